@@ -0,0 +1 @@
+"""Benchmarks for the Sisense MCP server (run with ``python -m benchmarks.<name>``)."""
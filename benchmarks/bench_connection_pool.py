@@ -0,0 +1,100 @@
+"""Per-call latency: one httpx client per request vs. the pooled SisenseClient.
+
+Run with:
+    python -m benchmarks.bench_connection_pool [--calls 500] [--latency 0.0]
+
+The "per-call client" mode reproduces the pre-pooling behaviour (a new
+``httpx.AsyncClient`` for every request, so every call opens a new TCP connection and
+builds a new SSL context). The "pooled" mode uses ``SisenseClient`` with its shared
+keep-alive pool. Note that the stand-in server is plain HTTP on localhost, so the numbers
+exclude the TLS handshake and network RTT that a real Sisense host adds to every new
+connection; the gap against a remote HTTPS instance is larger than reported here.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from src.client import SisenseClient
+
+from .fake_sisense import FakeSisense
+
+ENDPOINT = "/api/v1/elasticubes/getElasticubes"
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Summarize latency samples (seconds) as milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "calls": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+    }
+
+
+async def bench_per_call_client(base_url: str, calls: int) -> list[float]:
+    """Old behaviour: a fresh AsyncClient (and connection) for every call."""
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.get(f"{base_url}{ENDPOINT}")
+            response.raise_for_status()
+            response.json()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def bench_pooled_client(base_url: str, calls: int) -> list[float]:
+    """New behaviour: one SisenseClient with a shared keep-alive pool."""
+    samples = []
+    async with SisenseClient(base_url, "benchmark-token") as client:
+        for _ in range(calls):
+            start = time.perf_counter()
+            await client.get(ENDPOINT)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def run(calls: int, latency: float) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, bench in (
+        ("per_call_client", bench_per_call_client),
+        ("pooled", bench_pooled_client),
+    ):
+        async with FakeSisense(latency=latency) as server:
+            samples = await bench(server.url, calls)
+            results[name] = summarize(samples)
+            results[name]["connections"] = server.connection_count
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500, help="Sequential calls per mode")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Artificial server latency in seconds"
+    )
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.calls, args.latency))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<18}{'calls':>7}{'conns':>7}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:<18}{stats['calls']:>7}{stats['connections']:>7}"
+            f"{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Concurrent MCP sessions served by one HTTP server process: sessions per core.
+
+Run with:
+    python -m benchmarks.bench_http_sessions [--sessions 1 --sessions 50 --sessions 200]
+        [--duration 10] [--think 1.0] [--latency 0.05] [--workers 4] [--json]
+
+Starts the server with ``--transport http`` in a subprocess against a local Sisense
+stand-in, then opens many MCP sessions with the SDK's streamable HTTP client. Each
+session initializes, then loops over a mix of tool calls with a think time between
+calls (uniform between 0.5x and 1.5x ``--think``), like an agent. Sessions are spread
+over ``--workers`` load-generator processes so the client side does not limit the
+server. The caches use the shipped settings, so sessions share cached cube lists and
+schemas; client-side rate limits are off.
+
+For each session count it reports tool calls/s, p50/p99 call latency, errors, the
+server's CPU use in cores and peak RSS, and sessions per core: the number of such
+sessions one fully busy core would serve (sessions divided by cores used). Server CPU
+and RSS are read from ``/proc`` and are only reported on Linux.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import time
+
+import httpx
+
+from .bench_tools import percentile
+from .fake_sisense import FakeSisense, constant
+
+CALL_MIX = [
+    ("list_elasticubes", {}),
+    ("get_elasticube_schema", {"elasticube_name": "Cube 0", "mode": "columns"}),
+    ("get_elasticube_schema", {"elasticube_name": "Cube 1", "mode": "columns"}),
+    ("search_fields", {"query": "amount", "limit": 10}),
+    (
+        "query_elasticube",
+        {"datasource": "Cube 0", "sql_query": "SELECT col_0, col_1 FROM Table0", "count": 100},
+    ),
+    ("list_dashboards", {}),
+    ("get_dashboard_info", {"dashboard_id": "dash0", "mode": "summary"}),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_cpu_seconds(pid: int) -> float | None:
+    """User plus system CPU time of a process, from /proc (None elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # utime and stime are fields 14 and 15 of stat; fields[0] here is field 3
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_peak_rss_mb(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+async def run_sessions(url: str, sessions: int, duration: float, think: float) -> dict:
+    """Run ``sessions`` MCP sessions in this process (the load-generator side)."""
+    from mcp import ClientSession
+
+    try:
+        from mcp.client.streamable_http import streamable_http_client as connect
+    except ImportError:  # older SDKs only have the original name
+        from mcp.client.streamable_http import streamablehttp_client as connect
+
+    samples: list[float] = []
+    errors = 0
+    ready = 0
+    all_ready = asyncio.Event()
+    deadline = 0.0
+
+    async def session(seed: int) -> None:
+        nonlocal errors, ready, deadline
+        rng = random.Random(seed)
+        async with connect(url) as (read_stream, write_stream, _):
+            async with ClientSession(read_stream, write_stream) as client:
+                await client.initialize()
+                ready += 1
+                if ready == sessions:
+                    deadline = time.perf_counter() + duration
+                    all_ready.set()
+                await all_ready.wait()
+                # Stagger the first calls so sessions do not start in lockstep
+                await asyncio.sleep(rng.uniform(0, think))
+                while time.perf_counter() < deadline:
+                    name, arguments = rng.choice(CALL_MIX)
+                    start = time.perf_counter()
+                    try:
+                        result = await client.call_tool(name, arguments)
+                        if result.isError:
+                            errors += 1
+                    except Exception:
+                        errors += 1
+                    samples.append(time.perf_counter() - start)
+                    await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+
+    await asyncio.gather(*(session(os.getpid() * 1000 + i) for i in range(sessions)))
+    return {"samples": samples, "errors": errors}
+
+
+async def wait_until_healthy(url: str, process: asyncio.subprocess.Process) -> None:
+    async with httpx.AsyncClient() as client:
+        for _ in range(200):
+            if process.returncode is not None:
+                raise RuntimeError("The MCP server exited during startup")
+            try:
+                if (await client.get(f"{url}/healthz")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.05)
+    raise RuntimeError("The MCP server did not start")
+
+
+async def measure(
+    url: str, server: asyncio.subprocess.Process, sessions: int, args: argparse.Namespace
+) -> dict:
+    """Run one session count across the load-generator processes."""
+    workers = max(1, min(args.workers, sessions))
+    shares = [sessions // workers + (i < sessions % workers) for i in range(workers)]
+    processes = [
+        await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "benchmarks.bench_http_sessions",
+            "--run-load",
+            "--url",
+            f"{url}/mcp",
+            "--sessions",
+            str(share),
+            "--duration",
+            str(args.duration),
+            "--think",
+            str(args.think),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        for share in shares
+    ]
+    # The window also covers load-generator startup and session initialization
+    cpu_before = process_cpu_seconds(server.pid)
+    start = time.perf_counter()
+    outputs = await asyncio.gather(*(process.communicate() for process in processes))
+    elapsed = time.perf_counter() - start
+    cpu_after = process_cpu_seconds(server.pid)
+
+    samples: list[float] = []
+    errors = 0
+    for process, (stdout, stderr) in zip(processes, outputs, strict=True):
+        if process.returncode != 0:
+            raise RuntimeError(f"Load generator failed:\n{stderr.decode()}")
+        result = json.loads(stdout)
+        samples += result["samples"]
+        errors += result["errors"]
+
+    ordered = sorted(samples) or [0.0]
+    cores = (cpu_after - cpu_before) / elapsed if cpu_before is not None else None
+    return {
+        "sessions": sessions,
+        "calls": len(samples),
+        "errors": errors,
+        "throughput_per_s": round(len(samples) / args.duration, 1),
+        "p50_ms": round(percentile(ordered, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "server_cores": round(cores, 3) if cores is not None else None,
+        "sessions_per_core": round(sessions / cores) if cores else None,
+        "server_peak_rss_mb": process_peak_rss_mb(server.pid),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    results = []
+    async with FakeSisense(latency=constant(args.latency), tables_per_cube=12) as sisense:
+        env = {
+            **os.environ,
+            "SISENSE_BASE_URL": sisense.url,
+            "SISENSE_API_TOKEN": "bench",
+            "SISENSE_METADATA_RATE_LIMIT": "0",
+            "SISENSE_METADATA_MAX_CONCURRENCY": "0",
+            "SISENSE_SQL_RATE_LIMIT": "0",
+            "SISENSE_SQL_MAX_CONCURRENCY": "0",
+            "MCP_HTTP_AUTH_TOKEN": "",
+            "LOG_LEVEL": "WARNING",
+        }
+        server = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "src.server",
+            "--transport",
+            "http",
+            "--port",
+            str(port),
+            env=env,
+        )
+        try:
+            await wait_until_healthy(url, server)
+            for sessions in args.sessions or [1, 10, 50, 200]:
+                results.append(await measure(url, server, sessions, args))
+        finally:
+            server.terminate()
+            await server.wait()
+    return {
+        "config": {
+            "duration_s": args.duration,
+            "think_s": args.think,
+            "latency_s": args.latency,
+            "workers": args.workers,
+            "python": sys.version.split()[0],
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sessions", type=int, action="append", help="Concurrent sessions (default 1, 10, 50, 200)"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per session count")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean seconds between calls")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in latency (seconds)")
+    parser.add_argument("--workers", type=int, default=4, help="Load-generator processes")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--run-load", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_load:
+        result = asyncio.run(run_sessions(args.url, args.sessions[0], args.duration, args.think))
+        print(json.dumps(result))
+        return
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(
+        f"{'sessions':>9}{'calls/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        f"{'server cores':>14}{'sessions/core':>15}{'peak RSS MB':>13}"
+    )
+    for r in report["results"]:
+        print(
+            f"{r['sessions']:>9}{r['throughput_per_s']:>9}{r['p50_ms']:>9}{r['p99_ms']:>9}"
+            f"{r['errors']:>8}{str(r['server_cores']):>14}{str(r['sessions_per_core']):>15}"
+            f"{str(r['server_peak_rss_mb']):>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Encoded size and encode time of each query_elasticube output format.
+
+Run with:
+    python -m benchmarks.bench_output_formats [--repeat 3]
+
+Two synthetic result sets are encoded: "wide" (few rows, many columns) and "tall" (many
+rows, few columns with repetitive text). Sizes are UTF-8 bytes of the tool output.
+"""
+
+import argparse
+import json
+import time
+
+from src.tools.formatters import format_result
+
+VARIANTS = [
+    ("json", False),
+    ("compact", False),
+    ("columnar", False),
+    ("columnar", True),
+    ("csv", False),
+    ("tsv", False),
+]
+
+
+def wide_result(rows: int = 500, columns: int = 200) -> dict:
+    headers = [f"METRIC_{c:03d}" for c in range(columns)]
+    values = [[(r * columns + c) * 0.25 for c in range(columns)] for r in range(rows)]
+    return {"headers": headers, "values": values, "metadata": {"rowCount": rows}}
+
+
+def tall_result(rows: int = 100_000) -> dict:
+    regions = ["North America", "Europe", "Asia Pacific", "Latin America"]
+    values = [
+        [i, f"Brand {i % 50}", regions[i % 4], i * 1.5, "2024-08-02T16:50:14.417Z"]
+        for i in range(rows)
+    ]
+    headers = ["ID", "BRAND", "REGION", "AMOUNT", "CREATED"]
+    return {"headers": headers, "values": values, "metadata": {"rowCount": rows}}
+
+
+def run(repeat: int) -> dict[str, dict[str, dict[str, float]]]:
+    results = {}
+    for shape, result in (("wide", wide_result()), ("tall", tall_result())):
+        results[shape] = {}
+        for output_format, dictionary_encode in VARIANTS:
+            name = output_format + ("+dict" if dictionary_encode else "")
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                text = format_result(result, output_format, dictionary_encode)
+                best = min(best, time.perf_counter() - start)
+            results[shape][name] = {
+                "bytes": len(text.encode("utf-8")),
+                "encode_ms": round(best * 1000, 2),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per format (best is kept)")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for shape, formats in results.items():
+        baseline = formats["json"]["bytes"]
+        print(f"\n{shape}")
+        print(f"{'format':<15}{'bytes':>12}{'vs json':>9}{'encode ms':>11}")
+        for name, stats in formats.items():
+            print(
+                f"{name:<15}{stats['bytes']:>12}{stats['bytes'] / baseline:>9.2f}"
+                f"{stats['encode_ms']:>11}"
+            )
+
+
+if __name__ == "__main__":
+    main()
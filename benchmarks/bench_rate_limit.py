@@ -0,0 +1,119 @@
+"""Throughput and queueing delay under 429s: no client limits vs. token bucket + AIMD.
+
+Run with:
+    python -m benchmarks.bench_rate_limit [--calls 2000] [--workers 64] [--capacity 8]
+
+The stand-in server serves ``--capacity`` requests at a time and answers any request
+beyond that with 429, like a busy shared Sisense instance. ``--workers`` tasks issue
+schema requests as fast as they can. Without client-side limits every burst overshoots,
+is throttled and retried after a backoff; with the adaptive limit the client converges
+on the server's capacity and queues the excess locally instead.
+
+Reported per mode: completed and failed calls, 429s seen by the server, throughput,
+end-to-end call latency (including retries and local queueing) and the limiter's mean
+and max queueing delay.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.client import LimitConfig, RetryPolicy, SisenseClient
+
+from .bench_connection_pool import summarize
+from .fake_sisense import FakeSisense
+
+ENDPOINT = "/api/v2/datamodels/schema"
+
+
+async def run_mode(
+    limits: LimitConfig | None, calls: int, workers: int, capacity: int, latency: float
+) -> dict[str, float]:
+    samples: list[float] = []
+    failed = 0
+    async with FakeSisense(latency=latency, capacity=capacity) as server:
+        client = SisenseClient(
+            server.url,
+            "benchmark-token",
+            coalesce_requests=False,
+            retry_policy=RetryPolicy(max_retries=5, backoff=0.05, backoff_max=1.0),
+            breaker_failure_threshold=0,
+            rate_limits={"datamodels": limits} if limits is not None else None,
+        )
+        queue = iter(range(calls))
+
+        async def worker():
+            nonlocal failed
+            for i in queue:
+                start = time.perf_counter()
+                try:
+                    await client.get(ENDPOINT, params={"title": f"Cube {i}"})
+                except Exception:
+                    failed += 1
+                else:
+                    samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        async with client:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        elapsed = time.perf_counter() - start
+
+        result = summarize(samples) if samples else {"calls": 0}
+        result["failed"] = failed
+        result["throttled"] = server.throttled_count
+        result["throughput_rps"] = len(samples) / elapsed
+        limiter_stats = client.stats()["limits"].get("datamodels")
+        result["mean_queue_ms"] = limiter_stats["mean_wait_ms"] if limiter_stats else 0.0
+        result["max_queue_ms"] = limiter_stats["max_wait_ms"] if limiter_stats else 0.0
+    return result
+
+
+async def run(
+    calls: int, workers: int, capacity: int, latency: float
+) -> dict[str, dict[str, float]]:
+    modes = {
+        "unlimited": None,
+        "token_bucket": LimitConfig(rate=0.8 * capacity / latency, burst=capacity),
+        "aimd": LimitConfig(max_concurrency=workers),
+        "bucket+aimd": LimitConfig(
+            rate=capacity / latency, burst=capacity, max_concurrency=workers
+        ),
+    }
+    return {
+        name: await run_mode(limits, calls, workers, capacity, latency)
+        for name, limits in modes.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=2000, help="Total calls per mode")
+    parser.add_argument("--workers", type=int, default=64, help="Concurrent callers")
+    parser.add_argument("--capacity", type=int, default=8, help="Server concurrency limit")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Server latency per request in seconds"
+    )
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.calls, args.workers, args.capacity, args.latency))
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'mode':<14}{'ok':>6}{'failed':>8}{'429s':>7}{'req/s':>9}"
+        f"{'p50 ms':>9}{'p99 ms':>9}{'queue ms':>10}{'max q ms':>10}"
+    )
+    for name, stats in results.items():
+        print(
+            f"{name:<14}{stats['calls']:>6}{stats['failed']:>8}{stats['throttled']:>7}"
+            f"{stats['throughput_rps']:>9.1f}{stats.get('p50_ms', 0):>9.1f}"
+            f"{stats.get('p99_ms', 0):>9.1f}{stats['mean_queue_ms']:>10.1f}"
+            f"{stats['max_queue_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
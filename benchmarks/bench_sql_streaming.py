@@ -0,0 +1,127 @@
+"""Peak memory of buffered vs. streamed SQL result handling on a synthetic payload.
+
+Run with:
+    python -m benchmarks.bench_sql_streaming [--rows 1000000]
+
+"buffered" is the ``query_elasticube`` path for small counts: ``response.json()`` on the
+full body followed by ``json.dumps(indent=2)``. "streamed" is the path used from
+``SQL_STREAM_THRESHOLD_ROWS`` upwards: ``ElastiCubeService.stream_sql`` parses rows as the
+body arrives and the tool serializes them one by one. Each mode runs in a fresh
+subprocess and reports its peak RSS; the response body is generated on the fly so the
+payload itself only counts if the client buffers it. The baseline row reports the RSS of
+an idle process with the same imports.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import httpx
+
+from src.client import SisenseClient
+from src.services import ElastiCubeService
+from src.tools.formatters import format_result_stream
+
+CHUNK_ROWS = 2000
+
+
+async def synthetic_body(rows: int):
+    """Yield a Sisense-style /sql response for ``rows`` rows in byte chunks."""
+    yield b'{"headers": ["ID", "NAME", "AMOUNT", "CREATED"], "values": ['
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = ",".join(
+            f'[{i}, "Brand {i % 997}", {i * 1.5}, "2024-08-02T16:50:14.417Z"]'
+            for i in range(start, min(rows, start + CHUNK_ROWS))
+        )
+        yield (("," if start else "") + chunk).encode()
+    yield b'], "metadata": {"rowCount": %d}}' % rows
+
+
+def make_service(rows: int) -> ElastiCubeService:
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=synthetic_body(rows))
+    )
+    client = SisenseClient("https://bench.local", "token", transport=transport)
+    return ElastiCubeService(client)
+
+
+async def buffered(rows: int) -> int:
+    service = make_service(rows)
+    result = await service.query_sql("Bench", "SELECT * FROM t", count=rows)
+    text = json.dumps(result, indent=2)
+    return len(text)
+
+
+async def streamed(rows: int) -> int:
+    service = make_service(rows)
+    text = await format_result_stream(service.stream_sql("Bench", "SELECT * FROM t", count=rows))
+    return len(text)
+
+
+async def baseline(rows: int) -> int:
+    return 0
+
+
+MODES = {"baseline": baseline, "buffered": buffered, "streamed": streamed}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_mode(mode: str, rows: int) -> dict[str, float]:
+    """Run one mode in this process and return its measurements."""
+    start = time.perf_counter()
+    output_chars = asyncio.run(MODES[mode](rows))
+    return {
+        "rows": rows,
+        "seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "output_mb": round(output_chars / 1024 / 1024, 1),
+    }
+
+
+def measure(mode: str, rows: int) -> dict[str, float]:
+    """Run one mode in a fresh subprocess so peak RSS is not shared between modes."""
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_sql_streaming", "--rows", str(rows)]
+        + ["--mode", mode],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in the payload")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.rows)))
+        return
+
+    results = {mode: measure(mode, args.rows) for mode in MODES}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'mode':<10}{'rows':>10}{'seconds':>10}{'peak RSS MB':>13}{'output MB':>11}")
+    for name, stats in results.items():
+        print(
+            f"{name:<10}{stats['rows']:>10}{stats['seconds']:>10}"
+            f"{stats['peak_rss_mb']:>13}{stats['output_mb']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
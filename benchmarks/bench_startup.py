@@ -0,0 +1,181 @@
+"""Cold start: import time and time to the first MCP responses over stdio.
+
+Run with:
+    python -m benchmarks.bench_startup [--runs 5] [--top 10]
+
+Spawns the server as a subprocess (as an MCP client does) and measures, from process
+start, the time to the ``initialize`` and ``tools/list`` responses. After ``--pause``
+seconds (the model choosing a tool) it sends the first ``tools/call``
+(``list_elasticubes`` against the local Sisense stand-in) and measures its latency from
+when it was sent. Two modes are compared:
+
+- ``lazy``: ``python -m src.server``; the handshake is answered from the static tool
+  registry and the MCP SDK, settings, client and services load on the first tool call
+- ``eager``: the same server with ``src.app`` imported and the runtime built before
+  serving, which is what every launch paid before startup was made lazy
+
+It also reports ``python -X importtime`` totals for ``src.server`` and ``src.app`` and
+the heaviest modules imported by ``src.app``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from .fake_sisense import FakeSisense
+
+EAGER = (
+    "import src.app, src.runtime\n"
+    "src.runtime.get_runtime()\n"
+    "from src.server import cli\n"
+    "cli()\n"
+)
+MODES = {
+    "lazy": [sys.executable, "-m", "src.server"],
+    "eager": [sys.executable, "-c", EAGER],
+}
+MESSAGES = [
+    {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "bench", "version": "1.0"},
+        },
+    },
+    {"jsonrpc": "2.0", "method": "notifications/initialized"},
+    {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+    {
+        "jsonrpc": "2.0",
+        "id": 3,
+        "method": "tools/call",
+        "params": {"name": "list_elasticubes", "arguments": {}},
+    },
+]
+
+
+def import_times(module: str) -> list[tuple[int, str, int]]:
+    """Return (depth, module, cumulative microseconds) from ``python -X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            depth = (len(match.group(2)) - 1) // 2
+            times.append((depth, match.group(3), int(match.group(1))))
+    return times
+
+
+def total_ms(times: list[tuple[int, str, int]], module: str) -> float:
+    return next(micros for depth, name, micros in times if depth == 0 and name == module) / 1000
+
+
+def direct_imports(times: list[tuple[int, str, int]], module: str) -> list[tuple[str, int]]:
+    """Modules imported directly by ``module`` (importtime lists children before parents)."""
+    end = next(i for i, (depth, name, _) in enumerate(times) if depth == 0 and name == module)
+    direct = []
+    for depth, name, micros in reversed(times[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct.append((name, micros))
+    return direct
+
+
+async def time_session(command: list[str], env: dict[str, str], pause: float) -> dict[str, float]:
+    """Run one stdio session and time its responses."""
+    start = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        env=env,
+    )
+    timings = {}
+    for message in MESSAGES:
+        if message["method"] == "tools/call":
+            await asyncio.sleep(pause)
+            start = time.perf_counter()
+        process.stdin.write(json.dumps(message).encode() + b"\n")
+        await process.stdin.drain()
+        if "id" not in message:
+            continue
+        response = json.loads(await process.stdout.readline())
+        assert "result" in response and not response["result"].get("isError"), response
+        timings[message["method"]] = (time.perf_counter() - start) * 1000
+    process.stdin.close()
+    await process.wait()
+    return timings
+
+
+async def run(runs: int, pause: float) -> dict[str, dict[str, float]]:
+    results = {}
+    async with FakeSisense() as server:
+        env = {**os.environ, "SISENSE_BASE_URL": server.url, "SISENSE_API_TOKEN": "bench"}
+        for name, command in MODES.items():
+            sessions = [await time_session(command, env, pause) for _ in range(runs)]
+            results[name] = {
+                f"{method}_ms": statistics.median(s[method] for s in sessions)
+                for method in sessions[0]
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Sessions per mode (median)")
+    parser.add_argument("--top", type=int, default=10, help="Heaviest imports to list")
+    parser.add_argument(
+        "--pause", type=float, default=1.0, help="Seconds between tools/list and tools/call"
+    )
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    args = parser.parse_args()
+
+    imports = {module: import_times(module) for module in ("src.server", "src.app")}
+    sessions = asyncio.run(run(args.runs, args.pause))
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "import_ms": {
+                        module: total_ms(times, module) for module, times in imports.items()
+                    },
+                    "sessions": sessions,
+                },
+                indent=2,
+            )
+        )
+        return
+
+    for module, times in imports.items():
+        print(f"import {module}: {total_ms(times, module):.1f} ms")
+    print("\nheaviest direct imports of src.app (cumulative ms):")
+    direct = direct_imports(imports["src.app"], "src.app")
+    for name, micros in sorted(direct, key=lambda t: -t[1])[: args.top]:
+        print(f"  {name:<40}{micros / 1000:>8.1f}")
+
+    print(f"\n{'mode':<8}{'initialize ms':>15}{'tools/list ms':>15}{'1st call ms':>15}")
+    for name, stats in sessions.items():
+        print(
+            f"{name:<8}{stats['initialize_ms']:>15.1f}{stats['tools/list_ms']:>15.1f}"
+            f"{stats['tools/call_ms']:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""End-to-end throughput, latency and memory of every MCP tool.
+
+Run with:
+    python -m benchmarks.bench_tools [--calls 200] [--concurrency 8] [--json]
+    python -m benchmarks.bench_tools --output results.json --baseline previous.json
+
+Each scenario calls one tool through ``src.app.call_tool`` (argument handling, service,
+``SisenseClient`` over real HTTP, parsing and serialization) against a local Sisense
+stand-in with generated payloads. Scenarios run one at a time in a fresh subprocess so
+their peak RSS is not shared; the stand-in runs in this process. Per scenario it reports
+throughput, p50/p99 latency, errors, peak RSS and RSS growth over the process's state
+after the warm-up calls.
+
+The metadata and SQL result caches and the client-side rate limits are off by default,
+so every call reaches the stand-in; ``--cache`` and ``--limits`` use the shipped
+settings instead. ``--latency-median``/``--latency-p99`` add log-normal server latency
+and ``--error-rate`` makes the stand-in answer a fraction of requests with 500/503.
+
+``--output`` writes the results as JSON for regression tracking, and ``--baseline``
+prints the change against an earlier ``--output`` file.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import statistics
+import sys
+import time
+
+from .fake_sisense import FakeSisense, constant, lognormal
+
+QUERY = "SELECT col_0, col_1, col_2 FROM Table0"
+SCENARIOS = {
+    "list_elasticubes": ("list_elasticubes", {}),
+    "get_elasticube_schema": ("get_elasticube_schema", {"elasticube_name": "Cube 0"}),
+    "get_elasticube_schema_columns": (
+        "get_elasticube_schema",
+        {"elasticube_name": "Cube 0", "mode": "columns"},
+    ),
+    "query_elasticube": (
+        "query_elasticube",
+        {"datasource": "Cube 0", "sql_query": QUERY, "count": 1000},
+    ),
+    "query_elasticube_compact": (
+        "query_elasticube",
+        {"datasource": "Cube 0", "sql_query": QUERY, "count": 1000, "output_format": "compact"},
+    ),
+    "query_elasticube_streamed": (
+        "query_elasticube",
+        {"datasource": "Cube 0", "sql_query": QUERY, "count": 20000, "output_format": "csv"},
+    ),
+    "query_elasticube_batch": (
+        "query_elasticube_batch",
+        {
+            "queries": [
+                {
+                    "datasource": f"Cube {i}",
+                    "sql_query": f"SELECT COUNT(*) FROM Table{i}",
+                    "count": 1,
+                }
+                for i in range(10)
+            ]
+        },
+    ),
+    "profile_table": ("profile_table", {"elasticube_name": "Cube 0", "table": "Table0"}),
+    "search_fields": ("search_fields", {"query": "amount", "limit": 20}),
+    "list_dashboards": ("list_dashboards", {}),
+    "get_dashboard_info": ("get_dashboard_info", {"dashboard_id": "dash0"}),
+    "get_dashboard_info_summary": (
+        "get_dashboard_info",
+        {"dashboard_id": "dash0", "mode": "summary"},
+    ),
+    "get_server_metrics": ("get_server_metrics", {}),
+}
+WARM_UP_CALLS = 5
+
+
+def rss_mb(kind: int = resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(kind).ru_maxrss / scale
+
+
+def current_rss_mb() -> float:
+    """Resident set size now (falls back to the peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return rss_mb()
+    return pages * resource.getpagesize() / 1024 / 1024
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run_scenario(
+    url: str, scenario: str, calls: int, concurrency: int, cache: bool, limits: bool
+) -> dict[str, float]:
+    """Run one scenario in this process (the subprocess side)."""
+    from src import runtime
+    from src.app import call_tool
+    from src.config import Settings
+
+    overrides = {}
+    if not cache:
+        overrides.update(cache_enabled=False, result_cache_enabled=False)
+    if not limits:
+        overrides.update(
+            sisense_metadata_rate_limit=0,
+            sisense_metadata_max_concurrency=0,
+            sisense_sql_rate_limit=0,
+            sisense_sql_max_concurrency=0,
+        )
+    settings = Settings(sisense_base_url=url, sisense_api_token="bench", **overrides)
+    runtime._runtime = runtime.build_runtime(settings)
+    tool, arguments = SCENARIOS[scenario]
+
+    for _ in range(WARM_UP_CALLS):
+        await call_tool(tool, dict(arguments))
+    rss_before = current_rss_mb()
+
+    samples: list[float] = []
+    errors = 0
+    response_chars = 0
+    remaining = iter(range(calls))
+
+    async def worker() -> None:
+        nonlocal errors, response_chars
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                result = await call_tool(tool, dict(arguments))
+            except Exception:
+                errors += 1
+            else:
+                response_chars += len(result[0].text)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await runtime.close_runtime()
+
+    ordered = sorted(samples)
+    return {
+        "calls": calls,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_per_s": round(calls / elapsed, 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2),
+        "p50_ms": round(percentile(ordered, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "response_kb": round(response_chars / max(1, calls - errors) / 1024, 1),
+        "peak_rss_mb": round(rss_mb(), 1),
+        "rss_growth_mb": round(current_rss_mb() - rss_before, 1),
+    }
+
+
+async def measure(server: FakeSisense, scenario: str, args: argparse.Namespace) -> dict:
+    """Run one scenario in a fresh subprocess while this process serves the stand-in."""
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.bench_tools",
+        "--run-scenario",
+        scenario,
+        "--url",
+        server.url,
+        "--calls",
+        str(args.calls),
+        "--concurrency",
+        str(args.concurrency),
+    ]
+    command += ["--cache"] if args.cache else []
+    command += ["--limits"] if args.limits else []
+    requests_before = server.request_count
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"Scenario {scenario} failed:\n{stderr.decode()}")
+    result = json.loads(stdout)
+    result["upstream_requests"] = server.request_count - requests_before
+    return result
+
+
+async def run(args: argparse.Namespace) -> dict:
+    latency = (
+        lognormal(args.latency_median, args.latency_p99)
+        if args.latency_median > 0
+        else constant(0.0)
+    )
+    server_config = {
+        "cubes": args.cubes,
+        "tables_per_cube": args.tables,
+        "columns_per_table": args.columns,
+        "dashboards": args.dashboards,
+        "widgets_per_dashboard": args.widgets,
+        "error_rate": args.error_rate,
+    }
+    scenarios = args.scenario or list(SCENARIOS)
+    results = {}
+    async with FakeSisense(latency=latency, error_statuses=(500, 503), **server_config) as server:
+        for scenario in scenarios:
+            results[scenario] = await measure(server, scenario, args)
+    return {
+        "config": {
+            "calls": args.calls,
+            "concurrency": args.concurrency,
+            "cache": args.cache,
+            "limits": args.limits,
+            "latency_median_s": args.latency_median,
+            "latency_p99_s": args.latency_p99,
+            "python": sys.version.split()[0],
+            **server_config,
+        },
+        "results": results,
+    }
+
+
+def change(new: float, old: float | None) -> str:
+    if not old:
+        return ""
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def print_table(report: dict, baseline: dict | None) -> None:
+    previous = (baseline or {}).get("results", {})
+    print(
+        f"{'scenario':<31}{'calls/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        f"{'resp KB':>9}{'peak RSS MB':>13}{'RSS +MB':>9}"
+        + (f"{'Δ calls/s':>11}{'Δ p99':>8}" if baseline else "")
+    )
+    for name, stats in report["results"].items():
+        line = (
+            f"{name:<31}{stats['throughput_per_s']:>9}{stats['p50_ms']:>9}{stats['p99_ms']:>9}"
+            f"{stats['errors']:>8}{stats['response_kb']:>9}{stats['peak_rss_mb']:>13}"
+            f"{stats['rss_growth_mb']:>9}"
+        )
+        if baseline:
+            old = previous.get(name, {})
+            line += f"{change(stats['throughput_per_s'], old.get('throughput_per_s')):>11}"
+            line += f"{change(stats['p99_ms'], old.get('p99_ms')):>8}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200, help="Measured calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent callers")
+    parser.add_argument(
+        "--scenario", action="append", choices=SCENARIOS, help="Run only this scenario"
+    )
+    parser.add_argument("--cache", action="store_true", help="Keep the caches enabled")
+    parser.add_argument("--limits", action="store_true", help="Keep the client rate limits")
+    parser.add_argument("--cubes", type=int, default=20, help="Cubes listed by the stand-in")
+    parser.add_argument("--tables", type=int, default=12, help="Tables per cube schema")
+    parser.add_argument("--columns", type=int, default=15, help="Columns per table")
+    parser.add_argument("--dashboards", type=int, default=200, help="Dashboards listed")
+    parser.add_argument("--widgets", type=int, default=12, help="Widgets per dashboard")
+    parser.add_argument(
+        "--latency-median", type=float, default=0.0, help="Median server latency (seconds)"
+    )
+    parser.add_argument(
+        "--latency-p99", type=float, default=0.0, help="99th percentile server latency (seconds)"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of requests answered 500/503"
+    )
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="Compare against an earlier --output file")
+    parser.add_argument("--run-scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_scenario:
+        result = asyncio.run(
+            run_scenario(
+                args.url, args.run_scenario, args.calls, args.concurrency, args.cache, args.limits
+            )
+        )
+        print(json.dumps(result))
+        return
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(report, baseline)
+
+
+if __name__ == "__main__":
+    main()
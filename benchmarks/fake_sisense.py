@@ -0,0 +1,437 @@
+"""Local stand-in for a Sisense instance, used by benchmarks.
+
+Serves generated responses for the endpoints the MCP server calls so that benchmarks can
+exercise real HTTP (sockets, keep-alive, JSON bodies) without a Sisense deployment.
+Payload sizes, the latency distribution and injected errors are configurable; payloads
+are deterministic for a given configuration.
+"""
+
+import asyncio
+import json
+import math
+import random
+import socket
+from collections.abc import Callable
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+# Rows per chunk of a streamed /sql response body
+SQL_CHUNK_ROWS = 2000
+
+Latency = Callable[[random.Random], float]
+
+
+def constant(seconds: float) -> Latency:
+    """Every response takes ``seconds``."""
+    return lambda rng: seconds
+
+
+def uniform(low: float, high: float) -> Latency:
+    """Latency drawn uniformly from [low, high] seconds."""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal(median: float, p99: float) -> Latency:
+    """Right-skewed latency with the given median and 99th percentile (seconds).
+
+    Server response times are usually close to log-normal: most requests are near the
+    median and a few take many times longer.
+    """
+    sigma = math.log(p99 / median) / 2.326 if p99 > median else 0.0
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+class FakeSisense:
+    """In-process Sisense stand-in running on a random localhost port.
+
+    Usage:
+        async with FakeSisense() as server:
+            client = SisenseClient(server.url, "token")
+    """
+
+    def __init__(
+        self,
+        latency: float | Latency = 0.0,
+        capacity: int | None = None,
+        cubes: int = 10,
+        tables_per_cube: int = 0,
+        columns_per_table: int = 8,
+        dashboards: int = 10,
+        widgets_per_dashboard: int = 6,
+        sql_columns: int = 6,
+        sql_max_rows: int | None = None,
+        error_rate: float = 0.0,
+        error_statuses: tuple[int, ...] = (500,),
+        seed: int = 0,
+    ):
+        """Initialize the stand-in server.
+
+        Args:
+            latency: Artificial server-side latency added to every response: seconds, or
+                a distribution such as ``lognormal(0.05, 0.5)``
+            capacity: Requests served concurrently; requests beyond it are answered with
+                429 Too Many Requests (None: unlimited)
+            cubes: ElastiCubes listed by ``getElasticubes``
+            tables_per_cube: Tables in each cube's schema (joined in a chain)
+            columns_per_table: Columns per schema table
+            dashboards: Dashboards listed by ``/api/v1/dashboards``
+            widgets_per_dashboard: Widgets embedded in each dashboard
+            sql_columns: Columns of every ``/sql`` result
+            sql_max_rows: Rows a ``/sql`` query returns at most (default: the requested
+                ``count``, as if every table were large enough)
+            error_rate: Fraction of requests answered with an error status
+            error_statuses: Statuses injected errors are drawn from
+            seed: Seed of the random generator for latency and errors
+        """
+        self.latency = constant(latency) if isinstance(latency, int | float) else latency
+        self.capacity = capacity
+        self.cubes = cubes
+        self.tables_per_cube = tables_per_cube
+        self.columns_per_table = columns_per_table
+        self.dashboards = dashboards
+        self.widgets_per_dashboard = widgets_per_dashboard
+        self.sql_columns = sql_columns
+        self.sql_max_rows = sql_max_rows
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.rng = random.Random(seed)
+        self.request_count = 0
+        self.throttled_count = 0
+        self.error_count = 0
+        self.bytes_sent = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_by_route: dict[str, int] = {}
+        self.client_addresses: set[tuple[str, int]] = set()
+        self.url = ""
+        self._server: uvicorn.Server | None = None
+        self._task: asyncio.Task | None = None
+        self._bodies: dict[tuple, bytes] = {}
+
+    def build_app(self) -> Starlette:
+        """Build the Starlette application serving the fake endpoints."""
+        return Starlette(
+            routes=[
+                Route("/api/v1/elasticubes/getElasticubes", self.elasticubes),
+                Route("/api/v2/datamodels/schema", self.schema),
+                Route("/api/datasources/{datasource}/sql", self.sql),
+                Route("/api/v1/dashboards", self.dashboard_list),
+                Route("/api/v1/dashboards/{dashboard_id}", self.dashboard),
+                Route("/api/v1/dashboards/{dashboard_id}/widgets", self.dashboard_widgets),
+            ]
+        )
+
+    @property
+    def connection_count(self) -> int:
+        """Number of distinct client TCP connections seen (one per source port)."""
+        return len(self.client_addresses)
+
+    async def _respond(
+        self,
+        request: Request,
+        build: Callable[[], bytes | Response],
+        delay: float | None = None,
+    ) -> Response:
+        """Count, throttle, delay or fail a request, then answer it with ``build()``.
+
+        ``delay`` overrides the latency drawn from the configured distribution.
+        """
+        self.request_count += 1
+        route = request.scope["route"].path
+        self.requests_by_route[route] = self.requests_by_route.get(route, 0) + 1
+        if request.client is not None:
+            self.client_addresses.add((request.client.host, request.client.port))
+        if self.capacity is not None and self.in_flight >= self.capacity:
+            self.throttled_count += 1
+            return JSONResponse({"error": "Too many requests"}, status_code=429)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if delay is None:
+                delay = self.latency(self.rng)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.error_count += 1
+            status = self.rng.choice(self.error_statuses)
+            return JSONResponse({"error": f"Injected error {status}"}, status_code=status)
+        body = build()
+        if isinstance(body, Response):
+            return body
+        self.bytes_sent += len(body)
+        return Response(body, media_type="application/json")
+
+    def _cached_body(self, key: tuple, payload: Callable[[], object]) -> bytes:
+        """Encode a generated payload once per key; responses are served from bytes."""
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._bodies[key] = json.dumps(payload()).encode()
+        return body
+
+    # Payloads
+
+    def cube_title(self, i: int) -> str:
+        return f"Cube {i}"
+
+    def elasticube_list(self) -> list[dict]:
+        return [
+            {
+                "_id": f"cube{i}",
+                "title": self.cube_title(i),
+                "type": "extract",
+                "server": "LocalHost",
+                "lastUpdated": "2024-08-02T16:50:14.417Z",
+            }
+            for i in range(self.cubes)
+        ]
+
+    def schema_document(self, title: str | None) -> dict:
+        """A schema whose tables are joined in a chain on their first column."""
+        tables = []
+        relations = []
+        for t in range(self.tables_per_cube):
+            columns = [
+                {
+                    "oid": f"c{t}_{c}",
+                    "id": f"column_{c}",
+                    "name": "id" if c == 0 else f"{('amount', 'name', 'created')[c % 3]}_{c}",
+                    "type": (18, 0, 31)[c % 3],
+                }
+                for c in range(self.columns_per_table)
+            ]
+            tables.append(
+                {"oid": f"t{t}", "id": f"table_{t}", "name": f"Table{t}", "columns": columns}
+            )
+            if t:
+                relations.append(
+                    {
+                        "oid": f"r{t}",
+                        "columns": [
+                            {"dataset": "d0", "table": f"t{t - 1}", "column": f"c{t - 1}_0"},
+                            {"dataset": "d0", "table": f"t{t}", "column": f"c{t}_0"},
+                        ],
+                    }
+                )
+        return {
+            "oid": "m0",
+            "title": title,
+            "type": "extract",
+            "datasets": (
+                [{"oid": "d0", "name": "main", "schema": {"tables": tables}}] if tables else []
+            ),
+            "relations": relations,
+        }
+
+    def dashboard_summary(self, i: int) -> dict:
+        return {
+            "_id": f"dash{i}",
+            "oid": f"dash{i}",
+            "title": f"Dashboard {i}",
+            "desc": "",
+            "type": "dashboard",
+            "created": "2024-06-01T08:00:00.000Z",
+            "lastUpdated": "2024-08-02T16:50:14.417Z",
+            "owner": "owner",
+            "datasource": {"title": self.cube_title(i % max(1, self.cubes))},
+        }
+
+    def widget(self, dashboard: int, w: int) -> dict:
+        cube = self.cube_title(dashboard % max(1, self.cubes)).replace(" ", "")
+        return {
+            "oid": f"w{dashboard}_{w}",
+            "title": f"Widget {w}",
+            "type": ("chart/column", "pivot2", "indicator")[w % 3],
+            "datasource": {"title": self.cube_title(dashboard % max(1, self.cubes))},
+            "metadata": {
+                "panels": [
+                    {
+                        "name": "categories",
+                        "items": [{"jaql": {"dim": f"[{cube}.name_{w % 5}]", "title": "Name"}}],
+                    },
+                    {
+                        "name": "values",
+                        "items": [
+                            {
+                                "jaql": {
+                                    "dim": f"[{cube}.amount_{w % 5}]",
+                                    "agg": "sum",
+                                    "title": "Total",
+                                }
+                            }
+                        ],
+                    },
+                ]
+            },
+            "style": {"legend": {"enabled": True, "position": "bottom"}, "lineWidth": 2},
+        }
+
+    def dashboard_document(self, i: int) -> dict:
+        return {
+            **self.dashboard_summary(i),
+            "filters": [{"jaql": {"dim": "[Cube.created]", "title": "Created"}}],
+            "layout": {"columns": [{"width": 100}]},
+            "widgets": [self.widget(i, w) for w in range(self.widgets_per_dashboard)],
+        }
+
+    # Routes
+
+    async def elasticubes(self, request: Request) -> Response:
+        return await self._respond(
+            request, lambda: self._cached_body(("elasticubes",), self.elasticube_list)
+        )
+
+    async def schema(self, request: Request) -> Response:
+        title = request.query_params.get("title")
+        return await self._respond(
+            request,
+            lambda: self._cached_body(("schema", title), lambda: self.schema_document(title)),
+        )
+
+    async def dashboard_list(self, request: Request) -> Response:
+        return await self._respond(
+            request,
+            lambda: self._cached_body(
+                ("dashboards",),
+                lambda: [self.dashboard_summary(i) for i in range(self.dashboards)],
+            ),
+        )
+
+    def _dashboard_index(self, request: Request) -> int | None:
+        dashboard_id = request.path_params["dashboard_id"]
+        if dashboard_id.startswith("dash") and dashboard_id[4:].isdigit():
+            i = int(dashboard_id[4:])
+            if i < self.dashboards:
+                return i
+        return None
+
+    async def dashboard(self, request: Request) -> Response:
+        i = self._dashboard_index(request)
+        if i is None:
+            return await self._respond(
+                request, lambda: JSONResponse({"error": "Not found"}, status_code=404)
+            )
+        return await self._respond(
+            request, lambda: self._cached_body(("dashboard", i), lambda: self.dashboard_document(i))
+        )
+
+    async def dashboard_widgets(self, request: Request) -> Response:
+        i = self._dashboard_index(request)
+        if i is None:
+            return await self._respond(
+                request, lambda: JSONResponse({"error": "Not found"}, status_code=404)
+            )
+        return await self._respond(
+            request,
+            lambda: self._cached_body(
+                ("widgets", i),
+                lambda: [self.widget(i, w) for w in range(self.widgets_per_dashboard)],
+            ),
+        )
+
+    async def sql(self, request: Request) -> Response:
+        params = request.query_params
+        count = int(params.get("count", 100))
+        offset = int(params.get("offset", 0))
+        rows = (
+            count if self.sql_max_rows is None else max(0, min(count, self.sql_max_rows - offset))
+        )
+        query = params.get("query", "")
+        if query.startswith("SELECT COUNT(*), "):
+            # profile_table aggregates: one row with a number per select expression
+            select_list = query[len("SELECT ") : query.index(" FROM ")]
+            values = [[1000 - i for i in range(len(select_list.split(", ")))]]
+            return await self._respond(
+                request, lambda: json.dumps({"headers": [], "values": values}).encode()
+            )
+        if query.startswith("SELECT COUNT(*) FROM ("):
+            # Row count probe (query guard, sampling): the size of the wrapped result
+            total = [[self.sql_max_rows if self.sql_max_rows is not None else 1_000_000]]
+            return await self._respond(
+                request, lambda: json.dumps({"headers": [], "values": total}).encode()
+            )
+        if " GROUP BY " in query:
+            values = [[f"Brand {i}", 1000 - i] for i in range(rows)]
+            return await self._respond(
+                request, lambda: json.dumps({"headers": [], "values": values}).encode()
+            )
+        return await self._respond(request, lambda: self.sql_response(rows, offset))
+
+    def sql_response(self, rows: int, offset: int) -> Response:
+        """A ``/sql`` result; large ones are streamed in chunks like a real server."""
+        headers = [f"col_{c}" for c in range(self.sql_columns)]
+        if rows <= SQL_CHUNK_ROWS:
+            body = self._sql_body(headers, offset, rows)
+            self.bytes_sent += len(body)
+            return Response(body, media_type="application/json")
+        return StreamingResponse(
+            self._sql_chunks(headers, offset, rows), media_type="application/json"
+        )
+
+    def _sql_row(self, i: int) -> str:
+        cells = []
+        for c in range(self.sql_columns):
+            kind = c % 3
+            if kind == 0:
+                cells.append(str(i))
+            elif kind == 1:
+                cells.append(f'"Brand {(i + c) % 997}"')
+            else:
+                cells.append(repr((i % 1000) * 1.5 + c))
+        return "[" + ",".join(cells) + "]"
+
+    def _sql_body(self, headers: list[str], offset: int, rows: int) -> bytes:
+        values = ",".join(self._sql_row(i) for i in range(offset, offset + rows))
+        return (
+            f'{{"headers":{json.dumps(headers)},"values":[{values}],'
+            f'"metadata":{{"rowCount":{rows}}}}}'
+        ).encode()
+
+    async def _sql_chunks(self, headers: list[str], offset: int, rows: int):
+        yield f'{{"headers":{json.dumps(headers)},"values":['.encode()
+        for start in range(offset, offset + rows, SQL_CHUNK_ROWS):
+            end = min(offset + rows, start + SQL_CHUNK_ROWS)
+            chunk = ("," if start > offset else "") + ",".join(
+                self._sql_row(i) for i in range(start, end)
+            )
+            data = chunk.encode()
+            self.bytes_sent += len(data)
+            yield data
+        yield f'],"metadata":{{"rowCount":{rows}}}}}'.encode()
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Start serving on a free localhost port."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        # Accepted sockets inherit this; without it small responses hit delayed-ACK stalls
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.bind(("127.0.0.1", 0))
+        host, port = sock.getsockname()
+        self.url = f"http://{host}:{port}"
+
+        config = uvicorn.Config(self.build_app(), log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._task = asyncio.create_task(self._server.serve(sockets=[sock]))
+        while not self._server.started:
+            await asyncio.sleep(0.01)
+
+    async def stop(self) -> None:
+        """Stop the server and wait for it to shut down."""
+        if self._server is not None:
+            self._server.should_exit = True
+            await self._task
+            self._server = None
+
+    async def __aenter__(self) -> "FakeSisense":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
@@ -0,0 +1,262 @@
+"""Replay recorded Sisense traffic at higher speed and with more sessions.
+
+Record real sessions first by starting the server with ``TRAFFIC_RECORD_FILE`` set (see
+``src/client/recorder.py``), then run:
+
+    python -m benchmarks.replay traffic.jsonl [--speed 1 --speed 10 --speed 100]
+        [--sessions 1 --sessions 8] [--capacity 16] [--json] [--output replay.json]
+
+A stand-in server answers every recorded request with its recorded status, response
+size (the recorded body when payloads were captured, else filler of the same size) and
+recorded duration as server latency. Each configuration runs in a fresh subprocess that
+issues the requests through a ``SisenseClient`` built from the same settings as the
+server (so ``SISENSE_*`` limits from the environment apply): every session's requests
+are sent at their recorded offsets divided by ``--speed``, with ``--sessions`` copies
+running in parallel over one shared client, as in a server process serving that many
+sessions. Copies start spread over ``--ramp`` seconds.
+
+For each configuration it reports throughput, client-side p50/p99 latency next to the
+recorded p50/p99, errors, the stand-in's peak concurrent requests and the replaying
+process's peak RSS. ``--capacity`` makes the stand-in answer requests beyond that
+concurrency with 429, to see where Sisense itself would become the bottleneck.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from src.client.recorder import read_sessions
+
+from .bench_tools import percentile, rss_mb
+from .fake_sisense import FakeSisense
+
+
+def request_key(method: str, path: str, params: dict | None) -> tuple:
+    return (method, path, tuple(sorted((params or {}).items())))
+
+
+def filler(size: int) -> bytes:
+    """A JSON document of ``size`` bytes (at least 2)."""
+    return b'{"f":"' + b"x" * max(0, size - 8) + b'"}' if size >= 8 else b"{}"
+
+
+class ReplayServer(FakeSisense):
+    """Stand-in that answers recorded requests with their recorded responses.
+
+    Requests are matched on method, path and params; repeated requests cycle through
+    their recorded responses. Unknown requests get a 404.
+    """
+
+    def __init__(self, sessions: dict[str, list[dict]], **kwargs):
+        super().__init__(**kwargs)
+        self.responses: dict[tuple, itertools.cycle] = {}
+        recorded: dict[tuple, list[dict]] = {}
+        for records in sessions.values():
+            for record in records:
+                key = request_key(record["method"], record["path"], record.get("params"))
+                recorded.setdefault(key, []).append(record)
+        self.responses = {key: itertools.cycle(records) for key, records in recorded.items()}
+
+    def build_app(self) -> Starlette:
+        return Starlette(routes=[Route("/{path:path}", self.replay, methods=["GET", "POST"])])
+
+    async def replay(self, request: Request) -> Response:
+        # Recorded paths are as sent, i.e. with percent-encoded cube names
+        path = request.scope["raw_path"].decode("ascii")
+        key = request_key(request.method, path, dict(request.query_params))
+        responses = self.responses.get(key)
+        if responses is None:
+            return await self._respond(request, lambda: Response(status_code=404), delay=0.0)
+        record = next(responses)
+        return await self._respond(
+            request, lambda: self._recorded_response(record), delay=record.get("ms", 0) / 1000
+        )
+
+    def _recorded_response(self, record: dict) -> Response:
+        if "body" in record:
+            body = json.dumps(record["body"]).encode()
+        else:
+            body = filler(record.get("bytes", 2))
+        self.bytes_sent += len(body)
+        return Response(
+            body, status_code=record.get("status") or 502, media_type="application/json"
+        )
+
+
+async def replay_sessions(
+    path: str, url: str, speed: float, sessions: int, ramp: float
+) -> dict[str, float]:
+    """Replay the log in this process (the subprocess side)."""
+    from src.config import Settings
+    from src.runtime import build_runtime
+
+    recorded = [sorted(records, key=lambda r: r["t"]) for records in read_sessions(path).values()]
+    client = build_runtime(
+        Settings(
+            sisense_base_url=url,
+            sisense_api_token="replay",
+            traffic_record_file=None,
+            tracing_enabled=False,
+        )
+    ).client
+    # Create the connection pool up front so loading the TLS trust store is not measured
+    client._get_http_client()
+    rng = random.Random(0)
+    samples: list[float] = []
+    errors = 0
+
+    async def send(record: dict, at: float, start: float) -> None:
+        nonlocal errors
+        await asyncio.sleep(max(0.0, start + at - time.perf_counter()))
+        sent = time.perf_counter()
+        try:
+            if record["method"] == "POST":
+                await client.post(record["path"])
+            else:
+                await client.get(record["path"], params=record.get("params"))
+        except Exception:
+            errors += 1
+        samples.append(time.perf_counter() - sent)
+
+    async def session(records: list[dict], offset: float, start: float) -> None:
+        await asyncio.gather(*(send(r, offset + r["t"] / speed, start) for r in records))
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            session(recorded[i % len(recorded)], rng.uniform(0, ramp) if ramp else 0.0, start)
+            for i in range(sessions)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+
+    ordered = sorted(samples)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "throughput_per_s": round(len(ordered) / elapsed, 1),
+        "p50_ms": round(percentile(ordered, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+        "peak_rss_mb": round(rss_mb(), 1),
+    }
+
+
+async def measure(server: ReplayServer, args: argparse.Namespace, speed: float, sessions: int):
+    command = [
+        sys.executable,
+        "-m",
+        "benchmarks.replay",
+        args.log,
+        "--run",
+        "--url",
+        server.url,
+        "--speed",
+        str(speed),
+        "--sessions",
+        str(sessions),
+        "--ramp",
+        str(args.ramp),
+    ]
+    server.peak_in_flight = 0
+    throttled = server.throttled_count
+    process = await asyncio.create_subprocess_exec(
+        *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"Replay at {speed}x with {sessions} sessions failed:\n{stderr.decode()}"
+        )
+    result = json.loads(stdout)
+    result["server_peak_in_flight"] = server.peak_in_flight
+    result["throttled"] = server.throttled_count - throttled
+    return {"speed": speed, "sessions": sessions, **result}
+
+
+async def run(args: argparse.Namespace) -> dict:
+    sessions = read_sessions(args.log)
+    durations = sorted(r["ms"] for records in sessions.values() for r in records)
+    if not durations:
+        raise SystemExit(f"No recorded requests in {args.log}")
+    runs = []
+    async with ReplayServer(sessions, capacity=args.capacity) as server:
+        for speed in args.speed or [1.0, 10.0, 100.0]:
+            for parallel in args.sessions or [1]:
+                runs.append(await measure(server, args, speed, parallel))
+    return {
+        "recorded": {
+            "sessions": len(sessions),
+            "requests": len(durations),
+            "p50_ms": percentile(durations, 0.5),
+            "p99_ms": percentile(durations, 0.99),
+        },
+        "runs": runs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("log", help="Traffic log written with TRAFFIC_RECORD_FILE")
+    parser.add_argument(
+        "--speed", type=float, action="append", help="Replay speed factor (default 1, 10, 100)"
+    )
+    parser.add_argument(
+        "--sessions", type=int, action="append", help="Parallel sessions (default 1)"
+    )
+    parser.add_argument(
+        "--ramp", type=float, default=0.0, help="Spread session starts over this many seconds"
+    )
+    parser.add_argument(
+        "--capacity", type=int, help="Concurrent requests the stand-in serves before 429s"
+    )
+    parser.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--run", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        result = asyncio.run(
+            replay_sessions(args.log, args.url, args.speed[0], args.sessions[0], args.ramp)
+        )
+        print(json.dumps(result))
+        return
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    recorded = report["recorded"]
+    print(
+        f"recorded: {recorded['sessions']} sessions, {recorded['requests']} requests, "
+        f"p50 {recorded['p50_ms']} ms, p99 {recorded['p99_ms']} ms\n"
+    )
+    print(
+        f"{'speed':>6}{'sessions':>10}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}"
+        f"{'errors':>8}{'429s':>7}{'peak in flight':>16}{'peak RSS MB':>13}"
+    )
+    for r in report["runs"]:
+        print(
+            f"{r['speed']:>5g}x{r['sessions']:>10}{r['requests']:>10}{r['throughput_per_s']:>9}"
+            f"{r['p50_ms']:>9}{r['p99_ms']:>9}{r['errors']:>8}{r['throttled']:>7}"
+            f"{r['server_peak_in_flight']:>16}{r['peak_rss_mb']:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,3 @@
 # Sisense MCP Server Package
+
+__version__ = "0.1.0"
@@ -1,8 +1,6 @@
 """Entry point for running the server as a module: python -m src"""
 
-import asyncio
-
-from .server import main
+from .server import cli
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    cli()
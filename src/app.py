@@ -0,0 +1,117 @@
+"""MCP application: tool listing and routing to the tool handlers.
+
+Importing this module loads the MCP SDK, httpx and pydantic; ``server`` only does so
+once a client sends a message the stdio bootstrap cannot answer on its own.
+"""
+
+import json
+import time
+
+from mcp.server import Server
+from mcp.server.lowlevel.helper_types import ReadResourceContents
+from mcp.types import Resource, Tool
+from pydantic import AnyUrl
+
+from . import __version__
+from .runtime import get_runtime
+from .stdio_bootstrap import SERVER_NAME
+from .tools import (
+    get_dashboard_tools,
+    get_elasticube_tools,
+    get_instance_tools,
+    get_local_tools,
+    get_metrics_tools,
+    handle_dashboard_tool,
+    handle_elasticube_tool,
+    handle_instance_tool,
+    handle_local_tool,
+    handle_metrics_tool,
+)
+from .tools.registry import TOOL_GROUPS
+from .tracing import SERVER, span
+
+METRICS_URI = "sisense://metrics"
+
+app = Server(SERVER_NAME, version=__version__)
+
+
+@app.list_tools()
+async def list_tools() -> list[Tool]:
+    """List all available MCP tools."""
+    tools = []
+    tools.extend(get_elasticube_tools())
+    tools.extend(get_dashboard_tools())
+    tools.extend(get_metrics_tools())
+    tools.extend(get_instance_tools())
+    tools.extend(get_local_tools())
+    return tools
+
+
+@app.call_tool()
+async def call_tool(name: str, arguments: dict) -> list:
+    """Handle tool execution requests."""
+    group = TOOL_GROUPS.get(name)
+    if group is None:
+        raise ValueError(f"Unknown tool: {name}")
+
+    # The client and services are created on the first tool call
+    runtime = get_runtime()
+    with span(
+        f"tools/call {name}",
+        {"mcp.method.name": "tools/call", "gen_ai.tool.name": name},
+        kind=SERVER,
+    ):
+        metrics = runtime.metrics
+        if metrics is None:
+            return await _dispatch(group, name, arguments, runtime)
+
+        start = time.perf_counter()
+        try:
+            result = await _dispatch(group, name, arguments, runtime)
+        except Exception:
+            metrics.record_tool(name, time.perf_counter() - start, True, 0)
+            metrics.flush()
+            raise
+        response_bytes = sum(len(getattr(content, "text", "")) for content in result)
+        metrics.record_tool(name, time.perf_counter() - start, False, response_bytes)
+        metrics.flush()
+        return result
+
+
+async def _dispatch(group: str, name: str, arguments: dict, runtime) -> list:
+    if group == "metrics":
+        return await handle_metrics_tool(name, arguments, runtime.metrics)
+    if group == "instances":
+        return await handle_instance_tool(name, arguments, runtime)
+    # The default instance unless the call names another one
+    instance = arguments.get("instance")
+    target = runtime if instance is None else runtime.instance(instance)
+    if group == "local":
+        return await handle_local_tool(name, arguments, target.local_store)
+    if group == "elasticube":
+        return await handle_elasticube_tool(name, arguments, target.elasticube_service)
+    return await handle_dashboard_tool(name, arguments, target.dashboard_service)
+
+
+@app.list_resources()
+async def list_resources() -> list[Resource]:
+    """List the server's MCP resources."""
+    return [
+        Resource(
+            uri=METRICS_URI,
+            name="server-metrics",
+            description="Tool, Sisense API and cache metrics of this server (JSON)",
+            mimeType="application/json",
+        )
+    ]
+
+
+@app.read_resource()
+async def read_resource(uri: AnyUrl) -> list[ReadResourceContents]:
+    """Read an MCP resource."""
+    if str(uri) != METRICS_URI:
+        raise ValueError(f"Unknown resource: {uri}")
+    metrics = get_runtime().metrics
+    if metrics is None:
+        raise ValueError("Metrics are disabled (METRICS_ENABLED=false)")
+    return [ReadResourceContents(json.dumps(metrics.snapshot(), indent=2), "application/json")]
@@ -0,0 +1,5 @@
+"""In-memory caches for Sisense API responses."""
+
+from .ttl_cache import TTLCache, estimate_size
+
+__all__ = ["TTLCache", "estimate_size"]
@@ -0,0 +1,266 @@
+"""TTL + LRU cache bounded by entry count and by approximate size in bytes."""
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Items of a long list that are sized; the rest are assumed to be alike
+_SAMPLE_ITEMS = 32
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the in-memory footprint of a JSON-like value by its compact JSON length.
+
+    Long lists (SQL rows) are sized from an evenly spaced sample of their items, so
+    sizing a multi-megabyte result costs a few dozen rows rather than a full
+    serialization on the event loop.
+
+    Args:
+        value: JSON-like value (other leaves are sized by their ``str``)
+
+    Returns:
+        Approximate size in bytes
+    """
+    if isinstance(value, str):
+        return len(value) + 2
+    if value is None or value is True:
+        return 4
+    if value is False:
+        return 5
+    if isinstance(value, int | float):
+        return len(repr(value))
+    if isinstance(value, dict):
+        return max(2, 1 + sum(estimate_size(k) + estimate_size(v) + 2 for k, v in value.items()))
+    if isinstance(value, list | tuple):
+        count = len(value)
+        if count <= 2 * _SAMPLE_ITEMS:
+            return max(2, 1 + sum(estimate_size(item) + 1 for item in value))
+        sample = value[:: count // _SAMPLE_ITEMS]
+        return 1 + round(sum(estimate_size(item) + 1 for item in sample) * count / len(sample))
+    return len(str(value))
+
+
+class _Entry:
+    """A single cached value with its expiry time and estimated size."""
+
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class TTLCache:
+    """Namespaced TTL cache with LRU eviction by entry count and by bytes.
+
+    Keys are ``(namespace, key)`` pairs. Every namespace (e.g. ``"elasticubes"``,
+    ``"schema"``) can have its own TTL; a TTL of ``0`` disables caching for that namespace.
+    When either ``max_entries`` or ``max_bytes`` would be exceeded, least recently used
+    entries are evicted first.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl: float = 300.0,
+        ttls: dict[str, float] | None = None,
+        max_entry_bytes: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept
+            max_bytes: Maximum total estimated size of all entries in bytes
+            default_ttl: TTL in seconds for namespaces without an explicit TTL
+            ttls: Per-namespace TTLs in seconds (e.g., {"schema": 600})
+            max_entry_bytes: Largest single value accepted (default: ``max_bytes``), so one
+                big value cannot evict everything else
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.max_entry_bytes = max_bytes if max_entry_bytes is None else max_entry_bytes
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, Hashable], _Entry] = OrderedDict()
+        self._bytes = 0
+        self._hits: dict[str, int] = {}
+        self._misses: dict[str, int] = {}
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """Total estimated size of all cached entries."""
+        return self._bytes
+
+    def ttl_for(self, namespace: str) -> float:
+        """Return the TTL in seconds used for a namespace."""
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace: str, key: Hashable = None, default: Any = None) -> Any:
+        """Return a cached value, or ``default`` if missing or expired.
+
+        Args:
+            namespace: Cache namespace
+            key: Key within the namespace
+            default: Value returned on a miss
+
+        Returns:
+            Cached value or default
+        """
+        value = self._lookup(namespace, key)
+        return default if value is _MISSING else value
+
+    def _lookup(self, namespace: str, key: Hashable) -> Any:
+        full_key = (namespace, key)
+        entry = self._entries.get(full_key)
+        if entry is not None and entry.expires_at <= self._clock():
+            self._remove(full_key)
+            entry = None
+        if entry is None:
+            self._misses[namespace] = self._misses.get(namespace, 0) + 1
+            return _MISSING
+        self._entries.move_to_end(full_key)
+        self._hits[namespace] = self._hits.get(namespace, 0) + 1
+        return entry.value
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: Any,
+        ttl: float | None = None,
+        size: int | None = None,
+    ) -> bool:
+        """Store a value.
+
+        Args:
+            namespace: Cache namespace
+            key: Key within the namespace
+            value: Value to cache
+            ttl: TTL in seconds (defaults to the namespace TTL)
+            size: Size in bytes (estimated from the JSON encoding if omitted)
+
+        Returns:
+            True if the value was stored, False if caching is disabled for it or it is
+            larger than ``max_entry_bytes``
+        """
+        ttl = self.ttl_for(namespace) if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return False
+        size = estimate_size(value) if size is None else size
+        if size > min(self.max_bytes, self.max_entry_bytes):
+            logger.debug(f"Not caching {namespace}:{key!r}: {size} bytes exceeds cache limit")
+            return False
+
+        full_key = (namespace, key)
+        if full_key in self._entries:
+            self._remove(full_key)
+        self._entries[full_key] = _Entry(value, self._clock() + ttl, size)
+        self._bytes += size
+        self._evict()
+        return True
+
+    async def get_or_load(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+    ) -> Any:
+        """Return a cached value, calling ``loader`` and caching its result on a miss.
+
+        Args:
+            namespace: Cache namespace
+            key: Key within the namespace
+            loader: Coroutine function producing the value
+            refresh: Bypass and replace any cached value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        if refresh:
+            self.invalidate(namespace, key)
+        else:
+            value = self._lookup(namespace, key)
+            if value is not _MISSING:
+                return value
+        value = await loader()
+        self.set(namespace, key, value)
+        return value
+
+    def invalidate(self, namespace: str | None = None, key: Hashable = _MISSING) -> int:
+        """Explicitly drop cached entries.
+
+        Args:
+            namespace: Namespace to drop; all namespaces if None
+            key: Single key within the namespace to drop; whole namespace if omitted
+
+        Returns:
+            Number of entries removed
+        """
+        if namespace is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return removed
+        if key is not _MISSING:
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key))
+                return 1
+            return 0
+        doomed = [full_key for full_key in self._entries if full_key[0] == namespace]
+        for full_key in doomed:
+            self._remove(full_key)
+        return len(doomed)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current occupancy.
+
+        Returns:
+            Dictionary with totals and per-namespace hit/miss counts
+        """
+        namespaces = sorted(set(self._hits) | set(self._misses))
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": sum(self._hits.values()),
+            "misses": sum(self._misses.values()),
+            "evictions": self._evictions,
+            "namespaces": {
+                namespace: {
+                    "hits": self._hits.get(namespace, 0),
+                    "misses": self._misses.get(namespace, 0),
+                }
+                for namespace in namespaces
+            },
+        }
+
+    def _remove(self, full_key: tuple[str, Hashable]) -> None:
+        entry = self._entries.pop(full_key)
+        self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            full_key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._evictions += 1
@@ -1,5 +1,15 @@
 """HTTP client for Sisense API."""
 
+from .rate_limit import LimitConfig
+from .recorder import TrafficRecorder
+from .resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
 from .sisense_client import SisenseClient
 
-__all__ = ["SisenseClient"]
+__all__ = [
+    "SisenseClient",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "LimitConfig",
+    "TrafficRecorder",
+]
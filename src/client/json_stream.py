@@ -0,0 +1,127 @@
+"""Incremental parser for large top-level JSON objects.
+
+Sisense SQL results are a single JSON object whose row array can hold millions of
+entries. ``iter_json_items`` walks the object as bytes arrive and yields the elements of
+selected array members one at a time, so the full document and the full row list never
+have to be held in memory.
+"""
+
+import codecs
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Collection
+from typing import Any
+
+# Yielded as ``(key, ARRAY_START)`` when a streamed array member opens
+ARRAY_START = object()
+
+_WHITESPACE = " \t\n\r"
+# Compact the text buffer once this many characters have been consumed
+_COMPACT_AFTER = 1 << 16
+
+
+class _Reader:
+    """Text buffer over an async byte stream with a read position."""
+
+    def __init__(self, chunks: AsyncIterable[bytes | str]):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    async def fill(self) -> bool:
+        """Append the next chunk to the buffer. Returns False at end of stream."""
+        if self.eof:
+            return False
+        if self.pos > _COMPACT_AFTER:
+            self.buf = self.buf[self.pos :]
+            self.pos = 0
+        try:
+            chunk = await self._chunks.__anext__()
+        except StopAsyncIteration:
+            self.eof = True
+            self.buf += self._decoder.decode(b"", final=True)
+            return False
+        self.buf += self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        return True
+
+    async def peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not await self.fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    async def expect(self, chars: str) -> str:
+        """Consume the next non-whitespace character, which must be one of ``chars``."""
+        char = await self.peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at offset {self.pos}, got {char!r}")
+        self.pos += 1
+        return char
+
+    async def value(self) -> Any:
+        """Decode one complete JSON value at the current position."""
+        await self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if await self.fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buf) and not self.eof and await self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+async def iter_json_items(
+    chunks: AsyncIterable[bytes | str], stream_keys: Collection[str]
+) -> AsyncIterator[tuple[str, Any]]:
+    """Parse a top-level JSON object incrementally.
+
+    Members are yielded in document order as ``(key, value)``. Members named in
+    ``stream_keys`` whose value is an array are yielded as ``(key, ARRAY_START)`` followed
+    by one ``(key, element)`` pair per array element.
+
+    Args:
+        chunks: Async iterable of UTF-8 bytes (or str) chunks
+        stream_keys: Names of array members to stream element by element
+
+    Yields:
+        (key, value) pairs as described above
+
+    Raises:
+        ValueError: If the input is not a well-formed JSON object
+    """
+    reader = _Reader(chunks)
+    await reader.expect("{")
+    if await reader.peek() == "}":
+        return
+    while True:
+        key = await reader.value()
+        if not isinstance(key, str):
+            raise ValueError(f"Expected an object key at offset {reader.pos}")
+        await reader.expect(":")
+        if key in stream_keys and await reader.peek() == "[":
+            reader.pos += 1
+            yield key, ARRAY_START
+            if await reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield key, await reader.value()
+                    if await reader.expect(",]") == "]":
+                        break
+        else:
+            yield key, await reader.value()
+        if await reader.expect(",}") == "}":
+            return
@@ -0,0 +1,217 @@
+"""Client-side rate limiting and adaptive concurrency for Sisense API calls.
+
+Each endpoint family gets a ``FamilyLimiter``: a token bucket caps the request rate and
+an AIMD (additive-increase, multiplicative-decrease) limit caps requests in flight. The
+concurrency limit grows by about one per window of successful requests and is cut by
+``decrease_factor`` when Sisense signals overload (429/503 or a timeout), so bursts of
+tool calls back off before they slow the instance down for other users.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable
+
+
+class LimitConfig:
+    """Limits for one endpoint family."""
+
+    __slots__ = ("rate", "burst", "max_concurrency", "min_concurrency", "initial_concurrency")
+
+    def __init__(
+        self,
+        rate: float = 0.0,
+        burst: int = 10,
+        max_concurrency: int = 0,
+        min_concurrency: int = 1,
+        initial_concurrency: int | None = None,
+    ):
+        """Initialize the limits.
+
+        Args:
+            rate: Sustained requests per second (0 disables the token bucket)
+            burst: Requests that may be sent back to back before ``rate`` applies
+            max_concurrency: Upper bound of the adaptive concurrency limit (0 disables it)
+            min_concurrency: Lower bound of the adaptive concurrency limit
+            initial_concurrency: Starting concurrency limit (default: ``max_concurrency``)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.initial_concurrency = initial_concurrency
+
+
+class TokenBucket:
+    """Token bucket with FIFO reservations.
+
+    Tokens may go negative: each caller reserves the next token and sleeps until it is
+    due, so waiters are served in arrival order without polling. A caller cancelled
+    while it sleeps gives its reservation back.
+    """
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self._clock = clock
+        self._updated = clock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            try:
+                await asyncio.sleep(-self.tokens / self.rate)
+            except asyncio.CancelledError:
+                self.tokens += 1
+                raise
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency limit.
+
+    ``acquire`` waits while ``in_flight`` is at the current limit and returns a ticket
+    to pass to ``release``. Successes raise the limit by ``1 / limit`` (about +1 per
+    window); an overload cuts it by ``decrease_factor``, at most once per window: only
+    requests started after the last cut can cut it again.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: int | None = None,
+        decrease_factor: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        start = self.max_limit if initial_limit is None else initial_limit
+        self.limit = float(min(self.max_limit, max(self.min_limit, start)))
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.overloads = 0
+        self._clock = clock
+        self._last_decrease = float("-inf")
+        self._waiters: deque[asyncio.Future] = deque()
+        self._woken = 0
+
+    @property
+    def queued(self) -> int:
+        """Requests waiting for a slot."""
+        return len(self._waiters)
+
+    async def acquire(self) -> float:
+        """Wait for a slot. Returns a ticket (the start time) for ``release``."""
+        if self.in_flight + self._woken >= int(self.limit) or self._waiters:
+            requeue = False
+            while True:
+                waiter = asyncio.get_running_loop().create_future()
+                # A waiter that lost its slot to a limit cut keeps its place in line
+                if requeue:
+                    self._waiters.appendleft(waiter)
+                else:
+                    self._waiters.append(waiter)
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    if waiter.done() and not waiter.cancelled():
+                        # Woken but cancelled before running: pass the wake-up on
+                        self._woken -= 1
+                        self._wake()
+                    elif waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                    raise
+                self._woken -= 1
+                if self.in_flight < int(self.limit):
+                    break
+                requeue = True
+        self.in_flight += 1
+        return self._clock()
+
+    def release(self, ticket: float, overloaded: bool | None = False) -> None:
+        """Return a slot and adjust the limit from the request's outcome.
+
+        Args:
+            ticket: Value returned by ``acquire``
+            overloaded: The server signalled overload (429/503/timeout); None if the
+                request ended without an outcome (e.g. it was cancelled)
+        """
+        self.in_flight -= 1
+        if overloaded is None:
+            pass
+        elif overloaded:
+            self.overloads += 1
+            if ticket >= self._last_decrease:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self._last_decrease = self._clock()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        # Slots already promised to woken waiters that have not run yet are not free
+        free = int(self.limit) - self.in_flight - self._woken
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._woken += 1
+                free -= 1
+
+
+class FamilyLimiter:
+    """Token bucket plus adaptive concurrency for one endpoint family."""
+
+    def __init__(self, config: LimitConfig, clock: Callable[[], float] = time.monotonic):
+        self.bucket = TokenBucket(config.rate, config.burst, clock) if config.rate > 0 else None
+        self.concurrency = (
+            AdaptiveConcurrency(
+                config.max_concurrency,
+                config.min_concurrency,
+                config.initial_concurrency,
+                clock=clock,
+            )
+            if config.max_concurrency > 0
+            else None
+        )
+        self._clock = clock
+        self.requests = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def acquire(self) -> float | None:
+        """Wait for a token and a concurrency slot. Returns a ticket for ``release``."""
+        start = self._clock()
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        ticket = await self.concurrency.acquire() if self.concurrency is not None else None
+        waited = self._clock() - start
+        self.requests += 1
+        self.wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        return ticket
+
+    def release(self, ticket: float | None, overloaded: bool | None = False) -> None:
+        """Return the concurrency slot taken by ``acquire`` (see AdaptiveConcurrency)."""
+        if self.concurrency is not None and ticket is not None:
+            self.concurrency.release(ticket, overloaded)
+
+    def stats(self) -> dict[str, float | int | None]:
+        """Return the current limit and queueing counters."""
+        concurrency = self.concurrency
+        return {
+            "concurrency_limit": int(concurrency.limit) if concurrency else None,
+            "in_flight": concurrency.in_flight if concurrency else None,
+            "queued": concurrency.queued if concurrency else 0,
+            "overloads": concurrency.overloads if concurrency else 0,
+            "requests": self.requests,
+            "mean_wait_ms": (
+                round(1000 * self.wait_seconds / self.requests, 2) if self.requests else 0.0
+            ),
+            "max_wait_ms": round(1000 * self.max_wait_seconds, 2),
+        }
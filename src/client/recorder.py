@@ -0,0 +1,177 @@
+"""Opt-in recording of the Sisense API traffic of a server process.
+
+``TrafficRecorder`` appends one compact JSON line per upstream request to a log file
+(gzip-compressed if the path ends in ``.gz``): when it started relative to the session,
+method, path, query params, status, duration and response size. Response bodies are
+only stored when ``include_payloads`` is set. Values of params and body members whose
+names look like credentials are replaced, as is the API token wherever it appears;
+request headers (which carry the token) are never recorded.
+
+A log holds one or more sessions (one per server process, so several servers can append
+to the same file); each session starts with a ``session`` line and every request line
+carries its session id. ``benchmarks/replay.py`` re-issues them against a stand-in
+server.
+"""
+
+import gzip
+import json
+import logging
+import random
+import re
+import time
+from collections.abc import Callable
+from typing import Any, TextIO
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+SCRUBBED = "***"
+# Param and JSON member names whose values are never written to the log
+SECRET_NAMES = re.compile(r"token|secret|password|passwd|api[-_]?key|authorization|cookie", re.I)
+
+
+def scrub(value: Any, secrets: tuple[str, ...] = ()) -> Any:
+    """Return a copy of a JSON value with credential-like members and ``secrets`` masked."""
+    if isinstance(value, dict):
+        return {
+            key: SCRUBBED if SECRET_NAMES.search(str(key)) else scrub(item, secrets)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [scrub(item, secrets) for item in value]
+    if isinstance(value, str):
+        for secret in secrets:
+            value = value.replace(secret, SCRUBBED)
+    return value
+
+
+class TrafficRecorder:
+    """Writes request metadata (and optionally scrubbed payloads) to a JSON-lines log.
+
+    Args:
+        path: Log file; appended to, gzip-compressed if it ends in ``.gz``
+        include_payloads: Also store response bodies (scrubbed)
+        max_payload_bytes: Bodies larger than this are not stored (their size still is)
+        secrets: Strings masked wherever they appear (the API token)
+        clock: Time source for request offsets and durations (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        include_payloads: bool = False,
+        max_payload_bytes: int = 1024 * 1024,
+        secrets: tuple[str, ...] = (),
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.path = path
+        self.include_payloads = include_payloads
+        self.max_payload_bytes = max_payload_bytes
+        self.secrets = tuple(secret for secret in secrets if secret)
+        self._clock = clock
+        self.session = f"{random.getrandbits(64):016x}"
+        self.started = clock()
+        self.records = 0
+        self._flushed_at = self.started
+        self._file: TextIO | None = None
+        self._header_written = False
+
+    def _output(self) -> TextIO:
+        if self._file is None:
+            if self.path.endswith(".gz"):
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+            else:
+                self._file = open(self.path, "a", encoding="utf-8")
+        if not self._header_written:
+            self._header_written = True
+            self._write(
+                {
+                    "type": "session",
+                    "version": FORMAT_VERSION,
+                    "session": self.session,
+                    "started_at": round(time.time(), 3),
+                }
+            )
+        return self._file
+
+    def _write(self, record: dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def record(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None,
+        started: float,
+        status: int | None = None,
+        response_bytes: int | None = None,
+        body: bytes | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Record one upstream request.
+
+        Args:
+            method: HTTP method
+            path: API path
+            params: Query params
+            started: ``clock()`` value when the request was started
+            status: Final response status (None if no response was received)
+            response_bytes: Size of the response body
+            body: Response body, stored if payloads are enabled and it is small enough
+            error: Exception type when no response was received
+        """
+        now = self._clock()
+        record: dict[str, Any] = {
+            "session": self.session,
+            "t": round(started - self.started, 4),
+            "method": method,
+            "path": scrub(path, self.secrets),
+        }
+        if params:
+            record["params"] = scrub({str(k): str(v) for k, v in params.items()}, self.secrets)
+        if status is not None:
+            record["status"] = status
+        record["ms"] = round((now - started) * 1000, 2)
+        if response_bytes is not None:
+            record["bytes"] = response_bytes
+        if error is not None:
+            record["error"] = error
+        if self.include_payloads and body is not None and len(body) <= self.max_payload_bytes:
+            record["body"] = self._scrub_body(body)
+        try:
+            self._output()
+            self._write(record)
+            if now - self._flushed_at >= 1.0:
+                self._file.flush()
+                self._flushed_at = now
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not record request: {e}")
+            return
+        self.records += 1
+
+    def _scrub_body(self, body: bytes) -> Any:
+        text = body.decode("utf-8", errors="replace")
+        try:
+            return scrub(json.loads(text), self.secrets)
+        except ValueError:
+            return scrub(text, self.secrets)
+
+    def close(self) -> None:
+        """Flush and close the log."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_sessions(path: str) -> dict[str, list[dict[str, Any]]]:
+    """Read a recorded log into request records grouped by session, in log order."""
+    opener = gzip.open if path.endswith(".gz") else open
+    sessions: dict[str, list[dict[str, Any]]] = {}
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("type") != "session":
+                sessions.setdefault(record["session"], []).append(record)
+    return sessions
@@ -0,0 +1,209 @@
+"""Retry policy and circuit breakers for Sisense API calls."""
+
+import logging
+import random
+import time
+from collections.abc import Callable
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Endpoint families, each with its own circuit breaker (see ``endpoint_family``)
+ENDPOINT_FAMILIES = ("elasticubes", "datamodels", "sql", "dashboards", "other")
+
+
+def endpoint_family(endpoint: str) -> str:
+    """Classify an API path into an endpoint family.
+
+    Args:
+        endpoint: API path (e.g., '/api/datasources/Sales/sql')
+
+    Returns:
+        One of ENDPOINT_FAMILIES
+    """
+    path = endpoint.split("?", 1)[0]
+    if path.startswith("/api/datasources/") and path.endswith("/sql"):
+        return "sql"
+    if path.startswith("/api/v1/elasticubes"):
+        return "elasticubes"
+    if path.startswith("/api/v2/datamodels"):
+        return "datamodels"
+    if path.startswith("/api/v1/dashboards"):
+        return "dashboards"
+    return "other"
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a ``Retry-After`` header (delta seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """When and how long to wait before retrying an idempotent request.
+
+    Retries use exponential backoff with full jitter: the n-th retry waits a random time
+    between 0 and ``min(backoff_max, backoff * 2**n)``. A ``Retry-After`` header on a
+    retryable response is honored instead, unless it asks for more than
+    ``retry_after_max`` seconds, in which case the response is returned as is.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        backoff_max: float = 10.0,
+        retry_after_max: float = 30.0,
+        retry_statuses: frozenset[int] = frozenset({429, 500, 502, 503, 504}),
+    ):
+        """Initialize the policy.
+
+        Args:
+            max_retries: Retries after the first attempt (0 disables retries)
+            backoff: Base delay in seconds
+            backoff_max: Cap on a single backoff delay in seconds
+            retry_after_max: Longest ``Retry-After`` that is waited for
+            retry_statuses: HTTP statuses that are retried
+        """
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.retry_statuses = retry_statuses
+
+    def backoff_delay(self, retry: int) -> float:
+        """Jittered delay before retry number ``retry`` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2**retry))
+
+    def response_delay(self, response: httpx.Response, retry: int) -> float | None:
+        """Delay before retrying ``response``, or None if it should not be retried."""
+        if retry >= self.max_retries or response.status_code not in self.retry_statuses:
+            return None
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is None:
+            return self.backoff_delay(retry)
+        return retry_after if retry_after <= self.retry_after_max else None
+
+    def error_delay(self, error: Exception, retry: int, family: str) -> float | None:
+        """Delay before retrying after a transport error, or None if it is not retried.
+
+        Read and write timeouts of SQL queries are not retried: a query that ran into
+        its 60 s timeout is unlikely to finish on the next attempt.
+        """
+        if retry >= self.max_retries or not isinstance(error, httpx.TransportError):
+            return None
+        if family == "sql" and isinstance(error, (httpx.ReadTimeout, httpx.WriteTimeout)):
+            return None
+        return self.backoff_delay(retry)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request while an endpoint family's breaker is open."""
+
+    def __init__(self, family: str, retry_in: float):
+        self.family = family
+        self.retry_in = retry_in
+        super().__init__(
+            f"Sisense '{family}' endpoints are failing repeatedly; not sending requests for "
+            f"another {retry_in:.0f}s. Try again later."
+        )
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one endpoint family.
+
+    - closed: requests flow; ``failure_threshold`` consecutive failures open the breaker
+    - open: requests fail fast with CircuitOpenError for ``reset_timeout`` seconds
+    - half_open: a single probe request is let through; success closes the breaker,
+      failure opens it again
+
+    Failures are 5xx responses and transport errors (connect errors, timeouts);
+    4xx responses count as successes since the server is answering.
+    """
+
+    def __init__(
+        self,
+        family: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the breaker.
+
+        Args:
+            family: Endpoint family name (for errors and logs)
+            failure_threshold: Consecutive failures that open the breaker
+            reset_timeout: Seconds the breaker stays open before a probe is allowed
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.family = family
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.rejected = 0
+
+    def before_request(self) -> None:
+        """Admit a request or raise CircuitOpenError."""
+        if self.state == "closed":
+            return
+        if self.state == "open":
+            retry_in = self.opened_at + self.reset_timeout - self._clock()
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.family, retry_in)
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self._probe_in_flight:
+            self.rejected += 1
+            raise CircuitOpenError(self.family, 0)
+        self._probe_in_flight = True
+
+    def record_abandoned(self) -> None:
+        """Forget a request that ended without an outcome (e.g. it was cancelled)."""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info(f"Circuit breaker for '{self.family}' closed")
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or (
+            self.state == "closed" and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = "open"
+            self.opened_at = self._clock()
+            self.times_opened += 1
+            logger.warning(
+                f"Circuit breaker for '{self.family}' opened after "
+                f"{self.consecutive_failures} consecutive failures"
+            )
+
+    def stats(self) -> dict[str, object]:
+        """Return the breaker state and counters."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
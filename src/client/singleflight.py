@@ -0,0 +1,76 @@
+"""Single-flight coalescing of identical concurrent requests."""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class _Call:
+    """An in-flight call shared by every caller with the same key."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Runs at most one in-flight call per key; concurrent callers share its result.
+
+    Semantics:
+    - The first caller for a key starts the call; later callers with the same key await
+      the same task instead of starting their own.
+    - Results and exceptions are delivered to every waiter. The result object is shared,
+      so callers must not mutate it.
+    - Cancelling one waiter does not affect the others. When the last waiter is
+      cancelled, the shared call is cancelled too.
+    - Once a call finishes the key is released, so later calls start a fresh request
+      (this is coalescing, not caching).
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+
+    def __len__(self) -> int:
+        """Number of calls currently in flight."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` unless a call with the same key is in flight, then await the result.
+
+        Args:
+            key: Hashable identity of the call
+            fn: Coroutine function performing the call
+
+        Returns:
+            Result of the (possibly shared) call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every caller gave up: release the key and don't leave the call orphaned
+                self._release(key, call)
+                call.task.cancel()
+
+    def _release(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def _finish(self, key: Hashable, call: _Call) -> None:
+        self._release(key, call)
+        if not call.task.cancelled():
+            # Mark the exception as retrieved even if every waiter was cancelled
+            call.task.exception()
@@ -1,10 +1,35 @@
 """Pure HTTP client for Sisense API - no business logic."""
 
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection
+from functools import partial
 from typing import Any
 from urllib.parse import quote
 
 import httpx
 
+from ..metrics import MetricsRegistry
+from ..tracing import CLIENT, http_extensions, span
+from .json_stream import iter_json_items
+from .rate_limit import FamilyLimiter, LimitConfig
+from .recorder import TrafficRecorder
+from .resilience import (
+    ENDPOINT_FAMILIES,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    endpoint_family,
+)
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+def _noop() -> None:
+    pass
+
 
 class SisenseClient:
     """HTTP client for making requests to Sisense API.
@@ -14,14 +39,67 @@ class SisenseClient:
     - Authentication headers
     - URL encoding
     - Error handling at HTTP level
+    - A single long-lived connection pool shared by all requests
+    - Coalescing of identical concurrent GET requests
+    - Retries of GETs with jittered exponential backoff (honoring ``Retry-After``)
+    - A circuit breaker per endpoint family that fails fast while Sisense is degraded
+    - A token-bucket rate limit and an adaptive (AIMD) concurrency limit per endpoint
+      family, so bursts of tool calls queue on our side instead of overloading Sisense
+
+    The underlying ``httpx.AsyncClient`` is created lazily on the first request and kept
+    open (with keep-alive) until ``aclose()`` is called, so consecutive tool calls reuse
+    TCP/TLS connections instead of paying a handshake per call.
+
+    Concurrent GETs with the same endpoint and params share a single upstream request
+    and receive the same (read-only) response object.
+
+    GETs are idempotent and are retried on 429/5xx responses and transport errors
+    according to ``retry_policy``; POSTs are never retried. Every request passes through
+    the circuit breaker of its endpoint family (see ``resilience.endpoint_family``).
+
+    Each attempt (including every retry) first takes a token and a concurrency slot from
+    its family's limiter. A 429/503 response or a timeout halves that family's
+    concurrency limit; successes raise it again one step per window.
     """
 
-    def __init__(self, base_url: str, api_token: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_token: str,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        coalesce_requests: bool = True,
+        retry_policy: RetryPolicy | None = None,
+        breaker_failure_threshold: int = 5,
+        breaker_reset_timeout: float = 30.0,
+        rate_limits: dict[str, LimitConfig] | None = None,
+        metrics: MetricsRegistry | None = None,
+        metrics_instance: str = "",
+        recorder: TrafficRecorder | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
         """Initialize the Sisense HTTP client.
 
         Args:
             base_url: Base URL of the Sisense instance (e.g., https://instance.sisense.com)
             api_token: Personal API token for authentication
+            max_connections: Maximum number of concurrent connections in the pool
+            max_keepalive_connections: Maximum number of idle connections kept alive
+            keepalive_expiry: Seconds an idle connection is kept before being closed
+            http2: Enable HTTP/2 multiplexing (requires the optional ``h2`` package)
+            coalesce_requests: Share one in-flight request between identical concurrent GETs
+            retry_policy: Retry behavior for GETs (default: ``RetryPolicy()``)
+            breaker_failure_threshold: Consecutive failures that open an endpoint family's
+                circuit breaker (0 disables the breakers)
+            breaker_reset_timeout: Seconds an open breaker fails fast before probing again
+            rate_limits: Limits per endpoint family (families without an entry are not
+                limited); families mapped to the same LimitConfig object share one limiter
+            metrics: Registry that records the latency and status of every attempt
+            metrics_instance: Sisense instance name the attempts are recorded under
+            recorder: Traffic log that every upstream request is written to
+            transport: Optional custom transport (used by tests and benchmarks)
         """
         self.base_url = base_url.rstrip("/")
         self.headers = {
@@ -29,6 +107,70 @@ class SisenseClient:
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._inflight = SingleFlight() if coalesce_requests else None
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.breakers = (
+            {
+                family: CircuitBreaker(family, breaker_failure_threshold, breaker_reset_timeout)
+                for family in ENDPOINT_FAMILIES
+            }
+            if breaker_failure_threshold > 0
+            else {}
+        )
+        self.retries = dict.fromkeys(ENDPOINT_FAMILIES, 0)
+        self.metrics = metrics
+        self.metrics_instance = metrics_instance
+        self.recorder = recorder
+        shared: dict[int, FamilyLimiter] = {}
+        self.limiters: dict[str, FamilyLimiter] = {}
+        for family, config in (rate_limits or {}).items():
+            if id(config) not in shared:
+                shared[id(config)] = FamilyLimiter(config)
+            self.limiters[family] = shared[id(config)]
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the shared pooled client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning(
+                        "HTTP/2 requested but the 'h2' package is not installed; "
+                        "falling back to HTTP/1.1. Install with: pip install 'httpx[http2]'"
+                    )
+                    http2 = False
+            # Loading the TLS trust store makes this take a noticeable part of the first call
+            with span("create_http_client"):
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    headers=self.headers,
+                    limits=self.limits,
+                    http2=http2,
+                    transport=self._transport,
+                )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared connection pool. Safe to call more than once."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "SisenseClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
 
     async def get(
         self, endpoint: str, params: dict[str, Any] = None, timeout: float = 30.0
@@ -46,14 +188,237 @@ class SisenseClient:
         Raises:
             httpx.HTTPStatusError: If the request fails
             httpx.TimeoutException: If the request times out
+            CircuitOpenError: If the endpoint family's circuit breaker is open
         """
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.get(
-                f"{self.base_url}{endpoint}", headers=self.headers, params=params
+        if self._inflight is None:
+            return await self._get(endpoint, params, timeout)
+        key = ("GET", endpoint, self._params_key(params))
+        return await self._inflight.do(key, lambda: self._get(endpoint, params, timeout))
+
+    async def _get(
+        self, endpoint: str, params: dict[str, Any] | None, timeout: float
+    ) -> dict[str, Any]:
+        http_client = self._get_http_client()
+        started = time.perf_counter()
+        try:
+            response = await self._send(
+                endpoint,
+                lambda: http_client.get(
+                    endpoint, params=params, timeout=timeout, extensions=http_extensions()
+                ),
+                retry=True,
             )
-            response.raise_for_status()
+        except Exception as e:
+            self._record("GET", endpoint, params, started, error=e)
+            raise
+        self._record("GET", endpoint, params, started, response)
+        response.raise_for_status()
+        with span("parse", {"http.response.body.size": len(response.content)}):
             return response.json()
 
+    async def _send(
+        self,
+        endpoint: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        retry: bool,
+    ) -> httpx.Response:
+        """Send a request and return its limiter slot as soon as the response is back.
+
+        See ``_send_held``.
+        """
+        response, release = await self._send_held(endpoint, send, retry)
+        release()
+        return response
+
+    async def _send_held(
+        self,
+        endpoint: str,
+        send: Callable[[], Awaitable[httpx.Response]],
+        retry: bool,
+    ) -> tuple[httpx.Response, Callable[[], None]]:
+        """Send a request through its limiter and circuit breaker, retrying if ``retry`` is set.
+
+        Returns the first non-retryable response (which may be an error response) or
+        the last response once retries are exhausted, together with a callback that
+        returns the response's limiter slot; streamed responses hold it until the body
+        has been read. Responses that are retried are closed first, so streamed
+        responses do not hold a pooled connection.
+
+        Raises:
+            CircuitOpenError: If the endpoint family's breaker is open
+            httpx.TransportError: If the last attempt failed at the transport level
+        """
+        family = endpoint_family(endpoint)
+        breaker = self.breakers.get(family)
+        limiter = self.limiters.get(family)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                with span("queue", {"sisense.family": family}):
+                    ticket = await limiter.acquire()
+            else:
+                ticket = None
+            if breaker is not None:
+                try:
+                    breaker.before_request()
+                except CircuitOpenError:
+                    if limiter is not None:
+                        limiter.release(ticket, overloaded=None)
+                    raise
+            started = time.perf_counter()
+            try:
+                with span(
+                    f"sisense {family}",
+                    {"url.path": endpoint, "http.request.resend_count": attempt},
+                    kind=CLIENT,
+                ) as request_span:
+                    response = await send()
+                    request_span.set("http.request.method", response.request.method)
+                    request_span.set("http.response.status_code", response.status_code)
+                    if response.is_error:
+                        request_span.set_error(f"HTTP {response.status_code}")
+            except httpx.TransportError as e:
+                if self.metrics is not None:
+                    self.metrics.record_request(
+                        family, time.perf_counter() - started, None, self.metrics_instance
+                    )
+                if limiter is not None:
+                    limiter.release(ticket, overloaded=isinstance(e, httpx.TimeoutException))
+                if breaker is not None:
+                    breaker.record_failure()
+                delay = self.retry_policy.error_delay(e, attempt, family) if retry else None
+                if delay is None:
+                    raise
+                logger.debug(f"Retrying GET {endpoint} in {delay:.2f}s after {e!r}")
+            except BaseException:
+                if limiter is not None:
+                    limiter.release(ticket, overloaded=None)
+                if breaker is not None:
+                    breaker.record_abandoned()
+                raise
+            else:
+                if self.metrics is not None:
+                    self.metrics.record_request(
+                        family,
+                        time.perf_counter() - started,
+                        response.status_code,
+                        self.metrics_instance,
+                    )
+                overloaded = response.status_code in (429, 503)
+                if breaker is not None:
+                    if response.status_code >= 500:
+                        breaker.record_failure()
+                    else:
+                        breaker.record_success()
+                delay = self.retry_policy.response_delay(response, attempt) if retry else None
+                if delay is None:
+                    if limiter is None:
+                        return response, _noop
+                    return response, partial(limiter.release, ticket, overloaded)
+                if limiter is not None:
+                    limiter.release(ticket, overloaded)
+                logger.debug(
+                    f"Retrying GET {endpoint} in {delay:.2f}s after HTTP {response.status_code}"
+                )
+                await response.aclose()
+            attempt += 1
+            self.retries[family] += 1
+            await asyncio.sleep(delay)
+
+    def _record(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        started: float,
+        response: httpx.Response | None = None,
+        error: BaseException | None = None,
+        streamed: bool = False,
+    ) -> None:
+        """Write a finished request to the traffic recorder, if one is set."""
+        if self.recorder is None:
+            return
+        if response is None:
+            self.recorder.record(method, endpoint, params, started, error=type(error).__name__)
+            return
+        body = None if streamed else response.content
+        self.recorder.record(
+            method,
+            endpoint,
+            params,
+            started,
+            status=response.status_code,
+            response_bytes=response.num_bytes_downloaded if streamed else len(body),
+            body=body,
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return circuit breaker states, retry counts and limiter state per endpoint family."""
+        return {
+            "breakers": {family: breaker.stats() for family, breaker in self.breakers.items()},
+            "retries": dict(self.retries),
+            "limits": {family: limiter.stats() for family, limiter in self.limiters.items()},
+        }
+
+    @staticmethod
+    def _params_key(params: dict[str, Any] | None) -> tuple:
+        """Build an order-independent, hashable key from query params."""
+        if not params:
+            return ()
+        return tuple(sorted((str(k), str(v)) for k, v in params.items()))
+
+    async def stream_get(
+        self,
+        endpoint: str,
+        params: dict[str, Any] = None,
+        stream_keys: Collection[str] = (),
+        timeout: float = 30.0,
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """Make a GET request and parse the JSON object response incrementally.
+
+        Members named in ``stream_keys`` are yielded element by element as the body
+        arrives (see ``iter_json_items``), so large row arrays are never fully buffered.
+        Streamed requests are not coalesced. They are retried only until the response
+        headers arrive; errors while reading the body are raised as they are.
+
+        Args:
+            endpoint: API endpoint path
+            params: Query parameters
+            stream_keys: Names of top-level array members to stream element by element
+            timeout: Request timeout in seconds
+
+        Yields:
+            (key, value) pairs in document order
+
+        Raises:
+            httpx.HTTPStatusError: If the request fails
+            httpx.TimeoutException: If the request times out
+        """
+        http_client = self._get_http_client()
+        request = http_client.build_request(
+            "GET", endpoint, params=params, timeout=timeout, extensions=http_extensions()
+        )
+        started = time.perf_counter()
+        try:
+            response, release = await self._send_held(
+                endpoint, lambda: http_client.send(request, stream=True), retry=True
+            )
+        except Exception as e:
+            self._record("GET", endpoint, params, started, error=e)
+            raise
+        try:
+            if response.is_error:
+                # Load the (small) error body so handlers can report it
+                await response.aread()
+                response.raise_for_status()
+            async for item in iter_json_items(response.aiter_bytes(), stream_keys):
+                yield item
+        finally:
+            release()
+            await response.aclose()
+            # Streamed bodies are not kept, so only their size is recorded
+            self._record("GET", endpoint, params, started, response, streamed=True)
+
     async def post(
         self, endpoint: str, json_data: dict[str, Any] = None, timeout: float = 30.0
     ) -> dict[str, Any]:
@@ -71,11 +436,22 @@ class SisenseClient:
             httpx.HTTPStatusError: If the request fails
             httpx.TimeoutException: If the request times out
         """
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                f"{self.base_url}{endpoint}", headers=self.headers, json=json_data
+        http_client = self._get_http_client()
+        started = time.perf_counter()
+        try:
+            response = await self._send(
+                endpoint,
+                lambda: http_client.post(
+                    endpoint, json=json_data, timeout=timeout, extensions=http_extensions()
+                ),
+                retry=False,
             )
-            response.raise_for_status()
+        except Exception as e:
+            self._record("POST", endpoint, None, started, error=e)
+            raise
+        self._record("POST", endpoint, None, started, response)
+        response.raise_for_status()
+        with span("parse", {"http.response.body.size": len(response.content)}):
             return response.json()
 
     def encode_datasource_name(self, datasource: str) -> str:
@@ -1,9 +1,118 @@
+from functools import lru_cache
+from typing import Any
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     sisense_base_url: str
     sisense_api_token: str
+    # The instance above is the default one; more instances map a name to overrides of the
+    # per-instance settings below, e.g. {"staging": {"sisense_base_url": "...",
+    # "sisense_api_token": "..."}}. Each gets its own connection pool, limits and caches.
+    sisense_instance_name: str = "default"
+    sisense_instances: dict[str, dict[str, Any]] = {}
+
+    # HTTP connection pool
+    sisense_max_connections: int = 20
+    sisense_max_keepalive_connections: int = 10
+    sisense_keepalive_expiry: float = 30.0
+    sisense_http2: bool = False
+    sisense_coalesce_requests: bool = True
+
+    # Retries of GET requests (jittered exponential backoff, Retry-After is honored)
+    sisense_max_retries: int = 2
+    sisense_retry_backoff: float = 0.5
+    sisense_retry_backoff_max: float = 10.0
+    sisense_retry_after_max: float = 30.0
+    # Per endpoint family circuit breaker; a threshold of 0 disables the breakers
+    sisense_breaker_failure_threshold: int = 5
+    sisense_breaker_reset_timeout: float = 30.0
+    # Client-side limits: requests/second (token bucket, 0 = unlimited), burst size and the
+    # ceiling of the adaptive concurrency limit (0 = unlimited). SQL queries are limited
+    # separately from the metadata endpoints, which share one limiter.
+    sisense_metadata_rate_limit: float = 20.0
+    sisense_metadata_burst: int = 40
+    sisense_metadata_max_concurrency: int = 16
+    sisense_sql_rate_limit: float = 5.0
+    sisense_sql_burst: int = 10
+    sisense_sql_max_concurrency: int = 8
+
+    # Metadata cache (cube list, schemas, dashboard list); a TTL of 0 disables caching
+    cache_enabled: bool = True
+    cache_max_entries: int = 256
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_ttl_elasticubes: float = 300.0
+    cache_ttl_schema: float = 600.0
+    cache_ttl_dashboards: float = 300.0
+
+    # SQL results requested with at least this many rows are parsed incrementally
+    sql_stream_threshold_rows: int = 10000
+    # Auto-pagination defaults for query_elasticube (Live Connections cap pages at 5000 rows)
+    sql_page_size: int = 5000
+    sql_max_concurrent_pages: int = 4
+    # Queries of one query_elasticube_batch call in flight at once
+    sql_batch_max_concurrency: int = 4
+    # query_elasticube(sample=true): push a RAND() filter down to Sisense where the source
+    # accepts it, else stream at most this many rows through a reservoir
+    sql_sample_pushdown: bool = True
+    sql_sample_max_scan_rows: int = 1_000_000
+    # Pre-flight guard for queries without a LIMIT (opt-in): a cached COUNT(*) probe, one
+    # extra request per distinct unbounded query, sizes them; they are then rejected above
+    # the reject rows, paginated above the paginate rows, and otherwise sent with a LIMIT
+    # covering the requested rows
+    sql_guard_enabled: bool = False
+    sql_guard_count_probe: bool = True
+    sql_guard_reject_rows: int = 1_000_000
+    sql_guard_paginate_rows: int = 5000
+
+    # SQL result cache, keyed on (datasource, normalized query, count, offset); entries are
+    # dropped when the cube's lastUpdated changes. Larger results are not cached.
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 512
+    result_cache_max_bytes: int = 128 * 1024 * 1024
+    result_cache_max_entry_bytes: int = 16 * 1024 * 1024
+    result_cache_ttl: float = 900.0
+
+    # Schemas fetched concurrently when building the search_fields index
+    field_index_concurrency: int = 8
+
+    # Results materialized by query_elasticube(materialize=true) into in-memory SQLite for
+    # query_local; least recently used handles are evicted beyond the bytes or handles
+    local_store_enabled: bool = True
+    local_store_max_bytes: int = 256 * 1024 * 1024
+    local_store_max_handles: int = 16
+    local_query_timeout: float = 10.0
+
+    # In-process metrics (get_server_metrics tool and sisense://metrics resource); when a
+    # file is set it is rewritten in the Prometheus text format at most every interval
+    metrics_enabled: bool = True
+    metrics_prometheus_file: str | None = None
+    metrics_prometheus_interval: float = 15.0
+
+    # Trace spans per tool call (handler, service, HTTP phases, parse, serialize), written
+    # as OTLP/JSON lines to "stderr" or a file path
+    tracing_enabled: bool = False
+    tracing_export: str = "stderr"
+
+    # Traffic recording for capacity planning: every Sisense API request is appended to
+    # this JSON-lines file (gzip if it ends in .gz); bodies only with payloads enabled
+    traffic_record_file: str | None = None
+    traffic_record_payloads: bool = False
+
+    # Streamable HTTP transport (``--transport http``): one process serving many MCP sessions
+    # over the shared client and caches. Requests must carry "Authorization: Bearer <token>"
+    # when a token is set; Host headers are checked against the allowed hosts (loopback
+    # names are always allowed when bound to a loopback address).
+    mcp_http_host: str = "127.0.0.1"
+    mcp_http_port: int = 8000
+    mcp_http_auth_token: str | None = None
+    mcp_http_allowed_hosts: list[str] = []
+    mcp_http_stateless: bool = False
+    mcp_http_json_response: bool = False
+
+    # Seconds before the dashboard title index used by get_dashboard_info is refreshed
+    dashboard_index_max_age: float = 300.0
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -11,4 +120,14 @@ class Settings(BaseSettings):
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load the settings from the environment and ``.env`` on first use."""
+    return Settings()
+
+
+def __getattr__(name: str):
+    # ``from .config import settings`` keeps working, but no longer runs at import time
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,153 @@
+"""Streamable HTTP transport: many concurrent MCP sessions served by one process.
+
+Every session runs the SDK server in ``app`` on the process-wide runtime, so all
+sessions share one Sisense connection pool, the client-side rate limits and circuit
+breakers, and the metadata and SQL result caches: a schema fetched for one session is
+served from the cache to the next. Sessions are managed by the SDK's
+``StreamableHTTPSessionManager`` at ``/mcp``; ``/healthz`` answers load balancer probes.
+"""
+
+import contextlib
+import hmac
+import logging
+from collections.abc import AsyncIterator
+
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from mcp.server.transport_security import TransportSecuritySettings
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from . import __version__
+from .app import app
+from .config import Settings
+from .runtime import close_runtime, get_runtime
+
+logger = logging.getLogger(__name__)
+
+MCP_PATH = "/mcp"
+HEALTH_PATH = "/healthz"
+LOOPBACK_HOSTS = ("127.0.0.1", "localhost", "::1")
+
+
+def security_settings(host: str, allowed_hosts: list[str]) -> TransportSecuritySettings:
+    """Host/Origin checks against DNS rebinding.
+
+    A server bound to a loopback address only accepts loopback Host headers (plus
+    ``allowed_hosts``); one bound to another address checks Host headers only when
+    ``allowed_hosts`` is set, as its public names are not known.
+    """
+    hosts = list(allowed_hosts)
+    if host in LOOPBACK_HOSTS:
+        hosts += ["127.0.0.1:*", "localhost:*", "[::1]:*"]
+    origins = [f"http://{h}" for h in hosts] + [f"https://{h}" for h in hosts]
+    return TransportSecuritySettings(
+        enable_dns_rebinding_protection=bool(hosts),
+        allowed_hosts=hosts,
+        allowed_origins=origins,
+    )
+
+
+class BearerAuth:
+    """ASGI middleware that rejects requests without ``Authorization: Bearer <token>``.
+
+    Args:
+        app: The wrapped application
+        token: The expected token
+        exempt: Paths served without a token (health checks)
+    """
+
+    def __init__(self, app: ASGIApp, token: str, exempt: tuple[str, ...] = (HEALTH_PATH,)):
+        self.app = app
+        self.expected = f"Bearer {token}".encode()
+        self.exempt = exempt
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] not in self.exempt:
+            supplied = dict(scope["headers"]).get(b"authorization", b"")
+            if not hmac.compare_digest(supplied, self.expected):
+                response = JSONResponse(
+                    {"error": "Missing or invalid bearer token"},
+                    status_code=401,
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _SessionEndpoint:
+    """Route endpoint handing requests to the session manager (a plain ASGI app)."""
+
+    def __init__(self, manager: StreamableHTTPSessionManager):
+        self.manager = manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.manager.handle_request(scope, receive, send)
+
+
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok", "version": __version__})
+
+
+def build_http_app(settings: Settings) -> ASGIApp:
+    """Create the ASGI application serving MCP sessions at ``/mcp``.
+
+    The shared runtime is built on startup (so invalid settings fail fast rather than on
+    the first tool call) and closed on shutdown.
+    """
+    manager = StreamableHTTPSessionManager(
+        app,
+        json_response=settings.mcp_http_json_response,
+        stateless=settings.mcp_http_stateless,
+        security_settings=security_settings(
+            settings.mcp_http_host, settings.mcp_http_allowed_hosts
+        ),
+    )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(_: Starlette) -> AsyncIterator[None]:
+        get_runtime()
+        async with manager.run():
+            try:
+                yield
+            finally:
+                await close_runtime()
+
+    http_app = Starlette(
+        routes=[
+            Route(MCP_PATH, _SessionEndpoint(manager), methods=["GET", "POST", "DELETE"]),
+            Route(HEALTH_PATH, health),
+        ],
+        lifespan=lifespan,
+    )
+    if settings.mcp_http_auth_token:
+        return BearerAuth(http_app, settings.mcp_http_auth_token)
+    return http_app
+
+
+async def serve(settings: Settings) -> None:
+    """Serve MCP sessions over HTTP until the process is interrupted."""
+    import uvicorn
+
+    if not settings.mcp_http_auth_token and settings.mcp_http_host not in LOOPBACK_HOSTS:
+        logger.warning(
+            f"Serving on {settings.mcp_http_host} without MCP_HTTP_AUTH_TOKEN: anyone who can "
+            "reach the port can query Sisense with the server's API token"
+        )
+    config = uvicorn.Config(
+        build_http_app(settings),
+        host=settings.mcp_http_host,
+        port=settings.mcp_http_port,
+        # Keep the server's own logging configuration and skip per-request access logs
+        log_config=None,
+        access_log=False,
+        lifespan="on",
+    )
+    logger.info(
+        f"Serving MCP over HTTP at http://{settings.mcp_http_host}:{settings.mcp_http_port}"
+        f"{MCP_PATH}"
+    )
+    await uvicorn.Server(config).serve()
@@ -0,0 +1,389 @@
+"""In-process metrics: tool and upstream latency histograms, errors, bytes, cache hits.
+
+Everything is updated from the event loop thread, so recording is a few integer
+additions on plain Python objects with no locks: a histogram observation is one
+``bisect`` over a fixed bucket list. Cache, breaker, limiter and retry counters are not
+duplicated here; the registry reads them from the watched objects when a snapshot is
+taken.
+
+Upstream requests are labelled by endpoint family (see ``client.resilience``) rather
+than by path, since paths embed cube names and dashboard ids, and by Sisense instance.
+In snapshots, the default instance's families, breakers, limiters and caches keep their
+plain names and other instances' are prefixed with ``<instance>/``; the Prometheus text
+carries the instance as an ``instance`` label instead.
+"""
+
+import os
+import time
+from bisect import bisect_left
+from collections.abc import Callable
+from typing import Any
+
+# Upper bounds of the latency buckets in seconds (plus an implicit +Inf bucket)
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)  # fmt: skip
+# Upper bounds of the response size buckets in bytes
+BYTES_BUCKETS = tuple(2**n for n in range(8, 27, 2))  # 256 B .. 64 MiB
+
+
+class Histogram:
+    """Fixed-bucket histogram with exact count, sum and max."""
+
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        return self.max
+
+    def summary(self, scale: float = 1.0, digits: int = 2) -> dict[str, float]:
+        """Mean, p50/p90/p99 and max, multiplied by ``scale``."""
+        mean = self.sum / self.count if self.count else 0.0
+        return {
+            "mean": round(mean * scale, digits),
+            "p50": round(self.quantile(0.5) * scale, digits),
+            "p90": round(self.quantile(0.9) * scale, digits),
+            "p99": round(self.quantile(0.99) * scale, digits),
+            "max": round(self.max * scale, digits),
+        }
+
+
+class ToolMetrics:
+    __slots__ = ("latency", "bytes", "errors")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.bytes = Histogram(BYTES_BUCKETS)
+        self.errors = 0
+
+
+class UpstreamMetrics:
+    __slots__ = ("latency", "statuses", "transport_errors")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.statuses: dict[int, int] = {}
+        self.transport_errors = 0
+
+
+class MetricsRegistry:
+    """Per-tool and per-endpoint-family metrics plus watched caches and clients.
+
+    Args:
+        prometheus_file: Path that ``flush`` writes the Prometheus text format to
+        prometheus_interval: Minimum seconds between two writes of ``prometheus_file``
+        clock: Time source for the uptime and write interval (injectable for tests)
+        default_instance: Instance whose names are not prefixed in snapshots
+    """
+
+    def __init__(
+        self,
+        prometheus_file: str | None = None,
+        prometheus_interval: float = 15.0,
+        clock: Callable[[], float] = time.monotonic,
+        default_instance: str = "",
+    ):
+        self.prometheus_file = prometheus_file
+        self.prometheus_interval = prometheus_interval
+        self._clock = clock
+        self.default_instance = default_instance
+        self.started_at = clock()
+        self._written_at: float | None = None
+        self.tools: dict[str, ToolMetrics] = {}
+        # (instance, endpoint family) -> metrics
+        self.upstream: dict[tuple[str, str], UpstreamMetrics] = {}
+        # (instance, cache name) -> cache
+        self._caches: dict[tuple[str, str], Any] = {}
+        self._clients: list[tuple[str, Any]] = []
+
+    def record_tool(self, tool: str, seconds: float, error: bool, response_bytes: int) -> None:
+        """Record one tool call (``response_bytes`` is the length of the response text)."""
+        metrics = self.tools.get(tool)
+        if metrics is None:
+            metrics = self.tools[tool] = ToolMetrics()
+        metrics.latency.observe(seconds)
+        if error:
+            metrics.errors += 1
+        else:
+            metrics.bytes.observe(response_bytes)
+
+    def record_request(
+        self, family: str, seconds: float, status: int | None, instance: str = ""
+    ) -> None:
+        """Record one upstream request attempt (``status`` None: transport error)."""
+        metrics = self.upstream.get((instance, family))
+        if metrics is None:
+            metrics = self.upstream[instance, family] = UpstreamMetrics()
+        metrics.latency.observe(seconds)
+        if status is None:
+            metrics.transport_errors += 1
+        else:
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def watch_cache(self, name: str, cache: Any, instance: str = "") -> None:
+        """Include a TTLCache's ``stats()`` in snapshots under ``name``."""
+        self._caches[instance, name] = cache
+
+    def watch_client(self, client: Any, instance: str = "") -> None:
+        """Include a SisenseClient's retry, breaker and limiter ``stats()`` in snapshots.
+
+        Breakers and limiters are reported per endpoint family and ``instance``, so
+        several clients' states do not overwrite each other.
+        """
+        self._clients.append((instance, client))
+
+    def _key(self, instance: str, name: str) -> str:
+        """Snapshot key of a per-instance name (the default instance's is unprefixed)."""
+        return name if instance in ("", self.default_instance) else f"{instance}/{name}"
+
+    def _client_stats(self) -> list[tuple[str, dict[str, Any]]]:
+        return [(instance, client.stats()) for instance, client in self._clients]
+
+    def _retries(
+        self, client_stats: list[tuple[str, dict[str, Any]]]
+    ) -> dict[tuple[str, str], int]:
+        """Retry counts by (instance, endpoint family)."""
+        retries: dict[tuple[str, str], int] = {}
+        for instance, stats in client_stats:
+            for family, count in stats["retries"].items():
+                retries[instance, family] = retries.get((instance, family), 0) + count
+        return retries
+
+    def _by_family(
+        self, client_stats: list[tuple[str, dict[str, Any]]], key: str
+    ) -> dict[tuple[str, str], Any]:
+        """Breaker or limiter states by (instance, endpoint family)."""
+        return {
+            (instance, family): state
+            for instance, stats in client_stats
+            for family, state in stats.get(key, {}).items()
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return all metrics as a JSON-serializable dict (latencies in milliseconds)."""
+        client_stats = self._client_stats()
+        retries = self._retries(client_stats)
+        upstream: dict[str, dict[str, Any]] = {}
+        for (instance, family), metrics in sorted(self.upstream.items()):
+            upstream[self._key(instance, family)] = {
+                "requests": metrics.latency.count,
+                "statuses": {str(k): v for k, v in sorted(metrics.statuses.items())},
+                "transport_errors": metrics.transport_errors,
+                "retries": retries.get((instance, family), 0),
+                "latency_ms": metrics.latency.summary(1000),
+            }
+        return {
+            "uptime_seconds": round(self._clock() - self.started_at, 1),
+            "tools": {
+                tool: {
+                    "calls": metrics.latency.count,
+                    "errors": metrics.errors,
+                    "latency_ms": metrics.latency.summary(1000),
+                    "response_bytes": {
+                        "total": int(metrics.bytes.sum),
+                        "mean": (
+                            round(metrics.bytes.sum / metrics.bytes.count)
+                            if metrics.bytes.count
+                            else 0
+                        ),
+                        "max": int(metrics.bytes.max),
+                    },
+                }
+                for tool, metrics in sorted(self.tools.items())
+            },
+            "upstream": upstream,
+            "caches": {
+                self._key(instance, name): cache.stats()
+                for (instance, name), cache in self._caches.items()
+            },
+            "breakers": {
+                self._key(*key): state
+                for key, state in self._by_family(client_stats, "breakers").items()
+            },
+            "limits": {
+                self._key(*key): state
+                for key, state in self._by_family(client_stats, "limits").items()
+            },
+        }
+
+    def prometheus_text(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        _histograms(
+            lines,
+            "sisense_mcp_tool_duration_seconds",
+            "MCP tool call latency",
+            {_labels(tool=tool): m.latency for tool, m in self.tools.items()},
+        )
+        _histograms(
+            lines,
+            "sisense_mcp_tool_response_bytes",
+            "Size of successful MCP tool responses",
+            {_labels(tool=tool): m.bytes for tool, m in self.tools.items()},
+        )
+        _counter(
+            lines,
+            "sisense_mcp_tool_errors_total",
+            "MCP tool calls that raised an error",
+            {_labels(tool=tool): m.errors for tool, m in self.tools.items()},
+        )
+        _histograms(
+            lines,
+            "sisense_mcp_upstream_duration_seconds",
+            "Sisense API request latency by endpoint family (per attempt)",
+            {_family_labels(*key): m.latency for key, m in self.upstream.items()},
+        )
+        responses = {}
+        for key, metrics in self.upstream.items():
+            base = _family_labels(*key)
+            for status, count in metrics.statuses.items():
+                responses[f"{base},{_labels(status=str(status))}"] = count
+            if metrics.transport_errors:
+                responses[f"{base},{_labels(status='error')}"] = metrics.transport_errors
+        _counter(
+            lines,
+            "sisense_mcp_upstream_responses_total",
+            "Sisense API responses by endpoint family and status",
+            responses,
+        )
+
+        client_stats = self._client_stats()
+        _counter(
+            lines,
+            "sisense_mcp_upstream_retries_total",
+            "Retried Sisense API requests by endpoint family",
+            {_family_labels(*key): count for key, count in self._retries(client_stats).items()},
+        )
+        _gauge(
+            lines,
+            "sisense_mcp_breaker_open",
+            "1 if the endpoint family's circuit breaker is not closed",
+            {
+                _family_labels(*key): int(b["state"] != "closed")
+                for key, b in self._by_family(client_stats, "breakers").items()
+            },
+        )
+        _gauge(
+            lines,
+            "sisense_mcp_concurrency_limit",
+            "Current adaptive concurrency limit by endpoint family",
+            {
+                _family_labels(*key): s["concurrency_limit"]
+                for key, s in self._by_family(client_stats, "limits").items()
+                if s["concurrency_limit"] is not None
+            },
+        )
+
+        hits, misses = {}, {}
+        for (instance, name), cache in self._caches.items():
+            for namespace, counts in cache.stats()["namespaces"].items():
+                labels = _labels(cache=name, namespace=namespace)
+                if instance:
+                    labels += f",{_labels(instance=instance)}"
+                hits[labels] = counts["hits"]
+                misses[labels] = counts["misses"]
+        _counter(lines, "sisense_mcp_cache_hits_total", "Cache hits", hits)
+        _counter(lines, "sisense_mcp_cache_misses_total", "Cache misses", misses)
+        return "\n".join(lines) + "\n"
+
+    def flush(self, force: bool = False) -> bool:
+        """Write ``prometheus_file`` if one is set and ``prometheus_interval`` has passed.
+
+        Returns:
+            True if the file was written
+        """
+        if self.prometheus_file is None:
+            return False
+        now = self._clock()
+        if (
+            not force
+            and self._written_at is not None
+            and now - self._written_at < self.prometheus_interval
+        ):
+            return False
+        self._written_at = now
+        self.write_prometheus(self.prometheus_file)
+        return True
+
+    def write_prometheus(self, path: str) -> None:
+        """Write ``prometheus_text()`` to ``path`` atomically (for node_exporter's textfile collector)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(
+        '{}="{}"'.format(key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+
+
+def _family_labels(instance: str, family: str) -> str:
+    """``family`` plus ``instance`` labels (the latter omitted when unnamed)."""
+    if not instance:
+        return _labels(family=family)
+    return _labels(family=family, instance=instance)
+
+
+def _format(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _counter(lines: list[str], name: str, help_text: str, values: dict[str, float]) -> None:
+    _samples(lines, name, help_text, "counter", values)
+
+
+def _gauge(lines: list[str], name: str, help_text: str, values: dict[str, float]) -> None:
+    _samples(lines, name, help_text, "gauge", values)
+
+
+def _samples(lines, name, help_text, kind, values) -> None:
+    if not values:
+        return
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in sorted(values.items()):
+        lines.append(f"{name}{{{labels}}} {_format(value)}")
+
+
+def _histograms(lines, name, help_text, histograms: dict[str, Histogram]) -> None:
+    """Histogram samples keyed by their rendered labels."""
+    if not histograms:
+        return
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for base, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.counts, strict=False):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{base},le="{_format(bound)}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{base},le="+Inf"}} {histogram.count}')
+        lines.append(f"{name}_sum{{{base}}} {_format(histogram.sum)}")
+        lines.append(f"{name}_count{{{base}}} {histogram.count}")
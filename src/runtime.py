@@ -0,0 +1,342 @@
+"""Clients, caches and services of each Sisense instance, built on the first tool call.
+
+Nothing here runs at import time: the settings are loaded and the HTTP client is
+created when ``get_runtime()`` is first called, so starting the server and answering
+``initialize``/``tools/list`` does not pay for them.
+"""
+
+import logging
+
+from . import __version__
+from .cache import TTLCache
+from .client import LimitConfig, RetryPolicy, SisenseClient, TrafficRecorder
+from .config import Settings, get_settings
+from .metrics import MetricsRegistry
+from .services import DashboardIndex, DashboardService, ElastiCubeService, LocalStore
+from .tracing import Tracer, open_tracer, set_tracer
+
+logger = logging.getLogger(__name__)
+
+
+# Settings that can differ per Sisense instance; the rest (metrics, tracing, transport,
+# traffic recording) are process-wide
+INSTANCE_SETTING_PREFIXES = (
+    "sisense_",
+    "cache_",
+    "result_cache_",
+    "sql_",
+    "field_index_",
+    "dashboard_index_",
+)
+
+
+class Instance:
+    """One Sisense instance: its own client (connection pool, limits, breakers), caches,
+    store of materialized results and services, so a slow or throttled instance cannot
+    starve the others and no instance can read another's materialized rows."""
+
+    def __init__(
+        self,
+        name: str,
+        client: SisenseClient,
+        elasticube_service: ElastiCubeService,
+        dashboard_service: DashboardService,
+        metadata_cache: TTLCache | None = None,
+        result_cache: TTLCache | None = None,
+        local_store: LocalStore | None = None,
+    ):
+        self.name = name
+        self.client = client
+        self.elasticube_service = elasticube_service
+        self.dashboard_service = dashboard_service
+        self.metadata_cache = metadata_cache
+        self.result_cache = result_cache
+        self.local_store = local_store
+
+
+class Runtime:
+    """The objects shared by all tool calls.
+
+    ``client``, the services, the caches and the local store are those of the default
+    instance.
+    """
+
+    def __init__(
+        self,
+        instances: dict[str, Instance],
+        default_instance: str,
+        metrics: MetricsRegistry | None = None,
+        tracer: Tracer | None = None,
+        recorder: TrafficRecorder | None = None,
+    ):
+        self.instances = instances
+        self.default_instance = default_instance
+        self.metrics = metrics
+        self.tracer = tracer
+        self.recorder = recorder
+
+    def instance(self, name: str | None = None) -> Instance:
+        """Return the named instance (the default one for None).
+
+        Raises:
+            ValueError: If no instance has that name
+        """
+        if name is None:
+            return self.instances[self.default_instance]
+        instance = self.instances.get(name)
+        if instance is None:
+            raise ValueError(
+                f"Unknown Sisense instance '{name}'. Available: {', '.join(self.instances)}"
+            )
+        return instance
+
+    @property
+    def client(self) -> SisenseClient:
+        return self.instance().client
+
+    @property
+    def elasticube_service(self) -> ElastiCubeService:
+        return self.instance().elasticube_service
+
+    @property
+    def dashboard_service(self) -> DashboardService:
+        return self.instance().dashboard_service
+
+    @property
+    def metadata_cache(self) -> TTLCache | None:
+        return self.instance().metadata_cache
+
+    @property
+    def result_cache(self) -> TTLCache | None:
+        return self.instance().result_cache
+
+    @property
+    def local_store(self) -> LocalStore | None:
+        return self.instance().local_store
+
+
+def instance_settings(settings: Settings) -> dict[str, Settings]:
+    """Resolve the settings of every configured Sisense instance.
+
+    The top-level ``SISENSE_BASE_URL``/``SISENSE_API_TOKEN`` settings are the default
+    instance, named ``SISENSE_INSTANCE_NAME``. Each entry of ``SISENSE_INSTANCES`` adds an
+    instance whose values override the default instance's settings, e.g.
+    ``{"staging": {"sisense_base_url": "...", "sisense_api_token": "...",
+    "sisense_sql_rate_limit": 2}}``.
+
+    Raises:
+        ValueError: If an instance is named twice or overrides a process-wide or unknown
+            setting
+    """
+    resolved = {settings.sisense_instance_name: settings}
+    base = settings.model_dump(exclude={"sisense_instances"})
+    for name, overrides in settings.sisense_instances.items():
+        if not name or name in resolved:
+            raise ValueError(f"Invalid or duplicate Sisense instance name '{name}'")
+        overrides = {key.lower(): value for key, value in overrides.items()}
+        for key in overrides:
+            if (
+                key not in Settings.model_fields
+                or key in ("sisense_instance_name", "sisense_instances")
+                or not key.startswith(INSTANCE_SETTING_PREFIXES)
+            ):
+                raise ValueError(
+                    f"Setting '{key}' of Sisense instance '{name}' is not per-instance"
+                )
+        resolved[name] = Settings(**{**base, **overrides, "sisense_instances": {}})
+    return resolved
+
+
+def build_instance(
+    name: str,
+    settings: Settings,
+    metrics: MetricsRegistry | None = None,
+    recorder: TrafficRecorder | None = None,
+) -> Instance:
+    """Create one instance's client, caches and services from its ``settings``."""
+    metadata_limits = LimitConfig(
+        rate=settings.sisense_metadata_rate_limit,
+        burst=settings.sisense_metadata_burst,
+        max_concurrency=settings.sisense_metadata_max_concurrency,
+    )
+    client = SisenseClient(
+        settings.sisense_base_url,
+        settings.sisense_api_token,
+        max_connections=settings.sisense_max_connections,
+        max_keepalive_connections=settings.sisense_max_keepalive_connections,
+        keepalive_expiry=settings.sisense_keepalive_expiry,
+        http2=settings.sisense_http2,
+        coalesce_requests=settings.sisense_coalesce_requests,
+        retry_policy=RetryPolicy(
+            max_retries=settings.sisense_max_retries,
+            backoff=settings.sisense_retry_backoff,
+            backoff_max=settings.sisense_retry_backoff_max,
+            retry_after_max=settings.sisense_retry_after_max,
+        ),
+        breaker_failure_threshold=settings.sisense_breaker_failure_threshold,
+        breaker_reset_timeout=settings.sisense_breaker_reset_timeout,
+        rate_limits={
+            "elasticubes": metadata_limits,
+            "datamodels": metadata_limits,
+            "dashboards": metadata_limits,
+            "other": metadata_limits,
+            "sql": LimitConfig(
+                rate=settings.sisense_sql_rate_limit,
+                burst=settings.sisense_sql_burst,
+                max_concurrency=settings.sisense_sql_max_concurrency,
+            ),
+        },
+        metrics=metrics,
+        metrics_instance=name,
+        recorder=recorder,
+    )
+    metadata_cache = (
+        TTLCache(
+            max_entries=settings.cache_max_entries,
+            max_bytes=settings.cache_max_bytes,
+            ttls={
+                "elasticubes": settings.cache_ttl_elasticubes,
+                "schema": settings.cache_ttl_schema,
+                "dashboards": settings.cache_ttl_dashboards,
+            },
+        )
+        if settings.cache_enabled
+        else None
+    )
+    result_cache = (
+        TTLCache(
+            max_entries=settings.result_cache_max_entries,
+            max_bytes=settings.result_cache_max_bytes,
+            max_entry_bytes=settings.result_cache_max_entry_bytes,
+            default_ttl=settings.result_cache_ttl,
+        )
+        if settings.result_cache_enabled
+        else None
+    )
+    local_store = (
+        LocalStore(
+            max_bytes=settings.local_store_max_bytes,
+            max_handles=settings.local_store_max_handles,
+            query_timeout=settings.local_query_timeout,
+        )
+        if settings.local_store_enabled
+        else None
+    )
+    elasticube_service = ElastiCubeService(
+        client,
+        cache=metadata_cache,
+        stream_threshold_rows=settings.sql_stream_threshold_rows,
+        page_size=settings.sql_page_size,
+        max_concurrent_pages=settings.sql_max_concurrent_pages,
+        result_cache=result_cache,
+        field_index_concurrency=settings.field_index_concurrency,
+        batch_max_concurrency=settings.sql_batch_max_concurrency,
+        local_store=local_store,
+        sample_pushdown=settings.sql_sample_pushdown,
+        sample_max_scan_rows=settings.sql_sample_max_scan_rows,
+        query_guard=settings.sql_guard_enabled,
+        guard_count_probe=settings.sql_guard_count_probe,
+        guard_reject_rows=settings.sql_guard_reject_rows,
+        guard_paginate_rows=settings.sql_guard_paginate_rows,
+    )
+    dashboard_service = DashboardService(
+        client,
+        cache=metadata_cache,
+        title_index=DashboardIndex(max_age=settings.dashboard_index_max_age),
+    )
+    if metrics is not None:
+        metrics.watch_client(client, instance=name)
+        if metadata_cache is not None:
+            metrics.watch_cache("metadata", metadata_cache, instance=name)
+        if result_cache is not None:
+            metrics.watch_cache("results", result_cache, instance=name)
+    return Instance(
+        name,
+        client,
+        elasticube_service,
+        dashboard_service,
+        metadata_cache=metadata_cache,
+        result_cache=result_cache,
+        local_store=local_store,
+    )
+
+
+def build_runtime(settings: Settings) -> Runtime:
+    """Create the clients, caches and services of every instance from ``settings``."""
+    resolved = instance_settings(settings)
+    metrics = (
+        MetricsRegistry(
+            prometheus_file=settings.metrics_prometheus_file,
+            prometheus_interval=settings.metrics_prometheus_interval,
+            # The default instance keeps the unprefixed names in snapshots
+            default_instance=settings.sisense_instance_name,
+        )
+        if settings.metrics_enabled
+        else None
+    )
+    # One recorder for all instances, so their requests land in one session of the log
+    recorder = (
+        TrafficRecorder(
+            settings.traffic_record_file,
+            include_payloads=settings.traffic_record_payloads,
+            secrets=tuple(s.sisense_api_token for s in resolved.values()),
+        )
+        if settings.traffic_record_file
+        else None
+    )
+    instances = {
+        name: build_instance(name, instance, metrics=metrics, recorder=recorder)
+        for name, instance in resolved.items()
+    }
+    tracer = None
+    if settings.tracing_enabled:
+        tracer = open_tracer(settings.tracing_export, service_version=__version__)
+        set_tracer(tracer)
+    return Runtime(
+        instances,
+        settings.sisense_instance_name,
+        metrics=metrics,
+        tracer=tracer,
+        recorder=recorder,
+    )
+
+
+_runtime: Runtime | None = None
+
+
+def get_runtime() -> Runtime:
+    """Return the shared runtime, building it on first use.
+
+    Raises:
+        RuntimeError: If the settings are invalid or the services cannot be created
+    """
+    global _runtime
+    if _runtime is None:
+        logger.debug("Initializing SisenseClient and services...")
+        try:
+            _runtime = build_runtime(get_settings())
+        except Exception as e:
+            logger.error(f"Failed to initialize services: {e}", exc_info=True)
+            raise RuntimeError(
+                f"Services could not be initialized: {e}. Check configuration and logs."
+            ) from e
+        logger.debug("Services initialized successfully")
+    return _runtime
+
+
+async def close_runtime() -> None:
+    """Close the shared runtime's connection pools, if it was built."""
+    global _runtime
+    if _runtime is not None:
+        if _runtime.metrics is not None:
+            _runtime.metrics.flush(force=True)
+        for instance in _runtime.instances.values():
+            await instance.client.aclose()
+            if instance.local_store is not None:
+                instance.local_store.close()
+        if _runtime.recorder is not None:
+            _runtime.recorder.close()
+        if _runtime.tracer is not None:
+            set_tracer(None)
+            _runtime.tracer.close()
+        _runtime = None
@@ -1,95 +1,81 @@
-"""MCP server for Sisense API integration."""
+"""MCP server for Sisense API integration.
+
+Startup is kept cheap: this module imports only the standard library, the stdio
+bootstrap answers ``initialize`` and ``tools/list`` from the static tool registry, and
+the MCP SDK, settings, HTTP client and services are loaded on the first tool call (see
+``stdio_bootstrap`` and ``runtime``). With ``--transport http`` one process serves many
+sessions over streamable HTTP instead (see ``http_transport``).
+"""
 
 import asyncio
 import logging
+import os
 import sys
 
-from mcp.server import Server
-from mcp.server.stdio import stdio_server
-from mcp.types import Tool
-
-from .client import SisenseClient
-from .config import settings
-from .services import DashboardService, ElastiCubeService
-from .tools import (
-    get_dashboard_tools,
-    get_elasticube_tools,
-    handle_dashboard_tool,
-    handle_elasticube_tool,
-)
-
-# Configure logging to stderr (not stdout) so it doesn't interfere with MCP protocol
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    stream=sys.stderr,  # Log to stderr, not stdout
-)
 logger = logging.getLogger(__name__)
 
-app = Server("sisense-mcp")
-
-# Initialize services
-try:
-    logger.debug("Initializing SisenseClient at module load...")
-    client = SisenseClient(settings.sisense_base_url, settings.sisense_api_token)
-    elasticube_service = ElastiCubeService(client)
-    dashboard_service = DashboardService(client)
-    logger.debug("Services initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize services during module import: {e}", exc_info=True)
-    client = None
-    elasticube_service = None
-    dashboard_service = None
-
 
-@app.list_tools()
-async def list_tools() -> list[Tool]:
-    """List all available MCP tools."""
-    tools = []
-    tools.extend(get_elasticube_tools())
-    tools.extend(get_dashboard_tools())
-    return tools
+def configure_logging() -> None:
+    """Log to stderr (not stdout, which carries the MCP protocol) at ``LOG_LEVEL``."""
+    level = os.environ.get("LOG_LEVEL", "INFO").upper()
+    logging.basicConfig(
+        level=getattr(logging, level, logging.INFO),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,  # Log to stderr, not stdout
+    )
 
 
-@app.call_tool()
-async def call_tool(name: str, arguments: dict) -> list:
-    """Handle tool execution requests."""
-    if elasticube_service is None or dashboard_service is None:
-        raise RuntimeError("Services were not initialized. Check configuration and logs.")
+async def main(transport: str = "stdio", host: str | None = None, port: int | None = None):
+    """Main entry point for the MCP server.
 
-    # Route to appropriate tool handler
-    elasticube_tool_names = ["list_elasticubes", "get_elasticube_schema", "query_elasticube"]
-    dashboard_tool_names = ["list_dashboards", "get_dashboard_info"]
-
-    if name in elasticube_tool_names:
-        return await handle_elasticube_tool(name, arguments, elasticube_service)
-    elif name in dashboard_tool_names:
-        return await handle_dashboard_tool(name, arguments, dashboard_service)
-    else:
-        raise ValueError(f"Unknown tool: {name}")
-
-
-async def main():
-    """Main entry point for the MCP server."""
+    Args:
+        transport: ``stdio`` for a single session on stdin/stdout, ``http`` to serve many
+            sessions over streamable HTTP
+        host: Address to bind in HTTP mode (default ``MCP_HTTP_HOST``)
+        port: Port to bind in HTTP mode (default ``MCP_HTTP_PORT``)
+    """
     try:
-        logger.info("Initializing Sisense MCP server...")
-        logger.info(f"Base URL: {settings.sisense_base_url}")
-        logger.info("Token configured: " + ("Yes" if settings.sisense_api_token else "No"))
-
-        logger.info("Starting stdio_server...")
-        async with stdio_server() as (read_stream, write_stream):
-            logger.info("stdio_server started successfully")
-            logger.info("Running MCP server...")
-            await app.run(read_stream, write_stream, app.create_initialization_options())
-            logger.info("MCP server finished")
+        if transport == "http":
+            from .config import get_settings
+            from .http_transport import serve
+
+            overrides = {"mcp_http_host": host, "mcp_http_port": port}
+            settings = get_settings().model_copy(
+                update={key: value for key, value in overrides.items() if value is not None}
+            )
+            await serve(settings)
+        else:
+            from .stdio_bootstrap import StdioBootstrap
+
+            logger.info("Starting Sisense MCP server on stdio...")
+            await StdioBootstrap().run()
+        logger.info("MCP server finished")
     except Exception as e:
         logger.error(f"Server crashed: {e}", exc_info=True)
         raise
+    finally:
+        runtime = sys.modules.get(f"{__package__}.runtime")
+        if runtime is not None:
+            # Release pooled keep-alive connections on shutdown
+            await runtime.close_runtime()
 
 
-def cli():
+def cli(argv: list[str] | None = None):
     """Console script entry point (synchronous wrapper for async main)."""
-    asyncio.run(main())
+    import argparse  # Only needed here; keeps it out of the module's import time
+
+    parser = argparse.ArgumentParser(prog="sisense-mcp", description="MCP server for Sisense")
+    parser.add_argument(
+        "--transport",
+        choices=("stdio", "http"),
+        default=os.environ.get("MCP_TRANSPORT", "stdio"),
+        help="stdio (one session, the default) or http (many sessions, streamable HTTP)",
+    )
+    parser.add_argument("--host", help="Address to bind with --transport http")
+    parser.add_argument("--port", type=int, help="Port to bind with --transport http")
+    args = parser.parse_args(argv)
+    configure_logging()
+    asyncio.run(main(args.transport, args.host, args.port))
 
 
 if __name__ == "__main__":
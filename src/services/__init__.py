@@ -1,7 +1,17 @@
 """Service layer for Sisense operations."""
 
+from .dashboard_index import DashboardIndex
 from .dashboard_service import DashboardService
 from .elasticube_service import ElastiCubeService
+from .local_store import LocalStore
+from .schema_index import SchemaIndex
 from .sisense_service import SisenseService
 
-__all__ = ["SisenseService", "ElastiCubeService", "DashboardService"]
+__all__ = [
+    "SisenseService",
+    "ElastiCubeService",
+    "DashboardService",
+    "DashboardIndex",
+    "LocalStore",
+    "SchemaIndex",
+]
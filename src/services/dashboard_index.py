@@ -0,0 +1,157 @@
+"""In-memory title-to-ID index over the Sisense dashboard listing."""
+
+import logging
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def _text(value: Any) -> str | None:
+    # Null or non-string titles and timestamps are left out of the title maps
+    return value if isinstance(value, str) else None
+
+
+class DashboardIndex:
+    """Maps dashboard titles (exact and case-folded) to dashboard IDs.
+
+    The index is fed with lightweight listing entries (``_id``, ``title``,
+    ``lastUpdated``) and updated incrementally: only dashboards that were added, removed,
+    or whose ``lastUpdated`` changed touch the title maps.
+
+    When several dashboards share a title, the most recently updated one wins; ties are
+    broken by the smallest ``_id`` so lookups are deterministic.
+    """
+
+    def __init__(self, max_age: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        """Initialize an empty index.
+
+        Args:
+            max_age: Seconds after which the index is considered stale
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_age = max_age
+        self._clock = clock
+        # _id -> (title, lastUpdated)
+        self._entries: dict[str, tuple[str | None, str | None]] = {}
+        self._ids_by_title: dict[str, set[str]] = {}
+        self._ids_by_folded: dict[str, set[str]] = {}
+        self._by_title: dict[str, str] = {}
+        self._by_folded: dict[str, str] = {}
+        self._refreshed_at: float | None = None
+        self.last_build_ms = 0.0
+        self.last_changed = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_stale(self) -> bool:
+        """Return True if the index was never built or is older than ``max_age``."""
+        return self._refreshed_at is None or self._clock() - self._refreshed_at >= self.max_age
+
+    def lookup(self, title: str) -> str | None:
+        """Resolve a title to a dashboard ID.
+
+        Exact matches are preferred; otherwise a case-insensitive match is returned.
+
+        Args:
+            title: Dashboard title
+
+        Returns:
+            Dashboard ID, or None if no dashboard has that title
+        """
+        dashboard_id = self._by_title.get(title)
+        if dashboard_id is None:
+            dashboard_id = self._by_folded.get(title.casefold())
+        return dashboard_id
+
+    def update(self, dashboards: Iterable[dict[str, Any]]) -> int:
+        """Synchronize the index with a complete dashboard listing.
+
+        Args:
+            dashboards: All dashboards, each with at least ``_id``, ``title`` and
+                ``lastUpdated``
+
+        Returns:
+            Number of dashboards added, changed or removed
+        """
+        start = time.perf_counter()
+        seen: set[str] = set()
+        dirty_titles: set[str] = set()
+        dirty_folded: set[str] = set()
+        changed = 0
+
+        for dashboard in dashboards:
+            dashboard_id = dashboard.get("_id")
+            if not dashboard_id:
+                continue
+            seen.add(dashboard_id)
+            entry = (_text(dashboard.get("title")), _text(dashboard.get("lastUpdated")))
+            previous = self._entries.get(dashboard_id)
+            if previous == entry:
+                continue
+            changed += 1
+            if previous is not None:
+                self._unlink(dashboard_id, previous[0], dirty_titles, dirty_folded)
+            self._entries[dashboard_id] = entry
+            self._link(dashboard_id, entry[0], dirty_titles, dirty_folded)
+
+        for dashboard_id in [i for i in self._entries if i not in seen]:
+            changed += 1
+            title, _ = self._entries.pop(dashboard_id)
+            self._unlink(dashboard_id, title, dirty_titles, dirty_folded)
+
+        for title in dirty_titles:
+            self._resolve(title, self._ids_by_title, self._by_title)
+        for folded in dirty_folded:
+            self._resolve(folded, self._ids_by_folded, self._by_folded)
+
+        self._refreshed_at = self._clock()
+        self.last_build_ms = (time.perf_counter() - start) * 1000
+        self.last_changed = changed
+        logger.debug(
+            f"Dashboard index updated in {self.last_build_ms:.2f}ms: "
+            f"{len(self._entries)} dashboards, {changed} changed"
+        )
+        return changed
+
+    def stats(self) -> dict[str, Any]:
+        """Return index size and the cost of the last update."""
+        return {
+            "dashboards": len(self._entries),
+            "titles": len(self._by_title),
+            "last_build_ms": round(self.last_build_ms, 3),
+            "last_changed": self.last_changed,
+        }
+
+    def _link(
+        self, dashboard_id: str, title: str | None, dirty_titles: set, dirty_folded: set
+    ) -> None:
+        if title is None:
+            return
+        folded = title.casefold()
+        self._ids_by_title.setdefault(title, set()).add(dashboard_id)
+        self._ids_by_folded.setdefault(folded, set()).add(dashboard_id)
+        dirty_titles.add(title)
+        dirty_folded.add(folded)
+
+    def _unlink(
+        self, dashboard_id: str, title: str | None, dirty_titles: set, dirty_folded: set
+    ) -> None:
+        if title is None:
+            return
+        folded = title.casefold()
+        self._ids_by_title.get(title, set()).discard(dashboard_id)
+        self._ids_by_folded.get(folded, set()).discard(dashboard_id)
+        dirty_titles.add(title)
+        dirty_folded.add(folded)
+
+    def _resolve(self, key: str, ids_by_key: dict[str, set[str]], winners: dict[str, str]) -> None:
+        ids = ids_by_key.get(key)
+        if not ids:
+            ids_by_key.pop(key, None)
+            winners.pop(key, None)
+            return
+        # max() keeps the first maximal element, so sorting first breaks ties by smallest _id
+        winners[key] = max(sorted(ids), key=lambda i: self._entries[i][1] or "")
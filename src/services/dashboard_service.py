@@ -2,12 +2,49 @@
 
 from typing import Any
 
+from ..cache import TTLCache
+from ..client import SisenseClient
+from ..tracing import traced
+from .dashboard_index import DashboardIndex
+from .dashboard_summary import summarize_dashboard
+from .projection import compile_paths, project, top_level_fields
 from .sisense_service import SisenseService
 
+# Fields requested when only the title index needs refreshing (keeps the listing small)
+INDEX_FIELDS = "_id,title,lastUpdated"
+# Fields a dashboard summary is built from
+SUMMARY_FIELDS = "_id,oid,title,datasource,filters,widgets"
+SUMMARY_WIDGET_FIELDS = "oid,title,type,datasource,metadata"
+
 
 class DashboardService(SisenseService):
     """Service for Dashboard operations."""
 
+    def __init__(
+        self,
+        client: SisenseClient,
+        cache: TTLCache | None = None,
+        title_index: DashboardIndex | None = None,
+    ):
+        """Initialize the service.
+
+        Args:
+            client: Sisense HTTP client instance
+            cache: Optional metadata cache shared between services
+            title_index: Title-to-ID index used for lookups by name
+        """
+        super().__init__(client, cache)
+        self.title_index = title_index if title_index is not None else DashboardIndex()
+
+    @staticmethod
+    def _dashboard_items(data: Any) -> list[dict[str, Any]] | None:
+        """Extract the dashboard list from a listing response, or None if unrecognized."""
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict) and isinstance(data.get("dashboards"), list):
+            return data["dashboards"]
+        return None
+
     def _filter_dashboard_fields(self, dashboard: dict[str, Any]) -> dict[str, Any]:
         """Filter dashboard to only return required fields.
 
@@ -31,59 +68,137 @@ class DashboardService(SisenseService):
             "parentFolder": dashboard.get("parentFolder"),
         }
 
-    async def list_dashboards(self) -> list[dict[str, Any]]:
+    @traced("DashboardService.list_dashboards")
+    async def list_dashboards(self, refresh: bool = False) -> list[dict[str, Any]]:
         """Get list of all dashboards - filtered to required fields.
 
+        Args:
+            refresh: Bypass the metadata cache and fetch a fresh list
+
         Returns:
             List of filtered dashboard objects with only essential fields
 
         Raises:
             httpx.HTTPStatusError: If the API request fails
         """
+        return await self._cached("dashboards", None, self._fetch_dashboards, refresh=refresh)
+
+    async def _fetch_dashboards(self) -> list[dict[str, Any]]:
         data = await self.client.get("/api/v1/dashboards")
 
+        items = self._dashboard_items(data)
+        if items is None:
+            return data
         # Filter each dashboard to only required fields
-        if isinstance(data, list):
-            return [self._filter_dashboard_fields(item) for item in data]
-        elif isinstance(data, dict):
-            if "dashboards" in data and isinstance(data["dashboards"], list):
-                return [self._filter_dashboard_fields(item) for item in data["dashboards"]]
-        return data
+        dashboards = [self._filter_dashboard_fields(item) for item in items]
+        # A full listing is also a free title index refresh
+        self.title_index.update(dashboards)
+        return dashboards
+
+    async def _refresh_title_index(self) -> None:
+        """Refresh the title index from a listing projected to the indexed fields."""
+        data = await self.client.get("/api/v1/dashboards", params={"fields": INDEX_FIELDS})
+        self.title_index.update(self._dashboard_items(data) or [])
+
+    async def _resolve_dashboard_id(self, dashboard_name: str) -> str | None:
+        """Resolve a dashboard title to its ID using the title index.
+
+        The index is refreshed when stale, and once more on a miss in case the dashboard
+        was created or renamed since the last refresh.
+        """
+        refreshed = False
+        if self.title_index.is_stale():
+            await self._refresh_title_index()
+            refreshed = True
+        dashboard_id = self.title_index.lookup(dashboard_name)
+        if dashboard_id is None and not refreshed:
+            await self._refresh_title_index()
+            dashboard_id = self.title_index.lookup(dashboard_name)
+        return dashboard_id
+
+    async def _dashboard_id(self, dashboard_id: str | None, dashboard_name: str | None) -> str:
+        if not dashboard_id and not dashboard_name:
+            raise ValueError("Either dashboard_id or dashboard_name must be provided")
+
+        if not dashboard_id:
+            dashboard_id = await self._resolve_dashboard_id(dashboard_name)
+            if dashboard_id is None:
+                raise ValueError(f"Dashboard with name '{dashboard_name}' not found")
+        return dashboard_id
 
+    @traced("DashboardService.get_dashboard")
     async def get_dashboard(
-        self, dashboard_id: str = None, dashboard_name: str = None
+        self,
+        dashboard_id: str = None,
+        dashboard_name: str = None,
+        fields: list[str] | None = None,
     ) -> dict[str, Any]:
         """Get dashboard details by ID or name.
 
+        Name lookups resolve the title through an in-memory index (exact match first, then
+        case-insensitive; the most recently updated dashboard wins on duplicate titles) and
+        then fetch the dashboard by ID.
+
+        With ``fields``, the top-level members the paths touch are requested through the
+        API's ``fields`` parameter and the paths are then applied locally (see
+        ``projection``), so the result is the same whether or not the API honors it.
+
         Args:
             dashboard_id: ID of the dashboard (e.g., '68c20e36b10aaf740421cf12')
             dashboard_name: Name/title of the dashboard (e.g., 'Revenue over time')
+            fields: JSONPath-style paths to keep (e.g., ['title', 'widgets[*].title'])
 
         Returns:
-            Full dashboard object with all fields from the Sisense API
+            Full dashboard object with all fields from the Sisense API, or its projection
 
         Raises:
             ValueError: If neither dashboard_id nor dashboard_name is provided
             ValueError: If dashboard with given name is not found
+            ValueError: If a field path is malformed
             httpx.HTTPStatusError: If the API request fails
         """
-        if not dashboard_id and not dashboard_name:
-            raise ValueError("Either dashboard_id or dashboard_name must be provided")
+        # Validate paths before any request is made
+        tree = compile_paths(fields) if fields else None
+        dashboard_id = await self._dashboard_id(dashboard_id, dashboard_name)
+        endpoint = f"/api/v1/dashboards/{dashboard_id}"
+        if tree is None:
+            return await self.client.get(endpoint)
+
+        upstream = top_level_fields(fields)
+        data = await self.client.get(
+            endpoint, params={"fields": ",".join(upstream)} if upstream else None
+        )
+        return project(data, tree)
+
+    @traced("DashboardService.get_dashboard_summary")
+    async def get_dashboard_summary(
+        self, dashboard_id: str = None, dashboard_name: str = None
+    ) -> dict[str, Any]:
+        """Get a compact summary of a dashboard's widgets, datasources and fields.
 
-        if dashboard_id:
-            # Get by ID directly
-            return await self.client.get(f"/api/v1/dashboards/{dashboard_id}")
-        else:
-            # Get by name - first list all, then find matching title
-            dashboards = await self.client.get("/api/v1/dashboards")
-
-            if isinstance(dashboards, list):
-                for dashboard in dashboards:
-                    if dashboard.get("title") == dashboard_name:
-                        return dashboard
-            elif isinstance(dashboards, dict) and "dashboards" in dashboards:
-                for dashboard in dashboards["dashboards"]:
-                    if dashboard.get("title") == dashboard_name:
-                        return dashboard
-
-            raise ValueError(f"Dashboard with name '{dashboard_name}' not found")
+        Only the members the summary needs are requested. If the dashboard does not
+        embed its widgets, they are fetched from ``/api/v1/dashboards/{id}/widgets``.
+
+        Args:
+            dashboard_id: ID of the dashboard
+            dashboard_name: Name/title of the dashboard
+
+        Returns:
+            Summary as built by ``summarize_dashboard``
+
+        Raises:
+            ValueError: If neither dashboard_id nor dashboard_name is provided
+            ValueError: If dashboard with given name is not found
+            httpx.HTTPStatusError: If the API request fails
+        """
+        dashboard_id = await self._dashboard_id(dashboard_id, dashboard_name)
+        dashboard = await self.client.get(
+            f"/api/v1/dashboards/{dashboard_id}", params={"fields": SUMMARY_FIELDS}
+        )
+        widgets = dashboard.get("widgets")
+        if not isinstance(widgets, list) or not all(isinstance(w, dict) for w in widgets):
+            widgets = await self.client.get(
+                f"/api/v1/dashboards/{dashboard_id}/widgets",
+                params={"fields": SUMMARY_WIDGET_FIELDS},
+            )
+        return summarize_dashboard(dashboard, widgets)
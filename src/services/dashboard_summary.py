@@ -0,0 +1,107 @@
+"""Single-pass summary of a dashboard: its widgets, their datasources and fields.
+
+Widget fields live in ``widget.metadata.panels[].items[].jaql``: plain fields carry a
+``dim`` such as ``[Commerce.Revenue]`` (plus ``agg`` for measures), formulas carry a
+``formula`` whose operands are listed in ``context``. Dashboard filters use the same
+``jaql`` shape (dependent filters nest theirs under ``levels``).
+"""
+
+from typing import Any
+
+
+def _datasource_title(datasource: Any) -> str | None:
+    if isinstance(datasource, dict):
+        return datasource.get("title") or datasource.get("fullname")
+    return datasource if isinstance(datasource, str) else None
+
+
+def _jaql_fields(jaql: Any, dims: list[str]) -> dict[str, Any] | None:
+    """Describe one jaql item and append every dimension it references to ``dims``."""
+    if not isinstance(jaql, dict):
+        return None
+    field: dict[str, Any] = {}
+    if jaql.get("title"):
+        field["title"] = jaql["title"]
+    if jaql.get("dim"):
+        field["dim"] = jaql["dim"]
+        dims.append(jaql["dim"])
+    if jaql.get("agg"):
+        field["agg"] = jaql["agg"]
+    if jaql.get("formula"):
+        field["formula"] = jaql["formula"]
+        operands = []
+        for context in (jaql.get("context") or {}).values():
+            if isinstance(context, dict) and context.get("dim"):
+                operands.append(context["dim"])
+                dims.append(context["dim"])
+        if operands:
+            field["uses"] = operands
+    return field or None
+
+
+def _filter_fields(filters: Any, dims: list[str]) -> list[dict[str, Any]]:
+    fields = []
+    for item in filters if isinstance(filters, list) else []:
+        if not isinstance(item, dict):
+            continue
+        levels = item.get("levels")
+        for jaql in [item.get("jaql"), *(levels if isinstance(levels, list) else [])]:
+            field = _jaql_fields(jaql, dims)
+            if field is not None:
+                fields.append(field)
+    return fields
+
+
+def summarize_dashboard(dashboard: dict[str, Any], widgets: list | None = None) -> dict[str, Any]:
+    """Summarize a dashboard in one pass over its widgets and filters.
+
+    Args:
+        dashboard: Dashboard object from the Sisense API
+        widgets: Widget objects, when they are not embedded in ``dashboard["widgets"]``
+
+    Returns:
+        ``{_id, title, datasource, filters, widgets: [{oid, title, type, datasource,
+        fields: {panel: [field, ...]}}], fields}`` where the top-level ``fields`` lists
+        every dimension the dashboard references with its number of uses
+    """
+    if widgets is None:
+        widgets = dashboard.get("widgets")
+    dims: list[str] = []
+    summary: dict[str, Any] = {
+        "_id": dashboard.get("_id") or dashboard.get("oid"),
+        "title": dashboard.get("title"),
+        "datasource": _datasource_title(dashboard.get("datasource")),
+        "filters": _filter_fields(dashboard.get("filters"), dims),
+    }
+
+    widget_summaries = []
+    for widget in widgets if isinstance(widgets, list) else []:
+        if not isinstance(widget, dict):
+            continue
+        panels: dict[str, list[dict[str, Any]]] = {}
+        for panel in (widget.get("metadata") or {}).get("panels") or []:
+            if not isinstance(panel, dict):
+                continue
+            fields = []
+            for item in panel.get("items") or []:
+                field = _jaql_fields(item.get("jaql") if isinstance(item, dict) else None, dims)
+                if field is not None:
+                    fields.append(field)
+            if fields:
+                panels[panel.get("name") or "items"] = fields
+        widget_summaries.append(
+            {
+                "oid": widget.get("oid") or widget.get("_id"),
+                "title": widget.get("title"),
+                "type": widget.get("type"),
+                "datasource": _datasource_title(widget.get("datasource")),
+                "fields": panels,
+            }
+        )
+    summary["widgets"] = widget_summaries
+
+    counts: dict[str, int] = {}
+    for dim in dims:
+        counts[dim] = counts.get(dim, 0) + 1
+    summary["fields"] = dict(sorted(counts.items()))
+    return summary
@@ -1,13 +1,179 @@
 """Service for ElastiCube operations."""
 
+import asyncio
+import logging
+import math
+import random
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
 from typing import Any
 
+import httpx
+
+from ..cache import TTLCache, estimate_size
+from ..client import SisenseClient
+from ..client.json_stream import ARRAY_START
+from ..tracing import span, traced
+from .field_index import FieldIndex
+from .local_store import LocalStore, LocalTable
+from .query_guard import ALLOW, LIMIT, PAGINATE, REJECT, is_unbounded, with_limit
+from .sampling import (
+    SAMPLE_METHODS,
+    Reservoir,
+    count_query,
+    pushdown_probability,
+    random_filter_query,
+)
+from .schema_index import ColumnInfo, SchemaIndex, TableInfo
 from .sisense_service import SisenseService
+from .sql_fingerprint import sql_fingerprint
+from .table_profile import (
+    aggregate_query,
+    column_kind,
+    parse_aggregates,
+    parse_top_values,
+    top_values_query,
+)
+
+logger = logging.getLogger(__name__)
+
+# Top-level members of a /sql response that hold the result rows
+SQL_ROW_KEYS = ("values", "rows")
+# Members describing how a SQL result was cut, which every output format must keep
+SQL_SUMMARY_KEYS = ("guard", "pagination", "sampling")
+# Streamed rows inserted into a materialized result at a time
+MATERIALIZE_BATCH_ROWS = 1000
+
+# Seconds to wait before asking for cube versions again after the cube list failed
+_VERSION_RETRY_AFTER = 60.0
+_UNKNOWN = object()
+
+
+def _is_query_error(e: Exception) -> bool:
+    """True if Sisense rejected the query itself (not an outage or throttling)."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return 400 <= e.response.status_code < 500 and e.response.status_code != 429
+    return isinstance(e, ValueError)
+
+
+def _describe(e: Exception) -> str:
+    """Short description of a failed profiling query."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return f"API Error {e.response.status_code}: {e.response.text[:200]}"
+    return (str(e) or type(e).__name__)[:200]
+
+
+class SqlResultStream:
+    """Rows of a SQL result parsed incrementally, plus the result's other members.
+
+    Iterate with ``async for row in stream``. Non-row members (headers, metadata, ...)
+    are collected in ``fields`` in document order as they are parsed; the row member
+    itself is recorded in ``fields`` with a ``None`` placeholder so its position is known.
+    """
+
+    def __init__(self, items: AsyncIterator[tuple[str, Any]]):
+        """Wrap a stream of ``(key, value)`` items from ``SisenseClient.stream_get``.
+
+        Args:
+            items: Parsed response items
+        """
+        self._items = items
+        self.fields: dict[str, Any] = {}
+        self.rows_key: str | None = None
+        self.row_count = 0
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._rows()
+
+    async def _rows(self) -> AsyncIterator[Any]:
+        async for key, value in self._items:
+            if key == self.rows_key:
+                self.row_count += 1
+                yield value
+            elif value is ARRAY_START:
+                self.rows_key = key
+                self.fields[key] = None
+            else:
+                self.fields[key] = value
+
+        # Check for API error in response body
+        if self.fields.get("error"):
+            error_details = str(self.fields.get("details", self.fields))
+            raise ValueError(f"API returned error: {error_details[:500]}")
 
 
 class ElastiCubeService(SisenseService):
     """Service for ElastiCube/datamodel operations."""
 
+    def __init__(
+        self,
+        client: SisenseClient,
+        cache: TTLCache | None = None,
+        stream_threshold_rows: int = 10000,
+        page_size: int = 5000,
+        max_concurrent_pages: int = 4,
+        result_cache: TTLCache | None = None,
+        field_index_concurrency: int = 8,
+        batch_max_concurrency: int = 4,
+        local_store: LocalStore | None = None,
+        sample_pushdown: bool = True,
+        sample_max_scan_rows: int = 1_000_000,
+        query_guard: bool = False,
+        guard_count_probe: bool = True,
+        guard_reject_rows: int = 1_000_000,
+        guard_paginate_rows: int = 5000,
+    ):
+        """Initialize the service.
+
+        Args:
+            client: Sisense HTTP client instance
+            cache: Optional metadata cache shared between services
+            stream_threshold_rows: Row counts from which query results should be streamed
+                (``stream_sql``) rather than parsed in one piece (``query_sql``)
+            page_size: Default rows per request when auto-paginating
+            max_concurrent_pages: Default number of pages fetched concurrently when
+                auto-paginating
+            result_cache: Optional cache for SQL results, keyed on (datasource, normalized
+                query, count, offset) and invalidated when the cube's lastUpdated changes
+            field_index_concurrency: Schemas fetched at once when (re)building the
+                cross-cube field index
+            batch_max_concurrency: Default number of queries of a ``query_sql_batch`` call
+                in flight at once
+            local_store: Optional store for results materialized with ``materialize_sql``
+            sample_pushdown: Let ``sample_sql`` push a random filter down to Sisense
+            sample_max_scan_rows: Rows ``sample_sql`` reads at most when it samples by
+                streaming the result
+            query_guard: Check queries with ``check_query`` before running them
+            guard_count_probe: Let the guard estimate unbounded queries with ``COUNT(*)``
+            guard_reject_rows: Rows an unbounded query may return (0: no limit)
+            guard_paginate_rows: Rows from which unbounded queries are paginated (0: never)
+        """
+        super().__init__(client, cache)
+        self.stream_threshold_rows = stream_threshold_rows
+        self.page_size = page_size
+        self.max_concurrent_pages = max_concurrent_pages
+        self.result_cache = result_cache
+        # Last seen lastUpdated per cube title, used to validate cached results
+        self._cube_versions: dict[str, Any] = {}
+        self._versions_failed_at: float | None = None
+        self.field_index = FieldIndex()
+        self.field_index_concurrency = field_index_concurrency
+        self.batch_max_concurrency = batch_max_concurrency
+        self.local_store = local_store
+        self.sample_pushdown = sample_pushdown
+        self.sample_max_scan_rows = sample_max_scan_rows
+        # Datasources whose SQL rejected the push-down sample (no RAND() or subqueries)
+        self._pushdown_unsupported: set[str] = set()
+        self.query_guard = query_guard
+        self.guard_count_probe = guard_count_probe
+        self.guard_reject_rows = guard_reject_rows
+        self.guard_paginate_rows = guard_paginate_rows
+        # Datasources whose SQL rejected the guard's COUNT(*) probe
+        self._count_probe_unsupported: set[str] = set()
+        self._field_index_lock = asyncio.Lock()
+        # Cube title -> (lastUpdated, error) for schemas that could not be indexed
+        self._field_index_failures: dict[str, tuple[Any, str]] = {}
+
     def _filter_elasticube_fields(self, elasticube: dict[str, Any]) -> dict[str, Any]:
         """Filter elasticube to only return required fields.
 
@@ -25,32 +191,58 @@ class ElastiCubeService(SisenseService):
             "lastUpdated": elasticube.get("lastUpdated"),
         }
 
-    async def list_elasticubes(self) -> list[dict[str, Any]]:
+    @traced("ElastiCubeService.list_elasticubes")
+    async def list_elasticubes(self, refresh: bool = False) -> list[dict[str, Any]]:
         """List all ElastiCubes/datamodels - filtered to required fields.
 
+        Args:
+            refresh: Bypass the metadata cache and fetch a fresh list
+
         Returns:
             List of filtered elasticube objects with only essential fields
 
         Raises:
             httpx.HTTPStatusError: If the API request fails
         """
+        return await self._cached("elasticubes", None, self._fetch_elasticubes, refresh=refresh)
+
+    async def _fetch_elasticubes(self) -> list[dict[str, Any]]:
         data = await self.client.get("/api/v1/elasticubes/getElasticubes")
 
         # Handle different response structures
         if isinstance(data, list):
-            return [self._filter_elasticube_fields(item) for item in data]
+            cubes = [self._filter_elasticube_fields(item) for item in data]
         elif isinstance(data, dict):
             if "elasticubes" in data and isinstance(data["elasticubes"], list):
-                return [self._filter_elasticube_fields(item) for item in data["elasticubes"]]
-            # Return as-is if structure is unexpected
+                cubes = [self._filter_elasticube_fields(item) for item in data["elasticubes"]]
+            else:
+                # Return as-is if structure is unexpected
+                return data
+        else:
             return data
-        return data
+        self._track_cube_versions(cubes)
+        return cubes
 
-    async def get_schema(self, elasticube_name: str) -> dict[str, Any]:
+    def _track_cube_versions(self, cubes: list[dict[str, Any]]) -> None:
+        """Record each cube's lastUpdated and drop cached results of rebuilt cubes."""
+        for cube in cubes:
+            title = cube.get("title")
+            if not isinstance(title, str):
+                continue
+            version = cube.get("lastUpdated")
+            previous = self._cube_versions.get(title, _UNKNOWN)
+            self._cube_versions[title] = version
+            if previous is not _UNKNOWN and previous != version and self.result_cache is not None:
+                dropped = self.result_cache.invalidate(self._result_namespace(title))
+                logger.debug(f"Cube '{title}' was updated; dropped {dropped} cached results")
+
+    @traced("ElastiCubeService.get_schema")
+    async def get_schema(self, elasticube_name: str, refresh: bool = False) -> dict[str, Any]:
         """Get schema (tables/columns) for an ElastiCube.
 
         Args:
             elasticube_name: Name of the ElastiCube (e.g., 'Sales Data Model')
+            refresh: Bypass the metadata cache and fetch a fresh schema
 
         Returns:
             Full schema JSON including datasets, tables, columns, relations, and relationTables
@@ -58,38 +250,600 @@ class ElastiCubeService(SisenseService):
         Raises:
             httpx.HTTPStatusError: If the API request fails
         """
-        return await self.client.get("/api/v2/datamodels/schema", params={"title": elasticube_name})
+        return await self._cached(
+            "schema",
+            elasticube_name,
+            lambda: self.client.get("/api/v2/datamodels/schema", params={"title": elasticube_name}),
+            refresh=refresh,
+        )
+
+    @traced("ElastiCubeService.get_schema_index")
+    async def get_schema_index(self, elasticube_name: str, refresh: bool = False) -> SchemaIndex:
+        """Get the parsed, indexed form of a cube's schema.
 
+        The index is built once per schema document: as long as ``get_schema`` serves
+        the same (cached) document, the same index is returned.
+
+        Args:
+            elasticube_name: Name of the ElastiCube (e.g., 'Sales Data Model')
+            refresh: Bypass the metadata cache and rebuild from a fresh schema
+
+        Returns:
+            SchemaIndex with tables, columns and relations
+
+        Raises:
+            httpx.HTTPStatusError: If the API request fails
+        """
+        schema = await self.get_schema(elasticube_name, refresh=refresh)
+        built = None if self.cache is None else self.cache.get("schema_index", elasticube_name)
+        if built is not None and built[0] is schema:
+            return built[1]
+        with span("build_schema_index"):
+            index = SchemaIndex.from_schema(schema)
+        if self.cache is not None:
+            # Cached beside the schema with the same TTL, so LRU eviction bounds both
+            self.cache.set(
+                "schema_index",
+                elasticube_name,
+                (schema, index),
+                ttl=self.cache.ttl_for("schema"),
+                size=estimate_size(schema),
+            )
+        return index
+
+    @traced("ElastiCubeService.get_table_schema")
+    async def get_table_schema(
+        self, elasticube_name: str, table: str, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Get one table of a cube: its columns and the joins it takes part in.
+
+        Args:
+            elasticube_name: Name of the ElastiCube
+            table: Table name (matched case-insensitively if there is no exact match)
+            refresh: Bypass the metadata cache and fetch a fresh schema
+
+        Returns:
+            Table with ``name``, ``dataset``, ``type``, ``columns`` and ``relations``
+
+        Raises:
+            ValueError: If the table does not exist
+            httpx.HTTPStatusError: If the API request fails
+        """
+        index = await self.get_schema_index(elasticube_name, refresh=refresh)
+        return self._table_info(index, elasticube_name, table).to_dict()
+
+    @staticmethod
+    def _table_info(index: SchemaIndex, elasticube_name: str, table: str) -> TableInfo:
+        info = index.table(table)
+        if info is None:
+            available = ", ".join(list(index.tables)[:50])
+            raise ValueError(
+                f"Table '{table}' not found in '{elasticube_name}'. Available tables: {available}"
+            )
+        return info
+
+    @traced("ElastiCubeService.get_columns_summary")
+    async def get_columns_summary(
+        self, elasticube_name: str, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Get every table's column names and types, without the rest of the schema.
+
+        Args:
+            elasticube_name: Name of the ElastiCube
+            refresh: Bypass the metadata cache and fetch a fresh schema
+
+        Returns:
+            ``{"title": ..., "tables": {table: {column: type}}}``
+
+        Raises:
+            httpx.HTTPStatusError: If the API request fails
+        """
+        index = await self.get_schema_index(elasticube_name, refresh=refresh)
+        return index.columns_summary()
+
+    @traced("ElastiCubeService.search_fields")
+    async def search_fields(
+        self, query: str, limit: int = 20, cube: str | None = None, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Search table and column names across all cubes.
+
+        The field index is brought up to date first (see ``sync_field_index``); once
+        every cube is indexed, a search only costs a cube-list cache lookup and an
+        in-memory index query.
+
+        Args:
+            query: Field name or words to look for (e.g., 'customer id')
+            limit: Maximum number of matches
+            cube: Restrict matches to one cube
+            refresh: Refresh the cube list before searching
+
+        Returns:
+            ``{"query", "matches", "indexed_cubes"}`` plus ``failed_cubes`` if some
+            schemas could not be fetched
+
+        Raises:
+            httpx.HTTPStatusError: If the cube list cannot be fetched
+        """
+        failed = await self.sync_field_index(refresh=refresh)
+        result: dict[str, Any] = {
+            "query": query,
+            "matches": self.field_index.search(query, limit=limit, cube=cube),
+            "indexed_cubes": len(self.field_index.cubes),
+        }
+        if failed:
+            result["failed_cubes"] = failed
+        return result
+
+    @traced("ElastiCubeService.sync_field_index")
+    async def sync_field_index(self, refresh: bool = False) -> dict[str, Any]:
+        """Index the schemas of new or updated cubes and drop removed ones.
+
+        Cubes whose lastUpdated differs from the indexed version are (re)fetched
+        concurrently, at most ``field_index_concurrency`` at a time; a cube that was
+        indexed before is fetched with ``refresh`` so a stale cached schema is not reused.
+        A cube whose schema fails is retried once its lastUpdated changes or on
+        ``refresh``.
+
+        Args:
+            refresh: Refresh the cube list and retry cubes that failed before
+
+        Returns:
+            Cube title -> error message for cubes that are not indexed
+
+        Raises:
+            httpx.HTTPStatusError: If the cube list cannot be fetched
+        """
+        async with self._field_index_lock:
+            cubes = await self.list_elasticubes(refresh=refresh)
+            current = {
+                cube["title"]: cube.get("lastUpdated")
+                for cube in (cubes if isinstance(cubes, list) else [])
+                if isinstance(cube.get("title"), str)
+            }
+            for title in set(self.field_index.cubes) - current.keys():
+                self.field_index.remove_cube(title)
+            if refresh:
+                self._field_index_failures.clear()
+
+            index = self.field_index
+            stale = [
+                title
+                for title, version in current.items()
+                if (title not in index.versions or index.versions[title] != version)
+                and self._field_index_failures.get(title, (_UNKNOWN,))[0] != version
+            ]
+            semaphore = asyncio.Semaphore(max(1, self.field_index_concurrency))
+
+            async def index_cube(title: str) -> None:
+                async with semaphore:
+                    try:
+                        schema = await self.get_schema_index(title, refresh=title in index.versions)
+                    except Exception as e:
+                        logger.warning(f"Could not index schema of cube '{title}': {e}")
+                        self._field_index_failures[title] = (current[title], str(e)[:200])
+                        return
+                index.set_cube(title, schema, current[title])
+                self._field_index_failures.pop(title, None)
+
+            if stale:
+                await asyncio.gather(*(index_cube(title) for title in stale))
+                logger.debug(f"Field index updated for {len(stale)} cubes: {index.stats()}")
+            return {
+                title: error
+                for title, (_, error) in self._field_index_failures.items()
+                if title in current
+            }
+
+    @traced("ElastiCubeService.query_sql")
     async def query_sql(
-        self, datasource: str, sql_query: str, count: int = 5000, offset: int = 0
+        self,
+        datasource: str,
+        sql_query: str,
+        count: int = 5000,
+        offset: int = 0,
+        auto_paginate: bool = False,
+        page_size: int | None = None,
+        max_concurrency: int | None = None,
+        refresh: bool = False,
     ) -> dict[str, Any]:
         """Execute SQL query on ElastiCube.
 
+        With ``auto_paginate``, ``count`` is a total row budget that is fetched in
+        ``page_size`` windows, several pages at a time (see ``_query_sql_paginated``).
+
+        With a result cache, each requested window is served from the cache while the
+        cube's lastUpdated (from ``list_elasticubes``) is unchanged.
+
+        With the query guard enabled, unbounded queries are checked first (see
+        ``check_query``): they may be rejected, get a LIMIT or be paginated, and the
+        result reports the decision in ``guard``.
+
         Args:
             datasource: Name of the ElastiCube datasource (e.g., 'Sales Data Model')
             sql_query: SQL query string (must start with SELECT)
             count: Maximum number of rows to return (default: 5000)
             offset: Offset for pagination (default: 0)
+            auto_paginate: Fetch ``count`` rows in concurrent pages of ``page_size``
+            page_size: Rows per page when auto-paginating (default: service page_size)
+            max_concurrency: Pages in flight at once (default: service max_concurrent_pages)
+            refresh: Bypass and replace cached results
 
         Returns:
-            Query result with rows and metadata
+            Query result with rows and metadata; auto-paginated results also contain a
+            ``pagination`` summary
 
         Raises:
             httpx.HTTPStatusError: If the API request fails or query has errors
+            ValueError: If the query guard rejects the query
+        """
+        sql_query, guard = await self.guarded_sql(
+            datasource, sql_query, count, offset, refresh=refresh
+        )
+        if guard is not None and guard["action"] == PAGINATE:
+            auto_paginate = True
+
+        if auto_paginate:
+            result = await self._query_sql_paginated(
+                datasource,
+                sql_query,
+                max_rows=count,
+                offset=offset,
+                page_size=page_size or self.page_size,
+                max_concurrency=max_concurrency or self.max_concurrent_pages,
+                refresh=refresh,
+            )
+        else:
+            result = await self._query_sql_page(datasource, sql_query, count, offset, refresh)
+        if guard is not None and guard["unbounded"]:
+            # A copy, as the result may be shared with the result cache; the guard comes
+            # first, as in streamed results
+            result = {"guard": guard, **result}
+        return result
+
+    async def guarded_sql(
+        self,
+        datasource: str,
+        sql_query: str,
+        count: int,
+        offset: int = 0,
+        paginate: bool = True,
+        refresh: bool = False,
+    ) -> tuple[str, dict[str, Any] | None]:
+        """Apply the pre-flight guard (if enabled) to a query about to be run.
+
+        Returns:
+            The query to run (with an added LIMIT if the guard chose one) and the guard's
+            decision (None if the guard is disabled)
+
+        Raises:
+            ValueError: If the guard rejects the query
+        """
+        if not self.query_guard:
+            return sql_query, None
+        guard = await self.check_query(
+            datasource, sql_query, count, offset, paginate=paginate, refresh=refresh
+        )
+        if guard["action"] == REJECT:
+            raise ValueError(f"Query rejected: {guard['reason']}")
+        return guard.get("sql_query", sql_query), guard
+
+    @traced("ElastiCubeService.check_query")
+    async def check_query(
+        self,
+        datasource: str,
+        sql_query: str,
+        count: int,
+        offset: int = 0,
+        paginate: bool = True,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Decide how to run a query before sending it (the pre-flight guard).
+
+        Bounded queries (see ``query_guard.is_unbounded``) are allowed as they are. For
+        the others, a ``COUNT(*)`` probe (through the result cache) estimates the rows
+        the requested window would return, and the query is:
+
+        - rejected if that is more than ``guard_reject_rows``,
+        - paginated (with ``paginate``) if it is more than ``guard_paginate_rows``,
+        - otherwise allowed, with a ``LIMIT offset + count`` added unless the probe
+          shows the result ends within the window, so Sisense stops after the rows
+          that are returned anyway.
+
+        Args:
+            datasource: Name of the ElastiCube datasource
+            sql_query: SQL query string
+            count: Rows requested
+            offset: Offset of the requested window
+            paginate: Whether the caller can fetch the window in pages
+            refresh: Bypass the cached row count
+
+        Returns:
+            ``action`` (allow, limit, paginate or reject), ``unbounded``, and for
+            unbounded queries ``estimated_rows`` (None without a probe), ``reason`` and
+            the ``sql_query`` to run (with ``limit`` if one was added)
         """
-        encoded_datasource = self.client.encode_datasource_name(datasource)
+        if not is_unbounded(sql_query):
+            return {"action": ALLOW, "unbounded": False}
+
+        estimated = None
+        if self.guard_count_probe and datasource not in self._count_probe_unsupported:
+            try:
+                estimated = await self._count_rows(datasource, sql_query, refresh=refresh)
+            except Exception as e:
+                if not await self._rewrite_unsupported(datasource, sql_query, e):
+                    raise
+                logger.info(f"Not probing row counts on '{datasource}': {e}")
+                self._count_probe_unsupported.add(datasource)
+        rows = count if estimated is None else max(0, min(count, estimated - offset))
+        decision: dict[str, Any] = {
+            "action": ALLOW,
+            "unbounded": True,
+            "estimated_rows": estimated,
+            "sql_query": sql_query,
+        }
+
+        if self.guard_reject_rows and rows > self.guard_reject_rows:
+            decision["action"] = REJECT
+            decision["reason"] = (
+                f"the query has no LIMIT and would return {rows} rows "
+                f"(more than {self.guard_reject_rows}). Add a WHERE clause or a LIMIT, "
+                "aggregate in SQL, or use sample=true for representative rows."
+            )
+            return decision
+        if estimated is None or estimated > offset + count:
+            decision["action"] = LIMIT
+            decision["limit"] = offset + count
+            decision["sql_query"] = with_limit(sql_query, offset + count)
+            decision["reason"] = (
+                f"no LIMIT: added LIMIT {offset + count} to stop after the rows requested"
+            )
+        else:
+            decision["reason"] = f"no LIMIT, but the result has only {estimated} rows"
+        if paginate and self.guard_paginate_rows and rows > self.guard_paginate_rows:
+            decision["action"] = PAGINATE
+            decision["reason"] += f"; {rows} rows are fetched in concurrent pages"
+        return decision
+
+    async def _rewrite_unsupported(self, datasource: str, sql_query: str, error: Exception) -> bool:
+        """Whether a rewrite of a query (a ``COUNT(*)`` probe or a push-down sample)
+        failed because the datasource does not support it.
+
+        Only if Sisense rejected the rewrite and the query itself runs: a mistake in the
+        user's SQL must not switch the rewrite off for the whole datasource. The query is
+        tried with ``LIMIT 1`` so that an unbounded one does not hold ``/sql``.
+
+        Raises:
+            Exception: The query's own error, if it fails unchanged as well
+        """
+        if not _is_query_error(error):
+            return False
+        probe = with_limit(sql_query, 1) if is_unbounded(sql_query) else sql_query
+        await self._query_sql_page(datasource, probe, 1, 0)
+        return True
+
+    async def _count_rows(self, datasource: str, sql_query: str, refresh: bool = False) -> int:
+        """Number of rows a query returns, from a cached ``COUNT(*)`` probe.
+
+        Raises:
+            ValueError: If Sisense rejects the probe or answers without a count
+        """
+        counted = await self.query_sql(datasource, count_query(sql_query), count=1, refresh=refresh)
+        rows = self._result_rows(counted)
+        first = rows[0] if rows else None
+        if isinstance(first, dict):
+            first = list(first.values())
+        total = first[0] if isinstance(first, list) and first else None
+        if not isinstance(total, int):
+            raise ValueError(f"Unexpected row count result: {str(counted)[:200]}")
+        return total
+
+    @traced("ElastiCubeService.query_sql_batch")
+    async def query_sql_batch(
+        self,
+        queries: list[tuple[str, str, int]],
+        max_concurrency: int | None = None,
+        refresh: bool = False,
+    ) -> list[dict[str, Any] | Exception]:
+        """Run several SQL queries concurrently, each through ``query_sql``.
+
+        At most ``max_concurrency`` queries are in flight; the client's SQL limiter still
+        applies on top. A failing query does not cancel the others: its exception is
+        returned in its place.
 
+        Args:
+            queries: (datasource, sql_query, count) per query
+            max_concurrency: Queries in flight at once (default: service batch_max_concurrency)
+            refresh: Bypass and replace cached results
+
+        Returns:
+            Per query, in order, its result or the exception it raised
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency or self.batch_max_concurrency))
+
+        async def run(datasource: str, sql_query: str, count: int) -> dict[str, Any] | Exception:
+            async with semaphore:
+                try:
+                    return await self.query_sql(datasource, sql_query, count, refresh=refresh)
+                except Exception as e:
+                    return e
+
+        return await asyncio.gather(*(run(*query) for query in queries))
+
+    @traced("ElastiCubeService.profile_table")
+    async def profile_table(
+        self,
+        elasticube_name: str,
+        table: str,
+        columns: list[str] | None = None,
+        top_k: int = 5,
+        batch_size: int = 10,
+        max_concurrency: int | None = None,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Profile a table with aggregate queries computed by Sisense.
+
+        The columns come from the (cached) schema index. Their aggregates (non-null and
+        distinct counts, min/max for ordered types) are requested in one query per
+        ``batch_size`` columns, the batches concurrently (see ``query_sql_batch``). A
+        batch that Sisense rejects is retried column by column, so one unsupported
+        column does not hide the others. Then the ``top_k`` most frequent values are
+        fetched, concurrently, for every column whose values repeat (at most half as
+        many distinct values as non-null ones).
+
+        Args:
+            elasticube_name: Name of the ElastiCube
+            table: Table name (matched case-insensitively if there is no exact match)
+            columns: Only profile these columns (default: all)
+            top_k: Most frequent values per column (0 to skip)
+            batch_size: Columns per aggregate query
+            max_concurrency: Queries in flight at once (default: service batch_max_concurrency)
+            refresh: Bypass the metadata and result caches
+
+        Returns:
+            ``cube``, ``table``, ``row_count``, ``queries`` (requests sent) and ``columns``:
+            per column its ``type``, ``kind``, ``non_null``, ``nulls``, ``distinct``,
+            ``min``/``max``, ``top_values`` or the ``error`` that prevented them
+
+        Raises:
+            ValueError: If the table or a requested column does not exist
+            httpx.HTTPStatusError: If the schema cannot be fetched
+        """
+        index = await self.get_schema_index(elasticube_name, refresh=refresh)
+        info = self._table_info(index, elasticube_name, table)
+        selected = list(info.columns.values())
+        if columns:
+            unknown = [name for name in columns if name not in info.columns]
+            if unknown:
+                raise ValueError(
+                    f"Columns not found in '{info.name}': {', '.join(unknown)}. "
+                    f"Available columns: {', '.join(list(info.columns)[:100])}"
+                )
+            selected = [info.columns[name] for name in dict.fromkeys(columns)]
+
+        profiles: dict[str, dict[str, Any]] = {
+            column.name: {"type": column.type, "kind": column_kind(column.type)}
+            for column in selected
+        }
+        row_count = None
+        queries = 0
+
+        async def run_aggregates(batches: list[list[ColumnInfo]]) -> list[ColumnInfo]:
+            """Run one aggregate query per batch; return the columns of batches to split."""
+            nonlocal row_count, queries
+            queries += len(batches)
+            outcomes = await self.query_sql_batch(
+                [(elasticube_name, aggregate_query(info.name, batch), 1) for batch in batches],
+                max_concurrency=max_concurrency,
+                refresh=refresh,
+            )
+            split = []
+            for batch, outcome in zip(batches, outcomes, strict=True):
+                try:
+                    if isinstance(outcome, Exception):
+                        raise outcome
+                    count, statistics = parse_aggregates(batch, outcome)
+                except Exception as e:
+                    if len(batch) > 1 and _is_query_error(e):
+                        split.extend(batch)
+                        continue
+                    for column in batch:
+                        profiles[column.name]["error"] = _describe(e)
+                    continue
+                row_count = count
+                for name, values in statistics.items():
+                    profiles[name].update(values)
+                    if isinstance(values["non_null"], int) and isinstance(count, int):
+                        profiles[name]["nulls"] = count - values["non_null"]
+            return split
+
+        size = max(1, batch_size)
+        split = await run_aggregates(
+            [selected[i : i + size] for i in range(0, len(selected), size)]
+        )
+        if split:
+            await run_aggregates([[column] for column in split])
+
+        repeating = [
+            name
+            for name, profile in profiles.items()
+            if isinstance(profile.get("distinct"), int)
+            and isinstance(profile.get("non_null"), int)
+            and 0 < profile["distinct"] * 2 <= profile["non_null"]
+        ]
+        if top_k > 0 and repeating:
+            queries += len(repeating)
+            outcomes = await self.query_sql_batch(
+                [
+                    (elasticube_name, top_values_query(info.name, name, top_k), top_k)
+                    for name in repeating
+                ],
+                max_concurrency=max_concurrency,
+                refresh=refresh,
+            )
+            for name, outcome in zip(repeating, outcomes, strict=True):
+                if isinstance(outcome, Exception):
+                    profiles[name]["top_values_error"] = _describe(outcome)
+                else:
+                    profiles[name]["top_values"] = parse_top_values(outcome)
+
+        return {
+            "cube": elasticube_name,
+            "table": info.name,
+            "row_count": row_count,
+            "queries": queries,
+            "columns": profiles,
+        }
+
+    async def _query_sql_page(
+        self, datasource: str, sql_query: str, count: int, offset: int, refresh: bool = False
+    ) -> dict[str, Any]:
+        """Fetch a single window of a SQL result, through the result cache if enabled."""
+        if self.result_cache is None:
+            return await self._fetch_sql_page(datasource, sql_query, count, offset)
+        version = await self._cube_version(datasource)
+        if version is _UNKNOWN:
+            return await self._fetch_sql_page(datasource, sql_query, count, offset)
+
+        namespace = self._result_namespace(datasource)
+        key = (sql_fingerprint(sql_query), count, offset)
+        if not refresh:
+            cached = self.result_cache.get(namespace, key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        data = await self._fetch_sql_page(datasource, sql_query, count, offset)
+        self.result_cache.set(namespace, key, (version, data))
+        return data
+
+    async def _cube_version(self, datasource: str) -> Any:
+        """Return the cube's current lastUpdated (None if not listed), or _UNKNOWN.
+
+        Uses the (cached) cube list, so freshness follows the elasticubes TTL. Results are
+        not cached while the cube list is unavailable.
+        """
+        if (
+            self._versions_failed_at is not None
+            and time.monotonic() - self._versions_failed_at < _VERSION_RETRY_AFTER
+        ):
+            return _UNKNOWN
+        try:
+            await self.list_elasticubes()
+        except Exception as e:
+            logger.debug(f"Cube list unavailable, not caching SQL results: {e}")
+            self._versions_failed_at = time.monotonic()
+            return _UNKNOWN
+        self._versions_failed_at = None
+        return self._cube_versions.get(datasource)
+
+    @staticmethod
+    def _result_namespace(datasource: str) -> str:
+        return f"sql:{datasource}"
+
+    async def _fetch_sql_page(
+        self, datasource: str, sql_query: str, count: int, offset: int
+    ) -> dict[str, Any]:
         data = await self.client.get(
-            f"/api/datasources/{encoded_datasource}/sql",
-            params={
-                "queryBuildingCube": "false",
-                "count": str(count),
-                "offset": str(offset),
-                "includeMetadata": "true",
-                "isMaskedResponse": "false",
-                "shouldAddText": "false",
-                "query": sql_query,
-            },
+            self._sql_endpoint(datasource),
+            params=self._sql_params(sql_query, count, offset),
             timeout=60.0,
         )
 
@@ -99,3 +853,440 @@ class ElastiCubeService(SisenseService):
             raise ValueError(f"API returned error: {error_details[:500]}")
 
         return data
+
+    async def _query_sql_paginated(
+        self,
+        datasource: str,
+        sql_query: str,
+        max_rows: int,
+        offset: int,
+        page_size: int,
+        max_concurrency: int,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Fetch up to ``max_rows`` rows as concurrent offset windows and stitch them.
+
+        The windows are fetched by ``_sql_pages``, through the result cache.
+
+        Returns:
+            The first page's response with the rows of all pages concatenated in order
+            and a ``pagination`` summary
+        """
+        page_size = max(1, page_size)
+        num_pages = math.ceil(max_rows / page_size) if max_rows > 0 else 0
+        pages = {
+            index: page
+            async for index, page in self._sql_pages(
+                lambda count, page_offset: self._query_sql_page(
+                    datasource, sql_query, count, page_offset, refresh
+                ),
+                max_rows,
+                offset,
+                page_size,
+                max_concurrency,
+            )
+        }
+        last_page = min(
+            (i for i, page in pages.items() if len(self._result_rows(page)) < page_size),
+            default=num_pages - 1,
+        )
+
+        if not pages:
+            return {"values": [], "pagination": self._pagination(0, page_size, 0, True, offset)}
+
+        result = dict(pages[0])
+        rows_key = self._rows_key(result) or "values"
+        rows: list[Any] = []
+        for index in range(last_page + 1):
+            rows.extend(self._result_rows(pages[index]))
+        result[rows_key] = rows
+        complete = last_page < num_pages - 1 or len(self._result_rows(pages[last_page])) < (
+            min(page_size, max_rows - last_page * page_size)
+        )
+        result["pagination"] = self._pagination(
+            last_page + 1, page_size, len(rows), complete, offset + len(rows)
+        )
+        return result
+
+    async def _sql_pages(
+        self,
+        fetch_page: Callable[[int, int], Awaitable[dict[str, Any]]],
+        max_rows: int,
+        offset: int,
+        page_size: int,
+        max_concurrency: int,
+    ) -> AsyncIterator[tuple[int, dict[str, Any]]]:
+        """Yield ``(page index, response)`` of concurrent offset windows as they complete.
+
+        Pages are launched in offset order with at most ``max_concurrency`` in flight.
+        The first page that comes back shorter than requested marks the end of the
+        result: no further pages are launched and in-flight pages beyond it are cancelled.
+
+        Args:
+            fetch_page: Fetches ``(count, offset)``
+            max_rows: Row budget over all pages
+            offset: Offset of the first page
+            page_size: Rows per page
+            max_concurrency: Pages in flight at once
+        """
+        page_size = max(1, page_size)
+        num_pages = math.ceil(max_rows / page_size) if max_rows > 0 else 0
+        in_flight: dict[asyncio.Future, int] = {}
+        last_page = num_pages - 1
+        next_page = 0
+
+        def page_count(index: int) -> int:
+            return min(page_size, max_rows - index * page_size)
+
+        try:
+            while True:
+                while next_page <= last_page and len(in_flight) < max(1, max_concurrency):
+                    task = asyncio.ensure_future(
+                        fetch_page(page_count(next_page), offset + next_page * page_size)
+                    )
+                    in_flight[task] = next_page
+                    next_page += 1
+                if not in_flight:
+                    break
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=in_flight.__getitem__):
+                    index = in_flight.pop(task)
+                    page = task.result()
+                    if len(self._result_rows(page)) < page_count(index):
+                        last_page = min(last_page, index)
+                    if index <= last_page:
+                        yield index, page
+                for task in [t for t, index in in_flight.items() if index > last_page]:
+                    del in_flight[task]
+                    task.cancel()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    @staticmethod
+    def _pagination(
+        pages: int, page_size: int, rows: int, complete: bool, next_offset: int
+    ) -> dict[str, Any]:
+        summary = {"pages": pages, "page_size": page_size, "rows": rows, "complete": complete}
+        if not complete:
+            # The row budget ran out before the result did
+            summary["next_offset"] = next_offset
+        return summary
+
+    @staticmethod
+    def _rows_key(data: dict[str, Any]) -> str | None:
+        """Return the member holding the rows of a SQL result, if any."""
+        for key in SQL_ROW_KEYS:
+            if isinstance(data.get(key), list):
+                return key
+        return None
+
+    @classmethod
+    def _result_rows(cls, data: dict[str, Any]) -> list[Any]:
+        key = cls._rows_key(data)
+        return data[key] if key else []
+
+    def stream_sql(
+        self, datasource: str, sql_query: str, count: int = 5000, offset: int = 0
+    ) -> SqlResultStream:
+        """Execute SQL query on ElastiCube and parse the result row by row.
+
+        Use this for large results: rows are yielded as the response body arrives, so
+        neither the raw body nor the full row list is held in memory. Streamed results
+        bypass the result cache.
+
+        Args:
+            datasource: Name of the ElastiCube datasource (e.g., 'Sales Data Model')
+            sql_query: SQL query string (must start with SELECT)
+            count: Maximum number of rows to return (default: 5000)
+            offset: Offset for pagination (default: 0)
+
+        Returns:
+            SqlResultStream yielding rows; non-row members are available in ``fields``
+
+        Raises:
+            httpx.HTTPStatusError: If the API request fails (raised while iterating)
+            ValueError: If the query has errors (raised at the end of iteration)
+        """
+        items = self.client.stream_get(
+            self._sql_endpoint(datasource),
+            params=self._sql_params(sql_query, count, offset),
+            stream_keys=SQL_ROW_KEYS,
+            timeout=60.0,
+        )
+        return SqlResultStream(items)
+
+    @traced("ElastiCubeService.sample_sql")
+    async def sample_sql(
+        self,
+        datasource: str,
+        sql_query: str,
+        k: int = 100,
+        method: str = "auto",
+        page_size: int | None = None,
+        max_concurrency: int | None = None,
+        max_scan_rows: int | None = None,
+        seed: int | None = None,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Return a uniform random sample of k rows of a query's result.
+
+        ``pushdown`` counts the result (a cached ``COUNT(*)`` probe) and has Sisense
+        filter it with ``RAND() < p``, so only about k rows are transferred.
+        ``reservoir`` reads the result in concurrent pages through a reservoir that
+        keeps k rows, scanning at most ``max_scan_rows`` rows. ``auto`` pushes down and
+        falls back to the reservoir for datasources that reject the push-down query.
+        Push-down samples whose filtered result may exceed ``max_scan_rows`` (or that
+        would keep every row) are read through the reservoir as well. With the query
+        guard on, the reservoir scan is guarded like ``query_sql`` (it may get a
+        ``LIMIT max_scan_rows``) and the result carries its ``guard`` decision.
+
+        Args:
+            datasource: Name of the ElastiCube datasource (e.g., 'Sales Data Model')
+            sql_query: SQL query string (must start with SELECT)
+            k: Rows in the sample
+            method: ``auto``, ``pushdown`` or ``reservoir``
+            page_size: Rows per request when scanning (default: service page_size)
+            max_concurrency: Pages in flight when scanning (default: service
+                max_concurrent_pages)
+            max_scan_rows: Rows scanned at most (default: service sample_max_scan_rows)
+            seed: Seed of the reservoir's random numbers (the push-down filter is random
+                on the Sisense side)
+            refresh: Bypass the cached row count
+
+        Returns:
+            The first response's members with the sampled rows, and ``sampling``:
+            ``method``, ``k``, ``rows``, ``population`` (rows sampled from), ``complete``
+            (false if the scan stopped at ``max_scan_rows``, so the sample covers only
+            the first rows) and the push-down ``probability`` or the scanned ``pages``
+
+        Raises:
+            ValueError: If the method is unknown, the query has errors or the query guard
+                rejects the scan
+            httpx.HTTPStatusError: If the API request fails
+        """
+        if method not in SAMPLE_METHODS:
+            raise ValueError(f"Unknown method '{method}'. Use one of: {', '.join(SAMPLE_METHODS)}")
+        reservoir = Reservoir(k, random.Random(seed))
+        pushdown = method == "pushdown" or (
+            method == "auto"
+            and self.sample_pushdown
+            and datasource not in self._pushdown_unsupported
+        )
+        max_scan_rows = max_scan_rows or self.sample_max_scan_rows
+        if pushdown:
+            try:
+                sampled = await self._sample_pushdown(
+                    datasource, sql_query, reservoir, max_scan_rows, refresh
+                )
+                if sampled is not None:
+                    return sampled
+            except Exception as e:
+                if method == "pushdown" or not await self._rewrite_unsupported(
+                    datasource, sql_query, e
+                ):
+                    raise
+                logger.info(f"Sampling '{datasource}' by streaming: push-down rejected ({e})")
+                self._pushdown_unsupported.add(datasource)
+                reservoir = Reservoir(k, random.Random(seed))
+        scan_query, guard = await self.guarded_sql(
+            datasource, sql_query, max_scan_rows, paginate=False, refresh=refresh
+        )
+        result = await self._sample_reservoir(
+            datasource,
+            scan_query,
+            reservoir,
+            page_size=page_size or self.page_size,
+            max_concurrency=max_concurrency or self.max_concurrent_pages,
+            max_scan_rows=max_scan_rows,
+        )
+        if guard is not None and guard["unbounded"]:
+            result = {"guard": guard, **result}
+        return result
+
+    async def _sample_pushdown(
+        self,
+        datasource: str,
+        sql_query: str,
+        reservoir: Reservoir,
+        max_rows: int,
+        refresh: bool,
+    ) -> dict[str, Any] | None:
+        """Sample with a random filter in one request of at most ``max_rows`` rows.
+
+        The request may be larger than a page: a random filter cannot be paginated, as
+        every page would draw different rows. Returns None (nothing fetched) when the
+        filter would keep everything or the filtered result may exceed ``max_rows``, so
+        the caller reads the result through the reservoir instead.
+        """
+        population = await self._count_rows(datasource, sql_query, refresh=refresh)
+        probability = pushdown_probability(reservoir.k, population)
+        request_rows = math.ceil(2 * probability * population) + 100
+        if probability >= 1.0 or request_rows > max_rows:
+            logger.info(
+                f"Sampling {reservoir.k} of {population} rows of '{datasource}' by streaming"
+            )
+            return None
+        result = await self._fetch_sql_page(
+            datasource, random_filter_query(sql_query, probability), request_rows, 0
+        )
+        reservoir.extend(self._result_rows(result))
+        if reservoir.seen < min(reservoir.k, population):
+            # Vanishingly unlikely with the chosen probability; a short sample is reported
+            logger.warning(
+                f"Push-down sample of '{datasource}' returned {reservoir.seen} of "
+                f"{reservoir.k} rows"
+            )
+        return self._sample_result(
+            result, reservoir, population, complete=True, method="pushdown", probability=probability
+        )
+
+    async def _sample_reservoir(
+        self,
+        datasource: str,
+        sql_query: str,
+        reservoir: Reservoir,
+        page_size: int,
+        max_concurrency: int,
+        max_scan_rows: int,
+    ) -> dict[str, Any]:
+        # Pages are fetched past the result cache: they are read once and would only
+        # evict reusable results
+        first_page: dict[str, Any] | None = None
+        pages = 0
+        complete = False
+        async for index, page in self._sql_pages(
+            lambda count, offset: self._fetch_sql_page(datasource, sql_query, count, offset),
+            max_scan_rows,
+            0,
+            page_size,
+            max_concurrency,
+        ):
+            pages += 1
+            if index == 0:
+                first_page = page
+            rows = self._result_rows(page)
+            complete = complete or len(rows) < min(page_size, max_scan_rows - index * page_size)
+            reservoir.extend(rows)
+        return self._sample_result(
+            first_page or {}, reservoir, reservoir.seen, complete, method="reservoir", pages=pages
+        )
+
+    def _sample_result(
+        self,
+        response: dict[str, Any],
+        reservoir: Reservoir,
+        population: int,
+        complete: bool,
+        **details: Any,
+    ) -> dict[str, Any]:
+        """The response with its rows replaced by the sample and a ``sampling`` summary."""
+        result = dict(response)
+        result[self._rows_key(result) or "values"] = reservoir.sample
+        result.pop("metadata", None)
+        result["sampling"] = {
+            **details,
+            "k": reservoir.k,
+            "rows": len(reservoir.sample),
+            "population": population,
+            "complete": complete,
+        }
+        return result
+
+    @traced("ElastiCubeService.materialize_sql")
+    async def materialize_sql(
+        self,
+        datasource: str,
+        sql_query: str,
+        count: int = 5000,
+        offset: int = 0,
+        auto_paginate: bool = False,
+        page_size: int | None = None,
+        max_concurrency: int | None = None,
+        refresh: bool = False,
+    ) -> dict[str, Any]:
+        """Execute SQL query on ElastiCube and keep the result in the local store.
+
+        The rows are loaded into an in-memory SQLite table that ``LocalStore.query`` can
+        re-query under the returned handle. Large results are streamed into the table
+        (``stream_sql``) rather than parsed in one piece; the others go through
+        ``query_sql`` and its result cache.
+
+        Args:
+            datasource: Name of the ElastiCube datasource (e.g., 'Sales Data Model')
+            sql_query: SQL query string (must start with SELECT)
+            count: Maximum number of rows to load (default: 5000)
+            offset: Offset for pagination (default: 0)
+            auto_paginate: Fetch ``count`` rows in concurrent pages (see ``query_sql``)
+            page_size: Rows per page when auto-paginating
+            max_concurrency: Pages in flight at once when auto-paginating
+            refresh: Bypass and replace cached results
+
+        Returns:
+            The handle with the table's columns, row count and size in bytes
+
+        Raises:
+            ValueError: If the local store is disabled, the result is larger than the
+                store or the query has errors
+            httpx.HTTPStatusError: If the API request fails
+        """
+        if self.local_store is None:
+            raise ValueError("Materializing results is disabled (LOCAL_STORE_ENABLED=false)")
+        table = self.local_store.new_table()
+        guard = None
+        try:
+            if auto_paginate or count < self.stream_threshold_rows:
+                result = await self.query_sql(
+                    datasource,
+                    sql_query,
+                    count=count,
+                    offset=offset,
+                    auto_paginate=auto_paginate,
+                    page_size=page_size,
+                    max_concurrency=max_concurrency,
+                    refresh=refresh,
+                )
+                rows_key = next((k for k in SQL_ROW_KEYS if isinstance(result.get(k), list)), None)
+                if rows_key is not None:
+                    await asyncio.to_thread(table.add_rows, result[rows_key], result.get("headers"))
+                guard = result.get("guard")
+            else:
+                guarded, guard = await self.guarded_sql(
+                    datasource, sql_query, count, offset, paginate=False, refresh=refresh
+                )
+                stream = self.stream_sql(datasource, guarded, count=count, offset=offset)
+                rows = []
+                async for row in stream:
+                    rows.append(row)
+                    if len(rows) == MATERIALIZE_BATCH_ROWS:
+                        # Inserts run in a worker thread to keep the event loop free
+                        await asyncio.to_thread(self._load_rows, table, rows, stream.fields)
+                        rows = []
+                await asyncio.to_thread(table.add_rows, rows, stream.fields.get("headers"))
+            described = self.local_store.add(table, datasource=datasource, sql_query=sql_query)
+            if guard is not None and guard["unbounded"]:
+                described["guard"] = guard
+            return described
+        except BaseException:
+            table.close()
+            raise
+
+    def _load_rows(self, table: LocalTable, rows: list[Any], fields: dict[str, Any]) -> None:
+        """Insert a batch of streamed rows and check the table still fits (blocking)."""
+        table.add_rows(rows, fields.get("headers"))
+        self.local_store.check_size(table)
+
+    def _sql_endpoint(self, datasource: str) -> str:
+        return f"/api/datasources/{self.client.encode_datasource_name(datasource)}/sql"
+
+    @staticmethod
+    def _sql_params(sql_query: str, count: int, offset: int) -> dict[str, str]:
+        return {
+            "queryBuildingCube": "false",
+            "count": str(count),
+            "offset": str(offset),
+            "includeMetadata": "true",
+            "isMaskedResponse": "false",
+            "shouldAddText": "false",
+            "query": sql_query,
+        }
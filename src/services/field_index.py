@@ -0,0 +1,240 @@
+"""Inverted index over table and column names across all cubes.
+
+Names are split into lower-case tokens (on separators and camelCase boundaries, so
+``customer_id``, ``CustomerID`` and ``Customer ID`` all give ``customer`` + ``id``; letters
+of any script count, so ``Código_Cliente`` gives ``código`` + ``cliente``) and
+into character trigrams of the separator-free name. A query matches on whole tokens,
+on token prefixes and, for misspellings or abbreviations, on shared trigrams.
+"""
+
+import re
+import unicodedata
+from typing import Any
+
+from .schema_index import SchemaIndex
+
+# Runs of letters and digits in any script; separators (``_``, spaces, punctuation) split
+_WORD = re.compile(r"[^\W_]+")
+# Tokens over a word's character shapes: U(pper), l(ower), d(igit), o (caseless letter)
+_TOKEN = re.compile(r"U+(?=Ul)|U?l+|U+|d+|o+")
+# Candidates scoring below this are not reported
+_MIN_SCORE = 0.3
+
+
+def _shape(char: str) -> str:
+    if char.isupper() or char.istitle():
+        return "U"
+    if char.islower():
+        return "l"
+    return "d" if char.isdigit() else "o"
+
+
+def name_tokens(name: str) -> list[str]:
+    """Split a table or column name into case-folded word tokens.
+
+    Letters of every script count, so accented and non-Latin names tokenize too; text
+    is NFC-normalized first so composed and decomposed accents give the same tokens.
+    """
+    tokens = []
+    for word in _WORD.findall(unicodedata.normalize("NFC", name)):
+        shape = "".join(_shape(char) for char in word)
+        tokens.extend(word[m.start() : m.end()].casefold() for m in _TOKEN.finditer(shape))
+    return tokens
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of ``text`` (the whole text if it is shorter)."""
+    if len(text) < 3:
+        return {text} if text else set()
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class FieldEntry:
+    """An indexed table (``column`` is None) or column."""
+
+    __slots__ = ("cube", "table", "column", "type")
+
+    def __init__(self, cube: str, table: str, column: str | None, type: Any = None):
+        self.cube = cube
+        self.table = table
+        self.column = column
+        self.type = type
+
+    def sort_key(self) -> tuple[str, str, str]:
+        return (self.cube, self.table, self.column or "")
+
+    def to_dict(self, score: float) -> dict[str, Any]:
+        entry = {"cube": self.cube, "table": self.table}
+        if self.column is not None:
+            entry["column"] = self.column
+            entry["type"] = self.type
+        entry["score"] = round(score, 3)
+        return entry
+
+
+class _Name:
+    """A distinct table or column name and the entries that carry it."""
+
+    __slots__ = ("tokens", "compact", "grams", "entries")
+
+    def __init__(self, name: str):
+        self.tokens = name_tokens(name)
+        self.compact = "".join(self.tokens)
+        self.grams = trigrams(self.compact)
+        self.entries: set[int] = set()
+
+
+class FieldIndex:
+    """Token and trigram postings for the tables and columns of many cubes.
+
+    Postings point at distinct names rather than at individual fields: the same column
+    name usually appears in many tables and cubes, so a query scores each name once and
+    then expands the best names into their fields.
+
+    Cubes are added and replaced as a whole (``set_cube``) together with the
+    ``lastUpdated`` value they were indexed at, so callers can re-index only the cubes
+    that changed.
+    """
+
+    def __init__(self):
+        self._entries: dict[int, FieldEntry] = {}
+        self._entry_names: dict[int, str] = {}
+        self._names: dict[str, _Name] = {}
+        self._tokens: dict[str, set[str]] = {}
+        self._grams: dict[str, set[str]] = {}
+        self._cube_entries: dict[str, list[int]] = {}
+        self._next_id = 0
+        self.versions: dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def cubes(self) -> list[str]:
+        """Names of the indexed cubes."""
+        return list(self._cube_entries)
+
+    def set_cube(self, cube: str, schema: SchemaIndex, version: Any = None) -> None:
+        """Index (or re-index) every table and column of a cube.
+
+        Args:
+            cube: Cube title
+            schema: Parsed schema of the cube
+            version: The cube's lastUpdated at the time the schema was fetched
+        """
+        self.remove_cube(cube)
+        ids = []
+        for table in schema.tables.values():
+            ids.append(self._add(table.name, FieldEntry(cube, table.name, None)))
+            for column in table.columns.values():
+                entry = FieldEntry(cube, table.name, column.name, column.type)
+                ids.append(self._add(column.name, entry))
+        self._cube_entries[cube] = ids
+        self.versions[cube] = version
+
+    def remove_cube(self, cube: str) -> None:
+        """Drop a cube's tables and columns from the index."""
+        self.versions.pop(cube, None)
+        for entry_id in self._cube_entries.pop(cube, ()):
+            del self._entries[entry_id]
+            name = self._entry_names.pop(entry_id)
+            info = self._names[name]
+            info.entries.discard(entry_id)
+            if not info.entries:
+                del self._names[name]
+                for token in info.tokens:
+                    self._discard(self._tokens, token, name)
+                for gram in info.grams:
+                    self._discard(self._grams, gram, name)
+
+    def search(self, query: str, limit: int = 20, cube: str | None = None) -> list[dict]:
+        """Find tables and columns whose names match ``query``.
+
+        Scoring adds the share of query tokens found in the name (whole tokens count
+        fully, prefixes half) to the trigram similarity of the separator-free names, with
+        a bonus for an exact match. Columns and tables are ranked together.
+
+        Args:
+            query: Field name or words, e.g. 'customer id'
+            limit: Maximum number of results
+            cube: Only search this cube
+
+        Returns:
+            Matches as dicts with ``cube``, ``table``, ``column``/``type`` (for columns)
+            and ``score``, best first
+        """
+        query_tokens = list(dict.fromkeys(name_tokens(query)))
+        if not query_tokens or limit <= 0:
+            return []
+        compact = "".join(name_tokens(query))
+        query_grams = trigrams(compact)
+
+        token_hits: dict[str, float] = {}
+        for token in query_tokens:
+            matched: dict[str, float] = dict.fromkeys(self._tokens.get(token, ()), 1.0)
+            if len(token) >= 2:
+                for indexed, names in self._tokens.items():
+                    if indexed != token and indexed.startswith(token):
+                        for name in names:
+                            matched.setdefault(name, 0.5)
+            for name, weight in matched.items():
+                token_hits[name] = token_hits.get(name, 0.0) + weight
+        gram_hits: dict[str, int] = {}
+        for gram in query_grams:
+            for name in self._grams.get(gram, ()):
+                gram_hits[name] = gram_hits.get(name, 0) + 1
+
+        scored = []
+        for name in token_hits.keys() | gram_hits.keys():
+            info = self._names[name]
+            score = token_hits.get(name, 0.0) / len(query_tokens)
+            score += 2 * gram_hits.get(name, 0) / (len(query_grams) + len(info.grams))
+            if info.compact == compact:
+                score += 1.0
+            if score >= _MIN_SCORE:
+                scored.append((score, name))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+
+        matches = []
+        for score, name in scored:
+            entries = [self._entries[entry_id] for entry_id in self._names[name].entries]
+            if cube is not None:
+                entries = [entry for entry in entries if entry.cube == cube]
+            for entry in sorted(entries, key=FieldEntry.sort_key):
+                matches.append(entry.to_dict(score))
+                if len(matches) == limit:
+                    return matches
+        return matches
+
+    def stats(self) -> dict[str, int]:
+        """Return index sizes."""
+        return {
+            "cubes": len(self._cube_entries),
+            "fields": len(self._entries),
+            "names": len(self._names),
+            "tokens": len(self._tokens),
+            "trigrams": len(self._grams),
+        }
+
+    def _add(self, name: str, entry: FieldEntry) -> int:
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = entry
+        self._entry_names[entry_id] = name
+        info = self._names.get(name)
+        if info is None:
+            info = self._names[name] = _Name(name)
+            for token in info.tokens:
+                self._tokens.setdefault(token, set()).add(name)
+            for gram in info.grams:
+                self._grams.setdefault(gram, set()).add(name)
+        info.entries.add(entry_id)
+        return entry_id
+
+    @staticmethod
+    def _discard(postings: dict[str, set[str]], key: str, name: str) -> None:
+        names = postings.get(key)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del postings[key]
@@ -0,0 +1,267 @@
+"""Materialized SQL results, re-queried locally with SQLite.
+
+A result materialized by ``query_elasticube`` is loaded into its own in-memory SQLite
+database as a table named ``result`` and kept under a handle, so follow-up filters,
+sorts and aggregates run in-process without another request to Sisense. The store is
+bounded by a total byte budget and a handle count; the least recently used handles are
+evicted first. Local queries are read-only and interrupted after a timeout.
+"""
+
+import asyncio
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+TABLE = "result"
+
+# SQLite operations a local query may perform; anything else (writes, ATTACH, PRAGMA)
+# is denied by the authorizer
+_ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+# SQLite VM instructions between timeout checks
+_PROGRESS_STEPS = 10_000
+
+
+def column_names(headers: Any, width: int) -> list[str]:
+    """Unique column names from a result's ``headers``, falling back to ``column_<i>``."""
+    names = []
+    seen: set[str] = set()
+    for i in range(width):
+        header = headers[i] if isinstance(headers, list) and len(headers) == width else None
+        if isinstance(header, dict):
+            header = header.get("name") or header.get("title")
+        name = str(header) if header not in (None, "") else f"column_{i}"
+        unique, n = name, 1
+        while unique.casefold() in seen:
+            n += 1
+            unique = f"{name}_{n}"
+        seen.add(unique.casefold())
+        names.append(unique)
+    return names
+
+
+def _cell(value: Any) -> Any:
+    """A JSON value as an SQLite value (nested values are stored as JSON text)."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+class LocalTable:
+    """One materialized result: an in-memory SQLite database holding table ``result``."""
+
+    def __init__(self, handle: str):
+        self.handle = handle
+        self.connection = sqlite3.connect(":memory:", check_same_thread=False)
+        self.lock = threading.Lock()
+        self.columns: list[str] | None = None
+        self.row_count = 0
+        self.size = 0
+        self.source: dict[str, Any] = {}
+        self._close_when_idle = False
+
+    def measure(self) -> int:
+        """Update and return ``size``, the bytes used by the database pages."""
+        page_count = self.connection.execute("PRAGMA page_count").fetchone()[0]
+        page_size = self.connection.execute("PRAGMA page_size").fetchone()[0]
+        self.size = page_count * page_size
+        return self.size
+
+    def add_rows(self, rows: list[Any], headers: Any = None) -> None:
+        """Insert rows (lists or dicts); the first rows define the columns (blocking)."""
+        if not rows:
+            return
+        with self.lock:
+            try:
+                self._insert(rows, headers)
+            finally:
+                if self._close_when_idle:
+                    self.connection.close()
+
+    def _insert(self, rows: list[Any], headers: Any) -> None:
+        if self.columns is None:
+            first = rows[0]
+            if isinstance(first, dict):
+                self.columns = column_names(list(first), len(first))
+            else:
+                self.columns = column_names(headers, len(first) if isinstance(first, list) else 1)
+            quoted = ", ".join(_quote(column) for column in self.columns)
+            self.connection.execute(f"CREATE TABLE {TABLE} ({quoted})")
+        width = len(self.columns)
+        values = []
+        for row in rows:
+            if isinstance(row, dict):
+                row = list(row.values())
+            elif not isinstance(row, list):
+                row = [row]
+            row = [_cell(value) for value in row[:width]]
+            values.append(row + [None] * (width - len(row)))
+        placeholders = ", ".join("?" * width)
+        self.connection.executemany(f"INSERT INTO {TABLE} VALUES ({placeholders})", values)
+        self.row_count += len(values)
+
+    def seal(self) -> None:
+        """Finish loading: commit and make the database read-only."""
+        if self.columns is None:
+            self.columns = []
+            self.connection.execute(f"CREATE TABLE {TABLE} (empty)")
+        self.connection.commit()
+        self.measure()
+        self.connection.set_authorizer(
+            lambda action, *_: (
+                sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+            )
+        )
+
+    def query(self, sql_query: str, max_rows: int, timeout: float) -> dict[str, Any]:
+        """Run a read-only query, returning at most ``max_rows`` rows (blocking)."""
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            self.connection.set_progress_handler(
+                lambda: time.monotonic() > deadline, _PROGRESS_STEPS
+            )
+            try:
+                cursor = self.connection.execute(sql_query)
+                rows = cursor.fetchmany(max_rows + 1)
+                headers = [column[0] for column in cursor.description or ()]
+            except sqlite3.OperationalError as e:
+                if time.monotonic() > deadline:
+                    raise ValueError(f"Local query timed out after {timeout:g}s") from e
+                raise ValueError(f"Local query failed: {e}") from e
+            except sqlite3.Error as e:
+                raise ValueError(f"Local query failed: {e}") from e
+            finally:
+                self.connection.set_progress_handler(None, 0)
+                if self._close_when_idle:
+                    self.connection.close()
+        return {
+            "headers": headers,
+            "values": [list(row) for row in rows[:max_rows]],
+            "truncated": len(rows) > max_rows,
+        }
+
+    def describe(self) -> dict[str, Any]:
+        return {
+            "handle": self.handle,
+            "table": TABLE,
+            "columns": self.columns,
+            "row_count": self.row_count,
+            "bytes": self.size,
+            **self.source,
+        }
+
+    def close(self) -> None:
+        """Close the database, or have the running query or insert close it when done."""
+        if self.lock.acquire(blocking=False):
+            try:
+                self.connection.close()
+            finally:
+                self.lock.release()
+        else:
+            self._close_when_idle = True
+
+
+class LocalStore:
+    """Materialized results by handle, bounded by bytes and handle count (LRU eviction).
+
+    Args:
+        max_bytes: Total bytes of all materialized results; one larger result is rejected
+        max_handles: Results kept at once
+        query_timeout: Seconds a local query may run before it is interrupted
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_handles: int = 16,
+        query_timeout: float = 10.0,
+    ):
+        self.max_bytes = max_bytes
+        self.max_handles = max_handles
+        self.query_timeout = query_timeout
+        self._tables: OrderedDict[str, LocalTable] = OrderedDict()
+        self.evictions = 0
+
+    def new_table(self) -> LocalTable:
+        """Create an empty table to load; add it with ``add`` once loaded."""
+        return LocalTable(f"local_{secrets.token_hex(16)}")
+
+    def check_size(self, table: LocalTable) -> None:
+        """Raise ValueError (and close the table) if a table being loaded no longer fits."""
+        if table.measure() > self.max_bytes:
+            table.close()
+            raise ValueError(
+                f"Result too large to materialize: over {self.max_bytes} bytes "
+                "(LOCAL_STORE_MAX_BYTES). Lower count or select fewer columns."
+            )
+
+    def add(self, table: LocalTable, **source: Any) -> dict[str, Any]:
+        """Seal a loaded table, store it and evict the least recently used handles."""
+        self.check_size(table)
+        table.seal()
+        table.source = source
+        self._tables[table.handle] = table
+        total = sum(t.size for t in self._tables.values())
+        while len(self._tables) > 1 and (
+            len(self._tables) > self.max_handles or total > self.max_bytes
+        ):
+            _, evicted = self._tables.popitem(last=False)
+            total -= evicted.size
+            evicted.close()
+            self.evictions += 1
+        return table.describe()
+
+    def get(self, handle: str) -> LocalTable:
+        """Return a table by handle, marking it recently used.
+
+        Raises:
+            ValueError: If the handle is unknown or was evicted
+        """
+        table = self._tables.get(handle)
+        if table is None:
+            # Other handles are not listed: the store is shared by every session
+            raise ValueError(
+                f"Unknown or evicted handle '{handle}'. "
+                "Materialize the result again with query_elasticube(materialize=true)."
+            )
+        self._tables.move_to_end(handle)
+        return table
+
+    async def query(self, handle: str, sql_query: str, max_rows: int = 1000) -> dict[str, Any]:
+        """Run a read-only query against a handle's ``result`` table in a worker thread.
+
+        Raises:
+            ValueError: If the handle is unknown, the query fails, writes or times out
+        """
+        table = self.get(handle)
+        result = await asyncio.to_thread(table.query, sql_query, max_rows, self.query_timeout)
+        return {"handle": handle, **result}
+
+    def handles(self) -> list[dict[str, Any]]:
+        """Describe the stored results, least recently used first."""
+        return [table.describe() for table in self._tables.values()]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "handles": len(self._tables),
+            "bytes": sum(table.size for table in self._tables.values()),
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        for table in self._tables.values():
+            table.close()
+        self._tables.clear()
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
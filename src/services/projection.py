@@ -0,0 +1,154 @@
+"""JSONPath-style projection of JSON documents.
+
+Supported path syntax (a small subset of JSONPath):
+
+- ``title`` / ``$.title``: a member
+- ``datasource.title``: nested members
+- ``widgets[*].title`` / ``widgets[].title``: a member of every array element; a member
+  step applied to an array (``widgets.title``) also maps over its elements
+- ``filters[0]``: one array element
+- ``['odd.key']``: a member whose name contains dots or brackets
+- ``*`` as a member name: every member of an object
+
+Several paths are merged into one result that keeps the document's shape, so
+``["title", "widgets[*].title", "widgets[*].type"]`` yields
+``{"title": ..., "widgets": [{"title": ..., "type": ...}, ...]}``.
+"""
+
+import re
+from typing import Any
+
+_STEP = re.compile(r"\[(\*|\d+|)\]|\['([^']*)'\]|\.?([^.\[\]]+)")
+_ALL = "*"
+# Marks the end of a path: keep the whole value from here on
+_LEAF: dict = {}
+
+
+def parse_path(path: str) -> list[str | int]:
+    """Split a path into member names, array indexes and ``*`` wildcards.
+
+    Args:
+        path: Path such as 'widgets[*].metadata.panels'
+
+    Returns:
+        List of steps
+
+    Raises:
+        ValueError: If the path is empty or malformed
+    """
+    text = path.strip()
+    if text.startswith("$"):
+        text = text[1:]
+    steps: list[str | int] = []
+    pos = 0
+    while pos < len(text):
+        match = _STEP.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Invalid field path '{path}' at position {pos}")
+        index, quoted, name = match.groups()
+        if index is not None:
+            steps.append(_ALL if index in ("*", "") else int(index))
+        else:
+            steps.append(quoted if quoted is not None else name)
+        pos = match.end()
+    if not steps:
+        raise ValueError(f"Invalid field path '{path}'")
+    return steps
+
+
+def compile_paths(paths: list[str]) -> dict:
+    """Merge paths into a tree of steps (a path ending at a node keeps it whole)."""
+    tree: dict = {}
+    for path in paths:
+        node = tree
+        steps = parse_path(path)
+        for i, step in enumerate(steps):
+            if node is _LEAF:
+                break
+            if i == len(steps) - 1:
+                node[step] = _LEAF
+            else:
+                node = node.setdefault(step, {})
+    return tree
+
+
+def top_level_fields(paths: list[str]) -> list[str] | None:
+    """Top-level member names the paths touch, or None if any path starts with ``*``.
+
+    Used to build the upstream ``fields`` parameter.
+    """
+    names: list[str] = []
+    for path in paths:
+        first = parse_path(path)[0]
+        if not isinstance(first, str) or first == _ALL:
+            return None
+        if first not in names:
+            names.append(first)
+    return names
+
+
+def project(value: Any, paths: list[str] | dict) -> Any:
+    """Keep only the parts of ``value`` selected by ``paths``.
+
+    Missing members and out-of-range indexes are skipped rather than reported.
+
+    Args:
+        value: JSON-like document
+        paths: Paths (see module docstring) or a tree from ``compile_paths``
+
+    Returns:
+        Projected copy of the selected parts (unselected containers are not copied)
+    """
+    tree = compile_paths(paths) if isinstance(paths, list) else paths
+    return _apply(tree, value)
+
+
+def _apply(node: dict, value: Any) -> Any:
+    if node is _LEAF:
+        return value
+    if isinstance(value, list):
+        items: list[Any] = []
+        wildcard = node.get(_ALL)
+        member_steps = {k: v for k, v in node.items() if isinstance(k, str) and k != _ALL}
+        if wildcard is not None or member_steps:
+            # Every element is projected; selected indexes add their own paths to theirs
+            for position, item in enumerate(value):
+                projected = _merge(
+                    _apply(wildcard, item) if wildcard is not None else None,
+                    _apply(member_steps, item) if member_steps else None,
+                )
+                if position in node:
+                    projected = _merge(projected, _apply(node[position], item))
+                items.append(projected)
+        else:
+            for step, child in node.items():
+                if isinstance(step, int) and -len(value) <= step < len(value):
+                    items.append(_apply(child, value[step]))
+        return items
+    if isinstance(value, dict):
+        out: dict[str, Any] = {}
+        wildcard = node.get(_ALL)
+        for step, child in node.items():
+            if step == _ALL or not isinstance(step, str) or step not in value:
+                continue
+            out[step] = _apply(child, value[step])
+        if wildcard is not None:
+            for key, item in value.items():
+                out[key] = _merge(_apply(wildcard, item), out.get(key))
+        return out
+    # A path into a scalar selects nothing
+    return None
+
+
+def _merge(first: Any, second: Any) -> Any:
+    """Combine two projections of the same value."""
+    if first is None:
+        return second
+    if second is None:
+        return first
+    if isinstance(first, dict) and isinstance(second, dict):
+        merged = dict(first)
+        for key, item in second.items():
+            merged[key] = _merge(merged.get(key), item)
+        return merged
+    return first
@@ -0,0 +1,88 @@
+"""Pre-flight checks of SQL queries before they are sent to Sisense.
+
+A query without a top-level ``LIMIT``/``TOP`` that is not a plain aggregate makes Sisense
+compute its whole result even when only ``count`` rows are requested, which can tie up
+the ``/sql`` endpoint for the full request timeout. ``ElastiCubeService.check_query``
+uses ``is_unbounded`` to find such queries, estimates their size with a ``COUNT(*)``
+probe and then rejects them, adds a ``LIMIT`` covering the requested window, or fetches
+large windows in pages.
+"""
+
+from .sql_fingerprint import sql_tokens, strip_trailing
+
+ALLOW, LIMIT, PAGINATE, REJECT = "allow", "limit", "paginate", "reject"
+
+# Functions that collapse a query without GROUP BY to a single row
+AGGREGATE_FUNCTIONS = frozenset({"COUNT", "SUM", "AVG", "MIN", "MAX", "MEDIAN", "STDEV"})
+# Set operators whose result size depends on the data, like GROUP BY
+SET_OPERATORS = frozenset({"UNION", "INTERSECT", "EXCEPT"})
+
+
+def _bounds_rows(tokens: list[tuple[str, str]], i: int) -> bool:
+    """True if the top-level keyword at ``tokens[i]`` starts a row-limiting clause:
+    ``SELECT [DISTINCT | ALL] TOP n``, ``LIMIT n`` or ``FETCH FIRST | NEXT``.
+
+    A bare ``TOP`` or ``FETCH`` may be a column or alias name, so the clause shape is
+    checked rather than the keyword alone.
+    """
+    text = tokens[i][1]
+    kind_after, after = tokens[i + 1] if i + 1 < len(tokens) else ("", "")
+    if text == "LIMIT":
+        return kind_after == "number"
+    if text == "FETCH":
+        return after in ("FIRST", "NEXT")
+    if text == "TOP":
+        j = i - 1
+        if j >= 0 and tokens[j] in (("keyword", "DISTINCT"), ("keyword", "ALL")):
+            j -= 1
+        return (
+            j >= 0
+            and tokens[j] == ("keyword", "SELECT")
+            and (kind_after == "number" or after == "(")
+        )
+    return False
+
+
+def is_unbounded(sql_query: str) -> bool:
+    """True if a SELECT can return every row of its tables.
+
+    Only top-level tokens count (a ``LIMIT`` in a subquery does not bound the outer
+    query). Queries with a ``LIMIT``/``TOP``/``FETCH`` clause, without ``FROM``, or whose
+    select list aggregates without ``GROUP BY`` are bounded; ``UNION``/``INTERSECT``/
+    ``EXCEPT`` and ``GROUP BY`` queries are not, as their size depends on the data, and
+    neither are window aggregates (``COUNT(*) OVER ()``), which keep every row. Shapes
+    that cannot be classified count as unbounded, so the ``COUNT(*)`` probe decides.
+    """
+    tokens = sql_tokens(sql_query)
+    top = []
+    depth = 0
+    for i, (kind, text) in enumerate(tokens):
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth = max(0, depth - 1)
+        elif depth == 0:
+            if kind == "keyword" and _bounds_rows(tokens, i):
+                return False
+            top.append((kind, text.upper()))
+    keywords = {text for kind, text in top if kind == "keyword"}
+    if not top or top[0][1] not in ("SELECT", "WITH") or "FROM" not in keywords:
+        return False
+    if "GROUP" in keywords or any(text in SET_OPERATORS for _, text in top):
+        return True
+
+    # The select list of the (last) top-level SELECT: aggregates there mean one row
+    select = max(i for i, token in enumerate(top) if token == ("keyword", "SELECT"))
+    end = next((i for i in range(select, len(top)) if top[i] == ("keyword", "FROM")), None)
+    if end is None:
+        return True
+    select_list = [text for _, text in top[select + 1 : end]]
+    return not any(
+        text in AGGREGATE_FUNCTIONS and select_list[i + 1 : i + 2] != ["OVER"]
+        for i, text in enumerate(select_list)
+    )
+
+
+def with_limit(sql_query: str, limit: int) -> str:
+    """Append a top-level ``LIMIT`` (on its own line, after dropping trailing comments)."""
+    return f"{strip_trailing(sql_query)}\nLIMIT {limit}"
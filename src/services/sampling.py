@@ -0,0 +1,105 @@
+"""Uniform random samples of SQL results.
+
+Two strategies, used by ``ElastiCubeService.sample_sql``:
+
+- Push-down: a (cached) ``COUNT(*)`` probe gives the result's size N, then the query is
+  wrapped in a ``RAND() < p`` filter with p chosen so that at least k rows come back
+  with high probability. Sisense does the sampling and only about k rows are
+  transferred; a reservoir trims them to exactly k.
+- Streaming: the result is read page by page through a reservoir that keeps k rows,
+  for dialects without ``RAND()`` or subqueries. It costs a scan but only k rows are
+  held, whatever the result size.
+"""
+
+import math
+import random
+from typing import Any
+
+from .sql_fingerprint import strip_trailing
+
+# Push-down with fallback to streaming, push-down only, streaming only
+SAMPLE_METHODS = ("auto", "pushdown", "reservoir")
+
+# Random predicate appended to push-down samples; Sisense rejects it on sources whose
+# SQL has no RAND(), and sampling falls back to streaming
+RANDOM_PREDICATE = "RAND() < {probability}"
+
+
+class Reservoir:
+    """A uniform random sample of k items of a stream of unknown length.
+
+    Uses Li's Algorithm L: after the reservoir is full, the number of items to skip
+    before the next replacement is drawn directly, so a page is consumed with a few
+    random numbers rather than one per row.
+
+    Args:
+        k: Sample size
+        rng: Random number generator (seed it for reproducible samples)
+    """
+
+    def __init__(self, k: int, rng: random.Random | None = None):
+        self.k = max(0, k)
+        self.rng = rng or random.Random()
+        self.sample: list[Any] = []
+        self.seen = 0
+        self._weight = 0.0
+        # 1-based stream position of the next item to enter the full reservoir
+        self._next = 0
+
+    def _random(self) -> float:
+        """Uniform in (0, 1], so its logarithm is defined."""
+        return 1.0 - self.rng.random()
+
+    def _advance(self) -> None:
+        self._weight *= math.exp(math.log(self._random()) / self.k)
+        if self._weight >= 1.0:  # only reachable through float underflow in log(1 - w)
+            self._next = self.seen + 1
+            return
+        skip = math.floor(math.log(self._random()) / math.log(1.0 - self._weight))
+        self._next = self.seen + skip + 1
+
+    def extend(self, items: list[Any]) -> None:
+        """Offer a batch of items, in stream order."""
+        if self.k == 0:
+            self.seen += len(items)
+            return
+        i = 0
+        while i < len(items) and len(self.sample) < self.k:
+            self.sample.append(items[i])
+            self.seen += 1
+            i += 1
+            if len(self.sample) == self.k:
+                self._weight = 1.0
+                self._advance()
+        while i < len(items):
+            target = i + (self._next - self.seen - 1)
+            if target >= len(items):
+                self.seen += len(items) - i
+                return
+            self.seen += target - i + 1
+            self.sample[self.rng.randrange(self.k)] = items[target]
+            i = target + 1
+            self._advance()
+
+
+def _subquery(sql_query: str) -> str:
+    return strip_trailing(sql_query)
+
+
+def count_query(sql_query: str) -> str:
+    """The number of rows ``sql_query`` returns."""
+    return f"SELECT COUNT(*) FROM ({_subquery(sql_query)}) AS sample_source"
+
+
+def pushdown_probability(k: int, population: int) -> float:
+    """Keep probability for which a Bernoulli sample of ``population`` rows has at least
+    k rows with high probability (mean k plus four standard deviations plus slack)."""
+    if population <= 0:
+        return 1.0
+    return min(1.0, (k + 4 * math.sqrt(k) + 10) / population)
+
+
+def random_filter_query(sql_query: str, probability: float) -> str:
+    """``sql_query`` filtered to a Bernoulli sample of its rows."""
+    predicate = RANDOM_PREDICATE.format(probability=f"{probability:.6g}")
+    return f"SELECT * FROM ({_subquery(sql_query)}) AS sample_source WHERE {predicate}"
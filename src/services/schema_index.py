@@ -0,0 +1,164 @@
+"""Compact, indexed view of an ElastiCube schema document.
+
+``/api/v2/datamodels/schema`` nests tables under ``datasets[].schema.tables`` and
+describes joins as ``relations[].columns[]`` entries that point at dataset, table and
+column OIDs. ``SchemaIndex`` parses that document once into small ``__slots__`` objects:
+tables by name, columns by table and relations as a table adjacency list, so a single
+table or a column summary can be answered without walking or re-serializing the whole
+document.
+"""
+
+from typing import Any
+
+
+class ColumnInfo:
+    """A column of a schema table."""
+
+    __slots__ = ("name", "type", "oid", "hidden")
+
+    def __init__(self, name: str, type: Any = None, oid: str | None = None, hidden: bool = False):
+        self.name = name
+        self.type = type
+        self.oid = oid
+        self.hidden = hidden
+
+    def to_dict(self) -> dict[str, Any]:
+        column = {"name": self.name, "type": self.type}
+        if self.hidden:
+            column["hidden"] = True
+        return column
+
+
+class RelationEdge:
+    """One side of a join: ``column`` of the owning table matches ``other_table.other_column``."""
+
+    __slots__ = ("column", "other_table", "other_column")
+
+    def __init__(self, column: str, other_table: str, other_column: str):
+        self.column = column
+        self.other_table = other_table
+        self.other_column = other_column
+
+    def to_dict(self) -> dict[str, str]:
+        return {"column": self.column, "table": self.other_table, "to_column": self.other_column}
+
+
+class TableInfo:
+    """A schema table with its columns (by name, in schema order) and join edges."""
+
+    __slots__ = ("name", "oid", "dataset", "type", "columns", "relations")
+
+    def __init__(self, name: str, oid: str | None, dataset: str | None, type: Any = None):
+        self.name = name
+        self.oid = oid
+        self.dataset = dataset
+        self.type = type
+        self.columns: dict[str, ColumnInfo] = {}
+        self.relations: list[RelationEdge] = []
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "dataset": self.dataset,
+            "type": self.type,
+            "columns": [column.to_dict() for column in self.columns.values()],
+            "relations": [edge.to_dict() for edge in self.relations],
+        }
+
+
+class SchemaIndex:
+    """Tables by name, columns by table and relations as an adjacency list."""
+
+    __slots__ = ("title", "tables", "_folded")
+
+    def __init__(self, title: str | None = None):
+        self.title = title
+        self.tables: dict[str, TableInfo] = {}
+        self._folded: dict[str, str] = {}
+
+    @classmethod
+    def from_schema(cls, schema: dict[str, Any]) -> "SchemaIndex":
+        """Build the index from a ``/api/v2/datamodels/schema`` document.
+
+        Tables are read from ``datasets[].schema.tables`` (and from a top-level
+        ``tables`` list, if present). Unknown or partial structures are skipped.
+
+        Args:
+            schema: Raw schema document
+
+        Returns:
+            SchemaIndex for the document
+        """
+        index = cls(schema.get("title") if isinstance(schema, dict) else None)
+        if not isinstance(schema, dict):
+            return index
+
+        # (dataset oid, table oid) -> table, and column oid -> name per table
+        by_oid: dict[tuple[Any, Any], TableInfo] = {}
+        column_names: dict[tuple[Any, Any], dict[Any, str]] = {}
+
+        def add_tables(tables: Any, dataset: dict[str, Any] | None) -> None:
+            dataset_oid = dataset.get("oid") if dataset else None
+            dataset_name = dataset.get("name") if dataset else None
+            for raw in tables if isinstance(tables, list) else []:
+                if not isinstance(raw, dict) or not isinstance(raw.get("name"), str):
+                    continue
+                table = TableInfo(raw["name"], raw.get("oid"), dataset_name, raw.get("type"))
+                oids: dict[Any, str] = {}
+                for raw_column in raw.get("columns") or []:
+                    if not isinstance(raw_column, dict):
+                        continue
+                    name = raw_column.get("name") or raw_column.get("id")
+                    if not isinstance(name, str):
+                        continue
+                    oid = raw_column.get("oid")
+                    table.columns[name] = ColumnInfo(
+                        name, raw_column.get("type"), oid, bool(raw_column.get("hidden"))
+                    )
+                    oids[oid] = name
+                index._add_table(table)
+                by_oid[(dataset_oid, table.oid)] = table
+                column_names[(dataset_oid, table.oid)] = oids
+
+        for dataset in schema.get("datasets") or []:
+            if isinstance(dataset, dict):
+                add_tables((dataset.get("schema") or {}).get("tables"), dataset)
+        add_tables(schema.get("tables"), None)
+
+        for relation in schema.get("relations") or []:
+            ends = []
+            for end in (relation.get("columns") or []) if isinstance(relation, dict) else []:
+                if not isinstance(end, dict) or end.get("isDropped"):
+                    continue
+                key = (end.get("dataset"), end.get("table"))
+                table = by_oid.get(key)
+                column = column_names.get(key, {}).get(end.get("column"))
+                if table is not None and column is not None:
+                    ends.append((table, column))
+            # A relation joins every listed column with every other one
+            for table, column in ends:
+                for other_table, other_column in ends:
+                    if other_table is not table:
+                        table.relations.append(RelationEdge(column, other_table.name, other_column))
+        return index
+
+    def _add_table(self, table: TableInfo) -> None:
+        self.tables[table.name] = table
+        self._folded.setdefault(table.name.casefold(), table.name)
+
+    def table(self, name: str) -> TableInfo | None:
+        """Find a table by exact name, falling back to a case-insensitive match."""
+        table = self.tables.get(name)
+        if table is None and name.casefold() in self._folded:
+            table = self.tables[self._folded[name.casefold()]]
+        return table
+
+    def columns_summary(self) -> dict[str, Any]:
+        """Return ``{"title", "tables": {table: {column: type}}}`` for every table."""
+        return {
+            "title": self.title,
+            "tables": {
+                name: {column.name: column.type for column in table.columns.values()}
+                for name, table in self.tables.items()
+            },
+        }
@@ -1,15 +1,43 @@
 """Core Sisense service - base service with common functionality."""
 
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from ..cache import TTLCache
 from ..client import SisenseClient
 
 
 class SisenseService:
     """Base service for Sisense operations."""
 
-    def __init__(self, client: SisenseClient):
+    def __init__(self, client: SisenseClient, cache: TTLCache | None = None):
         """Initialize the service with an HTTP client.
 
         Args:
             client: Sisense HTTP client instance
+            cache: Optional metadata cache shared between services
         """
         self.client = client
+        self.cache = cache
+
+    async def _cached(
+        self,
+        namespace: str,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        refresh: bool = False,
+    ) -> Any:
+        """Serve a value from the metadata cache, loading it on a miss.
+
+        Args:
+            namespace: Cache namespace (selects the TTL, e.g. 'schema')
+            key: Key within the namespace
+            loader: Coroutine function fetching the value from the API
+            refresh: Bypass and replace any cached value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        if self.cache is None:
+            return await loader()
+        return await self.cache.get_or_load(namespace, key, loader, refresh=refresh)
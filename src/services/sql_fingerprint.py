@@ -0,0 +1,114 @@
+"""Normalization of SQL text into a stable cache fingerprint.
+
+Two queries that differ only in whitespace, comments, keyword casing or the order of the
+literals in an ``IN (...)`` list produce the same fingerprint. Identifiers and literal
+values are kept as written, so queries that can return different rows never collide.
+"""
+
+import hashlib
+import re
+
+_TOKEN = re.compile(
+    r"""
+      (?P<space>\s+)
+    | (?P<comment>--[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^']|'')*')
+    | (?P<quoted>"(?:[^"]|"")*"|\[[^\]]*\]|`[^`]*`)
+    | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<operator><>|!=|<=|>=|\|\||.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Words normalized to upper case; everything else (identifiers) keeps its spelling
+KEYWORDS = frozenset("""
+    ALL AND ANY AS ASC AVG BETWEEN BY CASE CAST COUNT CROSS DESC DISTINCT ELSE END EXISTS
+    FALSE FETCH FIRST FROM FULL GROUP HAVING IN INNER IS JOIN LEFT LIKE LIMIT MAX MIN NEXT
+    NOT NULL OFFSET ON ONLY OR ORDER OUTER RIGHT ROWS SELECT SUM THEN TOP TRUE UNION WHEN
+    WHERE WITH
+    """.split())
+
+
+def sql_tokens(sql: str) -> list[tuple[str, str]]:
+    """Split SQL into ``(kind, text)`` tokens without whitespace and comments.
+
+    Kinds are ``keyword`` (upper-cased), ``word``, ``string``, ``quoted``, ``number`` and
+    ``operator``.
+    """
+    tokens = []
+    for match in _TOKEN.finditer(sql):
+        kind = match.lastgroup
+        if kind in ("space", "comment"):
+            continue
+        text = match.group()
+        if kind == "word" and text.upper() in KEYWORDS:
+            kind, text = "keyword", text.upper()
+        tokens.append((kind, text))
+    return tokens
+
+
+def strip_trailing(sql: str) -> str:
+    """SQL without trailing whitespace, comments and semicolons, so it can be wrapped in
+    a subquery or extended without a ``--`` comment swallowing what follows."""
+    end = 0
+    for match in _TOKEN.finditer(sql):
+        if match.lastgroup not in ("space", "comment") and match.group() != ";":
+            end = match.end()
+    return sql[:end].lstrip()
+
+
+def _sort_in_lists(tokens: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Sort the literals of ``IN (literal, ...)`` lists into a canonical order."""
+    out: list[tuple[str, str]] = []
+    i = 0
+    while i < len(tokens):
+        out.append(tokens[i])
+        if tokens[i] == ("keyword", "IN") and i + 1 < len(tokens) and tokens[i + 1][1] == "(":
+            literals, j = [], i + 2
+            while j < len(tokens) and tokens[j][0] in ("string", "number"):
+                literals.append(tokens[j])
+                if j + 1 < len(tokens) and tokens[j + 1][1] == ",":
+                    j += 2
+                    continue
+                j += 1
+                break
+            # Only rewrite lists made entirely of literals (not subqueries or expressions)
+            if literals and j < len(tokens) and tokens[j][1] == ")" and tokens[j - 1][1] != ",":
+                out.append(tokens[i + 1])
+                for index, literal in enumerate(sorted(set(literals))):
+                    if index:
+                        out.append(("operator", ","))
+                    out.append(literal)
+                out.append(tokens[j])
+                i = j + 1
+                continue
+        i += 1
+    return out
+
+
+def normalize_sql(sql: str) -> str:
+    """Return a canonical spelling of a SQL query.
+
+    Comments are dropped, tokens are separated by single spaces, keywords are upper-cased
+    and literal-only ``IN`` lists are sorted and de-duplicated.
+
+    Args:
+        sql: SQL query text
+
+    Returns:
+        Normalized SQL text
+    """
+    return " ".join(text for _, text in _sort_in_lists(sql_tokens(sql)))
+
+
+def sql_fingerprint(sql: str) -> str:
+    """Return a short stable hash of the normalized query.
+
+    Args:
+        sql: SQL query text
+
+    Returns:
+        Hex digest identifying the normalized query
+    """
+    return hashlib.blake2b(normalize_sql(sql).encode(), digest_size=16).hexdigest()
@@ -0,0 +1,121 @@
+"""Aggregate SQL for profiling a table without transferring its rows.
+
+Column statistics are computed by Sisense: one aggregate query per batch of columns
+returns the row count and, per column, the non-null count, distinct count and (where
+the type supports ordering) min and max. Top values are one ``GROUP BY`` query per
+column. The results are small however large the table is.
+
+Schema column types are .NET ``SqlDbType`` codes (8 = Int, 18 = Text, 31 = Date);
+string type names are classified by keyword.
+"""
+
+from typing import Any
+
+from .query_guard import with_limit
+from .schema_index import ColumnInfo
+
+NUMERIC, TEXT, DATE, BOOLEAN, OTHER = "numeric", "text", "date", "boolean", "other"
+
+_KINDS_BY_CODE = {
+    **dict.fromkeys((0, 5, 6, 8, 9, 13, 16, 17, 20), NUMERIC),
+    **dict.fromkeys((3, 10, 11, 12, 14, 18, 22), TEXT),
+    **dict.fromkeys((4, 15, 31, 32, 33, 34), DATE),
+    2: BOOLEAN,
+}
+_KIND_KEYWORDS = (
+    (DATE, ("date", "time")),
+    (BOOLEAN, ("bool", "bit")),
+    (NUMERIC, ("int", "num", "dec", "float", "double", "real", "money")),
+    (TEXT, ("char", "text", "string")),
+)
+# Kinds whose values can be compared, so MIN and MAX are computed
+ORDERED_KINDS = (NUMERIC, TEXT, DATE)
+
+
+def column_kind(column_type: Any) -> str:
+    """Classify a schema column type as numeric, text, date, boolean or other."""
+    if isinstance(column_type, int):
+        return _KINDS_BY_CODE.get(column_type, OTHER)
+    if isinstance(column_type, str):
+        lowered = column_type.lower()
+        for kind, keywords in _KIND_KEYWORDS:
+            if any(keyword in lowered for keyword in keywords):
+                return kind
+    return OTHER
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table or column name for Sisense SQL."""
+    return "[" + name.replace("]", "]]") + "]"
+
+
+def column_aggregates(column: ColumnInfo) -> list[tuple[str, str]]:
+    """(statistic, SQL expression) pairs computed for a column."""
+    quoted = quote_identifier(column.name)
+    aggregates = [("non_null", f"COUNT({quoted})"), ("distinct", f"COUNT(DISTINCT {quoted})")]
+    if column_kind(column.type) in ORDERED_KINDS:
+        aggregates += [("min", f"MIN({quoted})"), ("max", f"MAX({quoted})")]
+    return aggregates
+
+
+def aggregate_query(table: str, columns: list[ColumnInfo]) -> str:
+    """One query returning ``COUNT(*)`` and every column's aggregates in a single row."""
+    expressions = ["COUNT(*)"]
+    for column in columns:
+        expressions += [expression for _, expression in column_aggregates(column)]
+    return f"SELECT {', '.join(expressions)} FROM {quote_identifier(table)}"
+
+
+def parse_aggregates(
+    columns: list[ColumnInfo], result: dict[str, Any]
+) -> tuple[int | None, dict[str, dict[str, Any]]]:
+    """Split the single row of an ``aggregate_query`` result into per-column statistics.
+
+    Values are matched by position, as aggregate column headers differ between Sisense
+    versions.
+
+    Returns:
+        (row count, column name -> statistics)
+
+    Raises:
+        ValueError: If the result does not have one row with the expected values
+    """
+    rows = result.get("values") or result.get("rows")
+    if not isinstance(rows, list) or len(rows) != 1:
+        raise ValueError("Aggregate query did not return exactly one row")
+    row = rows[0]
+    if isinstance(row, dict):
+        row = list(row.values())
+    expected = 1 + sum(len(column_aggregates(column)) for column in columns)
+    if not isinstance(row, list) or len(row) != expected:
+        raise ValueError(f"Aggregate query did not return the {expected} expected values")
+
+    values = iter(row[1:])
+    profiles = {}
+    for column in columns:
+        profiles[column.name] = {
+            statistic: next(values) for statistic, _ in column_aggregates(column)
+        }
+    return row[0], profiles
+
+
+def top_values_query(table: str, column: str, limit: int | None = None) -> str:
+    """The most frequent values of a column, with a ``LIMIT`` if one is given (so the
+    query guard does not probe its size)."""
+    quoted = quote_identifier(column)
+    query = (
+        f"SELECT {quoted}, COUNT(*) FROM {quote_identifier(table)} "
+        f"GROUP BY {quoted} ORDER BY COUNT(*) DESC"
+    )
+    return query if limit is None else with_limit(query, limit)
+
+
+def parse_top_values(result: dict[str, Any]) -> list[dict[str, Any]]:
+    """Turn a ``top_values_query`` result into ``[{"value": ..., "count": ...}]``."""
+    top = []
+    for row in result.get("values") or result.get("rows") or []:
+        if isinstance(row, dict):
+            row = list(row.values())
+        if isinstance(row, list) and len(row) == 2:
+            top.append({"value": row[0], "count": row[1]})
+    return top
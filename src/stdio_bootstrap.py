@@ -0,0 +1,240 @@
+"""Stdio transport that answers the MCP handshake before the MCP SDK is loaded.
+
+Importing the MCP SDK pulls in httpx, starlette and pydantic, which takes most of a
+second. A client's first messages (``initialize``, ``notifications/initialized``,
+``tools/list``, ``ping``) have static answers, so this module answers them from the
+tool registry with the standard library only. The first message it cannot answer
+(usually ``tools/call``) loads ``app`` and hands the session over to the SDK's server:
+the client's ``initialize`` request and ``initialized`` notification are replayed to it
+(the replayed response is dropped), followed by every further message.
+
+Messages are newline-delimited JSON-RPC, as in ``mcp.server.stdio``.
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import threading
+from importlib import import_module
+from typing import Any, BinaryIO
+
+from . import __version__
+from .tools.registry import (
+    DASHBOARD_TOOLS,
+    ELASTICUBE_TOOLS,
+    INSTANCE_TOOLS,
+    LOCAL_TOOLS,
+    METRICS_TOOLS,
+)
+
+logger = logging.getLogger(__name__)
+
+SERVER_NAME = "sisense-mcp"
+# Must match mcp.shared.version.SUPPORTED_PROTOCOL_VERSIONS and the capabilities the SDK
+# derives from the handlers registered in ``app`` (both are checked by the tests; the
+# negotiated version is also checked against the installed SDK at the hand-over)
+SUPPORTED_PROTOCOL_VERSIONS = ("2024-11-05", "2025-03-26", "2025-06-18", "2025-11-25")
+CAPABILITIES = {
+    "experimental": {},
+    "resources": {"subscribe": False, "listChanged": False},
+    "tools": {"listChanged": False},
+}
+
+# Request id of the replayed initialize request; its response is not forwarded
+_REPLAY_ID = "sisense-mcp-bootstrap-initialize"
+
+
+def initialize_result(params: dict[str, Any] | None) -> dict[str, Any]:
+    """Build the ``initialize`` result, negotiating the protocol version like the SDK."""
+    requested = (params or {}).get("protocolVersion")
+    return {
+        "protocolVersion": (
+            requested
+            if requested in SUPPORTED_PROTOCOL_VERSIONS
+            else SUPPORTED_PROTOCOL_VERSIONS[-1]
+        ),
+        "capabilities": CAPABILITIES,
+        "serverInfo": {"name": SERVER_NAME, "version": __version__},
+    }
+
+
+def list_tools_result() -> dict[str, Any]:
+    """Build the ``tools/list`` result from the static registry."""
+    return {
+        "tools": [
+            *ELASTICUBE_TOOLS,
+            *DASHBOARD_TOOLS,
+            *METRICS_TOOLS,
+            *INSTANCE_TOOLS,
+            *LOCAL_TOOLS,
+        ]
+    }
+
+
+class StdioBootstrap:
+    """Serve one MCP session over a pair of binary streams.
+
+    Args:
+        stdin: Stream of newline-delimited JSON-RPC messages from the client
+        stdout: Stream the responses are written to
+        warm_up: Import ``app`` in a background thread once ``tools/list`` has been
+            answered, so the first tool call does not wait for the import
+    """
+
+    def __init__(
+        self,
+        stdin: BinaryIO | None = None,
+        stdout: BinaryIO | None = None,
+        warm_up: bool = True,
+    ):
+        self.stdin = stdin if stdin is not None else sys.stdin.buffer
+        self.stdout = stdout if stdout is not None else sys.stdout.buffer
+        self.warm_up = warm_up
+        self.handed_over = False
+        self._lines: asyncio.Queue[bytes | None] = asyncio.Queue()
+        self._initialize: dict[str, Any] | None = None
+        self._initialized = False
+        self._warming: threading.Thread | None = None
+
+    async def run(self) -> None:
+        """Serve until the client closes stdin."""
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=self._read_lines, args=(loop,), daemon=True).start()
+        while True:
+            line = await self._lines.get()
+            if line is None:
+                return
+            if not line.strip():
+                continue
+            if await self._answer(line):
+                continue
+            await self._hand_over(line)
+            return
+
+    def _read_lines(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Blocking reads stay off the event loop (and keep working after the hand-over)
+        for line in iter(self.stdin.readline, b""):
+            loop.call_soon_threadsafe(self._lines.put_nowait, line)
+        loop.call_soon_threadsafe(self._lines.put_nowait, None)
+
+    async def _answer(self, line: bytes) -> bool:
+        """Answer a message from static data. Returns False if the SDK must handle it."""
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return False
+        if not isinstance(message, dict):
+            return False
+        method = message.get("method")
+        request_id = message.get("id")
+
+        if method == "initialize" and request_id is not None and self._initialize is None:
+            self._initialize = message
+            await self._respond(request_id, initialize_result(message.get("params")))
+        elif method == "notifications/initialized" and request_id is None:
+            self._initialized = True
+        elif method == "tools/list" and request_id is not None and self._initialize is not None:
+            await self._respond(request_id, list_tools_result())
+            self._start_warm_up()
+        elif method == "ping" and request_id is not None:
+            await self._respond(request_id, {})
+        else:
+            return False
+        return True
+
+    def _start_warm_up(self) -> None:
+        if self.warm_up and self._warming is None:
+            self._warming = threading.Thread(
+                target=import_module, args=(f"{__package__}.app",), daemon=True
+            )
+            self._warming.start()
+
+    async def _respond(self, request_id: Any, result: dict[str, Any]) -> None:
+        message = {"jsonrpc": "2.0", "id": request_id, "result": result}
+        await self._write(json.dumps(message, separators=(",", ":")))
+
+    async def _respond_error(self, line: bytes, error: str) -> None:
+        """Answer the request in ``line`` (if it is one) with an internal error."""
+        try:
+            request_id = json.loads(line).get("id")
+        except (ValueError, AttributeError):
+            return
+        if request_id is not None:
+            message = {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": -32603, "message": error},
+            }
+            await self._write(json.dumps(message, separators=(",", ":")))
+
+    async def _write(self, text: str) -> None:
+        data = text.encode("utf-8") + b"\n"
+        await asyncio.to_thread(self._write_blocking, data)
+
+    def _write_blocking(self, data: bytes) -> None:
+        self.stdout.write(data)
+        self.stdout.flush()
+
+    async def _hand_over(self, first_line: bytes) -> None:
+        """Run the SDK server for the rest of the session, starting with ``first_line``."""
+        logger.debug("Handing the session over to the MCP server")
+        self.handed_over = True
+        import anyio
+        import mcp.types as types
+        from mcp.shared.message import SessionMessage
+        from mcp.shared.version import SUPPORTED_PROTOCOL_VERSIONS as SDK_VERSIONS
+
+        from .app import app
+
+        if self._initialize is not None:
+            negotiated = initialize_result(self._initialize.get("params"))["protocolVersion"]
+            if negotiated not in SDK_VERSIONS:
+                # The SDK would answer the replayed initialize with another version, and
+                # that response is dropped: fail instead of serving a mismatched session
+                error = (
+                    f"Protocol version {negotiated} was agreed with the client, but the "
+                    f"installed MCP SDK only supports {', '.join(SDK_VERSIONS)}. "
+                    "Upgrade the mcp package."
+                )
+                logger.error(error)
+                await self._respond_error(first_line, error)
+                raise RuntimeError(error)
+
+        read_writer, read_stream = anyio.create_memory_object_stream(0)
+        write_stream, write_reader = anyio.create_memory_object_stream(0)
+
+        async def send(raw: bytes | str) -> None:
+            try:
+                message = types.JSONRPCMessage.model_validate_json(raw)
+            except Exception as exc:
+                await read_writer.send(exc)
+                return
+            await read_writer.send(SessionMessage(message))
+
+        async def pump_in() -> None:
+            async with read_writer:
+                if self._initialize is not None:
+                    await send(json.dumps({**self._initialize, "id": _REPLAY_ID}))
+                    if self._initialized:
+                        await send('{"jsonrpc":"2.0","method":"notifications/initialized"}')
+                await send(first_line)
+                while (line := await self._lines.get()) is not None:
+                    if line.strip():
+                        await send(line)
+
+        async def pump_out() -> None:
+            async with write_reader:
+                async for session_message in write_reader:
+                    message = session_message.message.root
+                    if getattr(message, "id", None) == _REPLAY_ID:
+                        continue
+                    await self._write(
+                        session_message.message.model_dump_json(by_alias=True, exclude_none=True)
+                    )
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(pump_in)
+            tg.start_soon(pump_out)
+            async with write_stream:
+                await app.run(read_stream, write_stream, app.create_initialization_options())
@@ -1,11 +1,28 @@
-"""MCP tool definitions and handlers."""
+"""MCP tool definitions and handlers.
 
-from .dashboard_tools import get_dashboard_tools, handle_dashboard_tool
-from .elasticube_tools import get_elasticube_tools, handle_elasticube_tool
+The handlers pull in httpx and the MCP SDK, so they are imported on first access; the
+static ``registry`` module can be imported on its own.
+"""
 
-__all__ = [
-    "get_elasticube_tools",
-    "handle_elasticube_tool",
-    "get_dashboard_tools",
-    "handle_dashboard_tool",
-]
+from importlib import import_module
+
+_EXPORTS = {
+    "get_elasticube_tools": ".elasticube_tools",
+    "handle_elasticube_tool": ".elasticube_tools",
+    "get_dashboard_tools": ".dashboard_tools",
+    "handle_dashboard_tool": ".dashboard_tools",
+    "get_metrics_tools": ".metrics_tools",
+    "handle_metrics_tool": ".metrics_tools",
+    "get_instance_tools": ".instance_tools",
+    "handle_instance_tool": ".instance_tools",
+    "get_local_tools": ".local_tools",
+    "handle_local_tool": ".local_tools",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,6 +7,8 @@ import httpx
 from mcp.types import TextContent, Tool
 
 from ..services import DashboardService
+from ..tracing import span, traced
+from .registry import DASHBOARD_TOOLS
 
 
 def get_dashboard_tools() -> list[Tool]:
@@ -15,42 +17,10 @@ def get_dashboard_tools() -> list[Tool]:
     Returns:
         List of Tool definitions for Dashboard operations
     """
-    return [
-        Tool(
-            name="list_dashboards",
-            description=(
-                "List all available dashboards from Sisense. "
-                "Use this to discover which dashboards exist, then pick one to inspect further with get_dashboard_info. "
-                "Returns a filtered list per dashboard with: _id, title, desc, source, type, created, lastUpdated, owner, isPublic, lastOpened, parentFolder."
-            ),
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        Tool(
-            name="get_dashboard_info",
-            description=(
-                "Get information about a specific Sisense dashboard by ID or name. "
-                "Use this when you want to inspect how a dashboard is built (widgets, filters, datasources, and configuration) "
-                "or to discover which cubes and fields a dashboard uses. "
-                "Returns the full dashboard object with all fields from the Sisense API."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dashboard_id": {
-                        "type": "string",
-                        "description": "ID of the dashboard (e.g., '68c20e36b10aaf740421cf12')",
-                    },
-                    "dashboard_name": {
-                        "type": "string",
-                        "description": "Name/title of the dashboard (e.g., 'Revenue over time')",
-                    },
-                },
-                "required": [],
-            },
-        ),
-    ]
+    return [Tool(**spec) for spec in DASHBOARD_TOOLS]
 
 
+@traced("handle_dashboard_tool")
 async def handle_dashboard_tool(
     name: str, arguments: dict[str, Any], service: DashboardService
 ) -> list[TextContent]:
@@ -71,7 +41,7 @@ async def handle_dashboard_tool(
     """
     try:
         if name == "list_dashboards":
-            result = await service.list_dashboards()
+            result = await service.list_dashboards(refresh=arguments.get("refresh", False))
 
         elif name == "get_dashboard_info":
             dashboard_id = arguments.get("dashboard_id")
@@ -80,13 +50,32 @@ async def handle_dashboard_tool(
             if not dashboard_id and not dashboard_name:
                 raise ValueError("Either dashboard_id or dashboard_name must be provided")
 
-            result = await service.get_dashboard(
-                dashboard_id=dashboard_id, dashboard_name=dashboard_name
-            )
+            mode = arguments.get("mode", "full")
+            if mode == "summary":
+                result = await service.get_dashboard_summary(
+                    dashboard_id=dashboard_id, dashboard_name=dashboard_name
+                )
+            elif mode == "full":
+                fields = arguments.get("fields")
+                if fields is not None and (
+                    not isinstance(fields, list)
+                    or not all(isinstance(field, str) for field in fields)
+                ):
+                    raise ValueError("fields must be a list of paths, e.g. ['title']")
+                result = await service.get_dashboard(
+                    dashboard_id=dashboard_id,
+                    dashboard_name=dashboard_name,
+                    fields=fields,
+                )
+            else:
+                raise ValueError(f"Unknown mode '{mode}'. Use 'full' or 'summary'")
         else:
             raise ValueError(f"Unknown Dashboard tool: {name}")
 
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        with span("serialize", {"output_format": "json"}) as serialize_span:
+            text = json.dumps(result, indent=2)
+            serialize_span.set("response.size", len(text))
+        return [TextContent(type="text", text=text)]
 
     except httpx.HTTPStatusError as e:
         # Handle HTTP errors
@@ -7,6 +7,15 @@ import httpx
 from mcp.types import TextContent, Tool
 
 from ..services import ElastiCubeService
+from ..tracing import span, traced
+from .formatters import format_result, format_result_stream
+from .registry import (
+    BATCH_MAX_QUERIES,
+    BATCH_OUTPUT_FORMATS,
+    ELASTICUBE_TOOLS,
+    OUTPUT_FORMATS,
+    SCHEMA_MODES,
+)
 
 
 def get_elasticube_tools() -> list[Tool]:
@@ -15,70 +24,10 @@ def get_elasticube_tools() -> list[Tool]:
     Returns:
         List of Tool definitions for ElastiCube operations
     """
-    return [
-        Tool(
-            name="list_elasticubes",
-            description=(
-                "List all available ElastiCubes/datamodels from Sisense. "
-                "Use this first when you are not sure which cube name to work with, or you want to explore what data models exist. "
-                "Returns a lightweight list per cube with: _id, title, type, server, lastUpdated (sufficient to pick a cube for further calls)."
-            ),
-            inputSchema={"type": "object", "properties": {}},
-        ),
-        Tool(
-            name="get_elasticube_schema",
-            description=(
-                "Get the schema (tables and columns) for a Sisense ElastiCube/Live Connection. "
-                "Use this when you need to understand the data model (tables, columns, data types, and table-to-table relationships) "
-                "for a specific cube before writing queries or debugging joins. "
-                "Returns the full schema JSON including datasets, tables, columns, relations, and relationTables."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "elasticube_name": {
-                        "type": "string",
-                        "description": "Name of the ElastiCube (e.g., 'Sales Data Model')",
-                    }
-                },
-                "required": ["elasticube_name"],
-            },
-        ),
-        Tool(
-            name="query_elasticube",
-            description=(
-                "Execute a SQL query to extract data from an ElastiCube. "
-                "Use this when you already know which cube and tables/fields you want and need actual rows for analysis, debugging, or sampling. "
-                "Returns the query result rows and basic metadata; use count/offset for pagination."
-            ),
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "datasource": {
-                        "type": "string",
-                        "description": "Name of the ElastiCube datasource (e.g., 'Sales Data Model')",
-                    },
-                    "sql_query": {
-                        "type": "string",
-                        "description": "SQL query string (must start with SELECT). Examples: 'SELECT * FROM TableName LIMIT 100', 'SELECT COUNT(*) FROM TableName', 'SELECT column1, column2 FROM TableName WHERE condition'",
-                    },
-                    "count": {
-                        "type": "integer",
-                        "description": "Maximum number of rows to return (default: 5000, max recommended: 10000 per request). Actual limit is 5000 rows per request for Live Connection and ~2M for Elastic Cubes.",
-                        "default": 5000,
-                    },
-                    "offset": {
-                        "type": "integer",
-                        "description": "Offset for pagination (default: 0). Use with count for large result sets.",
-                        "default": 0,
-                    },
-                },
-                "required": ["datasource", "sql_query"],
-            },
-        ),
-    ]
+    return [Tool(**spec) for spec in ELASTICUBE_TOOLS]
 
 
+@traced("handle_elasticube_tool")
 async def handle_elasticube_tool(
     name: str, arguments: dict[str, Any], service: ElastiCubeService
 ) -> list[TextContent]:
@@ -97,55 +46,240 @@ async def handle_elasticube_tool(
         httpx.HTTPStatusError: If API request fails
         httpx.TimeoutException: If request times out
     """
+    output_format = "json"
+    dictionary_encode = False
     try:
         if name == "list_elasticubes":
-            result = await service.list_elasticubes()
+            result = await service.list_elasticubes(refresh=arguments.get("refresh", False))
 
         elif name == "get_elasticube_schema":
             if "elasticube_name" not in arguments:
                 raise ValueError("Missing required argument: elasticube_name")
-            result = await service.get_schema(arguments["elasticube_name"])
+            cube = arguments["elasticube_name"]
+            refresh = arguments.get("refresh", False)
+            mode = arguments.get("mode") or ("table" if arguments.get("table") else "full")
+            if mode not in SCHEMA_MODES:
+                raise ValueError(f"Unknown mode '{mode}'. Use one of: {', '.join(SCHEMA_MODES)}")
+            if mode == "table":
+                if not arguments.get("table"):
+                    raise ValueError("Missing required argument for mode 'table': table")
+                result = await service.get_table_schema(cube, arguments["table"], refresh=refresh)
+            elif mode == "columns":
+                result = await service.get_columns_summary(cube, refresh=refresh)
+            else:
+                result = await service.get_schema(cube, refresh=refresh)
 
         elif name == "query_elasticube":
             if "datasource" not in arguments or "sql_query" not in arguments:
                 raise ValueError("Missing required arguments: datasource and sql_query")
-            result = await service.query_sql(
-                datasource=arguments["datasource"],
-                sql_query=arguments["sql_query"],
-                count=arguments.get("count", 5000),
-                offset=arguments.get("offset", 0),
+            count = arguments.get("count", 5000)
+            output_format = arguments.get("output_format", "json")
+            dictionary_encode = arguments.get("dictionary_encode", False)
+            if output_format not in OUTPUT_FORMATS:
+                raise ValueError(
+                    f"Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+                )
+            if arguments.get("sample") and arguments.get("materialize"):
+                raise ValueError("sample and materialize cannot be combined")
+            if arguments.get("sample"):
+                result = await service.sample_sql(
+                    datasource=arguments["datasource"],
+                    sql_query=arguments["sql_query"],
+                    k=count,
+                    method=arguments.get("sample_method", "auto"),
+                    page_size=arguments.get("page_size"),
+                    max_concurrency=arguments.get("max_concurrency"),
+                    refresh=arguments.get("refresh", False),
+                )
+            elif arguments.get("materialize"):
+                result = await service.materialize_sql(
+                    datasource=arguments["datasource"],
+                    sql_query=arguments["sql_query"],
+                    count=count,
+                    offset=arguments.get("offset", 0),
+                    auto_paginate=arguments.get("auto_paginate", False),
+                    page_size=arguments.get("page_size"),
+                    max_concurrency=arguments.get("max_concurrency"),
+                    refresh=arguments.get("refresh", False),
+                )
+            elif arguments.get("auto_paginate"):
+                result = await service.query_sql(
+                    datasource=arguments["datasource"],
+                    sql_query=arguments["sql_query"],
+                    count=count,
+                    offset=arguments.get("offset", 0),
+                    auto_paginate=True,
+                    page_size=arguments.get("page_size"),
+                    max_concurrency=arguments.get("max_concurrency"),
+                    refresh=arguments.get("refresh", False),
+                )
+            elif count >= service.stream_threshold_rows:
+                # Large results: parse and serialize row by row instead of in one piece
+                sql_query, guard = await service.guarded_sql(
+                    arguments["datasource"],
+                    arguments["sql_query"],
+                    count,
+                    arguments.get("offset", 0),
+                    paginate=False,
+                    refresh=arguments.get("refresh", False),
+                )
+                stream = service.stream_sql(
+                    datasource=arguments["datasource"],
+                    sql_query=sql_query,
+                    count=count,
+                    offset=arguments.get("offset", 0),
+                )
+                if guard is not None and guard["unbounded"]:
+                    # Written ahead of the rows
+                    stream.fields["guard"] = guard
+                # Download, parsing and serialization overlap here, so they share a span
+                with span(
+                    "serialize", {"output_format": output_format, "streamed": True}
+                ) as serialize_span:
+                    text = await format_result_stream(stream, output_format, dictionary_encode)
+                    serialize_span.set("response.size", len(text))
+                return [TextContent(type="text", text=text)]
+            else:
+                result = await service.query_sql(
+                    datasource=arguments["datasource"],
+                    sql_query=arguments["sql_query"],
+                    count=count,
+                    offset=arguments.get("offset", 0),
+                    refresh=arguments.get("refresh", False),
+                )
+        elif name == "query_elasticube_batch":
+            queries, invalid = _batch_queries(
+                arguments.get("queries"), service.stream_threshold_rows
             )
+            output_format = arguments.get("output_format", "json")
+            if output_format not in BATCH_OUTPUT_FORMATS:
+                raise ValueError(
+                    f"Unknown output_format '{output_format}'. Use one of: {', '.join(BATCH_OUTPUT_FORMATS)}"
+                )
+            runnable = [query for i, query in enumerate(queries) if i not in invalid]
+            outcomes = iter(
+                await service.query_sql_batch(
+                    runnable,
+                    max_concurrency=arguments.get("max_concurrency"),
+                    refresh=arguments.get("refresh", False),
+                )
+                if runnable
+                else []
+            )
+            results = []
+            for i, (datasource, sql_query, _) in enumerate(queries):
+                outcome = invalid[i] if i in invalid else next(outcomes)
+                entry = {"datasource": datasource, "sql_query": sql_query}
+                if isinstance(outcome, Exception):
+                    entry["error"] = _error_message(outcome)
+                else:
+                    entry["result"] = outcome
+                results.append(entry)
+            failed = sum(1 for entry in results if "error" in entry)
+            result = {"succeeded": len(results) - failed, "failed": failed, "results": results}
+
+        elif name == "profile_table":
+            if not arguments.get("elasticube_name") or not arguments.get("table"):
+                raise ValueError("Missing required arguments: elasticube_name and table")
+            columns = arguments.get("columns")
+            if columns is not None and not isinstance(columns, list):
+                raise ValueError("columns must be a list of column names")
+            result = await service.profile_table(
+                arguments["elasticube_name"],
+                arguments["table"],
+                columns=columns,
+                top_k=arguments.get("top_k", 5),
+                batch_size=arguments.get("batch_size", 10),
+                max_concurrency=arguments.get("max_concurrency"),
+                refresh=arguments.get("refresh", False),
+            )
+
+        elif name == "search_fields":
+            if not arguments.get("query"):
+                raise ValueError("Missing required argument: query")
+            result = await service.search_fields(
+                arguments["query"],
+                limit=arguments.get("limit", 20),
+                cube=arguments.get("cube"),
+                refresh=arguments.get("refresh", False),
+            )
+
         else:
             raise ValueError(f"Unknown ElastiCube tool: {name}")
 
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        with span("serialize", {"output_format": output_format}) as serialize_span:
+            text = format_result(result, output_format, dictionary_encode)
+            serialize_span.set("response.size", len(text))
+        return [TextContent(type="text", text=text)]
 
     except httpx.HTTPStatusError as e:
-        # Handle HTTP errors - include helpful context for common cases
-        if e.response.status_code == 404:
-            # For 404, provide more context about what endpoint was tried
-            if "elasticubes" in str(e.request.url) if e.request else False:
-                error_msg = (
-                    "API endpoint not found (404). "
-                    "The /api/v1/elasticubes/getElasticubes endpoint is not available in this Sisense instance. "
-                    "Cube names must be known in advance. "
-                    "Use get_elasticube_schema or query_elasticube with a specific cube name."
-                )
-            else:
-                error_msg = f"API endpoint not found (404): {str(e.request.url) if e.request else 'unknown'}"
-        else:
-            error_details = {
-                "error": f"API Error {e.response.status_code}",
-                "message": e.response.text[:1000] if e.response.text else str(e),
-                "url": str(e.request.url) if e.request else None,
-            }
-            error_msg = f"API request failed: {json.dumps(error_details, indent=2)}"
-
-        raise Exception(error_msg) from e
+        raise Exception(_http_error_message(e)) from e
 
     except httpx.TimeoutException as e:
         # Re-raise timeout errors with helpful message
-        raise Exception(
-            "Request timeout. The request took too long. "
-            "Potential causes: The ElastiCube/Live Connection is misconfigured or the query is too complex (then set count to limit the number of rows returned)."
-        ) from e
+        raise Exception(TIMEOUT_MESSAGE) from e
+
+
+TIMEOUT_MESSAGE = (
+    "Request timeout. The request took too long. "
+    "Potential causes: The ElastiCube/Live Connection is misconfigured or the query is too complex (then set count to limit the number of rows returned)."
+)
+
+
+def _http_error_message(e: httpx.HTTPStatusError) -> str:
+    """Describe a failed Sisense request, with helpful context for common cases."""
+    if e.response.status_code == 404:
+        # For 404, provide more context about what endpoint was tried
+        if "elasticubes" in str(e.request.url) if e.request else False:
+            return (
+                "API endpoint not found (404). "
+                "The /api/v1/elasticubes/getElasticubes endpoint is not available in this Sisense instance. "
+                "Cube names must be known in advance. "
+                "Use get_elasticube_schema or query_elasticube with a specific cube name."
+            )
+        return f"API endpoint not found (404): {str(e.request.url) if e.request else 'unknown'}"
+    error_details = {
+        "error": f"API Error {e.response.status_code}",
+        "message": e.response.text[:1000] if e.response.text else str(e),
+        "url": str(e.request.url) if e.request else None,
+    }
+    return f"API request failed: {json.dumps(error_details, indent=2)}"
+
+
+def _error_message(e: Exception) -> str:
+    """Describe the failure of one query of a batch."""
+    if isinstance(e, httpx.HTTPStatusError):
+        return _http_error_message(e)
+    if isinstance(e, httpx.TimeoutException):
+        return TIMEOUT_MESSAGE
+    return str(e) or type(e).__name__
+
+
+def _batch_queries(
+    queries: Any, max_count: int
+) -> tuple[list[tuple[str, str, int]], dict[int, ValueError]]:
+    """Validate the ``queries`` argument of query_elasticube_batch.
+
+    Returns:
+        (datasource, sql_query, count) per query, and the errors of queries whose
+        ``count`` is not a positive integer by index (reported in their place, unrun)
+    """
+    if not isinstance(queries, list) or not queries:
+        raise ValueError("Missing required argument: queries (a non-empty list)")
+    if len(queries) > BATCH_MAX_QUERIES:
+        raise ValueError(f"Too many queries: {len(queries)} (at most {BATCH_MAX_QUERIES})")
+    validated = []
+    invalid = {}
+    for i, query in enumerate(queries):
+        if not isinstance(query, dict) or not query.get("datasource") or not query.get("sql_query"):
+            raise ValueError(f"Query {i} needs datasource and sql_query")
+        count = query.get("count", 1000)
+        if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+            invalid[i] = ValueError(f"count must be a positive integer, got {count!r}")
+        elif count >= max_count:
+            raise ValueError(
+                f"Query {i} asks for {count} rows; batches are for small results, "
+                f"use query_elasticube for {max_count} rows or more"
+            )
+        validated.append((query["datasource"], query["sql_query"], count))
+    return validated, invalid
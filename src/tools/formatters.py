@@ -0,0 +1,261 @@
+"""Output encodings for tabular tool results (SQL query rows)."""
+
+import csv
+import io
+import json
+from typing import Any
+
+from ..services.elasticube_service import SQL_ROW_KEYS, SQL_SUMMARY_KEYS, SqlResultStream
+from .registry import OUTPUT_FORMATS
+
+# Dictionary-encode a string column only if it has at most this share of distinct values
+_DICTIONARY_MAX_DISTINCT_RATIO = 0.5
+_DICTIONARY_MIN_ROWS = 8
+
+
+def _column_name(header: Any, index: int) -> str:
+    if isinstance(header, str):
+        return header
+    if isinstance(header, dict):
+        for key in ("name", "title", "id"):
+            if isinstance(header.get(key), str):
+                return header[key]
+    return f"column_{index}"
+
+
+def _columns_from_members(members: dict[str, Any], width: int) -> list[str]:
+    """Column names from a result's ``headers`` member, falling back to positional names."""
+    headers = members.get("headers")
+    if isinstance(headers, list) and len(headers) == width:
+        return [_column_name(header, i) for i, header in enumerate(headers)]
+    return [f"column_{i}" for i in range(width)]
+
+
+def _extract_table(result: Any) -> tuple[list[str], list[list[Any]], str] | None:
+    """Normalize a SQL result to ``(columns, rows as lists, rows key)``.
+
+    Rows may be lists (with column names in ``headers``) or dicts keyed by column name.
+    Returns None for results that are not tabular.
+    """
+    if not isinstance(result, dict):
+        return None
+    rows_key = next((k for k in SQL_ROW_KEYS if isinstance(result.get(k), list)), None)
+    if rows_key is None:
+        return None
+    rows = result[rows_key]
+    if rows and all(isinstance(row, dict) for row in rows):
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        return columns, [[row.get(c) for c in columns] for row in rows], rows_key
+    width = max((len(row) for row in rows if isinstance(row, list)), default=0)
+    rows = [row if isinstance(row, list) else [row] for row in rows]
+    return _columns_from_members(result, width), rows, rows_key
+
+
+def _cell_text(value: Any) -> Any:
+    # csv already writes None as an empty cell; nested values are embedded as JSON
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+def _encode_column(values: list[Any], dictionary_encode: bool) -> Any:
+    """Return a column as a plain list, or dictionary-encoded when that is smaller."""
+    if not dictionary_encode or len(values) < _DICTIONARY_MIN_ROWS:
+        return values
+    codes: dict[str, int] = {}
+    max_distinct = len(values) * _DICTIONARY_MAX_DISTINCT_RATIO
+    for value in values:
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            return values
+        if value not in codes:
+            codes[value] = len(codes)
+            if len(codes) > max_distinct:
+                return values
+    return {
+        "dictionary": list(codes),
+        "codes": [None if value is None else codes[value] for value in values],
+    }
+
+
+class _TableWriter:
+    """Accumulates rows for one output format and renders the final text.
+
+    CSV/TSV rows are written straight into the output buffer and columnar rows are
+    appended to per-column lists, so neither keeps a second row-oriented copy.
+    """
+
+    def __init__(self, output_format: str, dictionary_encode: bool):
+        if output_format not in ("columnar", "csv", "tsv"):
+            raise ValueError(f"Unsupported table format: {output_format}")
+        self.output_format = output_format
+        self.dictionary_encode = dictionary_encode
+        self.columns: list[str] | None = None
+        self.row_count = 0
+        self._data: list[list[Any]] = []
+        self._out = io.StringIO()
+        delimiter = "\t" if output_format == "tsv" else ","
+        self._csv = csv.writer(self._out, delimiter=delimiter, lineterminator="\n")
+
+    def start(self, columns: list[str]) -> None:
+        self.columns = columns
+        if self.output_format == "columnar":
+            self._data = [[] for _ in columns]
+        else:
+            self._csv.writerow(columns)
+
+    def add(self, row: list[Any]) -> None:
+        self.row_count += 1
+        if self.output_format == "columnar":
+            for index, column in enumerate(self._data):
+                column.append(row[index] if index < len(row) else None)
+        else:
+            if any(isinstance(value, (dict, list)) for value in row):
+                row = [_cell_text(value) for value in row]
+            self._csv.writerow(row)
+
+    def render(self, members: dict[str, Any]) -> str:
+        """Render the table; ``members`` are the result's other top-level members."""
+        if self.columns is None:
+            self.start([])
+        if self.output_format != "columnar":
+            # The guard decision, pagination and sampling lead as "# key: json" lines
+            summary = "".join(
+                f"# {key}: {json.dumps(members[key], separators=(',', ':'))}\n"
+                for key in SQL_SUMMARY_KEYS
+                if key in members
+            )
+            return summary + self._out.getvalue()
+        encoded = {
+            "columns": self.columns,
+            "row_count": self.row_count,
+            "data": [_encode_column(values, self.dictionary_encode) for values in self._data],
+        }
+        for key, value in members.items():
+            if key not in encoded and key != "headers" and key not in SQL_ROW_KEYS:
+                encoded[key] = value
+        return json.dumps(encoded, separators=(",", ":"))
+
+
+def format_result(result: Any, output_format: str = "json", dictionary_encode: bool = False) -> str:
+    """Encode a tool result as text.
+
+    Formats:
+        - ``json``: indented JSON (the historical default)
+        - ``compact``: minified JSON
+        - ``columnar``: ``{"columns": [...], "data": [[column values], ...], ...}``
+        - ``csv`` / ``tsv``: header line plus one line per row, preceded by a
+          ``# key: <compact JSON>`` line for each of ``guard``, ``pagination`` and
+          ``sampling`` present (other members are dropped)
+
+    ``columnar``, ``csv`` and ``tsv`` apply to SQL results; anything else falls back to
+    compact JSON.
+
+    Args:
+        result: Tool result
+        output_format: One of OUTPUT_FORMATS
+        dictionary_encode: In columnar output, replace low-cardinality string columns with
+            ``{"dictionary": [...], "codes": [...]}``
+
+    Returns:
+        Encoded text
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format '{output_format}'. Use one of: {OUTPUT_FORMATS}")
+    if output_format == "json":
+        return json.dumps(result, indent=2)
+    table = _extract_table(result) if output_format != "compact" else None
+    if table is None:
+        return json.dumps(result, separators=(",", ":"))
+
+    columns, rows, rows_key = table
+    writer = _TableWriter(output_format, dictionary_encode)
+    writer.start(columns)
+    for row in rows:
+        writer.add(row)
+    return writer.render({k: v for k, v in result.items() if k != rows_key})
+
+
+async def format_result_stream(
+    stream: SqlResultStream, output_format: str = "json", dictionary_encode: bool = False
+) -> str:
+    """Encode a streamed SQL result without materializing the row list.
+
+    See ``format_result`` for the formats; the text is the same as ``format_result``
+    gives for the materialized result. For ``json``/``compact``, members preceding the
+    row array are written as soon as the array opens, rows are written as they are
+    parsed, and trailing members are written at the end.
+
+    Args:
+        stream: Streamed SQL result
+        output_format: One of OUTPUT_FORMATS
+        dictionary_encode: Dictionary-encode low-cardinality string columns (columnar)
+
+    Returns:
+        Encoded text
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output_format '{output_format}'. Use one of: {OUTPUT_FORMATS}")
+    if output_format in ("json", "compact"):
+        return await _write_json_stream(stream, 2 if output_format == "json" else None)
+
+    writer = _TableWriter(output_format, dictionary_encode)
+    dict_rows = False
+    async for row in stream:
+        if writer.columns is None:
+            dict_rows = isinstance(row, dict)
+            width = len(row) if isinstance(row, (list, dict)) else 1
+            writer.start(list(row) if dict_rows else _columns_from_members(stream.fields, width))
+        if dict_rows:
+            writer.add([row.get(column) for column in writer.columns])
+        else:
+            writer.add(row if isinstance(row, list) else [row])
+    return writer.render(stream.fields)
+
+
+async def _write_json_stream(stream: SqlResultStream, indent: int | None) -> str:
+    """Write the text ``json.dumps(result, indent=indent)`` (compact separators without
+    ``indent``) would produce, one row at a time."""
+    out = io.StringIO()
+    written: set[str] = set()
+    if indent is None:
+        open_object, member_separator, key_separator = "{", ",", ":"
+        margin = row_margin = close_rows = close_object = ""
+    else:
+        margin, row_margin = " " * indent, " " * 2 * indent
+        open_object, member_separator, key_separator = "{\n", ",\n", ": "
+        close_rows, close_object = f"\n{margin}", "\n"
+
+    def dumps(value: Any, nesting: str) -> str:
+        if indent is None:
+            return json.dumps(value, separators=(",", ":"))
+        # Continuation lines are indented to the value's depth
+        return json.dumps(value, indent=indent).replace("\n", "\n" + nesting)
+
+    def write_member(key: str, text: str) -> None:
+        out.write(member_separator if written else open_object)
+        written.add(key)
+        out.write(f"{margin}{json.dumps(key)}{key_separator}{text}")
+
+    async for row in stream:
+        if stream.row_count == 1:
+            for key, value in stream.fields.items():
+                if key == stream.rows_key:
+                    break
+                write_member(key, dumps(value, margin))
+            write_member(stream.rows_key, "[" + ("\n" if indent is not None else ""))
+        else:
+            out.write(member_separator)
+        out.write(row_margin + dumps(row, row_margin))
+    if stream.row_count:
+        out.write(close_rows + "]")
+
+    for key, value in stream.fields.items():
+        if key not in written:
+            write_member(key, "[]" if key == stream.rows_key else dumps(value, margin))
+    out.write(close_object + "}" if written else "{}")
+    return out.getvalue()
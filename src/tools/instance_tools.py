@@ -0,0 +1,45 @@
+"""MCP tool listing the configured Sisense instances."""
+
+import json
+from typing import Any
+
+from mcp.types import TextContent, Tool
+
+from .registry import INSTANCE_TOOLS
+
+
+def get_instance_tools() -> list[Tool]:
+    """Get the instance MCP tools.
+
+    Returns:
+        List of Tool definitions for the configured Sisense instances
+    """
+    return [Tool(**spec) for spec in INSTANCE_TOOLS]
+
+
+async def handle_instance_tool(name: str, arguments: dict[str, Any], runtime) -> list[TextContent]:
+    """Handle instance tool execution.
+
+    Args:
+        name: Tool name
+        arguments: Tool arguments
+        runtime: The shared runtime holding the instances
+
+    Returns:
+        List of TextContent with tool results
+
+    Raises:
+        ValueError: If tool name is unknown
+    """
+    if name != "list_instances":
+        raise ValueError(f"Unknown instance tool: {name}")
+
+    instances = [
+        {
+            "name": instance.name,
+            "base_url": instance.client.base_url,
+            "default": instance.name == runtime.default_instance,
+        }
+        for instance in runtime.instances.values()
+    ]
+    return [TextContent(type="text", text=json.dumps(instances, indent=2))]
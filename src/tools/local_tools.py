@@ -0,0 +1,58 @@
+"""MCP tool re-querying materialized results locally."""
+
+from typing import Any
+
+from mcp.types import TextContent, Tool
+
+from ..services import LocalStore
+from ..tracing import span
+from .formatters import format_result
+from .registry import LOCAL_TOOLS, OUTPUT_FORMATS
+
+
+def get_local_tools() -> list[Tool]:
+    """Get the local query MCP tools.
+
+    Returns:
+        List of Tool definitions for materialized results
+    """
+    return [Tool(**spec) for spec in LOCAL_TOOLS]
+
+
+async def handle_local_tool(
+    name: str, arguments: dict[str, Any], store: LocalStore | None
+) -> list[TextContent]:
+    """Handle local query tool execution.
+
+    Args:
+        name: Tool name
+        arguments: Tool arguments
+        store: Store of materialized results (None if it is disabled)
+
+    Returns:
+        List of TextContent with tool results
+
+    Raises:
+        ValueError: If tool name, handle or format is unknown, count is not positive, the
+            query fails or the store is disabled
+    """
+    if name != "query_local":
+        raise ValueError(f"Unknown local tool: {name}")
+    if store is None:
+        raise ValueError("Materializing results is disabled (LOCAL_STORE_ENABLED=false)")
+    if not arguments.get("handle") or not arguments.get("sql_query"):
+        raise ValueError("Missing required arguments: handle and sql_query")
+    count = arguments.get("count", 1000)
+    if isinstance(count, bool) or not isinstance(count, int) or count < 1:
+        raise ValueError(f"count must be a positive integer, got {count!r}")
+    output_format = arguments.get("output_format", "json")
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unknown output_format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}"
+        )
+
+    result = await store.query(arguments["handle"], arguments["sql_query"], max_rows=count)
+    with span("serialize", {"output_format": output_format}) as serialize_span:
+        text = format_result(result, output_format)
+        serialize_span.set("response.size", len(text))
+    return [TextContent(type="text", text=text)]
@@ -0,0 +1,49 @@
+"""MCP tool exposing the server's own metrics."""
+
+import json
+from typing import Any
+
+from mcp.types import TextContent, Tool
+
+from ..metrics import MetricsRegistry
+from .registry import METRICS_FORMATS, METRICS_TOOLS
+
+
+def get_metrics_tools() -> list[Tool]:
+    """Get the metrics MCP tools.
+
+    Returns:
+        List of Tool definitions for server metrics
+    """
+    return [Tool(**spec) for spec in METRICS_TOOLS]
+
+
+async def handle_metrics_tool(
+    name: str, arguments: dict[str, Any], metrics: MetricsRegistry | None
+) -> list[TextContent]:
+    """Handle metrics tool execution.
+
+    Args:
+        name: Tool name
+        arguments: Tool arguments
+        metrics: Metrics registry (None if metrics are disabled)
+
+    Returns:
+        List of TextContent with tool results
+
+    Raises:
+        ValueError: If tool name or format is unknown, or metrics are disabled
+    """
+    if name != "get_server_metrics":
+        raise ValueError(f"Unknown metrics tool: {name}")
+    if metrics is None:
+        raise ValueError("Metrics are disabled (METRICS_ENABLED=false)")
+
+    output_format = arguments.get("format", "json")
+    if output_format == "prometheus":
+        return [TextContent(type="text", text=metrics.prometheus_text())]
+    if output_format != "json":
+        raise ValueError(
+            f"Unknown format '{output_format}'. Use one of: {', '.join(METRICS_FORMATS)}"
+        )
+    return [TextContent(type="text", text=json.dumps(metrics.snapshot(), indent=2))]
@@ -0,0 +1,430 @@
+"""Static definitions of the MCP tools.
+
+Plain data with no third-party imports: the stdio bootstrap answers ``tools/list`` from
+these dicts before httpx, pydantic or the MCP SDK are loaded, and the tool modules build
+their ``mcp.types.Tool`` objects from the same dicts.
+"""
+
+SCHEMA_MODES = ("full", "columns", "table")
+OUTPUT_FORMATS = ("json", "compact", "columnar", "csv", "tsv")
+DASHBOARD_MODES = ("full", "summary")
+METRICS_FORMATS = ("json", "prometheus")
+# Mirrors services.sampling.SAMPLE_METHODS (this module is imported without the services)
+SAMPLE_METHODS = ("auto", "pushdown", "reservoir")
+BATCH_OUTPUT_FORMATS = ("json", "compact")
+BATCH_MAX_QUERIES = 50
+
+ELASTICUBE_TOOLS = [
+    {
+        "name": "list_elasticubes",
+        "description": (
+            "List all available ElastiCubes/datamodels from Sisense. "
+            "Use this first when you are not sure which cube name to work with, or you want to explore what data models exist. "
+            "Returns a lightweight list per cube with: _id, title, type, server, lastUpdated (sufficient to pick a cube for further calls)."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the server-side cache and fetch fresh data from Sisense (default: false)",
+                    "default": False,
+                },
+            },
+        },
+    },
+    {
+        "name": "get_elasticube_schema",
+        "description": (
+            "Get the schema (tables and columns) for a Sisense ElastiCube/Live Connection. "
+            "Use this when you need to understand the data model (tables, columns, data types, and table-to-table relationships) "
+            "for a specific cube before writing queries or debugging joins. "
+            "Returns the full schema JSON including datasets, tables, columns, relations, and relationTables. "
+            "For large models, use mode 'columns' for a compact table -> column -> type summary, or mode 'table' with `table` for a single table and its joins."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "elasticube_name": {
+                    "type": "string",
+                    "description": "Name of the ElastiCube (e.g., 'Sales Data Model')",
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": list(SCHEMA_MODES),
+                    "description": "'full' returns the raw schema document (default); 'columns' returns {title, tables: {table: {column: type}}}; 'table' returns one table's columns and relations (requires `table`).",
+                    "default": "full",
+                },
+                "table": {
+                    "type": "string",
+                    "description": "Table name for mode 'table' (case-insensitive). Passing a table without a mode selects mode 'table'.",
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the server-side cache and fetch fresh data from Sisense (default: false)",
+                    "default": False,
+                },
+            },
+            "required": ["elasticube_name"],
+        },
+    },
+    {
+        "name": "query_elasticube",
+        "description": (
+            "Execute a SQL query to extract data from an ElastiCube. "
+            "Use this when you already know which cube and tables/fields you want and need actual rows for analysis, debugging, or sampling. "
+            "Returns the query result rows and basic metadata; use count/offset for pagination. "
+            "If the server enables the query guard, queries without a LIMIT are sized first: very large ones are rejected, others get a LIMIT or are paginated (reported as `guard`)."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "datasource": {
+                    "type": "string",
+                    "description": "Name of the ElastiCube datasource (e.g., 'Sales Data Model')",
+                },
+                "sql_query": {
+                    "type": "string",
+                    "description": "SQL query string (must start with SELECT). Examples: 'SELECT * FROM TableName LIMIT 100', 'SELECT COUNT(*) FROM TableName', 'SELECT column1, column2 FROM TableName WHERE condition'",
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "Maximum number of rows to return (default: 5000, max recommended: 10000 per request). Actual limit is 5000 rows per request for Live Connection and ~2M for Elastic Cubes. Large counts are streamed (parsed and encoded row by row); the output is the same as for smaller counts.",
+                    "default": 5000,
+                },
+                "offset": {
+                    "type": "integer",
+                    "description": "Offset for pagination (default: 0). Use with count for large result sets.",
+                    "default": 0,
+                },
+                "auto_paginate": {
+                    "type": "boolean",
+                    "description": "Fetch up to `count` rows in one call by requesting several page_size windows concurrently and stitching them in order. Use this instead of looping offset yourself, e.g. to get 50000 rows from a Live Connection capped at 5000 per request (default: false).",
+                    "default": False,
+                },
+                "page_size": {
+                    "type": "integer",
+                    "description": "Rows per request when auto_paginate is true (default: 5000).",
+                },
+                "max_concurrency": {
+                    "type": "integer",
+                    "description": "Pages in flight at once when auto_paginate is true (default: 4).",
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the server-side result cache and re-run the query (default: false). Cached results are dropped automatically when the cube is rebuilt.",
+                    "default": False,
+                },
+                "output_format": {
+                    "type": "string",
+                    "enum": list(OUTPUT_FORMATS),
+                    "description": "Result encoding: 'json' (indented, default), 'compact' (minified JSON), 'columnar' (column names plus one value array per column; smallest for wide or repetitive data), 'csv' or 'tsv' (header line plus one line per row, after '# guard:', '# pagination:' or '# sampling:' summary lines when present).",
+                    "default": "json",
+                },
+                "dictionary_encode": {
+                    "type": "boolean",
+                    "description": "With output_format 'columnar', encode low-cardinality text columns as {dictionary, codes} (default: false).",
+                    "default": False,
+                },
+                "sample": {
+                    "type": "boolean",
+                    "description": "Return a uniform random sample of `count` rows of the query's result instead of its first rows. Use this (without LIMIT) to get representative rows of a large table (default: false).",
+                    "default": False,
+                },
+                "sample_method": {
+                    "type": "string",
+                    "enum": list(SAMPLE_METHODS),
+                    "description": "With sample: 'auto' (default) has Sisense filter rows randomly and falls back to 'reservoir' where that is not supported; 'pushdown' only uses the filter; 'reservoir' scans the result in concurrent pages and keeps a random sample.",
+                    "default": "auto",
+                },
+                "materialize": {
+                    "type": "boolean",
+                    "description": "Load the result into a local table instead of returning its rows, and return a handle for query_local. Use this when you expect follow-up filters, sorts or aggregates on the same rows (default: false).",
+                    "default": False,
+                },
+            },
+            "required": ["datasource", "sql_query"],
+        },
+    },
+    {
+        "name": "query_elasticube_batch",
+        "description": (
+            "Run several small SQL queries in one call, concurrently. "
+            "Use this instead of many query_elasticube calls when exploring data, e.g. row counts per table, min/max/distinct counts per column, or the same aggregate across several cubes. "
+            f"Accepts up to {BATCH_MAX_QUERIES} queries. Returns one entry per query, in order, with either its result (headers and values) or its error; a failing query does not affect the others."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "queries": {
+                    "type": "array",
+                    "maxItems": BATCH_MAX_QUERIES,
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "datasource": {
+                                "type": "string",
+                                "description": "Name of the ElastiCube datasource",
+                            },
+                            "sql_query": {
+                                "type": "string",
+                                "description": "SQL query string (must start with SELECT)",
+                            },
+                            "count": {
+                                "type": "integer",
+                                "description": "Maximum number of rows to return (default: 1000)",
+                                "default": 1000,
+                                "minimum": 1,
+                            },
+                        },
+                        "required": ["datasource", "sql_query"],
+                    },
+                    "description": "The queries to run",
+                },
+                "max_concurrency": {
+                    "type": "integer",
+                    "description": "Queries in flight at once (default: 4).",
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the server-side result cache and re-run the queries (default: false).",
+                    "default": False,
+                },
+                "output_format": {
+                    "type": "string",
+                    "enum": list(BATCH_OUTPUT_FORMATS),
+                    "description": "'json' (indented, default) or 'compact' (minified JSON).",
+                    "default": "json",
+                },
+            },
+            "required": ["queries"],
+        },
+    },
+    {
+        "name": "profile_table",
+        "description": (
+            "Profile the columns of one ElastiCube table in a single call: row count and, per column, non-null and null counts, distinct count, min/max (numeric, text and date columns) and the most frequent values. "
+            "Use this to understand a table's data before writing queries, instead of issuing COUNT/MIN/MAX/GROUP BY queries one column at a time. "
+            "The statistics are computed by Sisense with aggregate queries, so no rows are downloaded however large the table is. "
+            "Columns that cannot be profiled report an error without failing the others."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "elasticube_name": {
+                    "type": "string",
+                    "description": "Name of the ElastiCube",
+                },
+                "table": {
+                    "type": "string",
+                    "description": "Table to profile (case-insensitive)",
+                },
+                "columns": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only profile these columns (default: all columns of the table)",
+                },
+                "top_k": {
+                    "type": "integer",
+                    "description": "Most frequent values to return per column whose values repeat (default: 5, 0 to skip).",
+                    "default": 5,
+                },
+                "batch_size": {
+                    "type": "integer",
+                    "description": "Columns per aggregate query (default: 10).",
+                    "default": 10,
+                },
+                "max_concurrency": {
+                    "type": "integer",
+                    "description": "Queries in flight at once (default: 4).",
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the server-side schema and result caches (default: false).",
+                    "default": False,
+                },
+            },
+            "required": ["elasticube_name", "table"],
+        },
+    },
+    {
+        "name": "search_fields",
+        "description": (
+            "Search table and column names across ALL ElastiCubes at once. "
+            "Use this to find which cube and table hold a field (e.g., 'customer_id', 'order date') instead of listing cubes and reading every schema. "
+            "Matches whole words, word prefixes and similar spellings (CustomerID, customer_id and 'Customer ID' are equivalent). "
+            "Returns matches ranked by score with cube, table, column and type. The first call indexes all cube schemas; later calls answer from memory and only re-read cubes whose lastUpdated changed."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "Field or table name, or words from it (e.g., 'customer id')",
+                },
+                "cube": {
+                    "type": "string",
+                    "description": "Only search this ElastiCube (optional)",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of matches (default: 20)",
+                    "default": 20,
+                },
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Refresh the cube list and retry cubes whose schema could not be read (default: false)",
+                    "default": False,
+                },
+            },
+            "required": ["query"],
+        },
+    },
+]
+
+DASHBOARD_TOOLS = [
+    {
+        "name": "list_dashboards",
+        "description": (
+            "List all available dashboards from Sisense. "
+            "Use this to discover which dashboards exist, then pick one to inspect further with get_dashboard_info. "
+            "Returns a filtered list per dashboard with: _id, title, desc, source, type, created, lastUpdated, owner, isPublic, lastOpened, parentFolder."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the server-side cache and fetch fresh data from Sisense (default: false)",
+                    "default": False,
+                },
+            },
+        },
+    },
+    {
+        "name": "get_dashboard_info",
+        "description": (
+            "Get information about a specific Sisense dashboard by ID or name. "
+            "Use this when you want to inspect how a dashboard is built (widgets, filters, datasources, and configuration) "
+            "or to discover which cubes and fields a dashboard uses. "
+            "Returns the full dashboard object with all fields from the Sisense API, which can be very large. "
+            "Prefer mode 'summary' (widgets with their type, datasource and fields, plus the dashboard filters) or `fields` to select parts of the object."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "dashboard_id": {
+                    "type": "string",
+                    "description": "ID of the dashboard (e.g., '68c20e36b10aaf740421cf12')",
+                },
+                "dashboard_name": {
+                    "type": "string",
+                    "description": "Name/title of the dashboard (e.g., 'Revenue over time')",
+                },
+                "mode": {
+                    "type": "string",
+                    "enum": list(DASHBOARD_MODES),
+                    "description": "'full' returns the dashboard object (default); 'summary' returns each widget's oid, title, type, datasource and fields by panel, the dashboard filters, and every field used with its use count.",
+                    "default": "full",
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "In mode 'full', only return these JSONPath-style paths, e.g. ['title', 'datasource.title', 'widgets[*].title', 'widgets[*].metadata.panels', 'filters[0]'].",
+                },
+            },
+            "required": [],
+        },
+    },
+]
+
+METRICS_TOOLS = [
+    {
+        "name": "get_server_metrics",
+        "description": (
+            "Get this MCP server's own performance metrics. "
+            "Use this to see where time goes: per-tool call counts, errors, latency percentiles and response sizes; "
+            "per Sisense endpoint family (elasticubes, datamodels, sql, dashboards) request counts, status codes, retries and latency; "
+            "cache hit/miss counts; circuit breaker states and client-side concurrency limits."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "format": {
+                    "type": "string",
+                    "enum": list(METRICS_FORMATS),
+                    "description": "'json' (default) or 'prometheus' (text exposition format).",
+                    "default": "json",
+                },
+            },
+        },
+    },
+]
+
+INSTANCE_TOOLS = [
+    {
+        "name": "list_instances",
+        "description": (
+            "List the Sisense instances this server is connected to (e.g. prod, staging, regional deployments). "
+            "Use this when the user refers to a specific environment; pass the instance name as `instance` to the other tools. "
+            "Returns each instance's name and base URL and which one is used when `instance` is omitted."
+        ),
+        "inputSchema": {"type": "object", "properties": {}},
+    },
+]
+
+LOCAL_TOOLS = [
+    {
+        "name": "query_local",
+        "description": (
+            "Run SQL (SQLite dialect) against a result materialized by query_elasticube(materialize=true), without contacting Sisense. "
+            "Use this for follow-up filtering, sorting, grouping or joins-with-itself on rows you already fetched; the rows are in a table named `result`. "
+            "Queries are read-only. Handles are evicted least recently used first when the local store is full; re-materialize if a handle is gone."
+        ),
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "handle": {
+                    "type": "string",
+                    "description": "Handle returned by query_elasticube(materialize=true)",
+                },
+                "sql_query": {
+                    "type": "string",
+                    "description": "SQLite query over the table `result`, e.g. 'SELECT region, SUM(amount) FROM result GROUP BY region'",
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "Maximum number of rows to return (default: 1000).",
+                    "default": 1000,
+                    "minimum": 1,
+                },
+                "output_format": {
+                    "type": "string",
+                    "enum": list(OUTPUT_FORMATS),
+                    "description": "Result encoding, as for query_elasticube (default: 'json').",
+                    "default": "json",
+                },
+            },
+            "required": ["handle", "sql_query"],
+        },
+    },
+]
+
+# Every Sisense tool takes the instance to run against; so does query_local, as each
+# instance keeps its own materialized results
+INSTANCE_ARGUMENT = {
+    "type": "string",
+    "description": "Name of the Sisense instance to use (see list_instances). Defaults to the default instance.",
+}
+for _tool in (*ELASTICUBE_TOOLS, *DASHBOARD_TOOLS, *LOCAL_TOOLS):
+    _tool["inputSchema"]["properties"]["instance"] = INSTANCE_ARGUMENT
+
+# Tool name -> tool group ("elasticube", "dashboard", "metrics", "instances" or "local"),
+# used to route tool calls
+TOOL_GROUPS = {
+    **{tool["name"]: "elasticube" for tool in ELASTICUBE_TOOLS},
+    **{tool["name"]: "dashboard" for tool in DASHBOARD_TOOLS},
+    **{tool["name"]: "metrics" for tool in METRICS_TOOLS},
+    **{tool["name"]: "instances" for tool in INSTANCE_TOOLS},
+    **{tool["name"]: "local" for tool in LOCAL_TOOLS},
+}
@@ -0,0 +1,356 @@
+"""Trace spans for tool calls, exported as OTLP/JSON.
+
+A tool call is one trace: ``call_tool`` opens the root span, and the tool handler,
+service methods, upstream requests (with their queueing, connect, TLS, server and
+download phases) and the parse and serialize steps open child spans. The trace id is
+the call's correlation id. Finished traces are written as one OTLP/JSON
+``ExportTraceServiceRequest`` per line, the format of the OpenTelemetry Collector's
+file exporter, to stderr or a file.
+
+Tracing is off unless a ``Tracer`` is installed with ``set_tracer``. While it is off,
+``span()`` returns a shared no-op span after one global lookup, so instrumented code
+pays a function call per span and nothing else.
+"""
+
+import functools
+import json
+import logging
+import random
+import sys
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from typing import Any, TextIO
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+INTERNAL = 1
+SERVER = 2
+CLIENT = 3
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# httpcore trace events (without the ".started"/".complete"/".failed" suffix) -> span name
+HTTP_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.connect_unix_socket": "connect",
+    "connection.start_tls": "tls",
+    "http11.send_request_headers": "send",
+    "http11.send_request_body": "send",
+    "http11.receive_response_headers": "server",
+    "http11.receive_response_body": "download",
+    "http2.send_request_headers": "send",
+    "http2.send_request_body": "send",
+    "http2.receive_response_headers": "server",
+    "http2.receive_response_body": "download",
+}
+
+# Offset from perf_counter_ns to Unix time, so spans get precise and comparable timestamps
+_EPOCH_OFFSET_NS = time.time_ns() - time.perf_counter_ns()
+
+_current: ContextVar["Span | None"] = ContextVar("sisense_mcp_span", default=None)
+_tracer: "Tracer | None" = None
+
+
+class Span:
+    """A timed operation. Use as a context manager; it becomes the current span inside."""
+
+    __slots__ = (
+        "tracer",
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "status_message",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        kind: int,
+        parent: "Span | None",
+        attributes: dict[str, Any] | None,
+    ):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes if attributes is not None else {}
+        self.status = 0
+        self.status_message = ""
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        """Set an attribute."""
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed."""
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    def end(self) -> None:
+        """End the span (done by ``__exit__`` for spans used as context managers)."""
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+            self.tracer.finish(self)
+
+    def __enter__(self) -> "Span":
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current.reset(self._token)
+        if exc_type is not None and self.status != STATUS_ERROR:
+            self.attributes["error.type"] = exc_type.__qualname__
+            self.set_error(str(exc)[:500])
+        self.end()
+        return False
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    def to_otlp(self) -> dict[str, Any]:
+        """Encode the span as an OTLP/JSON ``Span``."""
+        encoded = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns + _EPOCH_OFFSET_NS),
+            "endTimeUnixNano": str((self.end_ns or self.start_ns) + _EPOCH_OFFSET_NS),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)} for key, value in self.attributes.items()
+            ],
+            "status": (
+                {"code": self.status, "message": self.status_message} if self.status else {}
+            ),
+        }
+        if self.parent_id is not None:
+            encoded["parentSpanId"] = self.parent_id
+        return encoded
+
+
+class _NoopSpan:
+    """Span returned while tracing is off."""
+
+    __slots__ = ()
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects the spans of each trace and exports the trace when its root span ends.
+
+    Spans that end after their root (e.g. from background tasks) are exported on their
+    own.
+
+    Args:
+        output: Stream the OTLP/JSON lines are written to
+        service_name: ``service.name`` resource attribute
+        service_version: ``service.version`` resource attribute
+        max_spans_per_trace: Spans buffered per trace; further spans are dropped
+            (counted in ``dropped_spans``)
+    """
+
+    def __init__(
+        self,
+        output: TextIO,
+        service_name: str = "sisense-mcp",
+        service_version: str = "",
+        max_spans_per_trace: int = 10_000,
+    ):
+        self.output = output
+        self.service_name = service_name
+        self.service_version = service_version
+        self.max_spans_per_trace = max_spans_per_trace
+        self.exported_traces = 0
+        self.dropped_spans = 0
+        self._open: dict[str, list[Span]] = {}
+        # Parent span id -> httpcore event -> phase span still open under it
+        self._phases: dict[str, dict[str, Span]] = {}
+
+    def start(
+        self, name: str, kind: int = INTERNAL, attributes: dict[str, Any] | None = None
+    ) -> Span:
+        """Start a span under the current span (or a new trace if there is none)."""
+        parent = _current.get()
+        started = Span(self, name, kind, parent, attributes)
+        if parent is None:
+            self._open[started.trace_id] = []
+        return started
+
+    def finish(self, span: Span) -> None:
+        # Phases a cancelled or failed request never completed end with it
+        for phase in self._phases.pop(span.span_id, {}).values():
+            phase.set_error("interrupted")
+            phase.end()
+        if span.parent_id is None:
+            spans = self._open.pop(span.trace_id, [])
+            spans.append(span)
+            self.export(spans)
+            logger.debug(f"{span.name} took {span.duration_ms:.1f} ms (trace {span.trace_id})")
+            return
+        buffered = self._open.get(span.trace_id)
+        if buffered is None:
+            self.export([span])
+        elif len(buffered) < self.max_spans_per_trace:
+            buffered.append(span)
+        else:
+            self.dropped_spans += 1
+
+    def export(self, spans: list[Span]) -> None:
+        """Write ``spans`` as one OTLP/JSON line."""
+        resource = [{"key": "service.name", "value": {"stringValue": self.service_name}}]
+        if self.service_version:
+            resource.append(
+                {"key": "service.version", "value": {"stringValue": self.service_version}}
+            )
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": resource},
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "sisense-mcp"},
+                            "spans": [s.to_otlp() for s in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        try:
+            self.output.write(json.dumps(request, separators=(",", ":")) + "\n")
+            self.output.flush()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not export trace: {e}")
+            return
+        self.exported_traces += 1
+
+    async def httpcore_trace(self, event: str, info: dict[str, Any]) -> None:
+        """httpx ``trace`` request extension: turns httpcore phases into child spans."""
+        base, _, phase = event.rpartition(".")
+        name = HTTP_PHASES.get(base)
+        parent = _current.get()
+        if name is None or parent is None:
+            return
+        if phase == "started":
+            self._phases.setdefault(parent.span_id, {})[base] = self.start(name)
+        else:
+            open_phases = self._phases.get(parent.span_id, {})
+            started = open_phases.pop(base, None)
+            if not open_phases:
+                self._phases.pop(parent.span_id, None)
+            if started is not None:
+                if phase == "failed":
+                    exc = info.get("exception")
+                    started.set_error(repr(exc) if exc is not None else "failed")
+                started.end()
+
+    def close(self) -> None:
+        """Close the output unless it is stderr or stdout."""
+        if self.output not in (sys.stderr, sys.stdout):
+            self.output.close()
+
+
+def open_tracer(export: str, **kwargs: Any) -> Tracer:
+    """Create a tracer writing to ``export``: "stderr" or a file path (appended to)."""
+    if export == "stderr":
+        return Tracer(sys.stderr, **kwargs)
+    return Tracer(open(export, "a", encoding="utf-8"), **kwargs)
+
+
+def set_tracer(tracer: Tracer | None) -> None:
+    """Install ``tracer`` process-wide (None turns tracing off)."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Tracer | None:
+    return _tracer
+
+
+def span(name: str, attributes: dict[str, Any] | None = None, kind: int = INTERNAL):
+    """Start a span under the current one; a no-op span while tracing is off.
+
+    Usage:
+        with span("parse", {"http.response.body.size": len(body)}) as s:
+            ...
+    """
+    tracer = _tracer
+    if tracer is None:
+        return NOOP_SPAN
+    return tracer.start(name, kind, attributes)
+
+
+def current_trace_id() -> str | None:
+    """Trace (correlation) id of the current span, if tracing is on."""
+    current = _current.get()
+    return current.trace_id if current is not None else None
+
+
+def http_extensions() -> dict[str, Any] | None:
+    """httpx request extensions that report connection phases, if tracing is on."""
+    tracer = _tracer
+    if tracer is None:
+        return None
+    return {"trace": tracer.httpcore_trace}
+
+
+def traced(name: str) -> Callable:
+    """Decorate a coroutine function to run inside a span named ``name``."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return await func(*args, **kwargs)
+            with tracer.start(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
@@ -8,6 +8,22 @@ from src.client import SisenseClient
 from src.services import DashboardService, ElastiCubeService
 
 
+class FakeClock:
+    """Manually advanced clock: set ``now`` to move time."""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """A FakeClock starting at 0, for components that take a ``clock`` callable."""
+    return FakeClock()
+
+
 @pytest.fixture
 def mock_client():
     """Create a mock SisenseClient."""
@@ -0,0 +1,84 @@
+"""Tests for DashboardIndex."""
+
+from src.services import DashboardIndex
+
+
+def dashboard(dashboard_id, title, last_updated="2025-01-01T00:00:00.000Z"):
+    return {"_id": dashboard_id, "title": title, "lastUpdated": last_updated}
+
+
+def test_lookup_exact_and_case_folded():
+    """Test exact lookups win over case-insensitive ones."""
+    index = DashboardIndex()
+    index.update([dashboard("1", "Revenue"), dashboard("2", "REVENUE"), dashboard("3", "Costs")])
+
+    assert index.lookup("Revenue") == "1"
+    assert index.lookup("REVENUE") == "2"
+    assert index.lookup("costs") == "3"
+    assert index.lookup("Missing") is None
+
+
+def test_entries_without_a_string_title_are_skipped():
+    """Test that null or non-string titles do not break a refresh."""
+    index = DashboardIndex()
+    index.update(
+        [
+            dashboard("1", None),
+            dashboard("2", 42, last_updated=None),
+            dashboard("3", "Costs", last_updated=1700000000),
+            dashboard("4", "Costs"),
+        ]
+    )
+
+    assert len(index) == 4
+    assert index.lookup("Costs") == "4"
+    assert index.lookup("42") is None
+    assert index.update([dashboard("1", "Revenue")]) == 4
+    assert index.lookup("revenue") == "1"
+
+
+def test_duplicate_titles_are_deterministic():
+    """Test that the most recently updated dashboard wins, then the smallest _id."""
+    index = DashboardIndex()
+    index.update(
+        [
+            dashboard("b", "Sales", "2025-01-01T00:00:00.000Z"),
+            dashboard("c", "Sales", "2025-03-01T00:00:00.000Z"),
+            dashboard("a", "Sales", "2025-03-01T00:00:00.000Z"),
+        ]
+    )
+    assert index.lookup("Sales") == "a"
+
+
+def test_incremental_update():
+    """Test that only changed entries count and removals/renames are applied."""
+    index = DashboardIndex()
+    assert index.update([dashboard("1", "Revenue"), dashboard("2", "Costs")]) == 2
+    assert index.update([dashboard("1", "Revenue"), dashboard("2", "Costs")]) == 0
+
+    changed = index.update(
+        [dashboard("1", "Revenue 2025", "2025-02-01T00:00:00.000Z"), dashboard("3", "Margin")]
+    )
+
+    assert changed == 3
+    assert index.lookup("Revenue") is None
+    assert index.lookup("Revenue 2025") == "1"
+    assert index.lookup("Costs") is None
+    assert index.lookup("Margin") == "3"
+    assert len(index) == 2
+
+
+def test_staleness_and_stats(clock):
+    """Test max_age staleness and build statistics."""
+    index = DashboardIndex(max_age=60, clock=clock)
+    assert index.is_stale()
+
+    index.update([dashboard("1", "Revenue")])
+    assert not index.is_stale()
+    clock.now = 61
+    assert index.is_stale()
+
+    stats = index.stats()
+    assert stats["dashboards"] == 1
+    assert stats["last_changed"] == 1
+    assert stats["last_build_ms"] >= 0
@@ -2,6 +2,9 @@
 
 import pytest
 
+from src.cache import TTLCache
+from src.services import DashboardIndex, DashboardService
+
 
 @pytest.mark.asyncio
 async def test_list_dashboards_list_response(dashboard_service, mock_client):
@@ -156,12 +159,20 @@ async def test_get_dashboard_by_name(dashboard_service, mock_client):
             "type": "dashboard",
         },
     ]
-    mock_client.get.return_value = mock_dashboards
+
+    async def fake_get(endpoint, params=None):
+        if endpoint == "/api/v1/dashboards":
+            assert params == {"fields": "_id,title,lastUpdated"}
+            return mock_dashboards
+        return next(d for d in mock_dashboards if endpoint.endswith(d["_id"]))
+
+    mock_client.get.side_effect = fake_get
 
     result = await dashboard_service.get_dashboard(dashboard_name="Target Dashboard")
 
     assert result["_id"] == "507f1f77bcf86cd799439012"
     assert result["title"] == "Target Dashboard"
+    mock_client.get.assert_called_with("/api/v1/dashboards/507f1f77bcf86cd799439012")
 
 
 @pytest.mark.asyncio
@@ -226,3 +237,104 @@ def test_filter_dashboard_fields(dashboard_service):
     assert "filters" not in filtered
     assert "settings" not in filtered
     assert "tenantId" not in filtered
+
+
+@pytest.mark.asyncio
+async def test_list_dashboards_cached(mock_client):
+    """Test that list_dashboards is served from the metadata cache."""
+    service = DashboardService(mock_client, cache=TTLCache())
+    mock_client.get.return_value = [{"_id": "1", "title": "Revenue"}]
+
+    await service.list_dashboards()
+    await service.list_dashboards()
+    assert mock_client.get.await_count == 1
+
+    service.cache.invalidate("dashboards")
+    await service.list_dashboards()
+    assert mock_client.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_by_name_uses_index(mock_client):
+    """Test that repeated name lookups hit the index instead of re-listing."""
+    service = DashboardService(mock_client, title_index=DashboardIndex(max_age=300))
+    listing = [{"_id": "1", "title": "Revenue", "lastUpdated": "2025-01-01T00:00:00.000Z"}]
+
+    async def fake_get(endpoint, params=None):
+        if endpoint == "/api/v1/dashboards":
+            return listing
+        return {"_id": endpoint.rsplit("/", 1)[-1], "widgets": []}
+
+    mock_client.get.side_effect = fake_get
+
+    assert (await service.get_dashboard(dashboard_name="Revenue"))["_id"] == "1"
+    assert (await service.get_dashboard(dashboard_name="revenue"))["_id"] == "1"
+    endpoints = [call.args[0] for call in mock_client.get.call_args_list]
+    assert endpoints.count("/api/v1/dashboards") == 1
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_by_name_refreshes_on_miss(mock_client):
+    """Test that a miss on a fresh index triggers one refresh before failing."""
+    service = DashboardService(mock_client)
+    listings = [
+        [{"_id": "1", "title": "Revenue", "lastUpdated": "2025-01-01T00:00:00.000Z"}],
+        [
+            {"_id": "1", "title": "Revenue", "lastUpdated": "2025-01-01T00:00:00.000Z"},
+            {"_id": "2", "title": "New", "lastUpdated": "2025-01-02T00:00:00.000Z"},
+        ],
+    ]
+
+    async def fake_get(endpoint, params=None):
+        if endpoint == "/api/v1/dashboards":
+            return listings.pop(0)
+        return {"_id": endpoint.rsplit("/", 1)[-1]}
+
+    mock_client.get.side_effect = fake_get
+
+    await service.get_dashboard(dashboard_name="Revenue")
+    assert (await service.get_dashboard(dashboard_name="New"))["_id"] == "2"
+    assert listings == []
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_with_fields(dashboard_service, mock_client):
+    """Test that field paths are sent upstream as top-level members and applied locally."""
+    mock_client.get.return_value = {
+        "_id": "d1",
+        "title": "Revenue",
+        "widgets": [{"oid": "w1", "title": "Chart", "metadata": {}}],
+        "layout": {"columns": []},
+    }
+
+    result = await dashboard_service.get_dashboard(
+        dashboard_id="d1", fields=["title", "widgets[*].title"]
+    )
+
+    assert result == {"title": "Revenue", "widgets": [{"title": "Chart"}]}
+    mock_client.get.assert_called_once_with(
+        "/api/v1/dashboards/d1", params={"fields": "title,widgets"}
+    )
+
+    with pytest.raises(ValueError, match="Invalid field path"):
+        await dashboard_service.get_dashboard(dashboard_id="d1", fields=["widgets[x]"])
+
+
+@pytest.mark.asyncio
+async def test_get_dashboard_summary_fetches_widgets_when_not_embedded(
+    dashboard_service, mock_client
+):
+    """Test that the summary falls back to the widgets endpoint."""
+
+    async def fake_get(endpoint, params=None):
+        if endpoint.endswith("/widgets"):
+            return [{"oid": "w1", "title": "Chart", "type": "chart/bar"}]
+        return {"_id": "d1", "title": "Revenue", "widgets": ["w1"]}
+
+    mock_client.get.side_effect = fake_get
+
+    summary = await dashboard_service.get_dashboard_summary(dashboard_id="d1")
+
+    assert summary["widgets"][0]["title"] == "Chart"
+    calls = [call.args[0] for call in mock_client.get.await_args_list]
+    assert calls == ["/api/v1/dashboards/d1", "/api/v1/dashboards/d1/widgets"]
@@ -0,0 +1,82 @@
+"""Tests for the dashboard summary."""
+
+from src.services.dashboard_summary import summarize_dashboard
+
+DASHBOARD = {
+    "oid": "d1",
+    "title": "Revenue",
+    "datasource": {"title": "Sales", "fullname": "localhost/Sales"},
+    "filters": [
+        {"jaql": {"dim": "[Commerce.Date]", "title": "Date"}},
+        {"levels": [{"dim": "[Geo.Country]"}, {"dim": "[Geo.City]"}]},
+    ],
+    "widgets": [
+        {
+            "oid": "w1",
+            "title": "Revenue by brand",
+            "type": "chart/bar",
+            "datasource": {"title": "Sales"},
+            "metadata": {
+                "panels": [
+                    {"name": "categories", "items": [{"jaql": {"dim": "[Brand.Brand]"}}]},
+                    {
+                        "name": "values",
+                        "items": [
+                            {"jaql": {"dim": "[Commerce.Revenue]", "agg": "sum"}},
+                            {
+                                "jaql": {
+                                    "title": "Margin",
+                                    "formula": "([a] - [b]) / [a]",
+                                    "context": {
+                                        "[a]": {"dim": "[Commerce.Revenue]", "agg": "sum"},
+                                        "[b]": {"dim": "[Commerce.Cost]", "agg": "sum"},
+                                    },
+                                }
+                            },
+                        ],
+                    },
+                    {"name": "filters", "items": []},
+                ]
+            },
+        },
+        {"oid": "w2", "title": "Notes", "type": "richtexteditor", "metadata": {"panels": []}},
+    ],
+}
+
+
+def test_summarize_dashboard():
+    """Test widgets, their fields by panel, filters and field use counts."""
+    summary = summarize_dashboard(DASHBOARD)
+
+    assert summary["_id"] == "d1"
+    assert summary["datasource"] == "Sales"
+    assert summary["filters"] == [
+        {"title": "Date", "dim": "[Commerce.Date]"},
+        {"dim": "[Geo.Country]"},
+        {"dim": "[Geo.City]"},
+    ]
+    chart, notes = summary["widgets"]
+    assert chart["fields"]["categories"] == [{"dim": "[Brand.Brand]"}]
+    assert chart["fields"]["values"][1] == {
+        "title": "Margin",
+        "formula": "([a] - [b]) / [a]",
+        "uses": ["[Commerce.Revenue]", "[Commerce.Cost]"],
+    }
+    assert "filters" not in chart["fields"]
+    assert notes == {
+        "oid": "w2",
+        "title": "Notes",
+        "type": "richtexteditor",
+        "datasource": None,
+        "fields": {},
+    }
+    assert summary["fields"]["[Commerce.Revenue]"] == 2
+    assert list(summary["fields"]) == sorted(summary["fields"])
+
+
+def test_summarize_dashboard_with_separate_widgets():
+    """Test that widgets fetched separately are used when given."""
+    summary = summarize_dashboard({"_id": "d1", "widgets": ["w1"]}, DASHBOARD["widgets"])
+
+    assert [w["oid"] for w in summary["widgets"]] == ["w1", "w2"]
+    assert summary["filters"] == []
@@ -84,7 +84,7 @@ async def test_handle_get_dashboard_info_by_id(dashboard_service):
     assert "datasource" in data
     assert "layout" in data
     dashboard_service.get_dashboard.assert_called_once_with(
-        dashboard_id="68c20e36b10aaf740421cf12", dashboard_name=None
+        dashboard_id="68c20e36b10aaf740421cf12", dashboard_name=None, fields=None
     )
 
 
@@ -117,7 +117,7 @@ async def test_handle_get_dashboard_info_by_name(dashboard_service):
     assert data == mock_dashboard
     assert data["title"] == "Revenue over time"
     dashboard_service.get_dashboard.assert_called_once_with(
-        dashboard_id=None, dashboard_name="Revenue over time"
+        dashboard_id=None, dashboard_name="Revenue over time", fields=None
     )
 
 
@@ -159,3 +159,36 @@ async def test_handle_unknown_tool(dashboard_service):
     """Test tool handler with unknown tool name."""
     with pytest.raises(ValueError, match="Unknown Dashboard tool"):
         await handle_dashboard_tool("unknown_tool", {}, dashboard_service)
+
+
+@pytest.mark.asyncio
+async def test_handle_get_dashboard_info_summary_and_fields(dashboard_service):
+    """Test that mode and fields select the summary or a projection."""
+    dashboard_service.get_dashboard_summary = AsyncMock(return_value={"widgets": []})
+    dashboard_service.get_dashboard = AsyncMock(return_value={"title": "Revenue"})
+
+    result = await handle_dashboard_tool(
+        "get_dashboard_info", {"dashboard_id": "abc", "mode": "summary"}, dashboard_service
+    )
+    assert json.loads(result[0].text) == {"widgets": []}
+    dashboard_service.get_dashboard_summary.assert_called_once_with(
+        dashboard_id="abc", dashboard_name=None
+    )
+
+    await handle_dashboard_tool(
+        "get_dashboard_info", {"dashboard_id": "abc", "fields": ["title"]}, dashboard_service
+    )
+    dashboard_service.get_dashboard.assert_called_once_with(
+        dashboard_id="abc", dashboard_name=None, fields=["title"]
+    )
+
+    with pytest.raises(ValueError, match="Unknown mode"):
+        await handle_dashboard_tool(
+            "get_dashboard_info", {"dashboard_id": "abc", "mode": "raw"}, dashboard_service
+        )
+    for fields in ("title", [1]):
+        with pytest.raises(ValueError, match="fields must be a list of paths"):
+            await handle_dashboard_tool(
+                "get_dashboard_info", {"dashboard_id": "abc", "fields": fields}, dashboard_service
+            )
+    assert dashboard_service.get_dashboard.await_count == 1
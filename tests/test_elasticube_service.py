@@ -1,7 +1,16 @@
 """Tests for ElastiCubeService."""
 
+import asyncio
+import json
+import re
+
+import httpx
 import pytest
 
+from src.cache import TTLCache
+from src.client import SisenseClient
+from src.services import ElastiCubeService
+
 
 @pytest.mark.asyncio
 async def test_list_elasticubes_list_response(elasticube_service, mock_client):
@@ -242,3 +251,754 @@ def test_filter_elasticube_fields(elasticube_service):
     assert "datasets" not in filtered
     assert "shares" not in filtered
     assert "tenantId" not in filtered
+
+
+@pytest.mark.asyncio
+async def test_list_elasticubes_cached(mock_client):
+    """Test that list_elasticubes is served from the metadata cache."""
+    service = ElastiCubeService(mock_client, cache=TTLCache())
+    mock_client.get.return_value = [{"_id": "1", "title": "Sales Data Model"}]
+
+    first = await service.list_elasticubes()
+    second = await service.list_elasticubes()
+
+    assert first == second
+    assert mock_client.get.await_count == 1
+
+    await service.list_elasticubes(refresh=True)
+    assert mock_client.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_get_schema_cached_per_cube(mock_client):
+    """Test that schemas are cached per cube name."""
+    cache = TTLCache()
+    service = ElastiCubeService(mock_client, cache=cache)
+    mock_client.get.side_effect = lambda endpoint, params: {"title": params["title"]}
+
+    assert await service.get_schema("Sales") == {"title": "Sales"}
+    assert await service.get_schema("Sales") == {"title": "Sales"}
+    assert await service.get_schema("Marketing") == {"title": "Marketing"}
+
+    assert mock_client.get.await_count == 2
+    assert cache.stats()["namespaces"]["schema"] == {"hits": 1, "misses": 2}
+
+
+@pytest.mark.asyncio
+async def test_stream_sql_yields_rows_incrementally():
+    """Test stream_sql against a real client parsing a chunked response body."""
+    body = json.dumps(
+        {"headers": ["BRAND_ID"], "values": [[i] for i in range(1000)], "metadata": {"n": 1000}}
+    ).encode()
+
+    async def chunks():
+        for start in range(0, len(body), 100):
+            yield body[start : start + 100]
+
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, content=chunks())
+
+    client = SisenseClient("https://test.sisense.com", "t", transport=httpx.MockTransport(handler))
+    service = ElastiCubeService(client)
+
+    stream = service.stream_sql("Sales Data Model", "SELECT BRAND_ID FROM brands", count=20000)
+    rows = [row async for row in stream]
+
+    assert rows == [[i] for i in range(1000)]
+    assert stream.rows_key == "values"
+    assert stream.fields == {"headers": ["BRAND_ID"], "values": None, "metadata": {"n": 1000}}
+    assert requests[0].url.raw_path.startswith(b"/api/datasources/Sales%20Data%20Model/sql?")
+    assert requests[0].url.params["count"] == "20000"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_sql_with_error(elasticube_service, mock_client):
+    """Test that an API error in a streamed response raises ValueError."""
+
+    async def items(*args, **kwargs):
+        yield "error", True
+        yield "details", "SQL syntax error"
+
+    mock_client.stream_get = items
+
+    with pytest.raises(ValueError, match="SQL syntax error"):
+        async for _ in elasticube_service.stream_sql("Sales", "INVALID SQL"):
+            pass
+
+
+def paged_sql_backend(total_rows: int, delay: float = 0.0):
+    """Fake client.get serving a table of ``total_rows`` rows honoring count/offset."""
+    state = {"calls": [], "in_flight": 0, "max_in_flight": 0}
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        count, offset = int(params["count"]), int(params["offset"])
+        state["calls"].append(offset)
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        # Later pages finish first to prove results are stitched by offset, not arrival
+        await asyncio.sleep(delay / (1 + offset))
+        state["in_flight"] -= 1
+        rows = [[i] for i in range(offset, min(total_rows, offset + count))]
+        return {"headers": ["ID"], "values": rows}
+
+    return fake_get, state
+
+
+@pytest.mark.asyncio
+async def test_query_sql_auto_paginate_stitches_in_order(elasticube_service, mock_client):
+    """Test that pages are fetched concurrently and stitched in offset order."""
+    fake_get, state = paged_sql_backend(total_rows=23, delay=0.01)
+    mock_client.get.side_effect = fake_get
+
+    result = await elasticube_service.query_sql(
+        "Sales", "SELECT ID FROM t", count=100, auto_paginate=True, page_size=5, max_concurrency=3
+    )
+
+    assert result["values"] == [[i] for i in range(23)]
+    assert result["headers"] == ["ID"]
+    assert result["pagination"] == {"pages": 5, "page_size": 5, "rows": 23, "complete": True}
+    assert state["max_in_flight"] == 3
+    # The short page at offset 20 stops the crawl well before the 100-row budget
+    assert max(state["calls"]) <= 30
+
+
+@pytest.mark.asyncio
+async def test_query_sql_auto_paginate_respects_row_budget(elasticube_service, mock_client):
+    """Test that the row budget caps the result and trims the last page request."""
+    fake_get, state = paged_sql_backend(total_rows=1000)
+    mock_client.get.side_effect = fake_get
+
+    result = await elasticube_service.query_sql(
+        "Sales", "SELECT ID FROM t", count=12, offset=100, auto_paginate=True, page_size=5
+    )
+
+    assert result["values"] == [[i] for i in range(100, 112)]
+    assert sorted(state["calls"]) == [100, 105, 110]
+    assert result["pagination"]["complete"] is False
+    assert result["pagination"]["next_offset"] == 112
+
+
+@pytest.mark.asyncio
+async def test_query_sql_auto_paginate_propagates_errors(elasticube_service, mock_client):
+    """Test that a failing page fails the whole paginated query."""
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        if params["offset"] == "5":
+            return {"error": True, "details": "boom"}
+        return {"values": [[0]] * int(params["count"])}
+
+    mock_client.get.side_effect = fake_get
+
+    with pytest.raises(ValueError, match="boom"):
+        await elasticube_service.query_sql(
+            "Sales", "SELECT 1", count=20, auto_paginate=True, page_size=5
+        )
+
+
+@pytest.mark.asyncio
+async def test_query_sql_batch_caps_concurrency_and_isolates_failures(
+    elasticube_service, mock_client
+):
+    """Test that batch queries run concurrently under the cap and fail independently."""
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        if params["query"] == "SELECT 3":
+            raise httpx.ConnectError("refused")
+        return {"values": [[params["query"]]]}
+
+    mock_client.get.side_effect = fake_get
+    queries = [("Sales", f"SELECT {i}", 10) for i in range(8)]
+
+    results = await elasticube_service.query_sql_batch(queries, max_concurrency=3)
+
+    assert state["max_in_flight"] == 3
+    assert isinstance(results[3], httpx.ConnectError)
+    assert [r["values"][0][0] for i, r in enumerate(results) if i != 3] == [
+        f"SELECT {i}" for i in range(8) if i != 3
+    ]
+
+
+def cube_backend(cubes: dict[str, str]):
+    """Fake client.get serving a cube list with the given lastUpdated values and SQL."""
+    calls = {"list": 0, "sql": 0}
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        if endpoint == "/api/v1/elasticubes/getElasticubes":
+            calls["list"] += 1
+            return [{"_id": t, "title": t, "lastUpdated": v} for t, v in cubes.items()]
+        calls["sql"] += 1
+        return {"headers": ["ID"], "values": [[calls["sql"]]]}
+
+    return fake_get, calls
+
+
+@pytest.mark.asyncio
+async def test_query_sql_result_cache_normalizes_query(mock_client):
+    """Test that equivalent spellings of a query share one cached result."""
+    fake_get, calls = cube_backend({"Sales": "2024-01-01"})
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(mock_client, cache=TTLCache(), result_cache=TTLCache())
+
+    first = await service.query_sql("Sales", "SELECT id FROM t WHERE x IN (3, 1, 2)", count=10)
+    again = await service.query_sql(
+        "Sales", "select   id\n  from t -- comment\n where x in (1,2,3)", count=10
+    )
+    assert again == first
+    assert calls["sql"] == 1
+
+    # count/offset, datasource and refresh all miss
+    await service.query_sql("Sales", "SELECT id FROM t WHERE x IN (1, 2, 3)", count=20)
+    await service.query_sql("Sales", "SELECT id FROM t WHERE x IN (1, 2, 3)", count=10, offset=5)
+    await service.query_sql(
+        "Sales", "SELECT id FROM t WHERE x IN (1, 2, 3)", count=10, refresh=True
+    )
+    assert calls["sql"] == 4
+    assert calls["list"] == 1
+
+
+@pytest.mark.asyncio
+async def test_query_sql_result_cache_invalidated_on_cube_rebuild(mock_client):
+    """Test that a new lastUpdated for the cube drops its cached results."""
+    cubes = {"Sales": "2024-01-01", "Marketing": "2024-01-01"}
+    fake_get, calls = cube_backend(cubes)
+    mock_client.get.side_effect = fake_get
+    result_cache = TTLCache()
+    service = ElastiCubeService(mock_client, cache=TTLCache(), result_cache=result_cache)
+
+    await service.query_sql("Sales", "SELECT 1")
+    await service.query_sql("Marketing", "SELECT 1")
+    assert calls["sql"] == 2
+
+    cubes["Sales"] = "2024-02-01"
+    await service.list_elasticubes(refresh=True)
+    assert len(result_cache) == 1
+
+    await service.query_sql("Sales", "SELECT 1")
+    await service.query_sql("Marketing", "SELECT 1")
+    assert calls["sql"] == 3
+
+
+@pytest.mark.asyncio
+async def test_query_sql_result_cache_skipped_without_cube_list(mock_client):
+    """Test that results are not cached while the cube list cannot be fetched."""
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        if endpoint == "/api/v1/elasticubes/getElasticubes":
+            raise httpx.HTTPStatusError("404", request=None, response=None)
+        return {"values": [[1]]}
+
+    mock_client.get.side_effect = fake_get
+    result_cache = TTLCache()
+    service = ElastiCubeService(mock_client, result_cache=result_cache)
+
+    assert await service.query_sql("Sales", "SELECT 1") == {"values": [[1]]}
+    assert await service.query_sql("Sales", "SELECT 1") == {"values": [[1]]}
+    assert len(result_cache) == 0
+    # The failed listing is not retried on every query
+    assert mock_client.get.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_schema_index_built_once_per_schema(mock_client):
+    """Test that table and column views reuse one index for a cached schema."""
+    schema = {
+        "title": "Sales",
+        "datasets": [
+            {
+                "oid": "ds1",
+                "schema": {
+                    "tables": [{"oid": "t1", "name": "brands", "columns": [{"name": "ID"}]}]
+                },
+            }
+        ],
+    }
+    mock_client.get.side_effect = lambda endpoint, params: dict(schema)
+    service = ElastiCubeService(mock_client, cache=TTLCache())
+
+    index = await service.get_schema_index("Sales")
+    assert await service.get_schema_index("Sales") is index
+    assert (await service.get_table_schema("Sales", "Brands"))["columns"] == [
+        {"name": "ID", "type": None}
+    ]
+    assert await service.get_columns_summary("Sales") == {
+        "title": "Sales",
+        "tables": {"brands": {"ID": None}},
+    }
+    assert mock_client.get.await_count == 1
+
+    with pytest.raises(ValueError, match="Available tables: brands"):
+        await service.get_table_schema("Sales", "missing")
+
+    # A refreshed schema document gets a fresh index
+    assert await service.get_schema_index("Sales", refresh=True) is not index
+
+
+@pytest.mark.asyncio
+async def test_schema_indexes_are_evicted_with_the_cache(mock_client):
+    """Test that built indexes live in the bounded metadata cache."""
+    mock_client.get.side_effect = lambda endpoint, params: {
+        "title": params["title"],
+        "datasets": [],
+    }
+    cache = TTLCache(max_entries=4)
+    service = ElastiCubeService(mock_client, cache=cache)
+
+    for number in range(20):
+        await service.get_schema_index(f"Cube {number}")
+
+    assert len(cache) <= 4
+    assert cache.get("schema_index", "Cube 19") is not None
+    assert cache.get("schema_index", "Cube 0") is None
+
+
+def schema_backend(cubes: dict[str, str], columns: dict[str, list[str]], delay: float = 0.0):
+    """Fake client.get serving a cube list and one-table schemas."""
+    state = {"schema_calls": [], "in_flight": 0, "max_in_flight": 0}
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        if endpoint == "/api/v1/elasticubes/getElasticubes":
+            return [{"_id": t, "title": t, "lastUpdated": v} for t, v in cubes.items()]
+        title = params["title"]
+        state["schema_calls"].append(title)
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(delay)
+        state["in_flight"] -= 1
+        if title not in columns:
+            raise httpx.HTTPStatusError("boom", request=None, response=None)
+        return {"title": title, "tables": [{"name": "t", "columns": columns[title]}]}
+
+    return fake_get, state
+
+
+@pytest.mark.asyncio
+async def test_search_fields_indexes_cubes_concurrently(mock_client):
+    """Test that all schemas are fetched under the cap and searched from memory."""
+    cubes = {f"Cube {i}": "v1" for i in range(10)}
+    columns = {title: [{"name": f"field_{i}"}] for i, title in enumerate(cubes)}
+    columns["Cube 3"] = [{"name": "customer_id"}]
+    fake_get, state = schema_backend(cubes, columns, delay=0.01)
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(mock_client, cache=TTLCache(), field_index_concurrency=3)
+
+    result = await service.search_fields("CustomerID")
+
+    assert result["matches"][0] == {
+        "cube": "Cube 3",
+        "table": "t",
+        "column": "customer_id",
+        "type": None,
+        "score": result["matches"][0]["score"],
+    }
+    assert result["indexed_cubes"] == 10
+    assert state["max_in_flight"] == 3
+
+    # Unchanged cubes are not fetched again
+    await service.search_fields("field")
+    assert len(state["schema_calls"]) == 10
+
+
+@pytest.mark.asyncio
+async def test_search_fields_reindexes_updated_and_drops_removed_cubes(mock_client):
+    """Test that lastUpdated changes trigger a re-fetch of just that cube."""
+    cubes = {"Sales": "v1", "CRM": "v1"}
+    columns = {"Sales": [{"name": "amount"}], "CRM": [{"name": "customer_id"}]}
+    fake_get, state = schema_backend(cubes, columns)
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(mock_client, cache=TTLCache())
+    await service.search_fields("amount")
+
+    cubes["Sales"] = "v2"
+    columns["Sales"] = [{"name": "revenue"}]
+    del cubes["CRM"]
+    result = await service.search_fields("revenue", refresh=True)
+
+    assert result["matches"][0]["column"] == "revenue"
+    assert result["indexed_cubes"] == 1
+    assert state["schema_calls"] == ["Sales", "CRM", "Sales"]
+
+
+@pytest.mark.asyncio
+async def test_search_fields_reports_failed_cubes(mock_client):
+    """Test that an unreadable schema is reported and not retried until it changes."""
+    fake_get, state = schema_backend({"Sales": "v1", "Broken": "v1"}, {"Sales": [{"name": "x"}]})
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(mock_client, cache=TTLCache())
+
+    result = await service.search_fields("x")
+    assert list(result["failed_cubes"]) == ["Broken"]
+    await service.search_fields("x")
+    assert state["schema_calls"].count("Broken") == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_table_batches_aggregates_and_isolates_bad_columns(mock_client):
+    """Test that aggregates are batched, a rejected batch is split and top values fetched."""
+    schema = {
+        "title": "Sales",
+        "tables": [
+            {
+                "name": "orders",
+                "columns": [
+                    {"name": "id", "type": 8},
+                    {"name": "status", "type": 18},
+                    {"name": "broken", "type": 18},
+                    {"name": "paid", "type": 2},
+                ],
+            }
+        ],
+    }
+    # (non-null, distinct, min, max) per column of a 10-row table
+    stats = {"id": (10, 10, 1, 10), "status": (8, 2, "closed", "open"), "paid": (10, 2)}
+    queries = []
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        if "query" not in params:
+            return schema
+        query = params["query"]
+        queries.append(query)
+        if "[broken]" in query:
+            request = httpx.Request("GET", "https://test.sisense.com/sql")
+            response = httpx.Response(400, text="Unsupported column", request=request)
+            raise httpx.HTTPStatusError("Bad request", request=request, response=response)
+        if "GROUP BY" in query:
+            return {"headers": ["status", "count"], "values": [["open", 5], ["closed", 3]]}
+        row = []
+        for function, distinct, column in re.findall(
+            r"(COUNT|MIN|MAX)\((DISTINCT )?(\[\w+\]|\*)\)", query
+        ):
+            if column == "*":
+                row.append(10)
+                continue
+            non_null, n_distinct, *bounds = stats[column.strip("[]")]
+            if function == "COUNT":
+                row.append(n_distinct if distinct else non_null)
+            else:
+                row.append(bounds[0] if function == "MIN" else bounds[1])
+        return {"headers": [f"c{i}" for i in range(len(row))], "values": [row]}
+
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(mock_client, cache=TTLCache())
+
+    result = await service.profile_table("Sales", "Orders", top_k=3, batch_size=2)
+
+    assert result["table"] == "orders"
+    assert result["row_count"] == 10
+    columns = result["columns"]
+    assert columns["id"] == {
+        "type": 8,
+        "kind": "numeric",
+        "non_null": 10,
+        "distinct": 10,
+        "min": 1,
+        "max": 10,
+        "nulls": 0,
+    }
+    assert columns["status"]["nulls"] == 2
+    assert columns["status"]["top_values"] == [
+        {"value": "open", "count": 5},
+        {"value": "closed", "count": 3},
+    ]
+    assert "min" not in columns["paid"]
+    assert columns["broken"]["error"] == "API Error 400: Unsupported column"
+    # Two batches, the failing one retried per column, then top values for status and paid
+    assert result["queries"] == len(queries) == 6
+    assert sum("GROUP BY" in query for query in queries) == 2
+
+    with pytest.raises(ValueError, match="Columns not found in 'orders': nope"):
+        await service.profile_table("Sales", "orders", columns=["id", "nope"])
+
+
+@pytest.mark.asyncio
+async def test_materialize_sql_loads_small_and_streamed_results(mock_client):
+    """Test that results are loaded into the local store, large ones row by row."""
+    from src.client.json_stream import ARRAY_START
+    from src.services import LocalStore
+
+    store = LocalStore()
+    service = ElastiCubeService(mock_client, stream_threshold_rows=100, local_store=store)
+    mock_client.get.return_value = {"headers": ["id", "name"], "values": [[1, "a"], [2, "b"]]}
+
+    small = await service.materialize_sql("Sales", "SELECT id, name FROM t", count=10)
+
+    assert small == {
+        "handle": small["handle"],
+        "table": "result",
+        "columns": ["id", "name"],
+        "row_count": 2,
+        "bytes": small["bytes"],
+        "datasource": "Sales",
+        "sql_query": "SELECT id, name FROM t",
+    }
+
+    async def items(*args, **kwargs):
+        yield "headers", ["n"]
+        yield "values", ARRAY_START
+        for i in range(2500):
+            yield "values", [i]
+
+    mock_client.stream_get = items
+    streamed = await service.materialize_sql("Sales", "SELECT n FROM t", count=5000)
+
+    assert streamed["row_count"] == 2500
+    result = await store.query(streamed["handle"], "SELECT COUNT(*), MAX(n) FROM result")
+    assert result["values"] == [[2500, 2499]]
+
+    with pytest.raises(ValueError, match="LOCAL_STORE_ENABLED"):
+        await ElastiCubeService(mock_client).materialize_sql("Sales", "SELECT 1")
+
+
+@pytest.mark.asyncio
+async def test_sample_sql_pushes_down_a_random_filter(mock_client):
+    """Test that the count probe and the random filter keep the transfer near k rows."""
+    queries = []
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        queries.append((params["query"], int(params["count"])))
+        if params["query"].startswith("SELECT COUNT(*)"):
+            return {"headers": ["n"], "values": [[1_000_000]]}
+        return {"headers": ["ID"], "values": [[i] for i in range(130)]}
+
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(mock_client)
+
+    result = await service.sample_sql("Sales", "SELECT ID FROM t", k=100, seed=1)
+
+    assert len(result["values"]) == 100
+    assert result["headers"] == ["ID"]
+    assert result["sampling"] == {
+        "method": "pushdown",
+        "probability": 150 / 1_000_000,
+        "k": 100,
+        "rows": 100,
+        "population": 1_000_000,
+        "complete": True,
+    }
+    assert queries[1] == (
+        "SELECT * FROM (SELECT ID FROM t) AS sample_source WHERE RAND() < 0.00015",
+        400,
+    )
+
+
+@pytest.mark.asyncio
+async def test_sample_sql_falls_back_to_a_streamed_reservoir(mock_client):
+    """Test that a rejected push-down switches the datasource to paged reservoir sampling."""
+    fake_get, state = paged_sql_backend(total_rows=230)
+    request = httpx.Request("GET", "https://test.sisense.com/sql")
+
+    async def rejecting_get(endpoint, params=None, timeout=None):
+        if "sample_source" in params["query"]:
+            response = httpx.Response(400, text="Unknown function RAND", request=request)
+            raise httpx.HTTPStatusError("Bad request", request=request, response=response)
+        return await fake_get(endpoint, params, timeout)
+
+    mock_client.get.side_effect = rejecting_get
+    service = ElastiCubeService(mock_client, page_size=50, max_concurrent_pages=3)
+
+    result = await service.sample_sql("Sales", "SELECT ID FROM t", k=20, seed=3)
+
+    assert len(result["values"]) == 20
+    assert len({row[0] for row in result["values"]}) == 20
+    assert result["sampling"] == {
+        "method": "reservoir",
+        "pages": 5,
+        "k": 20,
+        "rows": 20,
+        "population": 230,
+        "complete": True,
+    }
+    # The datasource is not offered the push-down again
+    state["calls"].clear()
+    capped = await service.sample_sql("Sales", "SELECT ID FROM t", k=20, max_scan_rows=100)
+    assert state["calls"] == [0, 50]
+    assert capped["sampling"]["complete"] is False
+    assert capped["sampling"]["population"] == 100
+
+    with pytest.raises(ValueError, match="Unknown method"):
+        await service.sample_sql("Sales", "SELECT ID FROM t", method="random")
+
+
+@pytest.mark.asyncio
+async def test_sample_sql_keeps_pushdown_after_a_query_error(mock_client):
+    """Test that a mistake in the sampled query does not switch off the push-down."""
+    request = httpx.Request("GET", "https://test.sisense.com/sql")
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        if "bogus" in params["query"]:
+            response = httpx.Response(400, text="Unknown column bogus", request=request)
+            raise httpx.HTTPStatusError("Bad request", request=request, response=response)
+        if params["query"].startswith("SELECT COUNT(*)"):
+            return {"headers": ["n"], "values": [[1_000_000]]}
+        return {"headers": ["ID"], "values": [[i] for i in range(130)]}
+
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(mock_client)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await service.sample_sql("Sales", "SELECT bogus FROM t", k=100)
+    result = await service.sample_sql("Sales", "SELECT ID FROM t", k=100)
+    assert result["sampling"]["method"] == "pushdown"
+
+
+def guarded_sql_backend(total_rows: int):
+    """Fake client.get answering COUNT(*) probes with ``total_rows`` and paging rows."""
+    queries = []
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        query, count, offset = params["query"], int(params["count"]), int(params["offset"])
+        queries.append((query, count, offset))
+        if query.startswith("SELECT COUNT(*) FROM ("):
+            return {"headers": ["n"], "values": [[total_rows]]}
+        return {
+            "headers": ["ID"],
+            "values": [[i] for i in range(offset, min(total_rows, offset + count))],
+        }
+
+    return fake_get, queries
+
+
+@pytest.mark.asyncio
+async def test_query_guard_limits_and_paginates_unbounded_queries(mock_client):
+    """Test that unbounded queries get a LIMIT for the window and large windows are paged."""
+    fake_get, queries = guarded_sql_backend(total_rows=230)
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(mock_client, query_guard=True, guard_paginate_rows=50, page_size=50)
+
+    result = await service.query_sql("Sales", "SELECT ID FROM t", count=20)
+    assert result["values"] == [[i] for i in range(20)]
+    assert list(result) == ["guard", "headers", "values"]
+    assert result["guard"]["action"] == "limit"
+    assert result["guard"]["estimated_rows"] == 230
+    assert queries == [
+        ("SELECT COUNT(*) FROM (SELECT ID FROM t) AS sample_source", 1, 0),
+        ("SELECT ID FROM t\nLIMIT 20", 20, 0),
+    ]
+
+    queries.clear()
+    paged = await service.query_sql("Sales", "SELECT ID FROM t", count=200)
+    assert paged["values"] == [[i] for i in range(200)]
+    assert paged["guard"]["action"] == "paginate"
+    assert paged["pagination"]["pages"] == 4
+    assert {query for query, _, _ in queries[1:]} == {"SELECT ID FROM t\nLIMIT 200"}
+
+    # The result ends within the window: nothing to cut short
+    tail = await service.query_sql("Sales", "SELECT ID FROM t", count=40, offset=200)
+    assert tail["values"] == [[i] for i in range(200, 230)]
+    assert tail["guard"]["action"] == "allow"
+    assert tail["guard"]["sql_query"] == "SELECT ID FROM t"
+
+    # Bounded queries are sent as they are, without a probe
+    queries.clear()
+    bounded = await service.query_sql("Sales", "SELECT TOP 5 ID FROM t", count=20)
+    assert "guard" not in bounded
+    assert queries == [("SELECT TOP 5 ID FROM t", 20, 0)]
+
+
+@pytest.mark.asyncio
+async def test_query_guard_rejects_huge_results_and_skips_unsupported_probes(mock_client):
+    """Test rejection above guard_reject_rows and the fallback when probes fail."""
+    fake_get, queries = guarded_sql_backend(total_rows=5_000_000)
+    request = httpx.Request("GET", "https://test.sisense.com/sql")
+
+    async def probe_rejecting_get(endpoint, params=None, timeout=None):
+        if "bogus" in params["query"]:
+            response = httpx.Response(400, text="Unknown column bogus", request=request)
+            raise httpx.HTTPStatusError("Bad request", request=request, response=response)
+        if "Legacy" in endpoint and "sample_source" in params["query"]:
+            response = httpx.Response(400, text="Subqueries not supported", request=request)
+            raise httpx.HTTPStatusError("Bad request", request=request, response=response)
+        return await fake_get(endpoint, params, timeout)
+
+    mock_client.get.side_effect = probe_rejecting_get
+    service = ElastiCubeService(mock_client, query_guard=True, guard_reject_rows=1_000_000)
+
+    with pytest.raises(ValueError, match="Query rejected: .*5000000 rows"):
+        await service.query_sql("Sales", "SELECT ID FROM t", count=5_000_000)
+    assert len(queries) == 1
+
+    # A mistake in the query fails the probe too, but is the user's error
+    with pytest.raises(httpx.HTTPStatusError):
+        await service.query_sql("Sales", "SELECT ID FROM t WHERE bogus = 1", count=10)
+    result = await service.query_sql("Sales", "SELECT ID FROM t", count=10)
+    assert result["guard"]["estimated_rows"] == 5_000_000
+
+    # Without a probe the requested count is all the guard knows
+    queries.clear()
+    result = await service.query_sql("Legacy", "SELECT ID FROM t", count=10)
+    # Checking that the query itself runs does not send it unbounded
+    assert queries[0] == ("SELECT ID FROM t\nLIMIT 1", 1, 0)
+    assert result["guard"]["estimated_rows"] is None
+    assert result["guard"]["action"] == "limit"
+    queries.clear()
+    await service.query_sql("Legacy", "SELECT ID FROM t", count=10, offset=10)
+    assert queries == [("SELECT ID FROM t\nLIMIT 20", 10, 10)]
+    with pytest.raises(ValueError, match="Query rejected"):
+        await service.query_sql("Legacy", "SELECT ID FROM t", count=2_000_000)
+
+
+@pytest.mark.asyncio
+async def test_sample_sql_pushdown_is_bounded_by_the_scan_budget(mock_client):
+    """Test that a push-down may exceed a page but falls back above max_scan_rows."""
+    fake_get, state = paged_sql_backend(total_rows=120)
+    population = {"n": 120}
+    requested = []
+
+    async def counting_get(endpoint, params=None, timeout=None):
+        if params["query"].startswith("SELECT COUNT(*)"):
+            return {"headers": ["n"], "values": [[population["n"]]]}
+        requested.append((int(params["count"]), "RAND()" in params["query"]))
+        return await fake_get(endpoint, params, timeout)
+
+    mock_client.get.side_effect = counting_get
+    service = ElastiCubeService(mock_client, page_size=50, sample_max_scan_rows=1000)
+
+    # The filter would keep every row
+    result = await service.sample_sql("Sales", "SELECT ID FROM t", k=100)
+    assert result["sampling"]["method"] == "reservoir"
+    assert result["sampling"]["population"] == 120
+    assert len(result["values"]) == 100
+    assert all(not filtered for _, filtered in requested)
+
+    # One filtered request of more than a page
+    population["n"] = 1_000_000
+    requested.clear()
+    result = await service.sample_sql("Sales", "SELECT ID FROM t", k=100, refresh=True)
+    assert result["sampling"]["method"] == "pushdown"
+    assert requested == [(400, True)]
+
+    # The filtered result may exceed the scan budget: read in pages instead
+    requested.clear()
+    result = await service.sample_sql("Sales", "SELECT ID FROM t", k=100, max_scan_rows=300)
+    assert result["sampling"]["method"] == "reservoir"
+    assert max(count for count, _ in requested) == 50
+    assert all(not filtered for _, filtered in requested)
+
+
+@pytest.mark.asyncio
+async def test_sample_sql_reservoir_scan_is_guarded(mock_client):
+    """Test that the reservoir scan goes through the query guard."""
+    fake_get, queries = guarded_sql_backend(total_rows=5_000)
+    mock_client.get.side_effect = fake_get
+    service = ElastiCubeService(
+        mock_client, page_size=100, sample_max_scan_rows=300, query_guard=True
+    )
+
+    result = await service.sample_sql("Sales", "SELECT ID FROM t", k=10, method="reservoir")
+
+    assert result["guard"]["action"] == "limit"
+    assert result["sampling"]["complete"] is False
+    scans = [query for query, _, _ in queries if not query.startswith("SELECT COUNT(*)")]
+    assert scans == ["SELECT ID FROM t\nLIMIT 300"] * 3
+
+    service.guard_reject_rows = 100
+    with pytest.raises(ValueError, match="Query rejected"):
+        await service.sample_sql("Sales", "SELECT ID FROM t", k=10, method="reservoir")
@@ -13,11 +13,14 @@ def test_get_elasticube_tools():
     """Test that all ElastiCube tools are defined."""
     tools = get_elasticube_tools()
 
-    assert len(tools) == 3
+    assert len(tools) == 6
     tool_names = [tool.name for tool in tools]
     assert "list_elasticubes" in tool_names
     assert "get_elasticube_schema" in tool_names
     assert "query_elasticube" in tool_names
+    assert "query_elasticube_batch" in tool_names
+    assert "profile_table" in tool_names
+    assert "search_fields" in tool_names
 
 
 @pytest.mark.asyncio
@@ -73,7 +76,45 @@ async def test_handle_get_elasticube_schema(elasticube_service):
     assert data == mock_schema
     assert "datasets" in data
     assert "relations" in data
-    elasticube_service.get_schema.assert_called_once_with("Sales Data Model")
+    elasticube_service.get_schema.assert_called_once_with("Sales Data Model", refresh=False)
+
+
+@pytest.mark.asyncio
+async def test_handle_get_elasticube_schema_modes(elasticube_service):
+    """Test the table and columns modes of get_elasticube_schema."""
+    elasticube_service.get_table_schema = AsyncMock(return_value={"name": "brands"})
+    elasticube_service.get_columns_summary = AsyncMock(return_value={"tables": {}})
+
+    result = await handle_elasticube_tool(
+        "get_elasticube_schema",
+        {"elasticube_name": "Sales Data Model", "table": "brands"},
+        elasticube_service,
+    )
+    assert json.loads(result[0].text) == {"name": "brands"}
+    elasticube_service.get_table_schema.assert_called_once_with(
+        "Sales Data Model", "brands", refresh=False
+    )
+
+    result = await handle_elasticube_tool(
+        "get_elasticube_schema",
+        {"elasticube_name": "Sales Data Model", "mode": "columns", "refresh": True},
+        elasticube_service,
+    )
+    assert json.loads(result[0].text) == {"tables": {}}
+    elasticube_service.get_columns_summary.assert_called_once_with("Sales Data Model", refresh=True)
+
+    with pytest.raises(ValueError, match="mode .table.: table"):
+        await handle_elasticube_tool(
+            "get_elasticube_schema",
+            {"elasticube_name": "Sales Data Model", "mode": "table"},
+            elasticube_service,
+        )
+    with pytest.raises(ValueError, match="Unknown mode"):
+        await handle_elasticube_tool(
+            "get_elasticube_schema",
+            {"elasticube_name": "Sales Data Model", "mode": "everything"},
+            elasticube_service,
+        )
 
 
 @pytest.mark.asyncio
@@ -121,6 +162,7 @@ async def test_handle_query_elasticube(elasticube_service):
         sql_query="SELECT * FROM brands LIMIT 10",
         count=5000,
         offset=0,
+        refresh=False,
     )
 
 
@@ -140,12 +182,17 @@ async def test_handle_query_elasticube_with_pagination(elasticube_service):
             "sql_query": "SELECT * FROM brands",
             "count": 100,
             "offset": 50,
+            "refresh": True,
         },
         elasticube_service,
     )
 
     elasticube_service.query_sql.assert_called_once_with(
-        datasource="Sales Data Model", sql_query="SELECT * FROM brands", count=100, offset=50
+        datasource="Sales Data Model",
+        sql_query="SELECT * FROM brands",
+        count=100,
+        offset=50,
+        refresh=True,
     )
 
 
@@ -191,3 +238,442 @@ async def test_handle_unknown_tool(elasticube_service):
     """Test tool handler with unknown tool name."""
     with pytest.raises(ValueError, match="Unknown ElastiCube tool"):
         await handle_elasticube_tool("unknown_tool", {}, elasticube_service)
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_streams_large_counts(elasticube_service, mock_client):
+    """Test that large counts use the streaming path and produce equivalent JSON."""
+    from src.client.json_stream import ARRAY_START
+
+    async def items(*args, **kwargs):
+        yield "headers", ["BRAND_ID", "BRAND_NAME"]
+        yield "values", ARRAY_START
+        yield "values", [1, "Brand A"]
+        yield "values", [2, "Brand B"]
+        yield "metadata", {"rowCount": 2}
+
+    mock_client.stream_get = items
+    elasticube_service.query_sql = AsyncMock()
+
+    result = await handle_elasticube_tool(
+        "query_elasticube",
+        {"datasource": "Sales Data Model", "sql_query": "SELECT * FROM brands", "count": 50000},
+        elasticube_service,
+    )
+
+    assert json.loads(result[0].text) == {
+        "headers": ["BRAND_ID", "BRAND_NAME"],
+        "values": [[1, "Brand A"], [2, "Brand B"]],
+        "metadata": {"rowCount": 2},
+    }
+    elasticube_service.query_sql.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_streams_empty_result(elasticube_service, mock_client):
+    """Test the streaming path with an empty row array."""
+    from src.client.json_stream import ARRAY_START
+
+    async def items(*args, **kwargs):
+        yield "headers", ["BRAND_ID"]
+        yield "values", ARRAY_START
+
+    mock_client.stream_get = items
+
+    result = await handle_elasticube_tool(
+        "query_elasticube",
+        {"datasource": "Sales Data Model", "sql_query": "SELECT * FROM brands", "count": 50000},
+        elasticube_service,
+    )
+
+    assert json.loads(result[0].text) == {"headers": ["BRAND_ID"], "values": []}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [100, 50000])
+async def test_handle_query_elasticube_csv_reports_the_guard(
+    elasticube_service, mock_client, count
+):
+    """Test that delimited output keeps the guard decision ahead of the rows."""
+    from src.client.json_stream import ARRAY_START
+
+    async def items(endpoint, params=None, **kwargs):
+        yield "headers", ["BRAND_ID"]
+        yield "values", ARRAY_START
+        yield "values", [1]
+
+    mock_client.get.side_effect = [
+        {"headers": ["n"], "values": [[2_000_000]]},
+        {"headers": ["BRAND_ID"], "values": [[1]]},
+    ]
+    mock_client.stream_get = items
+    elasticube_service.query_guard = True
+
+    result = await handle_elasticube_tool(
+        "query_elasticube",
+        {
+            "datasource": "Sales",
+            "sql_query": "SELECT * FROM brands",
+            "count": count,
+            "output_format": "csv",
+        },
+        elasticube_service,
+    )
+
+    summary, *table = result[0].text.splitlines()
+    assert summary.startswith("# guard: ")
+    guard = json.loads(summary.removeprefix("# guard: "))
+    assert guard["action"] == "limit"
+    assert guard["estimated_rows"] == 2_000_000
+    assert table == ["BRAND_ID", "1"]
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_streams_guarded_query(elasticube_service, mock_client):
+    """Test that a streamed unbounded query is sent with a LIMIT and reports the guard."""
+    from src.client.json_stream import ARRAY_START
+
+    streamed = []
+
+    async def items(endpoint, params=None, **kwargs):
+        streamed.append(params["query"])
+        yield "headers", ["BRAND_ID"]
+        yield "values", ARRAY_START
+        yield "values", [1]
+
+    mock_client.get.return_value = {"headers": ["n"], "values": [[2_000_000]]}
+    mock_client.stream_get = items
+    elasticube_service.query_guard = True
+
+    result = await handle_elasticube_tool(
+        "query_elasticube",
+        {"datasource": "Sales", "sql_query": "SELECT * FROM brands", "count": 50000},
+        elasticube_service,
+    )
+
+    output = json.loads(result[0].text)
+    assert list(output) == ["guard", "headers", "values"]
+    assert output["guard"]["action"] == "limit"
+    assert output["guard"]["estimated_rows"] == 2_000_000
+    assert streamed == ["SELECT * FROM brands\nLIMIT 50000"]
+    with pytest.raises(ValueError, match="Query rejected"):
+        await handle_elasticube_tool(
+            "query_elasticube",
+            {"datasource": "Sales", "sql_query": "SELECT * FROM brands", "count": 1_500_000},
+            elasticube_service,
+        )
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_auto_paginate(elasticube_service):
+    """Test that auto_paginate is forwarded to the service."""
+    elasticube_service.query_sql = AsyncMock(return_value={"values": [], "pagination": {}})
+
+    await handle_elasticube_tool(
+        "query_elasticube",
+        {
+            "datasource": "Sales Data Model",
+            "sql_query": "SELECT * FROM brands",
+            "count": 50000,
+            "auto_paginate": True,
+            "max_concurrency": 8,
+        },
+        elasticube_service,
+    )
+
+    elasticube_service.query_sql.assert_called_once_with(
+        datasource="Sales Data Model",
+        sql_query="SELECT * FROM brands",
+        count=50000,
+        offset=0,
+        auto_paginate=True,
+        page_size=None,
+        max_concurrency=8,
+        refresh=False,
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_output_format(elasticube_service):
+    """Test that output_format selects the result encoding."""
+    elasticube_service.query_sql = AsyncMock(
+        return_value={"headers": ["ID", "NAME"], "values": [[1, "a"], [2, "b"]]}
+    )
+
+    result = await handle_elasticube_tool(
+        "query_elasticube",
+        {"datasource": "Sales", "sql_query": "SELECT * FROM t", "output_format": "csv"},
+        elasticube_service,
+    )
+
+    assert result[0].text == "ID,NAME\n1,a\n2,b\n"
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_unknown_output_format(elasticube_service):
+    """Test that an unknown output_format is rejected before querying."""
+    elasticube_service.query_sql = AsyncMock()
+
+    with pytest.raises(ValueError, match="Unknown output_format"):
+        await handle_elasticube_tool(
+            "query_elasticube",
+            {"datasource": "Sales", "sql_query": "SELECT 1", "output_format": "xml"},
+            elasticube_service,
+        )
+    elasticube_service.query_sql.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_handle_search_fields(elasticube_service):
+    """Test that search_fields forwards its arguments."""
+    elasticube_service.search_fields = AsyncMock(return_value={"query": "id", "matches": []})
+
+    result = await handle_elasticube_tool(
+        "search_fields", {"query": "id", "cube": "Sales", "limit": 5}, elasticube_service
+    )
+
+    assert json.loads(result[0].text) == {"query": "id", "matches": []}
+    elasticube_service.search_fields.assert_called_once_with(
+        "id", limit=5, cube="Sales", refresh=False
+    )
+    with pytest.raises(ValueError, match="query"):
+        await handle_elasticube_tool("search_fields", {}, elasticube_service)
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_batch(elasticube_service, mock_client):
+    """Test that batch results and per-query errors are returned in order."""
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        if "Broken" in endpoint:
+            raise httpx.HTTPStatusError(
+                "500",
+                request=httpx.Request("GET", f"https://test.com{endpoint}"),
+                response=httpx.Response(500, text="cube is down"),
+            )
+        if "missing" in params["query"]:
+            return {"error": True, "details": "Table missing not found"}
+        return {"headers": ["n"], "values": [[int(params["count"])]]}
+
+    mock_client.get.side_effect = fake_get
+
+    result = await handle_elasticube_tool(
+        "query_elasticube_batch",
+        {
+            "queries": [
+                {"datasource": "Sales", "sql_query": "SELECT COUNT(*) FROM orders", "count": 1},
+                {"datasource": "Broken", "sql_query": "SELECT 1"},
+                {"datasource": "Sales", "sql_query": "SELECT * FROM missing"},
+                {"datasource": "Sales", "sql_query": "SELECT MAX(x) FROM orders"},
+            ],
+            "output_format": "compact",
+        },
+        elasticube_service,
+    )
+
+    data = json.loads(result[0].text)
+    assert (data["succeeded"], data["failed"]) == (2, 2)
+    first, broken, missing, last = data["results"]
+    assert first == {
+        "datasource": "Sales",
+        "sql_query": "SELECT COUNT(*) FROM orders",
+        "result": {"headers": ["n"], "values": [[1]]},
+    }
+    assert "API Error 500" in broken["error"] and "cube is down" in broken["error"]
+    assert "Table missing not found" in missing["error"]
+    assert last["result"]["values"] == [[1000]]
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_batch_invalid_counts(elasticube_service, mock_client):
+    """Test that a query with a bad count fails on its own, without being sent."""
+    mock_client.get.return_value = {"headers": ["n"], "values": [[1]]}
+
+    result = await handle_elasticube_tool(
+        "query_elasticube_batch",
+        {
+            "queries": [
+                {"datasource": "Sales", "sql_query": "SELECT 1", "count": "10"},
+                {"datasource": "Sales", "sql_query": "SELECT 2", "count": 5},
+                {"datasource": "Sales", "sql_query": "SELECT 3", "count": 0},
+                {"datasource": "Sales", "sql_query": "SELECT 4", "count": True},
+            ],
+        },
+        elasticube_service,
+    )
+
+    data = json.loads(result[0].text)
+    assert (data["succeeded"], data["failed"]) == (1, 3)
+    text, valid, zero, flag = data["results"]
+    assert text["error"] == "count must be a positive integer, got '10'"
+    assert valid["result"]["values"] == [[1]]
+    assert zero["error"] == "count must be a positive integer, got 0"
+    assert flag["error"] == "count must be a positive integer, got True"
+    assert mock_client.get.await_count == 1
+
+    elasticube_service.query_sql_batch = AsyncMock()
+    result = await handle_elasticube_tool(
+        "query_elasticube_batch",
+        {"queries": [{"datasource": "Sales", "sql_query": "SELECT 1", "count": -1}]},
+        elasticube_service,
+    )
+    assert json.loads(result[0].text)["failed"] == 1
+    elasticube_service.query_sql_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "arguments, message",
+    [
+        ({}, "Missing required argument: queries"),
+        ({"queries": [{"datasource": "Sales"}]}, "Query 0 needs datasource and sql_query"),
+        ({"queries": [{"datasource": "S", "sql_query": "SELECT 1"}] * 51}, "Too many queries"),
+        (
+            {"queries": [{"datasource": "S", "sql_query": "SELECT 1", "count": 50000}]},
+            "use query_elasticube",
+        ),
+        (
+            {"queries": [{"datasource": "S", "sql_query": "SELECT 1"}], "output_format": "csv"},
+            "Unknown output_format",
+        ),
+    ],
+)
+async def test_handle_query_elasticube_batch_invalid_arguments(
+    elasticube_service, arguments, message
+):
+    """Test that malformed batches are rejected before any query runs."""
+    elasticube_service.query_sql_batch = AsyncMock()
+
+    with pytest.raises(ValueError, match=message):
+        await handle_elasticube_tool("query_elasticube_batch", arguments, elasticube_service)
+    elasticube_service.query_sql_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_handle_profile_table(elasticube_service):
+    """Test that profile_table forwards its arguments and validates them."""
+    profile = {"cube": "Sales", "table": "orders", "row_count": 3, "queries": 1, "columns": {}}
+    elasticube_service.profile_table = AsyncMock(return_value=profile)
+
+    result = await handle_elasticube_tool(
+        "profile_table",
+        {"elasticube_name": "Sales", "table": "orders", "columns": ["id"], "top_k": 0},
+        elasticube_service,
+    )
+
+    assert json.loads(result[0].text) == profile
+    elasticube_service.profile_table.assert_called_once_with(
+        "Sales",
+        "orders",
+        columns=["id"],
+        top_k=0,
+        batch_size=10,
+        max_concurrency=None,
+        refresh=False,
+    )
+    with pytest.raises(ValueError, match="elasticube_name and table"):
+        await handle_elasticube_tool("profile_table", {"table": "orders"}, elasticube_service)
+    with pytest.raises(ValueError, match="columns must be a list"):
+        await handle_elasticube_tool(
+            "profile_table",
+            {"elasticube_name": "Sales", "table": "orders", "columns": "id"},
+            elasticube_service,
+        )
+
+
+@pytest.mark.asyncio
+async def test_materialize_then_query_local(mock_client):
+    """Test that a materialized result is re-queried without another request."""
+    from src.services import ElastiCubeService, LocalStore
+    from src.tools.local_tools import handle_local_tool
+
+    store = LocalStore()
+    service = ElastiCubeService(mock_client, local_store=store)
+    mock_client.get.return_value = {
+        "headers": ["region", "amount"],
+        "values": [["north", 10], ["south", 5], ["north", 7]],
+    }
+
+    result = await handle_elasticube_tool(
+        "query_elasticube",
+        {"datasource": "Sales", "sql_query": "SELECT region, amount FROM t", "materialize": True},
+        service,
+    )
+    handle = json.loads(result[0].text)["handle"]
+
+    result = await handle_local_tool(
+        "query_local",
+        {
+            "handle": handle,
+            "sql_query": "SELECT region, SUM(amount) FROM result GROUP BY region",
+            "output_format": "csv",
+        },
+        store,
+    )
+
+    assert result[0].text.splitlines() == ["region,SUM(amount)", "north,17", "south,5"]
+    assert mock_client.get.await_count == 1
+    with pytest.raises(ValueError, match="handle and sql_query"):
+        await handle_local_tool("query_local", {"handle": handle}, store)
+    with pytest.raises(ValueError, match="LOCAL_STORE_ENABLED"):
+        await handle_local_tool("query_local", {"handle": handle, "sql_query": "SELECT 1"}, None)
+    for count in (0, -5, "10", True):
+        with pytest.raises(ValueError, match="count must be a positive integer"):
+            await handle_local_tool(
+                "query_local", {"handle": handle, "sql_query": "SELECT 1", "count": count}, store
+            )
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_sample_defaults_push_down(elasticube_service, mock_client):
+    """Test that sample=true with default arguments has Sisense filter the rows."""
+    requests = []
+
+    async def fake_get(endpoint, params=None, timeout=None):
+        requests.append((params["query"], int(params["count"])))
+        if params["query"].startswith("SELECT COUNT(*)"):
+            return {"headers": ["n"], "values": [[10_000_000]]}
+        return {"headers": ["ID"], "values": [[i] for i in range(5200)]}
+
+    mock_client.get.side_effect = fake_get
+
+    result = await handle_elasticube_tool(
+        "query_elasticube",
+        {"datasource": "Sales", "sql_query": "SELECT ID FROM t", "sample": True},
+        elasticube_service,
+    )
+
+    assert json.loads(result[0].text)["sampling"]["method"] == "pushdown"
+    assert len(requests) == 2
+    assert "RAND()" in requests[1][0]
+    assert requests[1][1] > elasticube_service.page_size
+
+
+@pytest.mark.asyncio
+async def test_handle_query_elasticube_sample(elasticube_service):
+    """Test that sample mode asks the service for count random rows."""
+    sample = {"headers": ["ID"], "values": [[7]], "sampling": {"method": "pushdown"}}
+    elasticube_service.sample_sql = AsyncMock(return_value=sample)
+
+    result = await handle_elasticube_tool(
+        "query_elasticube",
+        {"datasource": "Sales", "sql_query": "SELECT ID FROM t", "count": 1, "sample": True},
+        elasticube_service,
+    )
+
+    assert json.loads(result[0].text) == sample
+    elasticube_service.sample_sql.assert_called_once_with(
+        datasource="Sales",
+        sql_query="SELECT ID FROM t",
+        k=1,
+        method="auto",
+        page_size=None,
+        max_concurrency=None,
+        refresh=False,
+    )
+    with pytest.raises(ValueError, match="cannot be combined"):
+        await handle_elasticube_tool(
+            "query_elasticube",
+            {"datasource": "S", "sql_query": "SELECT 1", "sample": True, "materialize": True},
+            elasticube_service,
+        )
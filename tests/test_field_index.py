@@ -0,0 +1,89 @@
+"""Tests for FieldIndex."""
+
+from src.services import SchemaIndex
+from src.services.field_index import FieldIndex, name_tokens
+
+
+def schema(*tables: tuple[str, list[str]]) -> SchemaIndex:
+    return SchemaIndex.from_schema(
+        {
+            "tables": [
+                {"name": t, "columns": [{"name": c, "type": 8} for c in cols]} for t, cols in tables
+            ]
+        }
+    )
+
+
+def make_index() -> FieldIndex:
+    index = FieldIndex()
+    index.set_cube("Sales", schema(("orders", ["OrderID", "customer_id", "order_date"])), "v1")
+    index.set_cube("CRM", schema(("Customers", ["CustomerID", "Name"])), "v1")
+    return index
+
+
+def test_name_tokens():
+    """Test splitting on separators and camelCase boundaries."""
+    assert name_tokens("customer_id") == ["customer", "id"]
+    assert name_tokens("CustomerID") == ["customer", "id"]
+    assert name_tokens("Customer ID") == ["customer", "id"]
+    assert name_tokens("HTTPServerName2") == ["http", "server", "name", "2"]
+    assert name_tokens("CódigoCliente") == ["código", "cliente"]
+    assert name_tokens("Código_Cliente") == ["código", "cliente"]
+    assert name_tokens("Straße Nr") == name_tokens("STRASSE NR") == ["strasse", "nr"]
+    assert name_tokens("客户ID") == ["客户", "id"]
+    # Decomposed accents tokenize like composed ones
+    assert name_tokens("Cafe\u0301") == ["café"]
+
+
+def test_search_finds_non_ascii_names():
+    """Test that accented and non-Latin table and column names are searchable."""
+    index = FieldIndex()
+    index.set_cube("Ventas", schema(("Pedidos", ["Código_Cliente", "Año", "客户名称"])), "v1")
+
+    assert [m["column"] for m in index.search("código cliente")][:1] == ["Código_Cliente"]
+    assert [m["column"] for m in index.search("año")][:1] == ["Año"]
+    assert [m["column"] for m in index.search("客户名称")][:1] == ["客户名称"]
+
+
+def test_search_matches_across_spellings_and_cubes():
+    """Test that token matches find the same field under different spellings."""
+    index = make_index()
+
+    matches = index.search("customer_id")
+    assert [(m["cube"], m.get("column")) for m in matches[:2]] == [
+        ("CRM", "CustomerID"),
+        ("Sales", "customer_id"),
+    ]
+    assert matches[0]["table"] == "Customers"
+    assert matches[0]["type"] == 8
+
+
+def test_search_prefix_and_trigram_matching():
+    """Test prefix tokens and misspellings."""
+    index = make_index()
+
+    assert index.search("cust")[0]["table"] == "Customers"
+    assert index.search("ordr date")[0]["column"] == "order_date"
+    assert index.search("zzz") == []
+
+
+def test_search_filters_and_limits():
+    """Test the cube filter and result limit."""
+    index = make_index()
+
+    assert {m["cube"] for m in index.search("id", cube="Sales")} == {"Sales"}
+    assert len(index.search("id", limit=1)) == 1
+
+
+def test_set_cube_replaces_and_remove_cube_drops_entries():
+    """Test that re-indexing a cube replaces its postings."""
+    index = make_index()
+    index.set_cube("Sales", schema(("invoices", ["invoice_no"])), "v2")
+
+    assert index.search("order_date") == []
+    assert index.search("invoice")[0]["cube"] == "Sales"
+    assert index.versions["Sales"] == "v2"
+
+    index.remove_cube("CRM")
+    assert index.cubes == ["Sales"]
+    assert index.stats()["fields"] == 2
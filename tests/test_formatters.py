@@ -0,0 +1,142 @@
+"""Tests for tool result output formats."""
+
+import json
+
+import pytest
+
+from src.client.json_stream import ARRAY_START
+from src.services.elasticube_service import SqlResultStream
+from src.tools.formatters import format_result, format_result_stream
+
+LIST_RESULT = {
+    "headers": ["ID", "BRAND"],
+    "values": [[1, "Brand A"], [2, None], [3, "Brand, C"]],
+    "metadata": {"rowCount": 3},
+}
+DICT_RESULT = {
+    "rows": [{"BRAND_ID": 1, "BRAND_NAME": "Brand A"}, {"BRAND_ID": 2, "BRAND_NAME": "Brand B"}],
+    "metadata": {"rowCount": 2},
+}
+
+
+def make_stream(result: dict) -> SqlResultStream:
+    async def items():
+        for key, value in result.items():
+            if key in ("values", "rows"):
+                yield key, ARRAY_START
+                for row in value:
+                    yield key, row
+            else:
+                yield key, value
+
+    return SqlResultStream(items())
+
+
+def test_json_and_compact():
+    """Test that json is indented and compact is minified, both round-tripping."""
+    assert format_result(LIST_RESULT, "json") == json.dumps(LIST_RESULT, indent=2)
+    compact = format_result(LIST_RESULT, "compact")
+    assert " " not in compact.replace("Brand ", "").replace("Brand, ", "")
+    assert json.loads(compact) == LIST_RESULT
+
+
+def test_columnar_from_list_rows():
+    """Test columnar output keeps other members and drops the row-oriented copy."""
+    data = json.loads(format_result(LIST_RESULT, "columnar"))
+
+    assert data == {
+        "columns": ["ID", "BRAND"],
+        "row_count": 3,
+        "data": [[1, 2, 3], ["Brand A", None, "Brand, C"]],
+        "metadata": {"rowCount": 3},
+    }
+
+
+def test_columnar_from_dict_rows():
+    """Test columnar output for rows keyed by column name."""
+    data = json.loads(format_result(DICT_RESULT, "columnar"))
+
+    assert data["columns"] == ["BRAND_ID", "BRAND_NAME"]
+    assert data["data"] == [[1, 2], ["Brand A", "Brand B"]]
+
+
+def test_columnar_dictionary_encoding():
+    """Test that low-cardinality string columns are dictionary encoded."""
+    result = {
+        "headers": ["ID", "REGION"],
+        "values": [[i, ["North", "South", None][i % 3]] for i in range(12)],
+    }
+    data = json.loads(format_result(result, "columnar", dictionary_encode=True))
+
+    assert data["data"][0] == list(range(12))  # numeric columns are left alone
+    region = data["data"][1]
+    assert region["dictionary"] == ["North", "South"]
+    assert region["codes"][:3] == [0, 1, None]
+
+
+@pytest.mark.parametrize("output_format,delimiter", [("csv", ","), ("tsv", "\t")])
+def test_csv_and_tsv(output_format, delimiter):
+    """Test delimited output with quoting and empty cells for nulls."""
+    text = format_result(LIST_RESULT, output_format)
+    lines = text.splitlines()
+
+    assert lines[0] == f"ID{delimiter}BRAND"
+    assert lines[1] == f"1{delimiter}Brand A"
+    assert lines[2] == f"2{delimiter}"
+    expected = '3,"Brand, C"' if output_format == "csv" else "3\tBrand, C"
+    assert lines[3] == expected
+
+
+def test_csv_leads_with_result_summaries():
+    """Test that guard, pagination and sampling members survive delimited output."""
+    result = {
+        **LIST_RESULT,
+        "guard": {"action": "limit", "limit": 3},
+        "pagination": {"complete": False, "next_offset": 3},
+    }
+    lines = format_result(result, "tsv").splitlines()
+
+    assert lines[:2] == [
+        '# guard: {"action":"limit","limit":3}',
+        '# pagination: {"complete":false,"next_offset":3}',
+    ]
+    assert lines[2] == "ID\tBRAND"
+    assert not any(line.startswith("# metadata") for line in lines)
+
+
+def test_non_tabular_results_fall_back_to_compact_json():
+    """Test that non-SQL results are emitted as compact JSON."""
+    assert format_result([{"a": 1}], "csv") == '[{"a":1}]'
+
+
+def test_unknown_format():
+    """Test that unknown formats are rejected."""
+    with pytest.raises(ValueError, match="Unknown output_format"):
+        format_result(LIST_RESULT, "xml")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("output_format", ["json", "compact", "columnar", "csv", "tsv"])
+@pytest.mark.parametrize("result", [LIST_RESULT, DICT_RESULT])
+async def test_stream_matches_materialized(output_format, result):
+    """Test that streamed encodings are the text of encoding the materialized result."""
+    streamed = await format_result_stream(make_stream(result), output_format)
+
+    assert streamed == format_result(result, output_format)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("output_format", ["json", "compact"])
+@pytest.mark.parametrize(
+    "result",
+    [
+        {"headers": ["ID"], "values": []},
+        {"values": [[1]], "nested": {"a": [1, {"b": None}], "c": {}}},
+        {},
+    ],
+)
+async def test_stream_matches_materialized_edge_cases(output_format, result):
+    """Test empty row arrays, trailing nested members and empty results."""
+    streamed = await format_result_stream(make_stream(result), output_format)
+
+    assert streamed == format_result(result, output_format)
@@ -0,0 +1,133 @@
+"""Tests for the streamable HTTP transport."""
+
+import contextlib
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+import pytest
+
+from src import runtime
+from src.config import Settings
+from src.http_transport import build_http_app, security_settings
+
+HEADERS = {"Accept": "application/json, text/event-stream", "Host": "127.0.0.1:8000"}
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1"},
+    },
+}
+
+
+def make_settings(**overrides) -> Settings:
+    return Settings(
+        sisense_base_url="https://test.sisense.com",
+        sisense_api_token="test_token",
+        mcp_http_json_response=True,
+        **overrides,
+    )
+
+
+@pytest.fixture
+def shared_runtime(monkeypatch):
+    """A mocked shared runtime whose cube list is served by one service."""
+    service = MagicMock()
+    service.list_elasticubes = AsyncMock(return_value=[{"title": "Sales", "type": "extract"}])
+    shared = MagicMock(elasticube_service=service, metrics=None, tracer=None)
+    shared.client.aclose = AsyncMock()
+    shared.instances = {"default": MagicMock(client=shared.client)}
+    monkeypatch.setattr(runtime, "_runtime", shared)
+    return shared
+
+
+@contextlib.asynccontextmanager
+async def serve(settings: Settings):
+    """Run the app's lifespan and yield an httpx client bound to the app."""
+    http_app = build_http_app(settings)
+    starlette_app = getattr(http_app, "app", http_app)  # unwrap BearerAuth
+    async with starlette_app.router.lifespan_context(starlette_app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=http_app), base_url="http://127.0.0.1:8000"
+        ) as client:
+            yield client
+
+
+async def open_session(client: httpx.AsyncClient, headers: dict | None = None) -> str:
+    headers = {**HEADERS, **(headers or {})}
+    response = await client.post("/mcp", json=INITIALIZE, headers=headers)
+    assert response.status_code == 200
+    session_id = response.headers["mcp-session-id"]
+    await client.post(
+        "/mcp",
+        json={"jsonrpc": "2.0", "method": "notifications/initialized"},
+        headers={**headers, "mcp-session-id": session_id},
+    )
+    return session_id
+
+
+async def call_tool(client: httpx.AsyncClient, session_id: str, name: str) -> dict:
+    response = await client.post(
+        "/mcp",
+        json={"jsonrpc": "2.0", "id": 2, "method": "tools/call", "params": {"name": name}},
+        headers={**HEADERS, "mcp-session-id": session_id, "mcp-protocol-version": "2025-06-18"},
+    )
+    assert response.status_code == 200
+    return response.json()["result"]
+
+
+@pytest.mark.asyncio
+async def test_sessions_share_the_runtime(shared_runtime):
+    """Test that concurrent sessions get their own ids but one client and services."""
+    async with serve(make_settings()) as client:
+        first = await open_session(client)
+        second = await open_session(client)
+        assert first != second
+
+        for session_id in (first, second):
+            result = await call_tool(client, session_id, "list_elasticubes")
+            assert json.loads(result["content"][0]["text"])[0]["title"] == "Sales"
+        assert shared_runtime.elasticube_service.list_elasticubes.await_count == 2
+    # The shared connection pool is closed on shutdown
+    shared_runtime.client.aclose.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_bearer_token_is_required_when_configured(shared_runtime):
+    """Test that MCP requests need the token and the health check does not."""
+    async with serve(make_settings(mcp_http_auth_token="s3cret")) as client:
+        response = await client.post("/mcp", json=INITIALIZE, headers=HEADERS)
+        assert response.status_code == 401
+        assert response.headers["www-authenticate"] == "Bearer"
+        response = await client.post(
+            "/mcp", json=INITIALIZE, headers={**HEADERS, "Authorization": "Bearer wrong"}
+        )
+        assert response.status_code == 401
+        await open_session(client, {"Authorization": "Bearer s3cret"})
+        assert (await client.get("/healthz")).json()["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_foreign_host_headers_are_rejected_on_loopback(shared_runtime):
+    """Test DNS rebinding protection for a server bound to localhost."""
+    async with serve(make_settings()) as client:
+        response = await client.post(
+            "/mcp", json=INITIALIZE, headers={**HEADERS, "Host": "attacker.example:8000"}
+        )
+        assert response.status_code == 421
+
+
+def test_security_settings():
+    """Test which Host headers are checked for loopback and public bindings."""
+    local = security_settings("127.0.0.1", [])
+    assert local.enable_dns_rebinding_protection
+    assert "localhost:*" in local.allowed_hosts
+
+    assert not security_settings("0.0.0.0", []).enable_dns_rebinding_protection
+    public = security_settings("0.0.0.0", ["mcp.example.com"])
+    assert public.allowed_hosts == ["mcp.example.com"]
+    assert public.allowed_origins == ["http://mcp.example.com", "https://mcp.example.com"]
@@ -0,0 +1,67 @@
+"""Tests for the incremental JSON parser."""
+
+import json
+
+import pytest
+
+from src.client.json_stream import ARRAY_START, iter_json_items
+
+
+async def chunked(text: str, size: int):
+    """Yield ``text`` as UTF-8 bytes in fixed-size chunks."""
+    data = text.encode("utf-8")
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def collect(text: str, size: int, stream_keys=("values",)) -> list:
+    return [item async for item in iter_json_items(chunked(text, size), stream_keys)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, 4096])
+async def test_streams_rows_across_chunk_boundaries(chunk_size):
+    """Test that values split at any byte boundary are parsed correctly."""
+    document = {
+        "headers": ["id", "name", "amount"],
+        "values": [[1, "Brand A", 12345.678], [22, 'Bränd "B"', -0.5e-3], [333, None, True]],
+        "metadata": {"rowCount": 3},
+    }
+    items = await collect(json.dumps(document), chunk_size)
+
+    assert items == [
+        ("headers", ["id", "name", "amount"]),
+        ("values", ARRAY_START),
+        ("values", [1, "Brand A", 12345.678]),
+        ("values", [22, 'Bränd "B"', -0.5e-3]),
+        ("values", [333, None, True]),
+        ("metadata", {"rowCount": 3}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_numbers_at_chunk_end_are_not_truncated():
+    """Test that a number cut by a chunk boundary is not decoded early."""
+    items = await collect('{"values": [1234567, 89]}', 14)
+    assert items[1:] == [("values", 1234567), ("values", 89)]
+
+
+@pytest.mark.asyncio
+async def test_empty_and_non_streamed_members():
+    """Test empty arrays, empty objects and non-streamed arrays."""
+    assert await collect("{}", 1) == []
+    assert await collect('{"values": [], "other": [1, 2]}', 5) == [
+        ("values", ARRAY_START),
+        ("other", [1, 2]),
+    ]
+    # A streamed key holding a non-array is yielded as a plain value
+    assert await collect('{"values": null}', 4) == [("values", None)]
+
+
+@pytest.mark.asyncio
+async def test_malformed_input_raises():
+    """Test that truncated or invalid documents raise ValueError."""
+    with pytest.raises(ValueError):
+        await collect('{"values": [1, 2', 4)
+    with pytest.raises(ValueError):
+        await collect("[1, 2]", 4)
@@ -0,0 +1,96 @@
+"""Tests for the local store of materialized results."""
+
+import pytest
+
+from src.services.local_store import LocalStore, column_names
+
+
+def load(store: LocalStore, rows: list, headers: list | None = None, **source) -> dict:
+    table = store.new_table()
+    table.add_rows(rows, headers)
+    return store.add(table, **source)
+
+
+def test_column_names():
+    """Test that headers are de-duplicated and missing ones get positional names."""
+    assert column_names(["id", "ID", "n", ""], 4) == ["id", "ID_2", "n", "column_3"]
+    assert column_names([{"name": "a"}, {"title": "b"}], 2) == ["a", "b"]
+    assert column_names(None, 2) == ["column_0", "column_1"]
+
+
+@pytest.mark.asyncio
+async def test_query_materialized_result():
+    """Test that a loaded result is re-queried with SQL, truncated to max_rows."""
+    store = LocalStore()
+    rows = [["north", 10, None], ["south", 5, [1]], ["north", 7, {"a": 1}]]
+    described = load(store, rows, ["region", "amount", "extra"], datasource="Sales")
+
+    assert described["row_count"] == 3
+    assert described["columns"] == ["region", "amount", "extra"]
+    assert described["datasource"] == "Sales"
+    assert described["bytes"] > 0
+
+    result = await store.query(
+        described["handle"],
+        "SELECT region, SUM(amount) AS total FROM result GROUP BY region ORDER BY total DESC",
+    )
+    assert result["headers"] == ["region", "total"]
+    assert result["values"] == [["north", 17], ["south", 5]]
+    assert not result["truncated"]
+
+    result = await store.query(described["handle"], "SELECT extra FROM result", max_rows=2)
+    assert result["values"] == [[None], ["[1]"]]
+    assert result["truncated"]
+
+    # Dict rows define their own columns
+    handle = load(store, [{"a": 1, "b": 2}])["handle"]
+    assert (await store.query(handle, "SELECT b FROM result"))["values"] == [[2]]
+
+
+@pytest.mark.asyncio
+async def test_local_queries_are_read_only_and_time_out():
+    """Test that writes, ATTACH and runaway queries are refused."""
+    store = LocalStore(query_timeout=0.05)
+    handle = load(store, [[1], [2]], ["n"])["handle"]
+
+    for sql in ("DELETE FROM result", "ATTACH DATABASE 'x.db' AS x", "PRAGMA page_count"):
+        with pytest.raises(ValueError, match="Local query failed"):
+            await store.query(handle, sql)
+    with pytest.raises(ValueError, match="Local query failed: no such table"):
+        await store.query(handle, "SELECT * FROM missing")
+    with pytest.raises(ValueError, match="timed out"):
+        await store.query(
+            handle,
+            "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) "
+            "SELECT MAX(x) FROM c",
+        )
+    assert (await store.query(handle, "SELECT COUNT(*) FROM result"))["values"] == [[2]]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_handles_are_evicted():
+    """Test eviction by handle count and bytes, and rejection of oversized results."""
+    store = LocalStore(max_handles=2)
+    first = load(store, [[1]])["handle"]
+    second = load(store, [[2]])["handle"]
+    await store.query(first, "SELECT * FROM result")  # second is now least recently used
+    third = load(store, [[3]])["handle"]
+
+    assert [h["handle"] for h in store.handles()] == [first, third]
+    assert store.stats()["evictions"] == 1
+    with pytest.raises(ValueError, match=f"Unknown or evicted handle '{second}'") as error:
+        await store.query(second, "SELECT * FROM result")
+    # Handles of other sessions are not disclosed
+    assert first not in str(error.value) and third not in str(error.value)
+
+    rows = [["x" * 100] for _ in range(200)]
+    budget = LocalStore(max_bytes=load(LocalStore(), rows)["bytes"] + 1)
+    kept = load(budget, rows)["handle"]
+    load(budget, rows)
+    assert kept not in [h["handle"] for h in budget.handles()]
+    assert budget.stats()["handles"] == 1
+
+    tiny = LocalStore(max_bytes=1024)
+    with pytest.raises(ValueError, match="Result too large to materialize"):
+        load(tiny, rows)
+    assert tiny.stats()["handles"] == 0
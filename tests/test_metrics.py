@@ -0,0 +1,113 @@
+"""Tests for the metrics registry."""
+
+import pytest
+
+from src.cache import TTLCache
+from src.metrics import LATENCY_BUCKETS, Histogram, MetricsRegistry
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    """Test that quantiles stay inside the bucket holding the rank and never exceed max."""
+    histogram = Histogram(LATENCY_BUCKETS)
+    for _ in range(90):
+        histogram.observe(0.004)
+    for _ in range(10):
+        histogram.observe(0.2)
+
+    assert histogram.count == 100
+    assert 0.0025 < histogram.quantile(0.5) <= 0.004
+    assert 0.1 < histogram.quantile(0.99) <= 0.2
+    assert histogram.quantile(1.0) == 0.2
+    assert histogram.summary(1000)["max"] == 200.0
+    assert Histogram(LATENCY_BUCKETS).quantile(0.5) == 0.0
+
+
+def test_snapshot_reports_tools_upstream_and_caches(clock):
+    """Test the JSON snapshot of tool, upstream and cache metrics."""
+    metrics = MetricsRegistry(clock=clock)
+    cache = TTLCache(default_ttl=60)
+    cache.set("schema", "Sales", {"tables": []})
+    cache.get("schema", "Sales")
+    cache.get("schema", "Other")
+    metrics.watch_cache("metadata", cache)
+
+    metrics.record_tool("query_elasticube", 0.05, False, 1200)
+    metrics.record_tool("query_elasticube", 0.5, True, 0)
+    metrics.record_request("sql", 0.04, 200)
+    metrics.record_request("sql", 1.0, None)
+    clock.now = 12.0
+
+    snapshot = metrics.snapshot()
+    assert snapshot["uptime_seconds"] == 12.0
+    tool = snapshot["tools"]["query_elasticube"]
+    assert tool["calls"] == 2
+    assert tool["errors"] == 1
+    assert tool["response_bytes"] == {"total": 1200, "mean": 1200, "max": 1200}
+    assert tool["latency_ms"]["max"] == 500.0
+    sql = snapshot["upstream"]["sql"]
+    assert sql["requests"] == 2
+    assert sql["statuses"] == {"200": 1}
+    assert sql["transport_errors"] == 1
+    assert snapshot["caches"]["metadata"]["namespaces"]["schema"]["hits"] == 1
+
+
+def test_prometheus_text_format():
+    """Test the exposition format: cumulative buckets, +Inf, sum/count and escaped labels."""
+    metrics = MetricsRegistry()
+    metrics.record_tool("list_elasticubes", 0.003, False, 100)
+    metrics.record_tool("list_elasticubes", 0.03, False, 100)
+    metrics.record_request("elasticubes", 0.02, 200)
+    metrics.record_request("elasticubes", 0.02, None)
+    metrics.record_tool('we"ird', 0.001, True, 0)
+
+    text = metrics.prometheus_text()
+    assert "# TYPE sisense_mcp_tool_duration_seconds histogram" in text
+    assert 'sisense_mcp_tool_duration_seconds_bucket{tool="list_elasticubes",le="0.0025"} 0' in text
+    assert 'sisense_mcp_tool_duration_seconds_bucket{tool="list_elasticubes",le="0.005"} 1' in text
+    assert 'sisense_mcp_tool_duration_seconds_bucket{tool="list_elasticubes",le="+Inf"} 2' in text
+    assert 'sisense_mcp_tool_duration_seconds_count{tool="list_elasticubes"} 2' in text
+    assert 'sisense_mcp_upstream_responses_total{family="elasticubes",status="200"} 1' in text
+    assert 'sisense_mcp_upstream_responses_total{family="elasticubes",status="error"} 1' in text
+    assert 'sisense_mcp_tool_errors_total{tool="we\\"ird"} 1' in text
+    assert text.endswith("\n")
+
+
+def test_instances_are_labelled_separately():
+    """Test that upstream requests and caches of several instances are not merged."""
+    metrics = MetricsRegistry(default_instance="prod")
+    metrics.record_request("sql", 0.02, 200, instance="prod")
+    metrics.record_request("sql", 0.5, 503, instance="staging")
+    metrics.watch_cache("results", TTLCache(default_ttl=60), instance="staging")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["upstream"]["sql"]["statuses"] == {"200": 1}
+    assert snapshot["upstream"]["staging/sql"]["statuses"] == {"503": 1}
+    assert set(snapshot["caches"]) == {"staging/results"}
+
+    text = metrics.prometheus_text()
+    assert (
+        'sisense_mcp_upstream_responses_total{family="sql",instance="prod",status="200"} 1' in text
+    )
+    assert 'sisense_mcp_upstream_duration_seconds_count{family="sql",instance="staging"} 1' in text
+    assert "staging/" not in text
+
+
+@pytest.mark.parametrize("force", [False, True])
+def test_flush_writes_at_most_once_per_interval(tmp_path, clock, force):
+    """Test that flush rewrites the Prometheus file only after the interval (or if forced)."""
+    path = tmp_path / "sisense_mcp.prom"
+    metrics = MetricsRegistry(prometheus_file=str(path), prometheus_interval=15.0, clock=clock)
+
+    assert metrics.flush() is True
+    metrics.record_tool("list_dashboards", 0.01, False, 10)
+    clock.now = 5.0
+    assert metrics.flush(force=force) is force
+    clock.now = 20.0
+    assert metrics.flush() is True
+    assert "list_dashboards" in path.read_text()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_flush_without_file_is_a_no_op():
+    """Test that flush does nothing when no Prometheus file is configured."""
+    assert MetricsRegistry().flush(force=True) is False
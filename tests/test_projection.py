@@ -0,0 +1,74 @@
+"""Tests for JSONPath-style projection."""
+
+import pytest
+
+from src.services.projection import parse_path, project, top_level_fields
+
+DASHBOARD = {
+    "_id": "d1",
+    "title": "Revenue",
+    "datasource": {"title": "Sales", "live": True},
+    "filters": [{"jaql": {"dim": "[A.x]"}}, {"jaql": {"dim": "[A.y]"}}],
+    "widgets": [
+        {"oid": "w1", "title": "Chart", "type": "chart/bar", "metadata": {"panels": [1, 2]}},
+        {"oid": "w2", "title": "Table", "type": "tablewidget"},
+    ],
+}
+
+
+def test_parse_path():
+    """Test the supported path syntax."""
+    assert parse_path("$.widgets[*].metadata.panels[0]") == [
+        "widgets",
+        "*",
+        "metadata",
+        "panels",
+        0,
+    ]
+    assert parse_path("widgets[].title") == ["widgets", "*", "title"]
+    assert parse_path("['odd.key'].x") == ["odd.key", "x"]
+    with pytest.raises(ValueError):
+        parse_path("widgets[x]")
+    with pytest.raises(ValueError):
+        parse_path("$")
+
+
+def test_project_merges_paths_and_keeps_shape():
+    """Test that several paths produce one document of the same shape."""
+    result = project(DASHBOARD, ["title", "datasource.title", "widgets[*].title", "widgets.type"])
+
+    assert result == {
+        "title": "Revenue",
+        "datasource": {"title": "Sales"},
+        "widgets": [
+            {"title": "Chart", "type": "chart/bar"},
+            {"title": "Table", "type": "tablewidget"},
+        ],
+    }
+
+
+def test_project_indexes_wildcards_and_missing_members():
+    """Test array indexes, object wildcards and skipped members."""
+    assert project(DASHBOARD, ["filters[1].jaql.dim"]) == {"filters": [{"jaql": {"dim": "[A.y]"}}]}
+    assert project(DASHBOARD, ["datasource.*"]) == {"datasource": DASHBOARD["datasource"]}
+    assert project(DASHBOARD, ["widgets[*].metadata"]) == {
+        "widgets": [{"metadata": {"panels": [1, 2]}}, {}]
+    }
+    assert project(DASHBOARD, ["missing", "filters[5]"]) == {"filters": []}
+    # An index selects more of its element on top of a wildcard or member path
+    assert project(DASHBOARD, ["widgets[0].metadata", "widgets[*].title"]) == {
+        "widgets": [{"title": "Chart", "metadata": {"panels": [1, 2]}}, {"title": "Table"}]
+    }
+    assert project(DASHBOARD, ["widgets.oid", "widgets[1]"]) == {
+        "widgets": [{"oid": "w1"}, DASHBOARD["widgets"][1]]
+    }
+    # A shorter path keeps the whole subtree
+    assert project(DASHBOARD, ["datasource.title", "datasource"]) == {
+        "datasource": DASHBOARD["datasource"]
+    }
+
+
+def test_top_level_fields():
+    """Test the member list sent upstream."""
+    assert top_level_fields(["title", "widgets[*].title", "widgets.type"]) == ["title", "widgets"]
+    assert top_level_fields(["*.title"]) is None
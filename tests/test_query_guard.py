@@ -0,0 +1,43 @@
+"""Tests for the pre-flight query guard's SQL checks."""
+
+from src.services.query_guard import is_unbounded, with_limit
+
+
+def test_is_unbounded():
+    """Test which queries can return every row of their tables."""
+    assert is_unbounded("SELECT ID, Name FROM Sales")
+    assert is_unbounded("select Brand, SUM(Amount) from Sales group by Brand")
+    assert is_unbounded("SELECT a FROM x UNION SELECT COUNT(*) FROM y")
+    # A LIMIT or aggregate inside a subquery does not bound the outer query
+    assert is_unbounded("SELECT * FROM (SELECT COUNT(*) AS n FROM t LIMIT 5) s, u")
+    assert is_unbounded("WITH s AS (SELECT MAX(x) FROM t) SELECT * FROM s")
+    # Set operators other than UNION, including ones ending in a FROM-less SELECT
+    assert is_unbounded("SELECT a FROM t INTERSECT SELECT 1")
+    assert is_unbounded("SELECT a FROM t except SELECT a FROM u")
+    # A top-level SELECT without FROM after one with it cannot be classified
+    assert is_unbounded("SELECT a FROM t ORDER BY (SELECT 1) SELECT 2")
+    # Window aggregates keep every row
+    assert is_unbounded("SELECT ID, COUNT(*) OVER () AS total FROM Sales")
+    assert not is_unbounded("SELECT COUNT(*), MAX(x) OVER (ORDER BY y) FROM Sales")
+
+    # Columns and aliases named like row-limiting keywords do not bound the query
+    assert is_unbounded("SELECT top, fetch FROM t")
+    assert is_unbounded("SELECT a AS limit FROM t ORDER BY top")
+
+    assert not is_unbounded("SELECT ID FROM Sales LIMIT 10")
+    assert not is_unbounded("SELECT DISTINCT TOP (10) ID FROM Sales")
+    assert not is_unbounded("SELECT ID FROM Sales ORDER BY ID OFFSET 5 ROWS FETCH NEXT 5 ROWS ONLY")
+    assert not is_unbounded("SELECT TOP 10 ID FROM Sales")
+    assert not is_unbounded("SELECT COUNT(*), MAX([Amount]) FROM [Sales]")
+    assert not is_unbounded("SELECT 1")
+    assert not is_unbounded("-- comment\nSELECT ID FROM Sales -- LIMIT 5\nLIMIT 5")
+    assert not is_unbounded("")
+
+
+def test_with_limit():
+    """Test that trailing semicolons and comments are dropped before the LIMIT."""
+    assert with_limit("SELECT ID FROM Sales;  ", 100) == "SELECT ID FROM Sales\nLIMIT 100"
+    assert with_limit("SELECT ID FROM Sales -- all", 5) == "SELECT ID FROM Sales\nLIMIT 5"
+    assert with_limit("SELECT ID -- id\nFROM Sales; -- x", 5) == (
+        "SELECT ID -- id\nFROM Sales\nLIMIT 5"
+    )
@@ -0,0 +1,149 @@
+"""Tests for the token bucket and adaptive concurrency limiter."""
+
+import asyncio
+
+import pytest
+
+from src.client import LimitConfig
+from src.client.rate_limit import AdaptiveConcurrency, FamilyLimiter, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_allows_burst_then_paces(monkeypatch, clock):
+    """Test that a burst passes immediately and later requests are spaced by 1/rate."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(rate=10, burst=3, clock=clock)
+
+    for _ in range(5):
+        await bucket.acquire()
+    # Three tokens of burst, then reservations 0.1 s and 0.2 s ahead
+    assert delays == pytest.approx([0.1, 0.2])
+
+    # Tokens refill with time but never beyond the burst size
+    clock.now = 100.0
+    delays.clear()
+    for _ in range(3):
+        await bucket.acquire()
+    assert delays == []
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_cancelled_waiter_returns_its_token(clock):
+    """Test that a caller cancelled while waiting does not keep its reservation."""
+    bucket = TokenBucket(rate=10, burst=1, clock=clock)
+    await bucket.acquire()
+
+    waiters = [asyncio.create_task(bucket.acquire()) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert bucket.tokens == pytest.approx(-3)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+
+    # The next caller waits one interval, not four
+    assert bucket.tokens == pytest.approx(0)
+    clock.now = 0.1
+    await asyncio.wait_for(bucket.acquire(), timeout=0.05)
+
+
+def test_adaptive_concurrency_aimd(clock):
+    """Test additive increase on success and one multiplicative cut per window."""
+    limiter = AdaptiveConcurrency(max_limit=8, initial_limit=4, clock=clock)
+    assert limiter.limit == 4
+
+    # Four successes (one window) add about one slot
+    for _ in range(4):
+        limiter.in_flight += 1
+        limiter.release(limiter._clock())
+    assert 4.9 < limiter.limit < 5.0
+
+    # Requests started before a cut do not cut again
+    early = [clock.now, clock.now]
+    limiter.in_flight += 2
+    clock.now = 1.0
+    before = limiter.limit
+    limiter.release(early[0], overloaded=True)
+    cut = limiter.limit
+    assert cut == pytest.approx(before / 2)
+    limiter.release(early[1], overloaded=True)
+    assert limiter.limit == cut
+    assert limiter.overloads == 2
+
+    # Outcome-less releases leave the limit alone; the floor is min_limit
+    limiter.in_flight += 1
+    limiter.release(clock.now, overloaded=None)
+    assert limiter.limit == cut
+    for _ in range(5):
+        clock.now += 1
+        limiter.in_flight += 1
+        limiter.release(clock.now, overloaded=True)
+    assert limiter.limit == 1
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_queues_in_order():
+    """Test that requests over the limit wait and are admitted first come, first served."""
+    limiter = AdaptiveConcurrency(max_limit=2, initial_limit=2)
+    order = []
+
+    async def request(i: int):
+        ticket = await limiter.acquire()
+        order.append(i)
+        await asyncio.sleep(0.01)
+        limiter.release(ticket, overloaded=None)
+
+    await asyncio.gather(*(request(i) for i in range(6)))
+
+    assert order == list(range(6))
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_adaptive_concurrency_cancelled_waiter_passes_on_wakeup():
+    """Test that a cancelled waiter does not leak a slot or block the queue."""
+    limiter = AdaptiveConcurrency(max_limit=1)
+    ticket = await limiter.acquire()
+    cancelled = asyncio.create_task(limiter.acquire())
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    limiter.release(ticket, overloaded=None)
+    await asyncio.wait_for(waiting, 1)
+
+    assert limiter.in_flight == 1
+    assert limiter.queued == 0
+
+    # Woken, then cancelled before it could run
+    woken = asyncio.create_task(limiter.acquire())
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    limiter.release(limiter._clock(), overloaded=None)
+    woken.cancel()
+    await asyncio.wait_for(waiting, 1)
+
+    assert limiter.in_flight == 1
+    assert limiter.queued == 0
+
+
+@pytest.mark.asyncio
+async def test_family_limiter_stats():
+    """Test that disabled parts are skipped and waits are recorded."""
+    unlimited = FamilyLimiter(LimitConfig())
+    assert unlimited.bucket is None and unlimited.concurrency is None
+    unlimited.release(await unlimited.acquire())
+
+    limiter = FamilyLimiter(LimitConfig(rate=1000, burst=5, max_concurrency=3))
+    ticket = await limiter.acquire()
+    limiter.release(ticket, overloaded=True)
+    stats = limiter.stats()
+    assert stats["concurrency_limit"] == 1
+    assert stats["overloads"] == 1
+    assert stats["requests"] == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,134 @@
+"""Tests for the traffic recorder."""
+
+import gzip
+import json
+
+import httpx
+import pytest
+
+from src.client import SisenseClient, TrafficRecorder
+from src.client.recorder import SCRUBBED, read_sessions, scrub
+
+
+def read_lines(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_scrub_masks_credential_members_and_secrets():
+    """Test that credential-like keys and the token are masked at any depth."""
+    value = {
+        "title": "Sales",
+        "apiKey": "k",
+        "nested": [{"accessToken": "t", "note": "Bearer SECRET123 used"}],
+    }
+    assert scrub(value, ("SECRET123",)) == {
+        "title": "Sales",
+        "apiKey": SCRUBBED,
+        "nested": [{"accessToken": SCRUBBED, "note": f"Bearer {SCRUBBED} used"}],
+    }
+
+
+def test_record_writes_a_session_line_and_compact_records(tmp_path, clock):
+    """Test the log layout: one session header, then one line per request."""
+    clock.now = 100.0
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path), clock=clock)
+
+    clock.now = 101.5
+    recorder.record("GET", "/api/v2/datamodels/schema", {"title": "Sales"}, 101.0, 200, 1234)
+    recorder.record("GET", "/api/v1/dashboards", None, 101.2, error="ConnectError")
+    recorder.close()
+
+    header, first, second = read_lines(path)
+    assert header["type"] == "session"
+    assert header["session"] == recorder.session
+    assert first == {
+        "session": recorder.session,
+        "t": 1.0,
+        "method": "GET",
+        "path": "/api/v2/datamodels/schema",
+        "params": {"title": "Sales"},
+        "status": 200,
+        "ms": 500.0,
+        "bytes": 1234,
+    }
+    assert second["error"] == "ConnectError"
+    assert "status" not in second
+    assert recorder.records == 2
+
+
+def test_payloads_are_optional_scrubbed_and_size_capped(tmp_path):
+    """Test that bodies are stored only when enabled, scrubbed, and only if small."""
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(
+        str(path), include_payloads=True, max_payload_bytes=100, secrets=("tok123",)
+    )
+    recorder.record(
+        "GET", "/a", {"token": "tok123"}, recorder.started, 200, 30, b'{"password": "x", "v": 1}'
+    )
+    recorder.record("GET", "/b", None, recorder.started, 200, 200, b"[" + b"1," * 99 + b"1]")
+    recorder.close()
+
+    _, small, large = read_lines(path)
+    assert small["params"] == {"token": SCRUBBED}
+    assert small["body"] == {"password": SCRUBBED, "v": 1}
+    assert "body" not in large
+    assert "tok123" not in path.read_text()
+
+
+def test_read_sessions_groups_interleaved_sessions(tmp_path):
+    """Test that two recorders appending to one gzip log are read back per session."""
+    path = str(tmp_path / "traffic.jsonl.gz")
+    first, second = TrafficRecorder(path), TrafficRecorder(path)
+    first.record("GET", "/a", None, first.started, 200, 1)
+    first.close()
+    second.record("GET", "/b", None, second.started, 200, 1)
+    second.close()
+    first.record("GET", "/c", None, first.started, 200, 1)
+    first.close()
+
+    with gzip.open(path, "rt") as f:
+        assert sum(1 for _ in f) == 5  # two session lines, three requests
+    sessions = read_sessions(path)
+    assert [r["path"] for r in sessions[first.session]] == ["/a", "/c"]
+    assert [r["path"] for r in sessions[second.session]] == ["/b"]
+
+
+@pytest.mark.asyncio
+async def test_client_records_gets_streams_and_failures(tmp_path):
+    """Test that SisenseClient records every upstream request without the token."""
+    path = tmp_path / "traffic.jsonl"
+    recorder = TrafficRecorder(str(path), include_payloads=True, secrets=("test_token",))
+
+    async def sql_body():
+        # A streamed body, so the response size is counted as it is downloaded
+        yield b'{"headers": ["a"], "values": [[1], [2]]}'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/sql"):
+            return httpx.Response(200, content=sql_body())
+        if request.url.path == "/api/v1/dashboards":
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    client = SisenseClient(
+        "https://test.sisense.com",
+        "test_token",
+        transport=httpx.MockTransport(handler),
+        recorder=recorder,
+    )
+    await client.get("/api/v1/elasticubes/getElasticubes")
+    rows = [item async for item in client.stream_get("/api/datasources/S/sql", {"count": 2})]
+    assert len(rows) == 2
+    with pytest.raises(httpx.ConnectError):
+        await client.get("/api/v1/dashboards")
+    await client.aclose()
+    recorder.close()
+
+    _, cubes, sql, dashboards = read_lines(path)
+    assert cubes["body"] == {"ok": True}
+    assert cubes["bytes"] == len(b'{"ok":true}')
+    assert sql["params"] == {"count": "2"}
+    assert sql["bytes"] > 0 and "body" not in sql
+    assert dashboards["error"] == "ConnectError"
+    assert "test_token" not in path.read_text()
@@ -0,0 +1,81 @@
+"""Tests for the retry policy and circuit breaker."""
+
+import httpx
+import pytest
+
+from src.client import CircuitBreaker, CircuitOpenError, RetryPolicy
+from src.client.resilience import endpoint_family, parse_retry_after
+
+
+def test_endpoint_family():
+    """Test endpoint classification."""
+    assert endpoint_family("/api/v1/elasticubes/getElasticubes") == "elasticubes"
+    assert endpoint_family("/api/v2/datamodels/schema") == "datamodels"
+    assert endpoint_family("/api/datasources/Sales%20Data/sql") == "sql"
+    assert endpoint_family("/api/v1/dashboards/abc/widgets") == "dashboards"
+    assert endpoint_family("/api/v1/users") == "other"
+
+
+def test_parse_retry_after():
+    """Test delta-seconds and HTTP-date Retry-After values."""
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_policy_backoff_is_jittered_and_capped():
+    """Test that backoff delays stay within the exponential envelope."""
+    policy = RetryPolicy(max_retries=10, backoff=1.0, backoff_max=4.0)
+    for retry in range(6):
+        assert 0 <= policy.backoff_delay(retry) <= min(4.0, 2**retry)
+
+    response = httpx.Response(404)
+    assert policy.response_delay(response, 0) is None
+    assert policy.response_delay(httpx.Response(503), 10) is None
+
+
+def test_circuit_breaker_state_machine(clock):
+    """Test closed -> open -> half-open -> closed/open transitions."""
+    breaker = CircuitBreaker("sql", failure_threshold=2, reset_timeout=10, clock=clock)
+
+    breaker.before_request()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+    # After the reset timeout one probe is allowed, concurrent requests are rejected
+    clock.now = 11
+    breaker.before_request()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 22
+    breaker.before_request()
+    breaker.record_success()
+    assert breaker.stats() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "times_opened": 2,
+        "rejected": 2,
+    }
+
+
+def test_circuit_breaker_abandoned_probe_allows_another(clock):
+    """Test that a cancelled probe does not wedge the breaker half-open."""
+    breaker = CircuitBreaker("sql", failure_threshold=1, reset_timeout=1, clock=clock)
+    breaker.record_failure()
+    clock.now = 2
+
+    breaker.before_request()
+    breaker.record_abandoned()
+    breaker.before_request()
+    assert breaker.state == "half_open"
@@ -0,0 +1,66 @@
+"""Tests for random sampling of SQL results."""
+
+import random
+from collections import Counter
+
+from src.services.sampling import (
+    Reservoir,
+    count_query,
+    pushdown_probability,
+    random_filter_query,
+)
+
+
+def test_reservoir_is_uniform():
+    """Test that every item is equally likely to be sampled, whatever the batching."""
+    rng = random.Random(7)
+    counts: Counter = Counter()
+    trials = 4000
+    for _ in range(trials):
+        reservoir = Reservoir(5, rng)
+        for start in range(0, 50, 7):
+            reservoir.extend(list(range(start, min(50, start + 7))))
+        assert reservoir.seen == 50
+        assert len(set(reservoir.sample)) == 5
+        counts.update(reservoir.sample)
+
+    expected = trials * 5 / 50
+    assert set(counts) == set(range(50))
+    assert all(abs(count - expected) < 0.25 * expected for count in counts.values())
+
+
+def test_reservoir_short_streams_and_seeds():
+    """Test that short streams are kept whole and a seed makes samples reproducible."""
+    reservoir = Reservoir(10)
+    reservoir.extend([1, 2, 3])
+    assert reservoir.sample == [1, 2, 3]
+
+    empty = Reservoir(0)
+    empty.extend([1, 2])
+    assert (empty.sample, empty.seen) == ([], 2)
+
+    samples = []
+    for _ in range(2):
+        reservoir = Reservoir(3, random.Random(42))
+        reservoir.extend(list(range(1000)))
+        samples.append(reservoir.sample)
+    assert samples[0] == samples[1]
+
+
+def test_pushdown_queries():
+    """Test the count probe and the random filter wrapped around a query."""
+    assert count_query("SELECT a FROM t;") == (
+        "SELECT COUNT(*) FROM (SELECT a FROM t) AS sample_source"
+    )
+    # A trailing comment would otherwise swallow the closing parenthesis and alias
+    assert count_query("SELECT * FROM t -- all rows\n") == (
+        "SELECT COUNT(*) FROM (SELECT * FROM t) AS sample_source"
+    )
+    assert count_query("SELECT * FROM t; /* done */ -- x") == (
+        "SELECT COUNT(*) FROM (SELECT * FROM t) AS sample_source"
+    )
+    assert random_filter_query("SELECT a FROM t", 0.0012345678) == (
+        "SELECT * FROM (SELECT a FROM t) AS sample_source WHERE RAND() < 0.00123457"
+    )
+    assert pushdown_probability(100, 1_000_000) == (100 + 40 + 10) / 1_000_000
+    assert pushdown_probability(100, 120) == 1.0
@@ -0,0 +1,93 @@
+"""Tests for SchemaIndex."""
+
+from src.services import SchemaIndex
+
+SCHEMA = {
+    "title": "Sales Data Model",
+    "datasets": [
+        {
+            "oid": "ds1",
+            "name": "Dataset1",
+            "schema": {
+                "tables": [
+                    {
+                        "oid": "t1",
+                        "name": "brands",
+                        "type": "base",
+                        "columns": [
+                            {"oid": "c1", "name": "BRAND_ID", "type": 8},
+                            {"oid": "c2", "name": "BRAND_NAME", "type": 18, "hidden": True},
+                        ],
+                    },
+                    {
+                        "oid": "t2",
+                        "name": "sales",
+                        "type": "base",
+                        "columns": [
+                            {"oid": "c3", "name": "SALE_ID", "type": 8},
+                            {"oid": "c4", "name": "BRAND_ID", "type": 8},
+                        ],
+                    },
+                ]
+            },
+        }
+    ],
+    "relations": [
+        {
+            "oid": "r1",
+            "columns": [
+                {"dataset": "ds1", "table": "t1", "column": "c1"},
+                {"dataset": "ds1", "table": "t2", "column": "c4"},
+                {"dataset": "ds1", "table": "t9", "column": "c9"},
+            ],
+        },
+        {"oid": "r2", "columns": [{"dataset": "ds1", "table": "t1", "isDropped": True}]},
+    ],
+}
+
+
+def test_tables_and_columns_indexed_by_name():
+    """Test that tables and their columns are indexed in schema order."""
+    index = SchemaIndex.from_schema(SCHEMA)
+
+    assert list(index.tables) == ["brands", "sales"]
+    brands = index.table("brands")
+    assert list(brands.columns) == ["BRAND_ID", "BRAND_NAME"]
+    assert brands.dataset == "Dataset1"
+    assert index.table("BRANDS") is brands
+    assert index.table("missing") is None
+
+
+def test_relations_form_an_adjacency_list():
+    """Test that relations become edges on both tables, skipping unknown ends."""
+    index = SchemaIndex.from_schema(SCHEMA)
+
+    assert [edge.to_dict() for edge in index.table("brands").relations] == [
+        {"column": "BRAND_ID", "table": "sales", "to_column": "BRAND_ID"}
+    ]
+    assert [edge.to_dict() for edge in index.table("sales").relations] == [
+        {"column": "BRAND_ID", "table": "brands", "to_column": "BRAND_ID"}
+    ]
+
+
+def test_table_dict_and_columns_summary():
+    """Test the single-table and column-summary views."""
+    index = SchemaIndex.from_schema(SCHEMA)
+
+    assert index.table("brands").to_dict()["columns"] == [
+        {"name": "BRAND_ID", "type": 8},
+        {"name": "BRAND_NAME", "type": 18, "hidden": True},
+    ]
+    assert index.columns_summary() == {
+        "title": "Sales Data Model",
+        "tables": {
+            "brands": {"BRAND_ID": 8, "BRAND_NAME": 18},
+            "sales": {"SALE_ID": 8, "BRAND_ID": 8},
+        },
+    }
+
+
+def test_tolerates_partial_documents():
+    """Test that missing or malformed sections produce an empty index."""
+    assert SchemaIndex.from_schema({"title": "x", "datasets": [{"schema": None}]}).tables == {}
+    assert SchemaIndex.from_schema({"tables": [{"name": "t", "columns": None}]}).table("t")
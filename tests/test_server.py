@@ -1,7 +1,8 @@
 """Integration tests for the MCP server."""
 
+import json
 import os
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -14,57 +15,244 @@ def test_list_tools():
     """Test that server lists all tools correctly."""
     # This is a synchronous test, but list_tools is async
     # We'll test it by checking the tool definitions directly
-    from src.tools import get_dashboard_tools, get_elasticube_tools
+    from src.tools import (
+        get_dashboard_tools,
+        get_elasticube_tools,
+        get_instance_tools,
+        get_local_tools,
+        get_metrics_tools,
+    )
 
     elasticube_tools = get_elasticube_tools()
     dashboard_tools = get_dashboard_tools()
+    metrics_tools = get_metrics_tools()
+    instance_tools = get_instance_tools()
+    local_tools = get_local_tools()
 
-    assert len(elasticube_tools) == 3
+    assert len(elasticube_tools) == 6
     assert len(dashboard_tools) == 2
+    assert len(metrics_tools) == 1
+    assert len(instance_tools) == 1
+    assert len(local_tools) == 1
 
-    all_tool_names = [t.name for t in elasticube_tools + dashboard_tools]
+    all_tools = elasticube_tools + dashboard_tools + metrics_tools + instance_tools + local_tools
+    all_tool_names = [t.name for t in all_tools]
     assert "list_elasticubes" in all_tool_names
     assert "get_elasticube_schema" in all_tool_names
     assert "query_elasticube" in all_tool_names
+    assert "search_fields" in all_tool_names
     assert "list_dashboards" in all_tool_names
     assert "get_dashboard_info" in all_tool_names
+    assert "get_server_metrics" in all_tool_names
+    assert "list_instances" in all_tool_names
+    assert "query_local" in all_tool_names
+    # Every Sisense tool can be pointed at another instance
+    for tool in elasticube_tools + dashboard_tools:
+        assert "instance" in tool.inputSchema["properties"]
 
 
 @pytest.mark.asyncio
-async def test_call_tool_list_elasticubes():
+async def test_call_tool_list_elasticubes(monkeypatch):
     """Test server call_tool with list_elasticubes."""
-    with patch("src.server.elasticube_service") as mock_service:
-        mock_service.list_elasticubes = AsyncMock(
-            return_value=[
-                {
-                    "_id": "507f1f77bcf86cd799439011",
-                    "title": "Sales Data Model",
-                    "type": "extract",
-                    "server": "LocalHost",
-                    "lastUpdated": "2024-08-02T16:50:14.417Z",
-                }
-            ]
-        )
+    from src import runtime
+    from src.app import call_tool
 
-        from src.tools import handle_elasticube_tool
+    mock_service = MagicMock()
+    mock_service.list_elasticubes = AsyncMock(
+        return_value=[
+            {
+                "_id": "507f1f77bcf86cd799439011",
+                "title": "Sales Data Model",
+                "type": "extract",
+                "server": "LocalHost",
+                "lastUpdated": "2024-08-02T16:50:14.417Z",
+            }
+        ]
+    )
+    monkeypatch.setattr(runtime, "_runtime", MagicMock(elasticube_service=mock_service))
 
-        result = await handle_elasticube_tool("list_elasticubes", {}, mock_service)
+    result = await call_tool("list_elasticubes", {})
 
-        assert len(result) == 1
-        assert result[0].type == "text"
+    assert len(result) == 1
+    assert result[0].type == "text"
+    mock_service.list_elasticubes.assert_called_once_with(refresh=False)
+
+
+@pytest.mark.asyncio
+async def test_call_tool_records_metrics(monkeypatch):
+    """Test that call_tool records latency, errors and response size per tool."""
+    from src import runtime
+    from src.app import call_tool, read_resource
+    from src.metrics import MetricsRegistry
+
+    mock_service = MagicMock()
+    mock_service.list_elasticubes = AsyncMock(return_value=[{"title": "Sales"}])
+    mock_service.get_schema = AsyncMock(side_effect=ValueError("missing"))
+    metrics = MetricsRegistry()
+    monkeypatch.setattr(
+        runtime, "_runtime", MagicMock(elasticube_service=mock_service, metrics=metrics)
+    )
+
+    result = await call_tool("list_elasticubes", {})
+    with pytest.raises(ValueError):
+        await call_tool("get_elasticube_schema", {"elasticube_name": "Sales"})
+
+    tools = metrics.snapshot()["tools"]
+    assert tools["list_elasticubes"]["calls"] == 1
+    assert tools["list_elasticubes"]["errors"] == 0
+    assert tools["list_elasticubes"]["response_bytes"]["total"] == len(result[0].text)
+    assert tools["get_elasticube_schema"]["errors"] == 1
+
+    [contents] = await read_resource("sisense://metrics")
+    assert json.loads(contents.content)["tools"]["list_elasticubes"]["calls"] == 1
+
+    [metrics_result] = await call_tool("get_server_metrics", {"format": "prometheus"})
+    assert 'sisense_mcp_tool_errors_total{tool="get_elasticube_schema"} 1' in metrics_result.text
 
 
 @pytest.mark.asyncio
 async def test_call_tool_unknown_tool():
     """Test server call_tool with unknown tool."""
+    from src.app import call_tool
+
     with pytest.raises(ValueError, match="Unknown tool"):
-        # Simulate what server.call_tool would do
-        tool_name = "unknown_tool"
-        if tool_name not in [
-            "list_elasticubes",
-            "get_elasticube_schema",
-            "query_elasticube",
-            "list_dashboards",
-            "get_dashboard_info",
-        ]:
-            raise ValueError(f"Unknown tool: {tool_name}")
+        await call_tool("unknown_tool", {})
+
+
+def test_runtime_is_built_once_on_first_use(monkeypatch):
+    """Test that settings and services are created lazily and only once."""
+    from src import runtime
+
+    monkeypatch.setattr(runtime, "_runtime", None)
+    first = runtime.get_runtime()
+    assert runtime.get_runtime() is first
+    assert first.elasticube_service.client is first.client
+    assert first.dashboard_service.client is first.client
+    monkeypatch.setattr(runtime, "_runtime", None)
+
+
+def test_runtime_reports_invalid_settings(monkeypatch):
+    """Test that configuration errors surface on the first tool call."""
+    from src import runtime
+
+    def broken_settings():
+        raise ValueError("sisense_base_url: Field required")
+
+    monkeypatch.setattr(runtime, "_runtime", None)
+    monkeypatch.setattr(runtime, "get_settings", broken_settings)
+
+    with pytest.raises(RuntimeError, match="Services could not be initialized"):
+        runtime.get_runtime()
+
+
+def make_instance(name: str, cubes: list[dict]):
+    from src.runtime import Instance
+
+    service = MagicMock()
+    service.list_elasticubes = AsyncMock(return_value=cubes)
+    client = MagicMock(base_url=f"https://{name}.sisense.com")
+    return Instance(name, client, service, MagicMock())
+
+
+@pytest.mark.asyncio
+async def test_call_tool_routes_to_the_named_instance(monkeypatch):
+    """Test that the instance argument selects the instance's services."""
+    from src import runtime
+    from src.app import call_tool
+
+    prod = make_instance("prod", [{"title": "Prod Sales"}])
+    staging = make_instance("staging", [{"title": "Staging Sales"}])
+    shared = runtime.Runtime({"prod": prod, "staging": staging}, "prod")
+    monkeypatch.setattr(runtime, "_runtime", shared)
+
+    [default] = await call_tool("list_elasticubes", {})
+    [selected] = await call_tool("list_elasticubes", {"instance": "staging"})
+    assert json.loads(default.text)[0]["title"] == "Prod Sales"
+    assert json.loads(selected.text)[0]["title"] == "Staging Sales"
+    with pytest.raises(ValueError, match="Unknown Sisense instance 'qa'. Available: prod, staging"):
+        await call_tool("list_elasticubes", {"instance": "qa"})
+
+    # Handles only resolve in the store of the instance that materialized them
+    from src.services import LocalStore
+
+    prod.local_store, staging.local_store = LocalStore(), LocalStore()
+    table = staging.local_store.new_table()
+    table.add_rows([[1]], ["n"])
+    handle = staging.local_store.add(table)["handle"]
+    assert len(handle) == len("local_") + 32
+    arguments = {"handle": handle, "sql_query": "SELECT n FROM result"}
+    [local] = await call_tool("query_local", {**arguments, "instance": "staging"})
+    assert json.loads(local.text)["values"] == [[1]]
+    with pytest.raises(ValueError, match="Unknown or evicted handle"):
+        await call_tool("query_local", arguments)
+
+    [listed] = await call_tool("list_instances", {})
+    assert json.loads(listed.text) == [
+        {"name": "prod", "base_url": "https://prod.sisense.com", "default": True},
+        {"name": "staging", "base_url": "https://staging.sisense.com", "default": False},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_runtime_builds_isolated_instances():
+    """Test that each instance gets its own client, limits and caches."""
+    from src.config import Settings
+    from src.runtime import build_runtime
+
+    settings = Settings(
+        sisense_base_url="https://prod.sisense.com",
+        sisense_api_token="prod_token",
+        sisense_instance_name="prod",
+        sisense_instances={
+            "staging": {
+                "SISENSE_BASE_URL": "https://staging.sisense.com",
+                "sisense_api_token": "staging_token",
+                "sisense_sql_max_concurrency": 2,
+            }
+        },
+    )
+    built = build_runtime(settings)
+    prod, staging = built.instance("prod"), built.instance("staging")
+
+    assert built.client is prod.client
+    assert staging.client is not prod.client
+    assert staging.client.base_url == "https://staging.sisense.com"
+    assert staging.elasticube_service.client is staging.client
+    assert staging.metadata_cache is not prod.metadata_cache
+    # Each instance keeps its own materialized results
+    assert staging.elasticube_service.local_store is staging.local_store
+    assert staging.local_store is not prod.local_store
+    assert built.local_store is prod.local_store
+    limits = built.metrics.snapshot()["limits"]
+    assert limits["sql"]["concurrency_limit"] == 8
+    assert limits["staging/sql"]["concurrency_limit"] == 2
+    assert set(built.metrics.snapshot()["caches"]) == {
+        "metadata",
+        "results",
+        "staging/metadata",
+        "staging/results",
+    }
+    for instance in built.instances.values():
+        await instance.client.aclose()
+
+
+@pytest.mark.parametrize(
+    "instances",
+    [
+        {"staging": {"metrics_enabled": False}},
+        {"staging": {"sisense_no_such_setting": 1}},
+        {"default": {"sisense_api_token": "other"}},
+    ],
+)
+def test_instance_settings_rejects_invalid_instances(instances):
+    """Test that process-wide or unknown settings and duplicate names are rejected."""
+    from src.config import Settings
+    from src.runtime import instance_settings
+
+    settings = Settings(
+        sisense_base_url="https://test.sisense.com",
+        sisense_api_token="test_token",
+        sisense_instances=instances,
+    )
+    with pytest.raises(ValueError):
+        instance_settings(settings)
@@ -0,0 +1,95 @@
+"""Tests for SingleFlight request coalescing."""
+
+import asyncio
+
+import pytest
+
+from src.client.singleflight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    """Test that concurrent calls with one key run the function once."""
+    flight = SingleFlight()
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(100)))
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_all_waiters():
+    """Test that every waiter receives the shared exception."""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    results = await asyncio.gather(
+        *(flight.do("key", fail) for _ in range(10)), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_the_call_alive():
+    """Test that a cancelled waiter does not cancel the call for others."""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flight.do("key", fetch))
+    second = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_cancelling_all_waiters_cancels_the_call():
+    """Test that the shared call is cancelled when nobody is waiting anymore."""
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def fetch():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flight.do("key", fetch))
+    await started.wait()
+    waiter.cancel()
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    assert len(flight) == 0
+
+    # A new call after cancellation starts fresh instead of reusing the cancelled one
+    async def quick():
+        return "fresh"
+
+    assert await flight.do("key", quick) == "fresh"
@@ -1,11 +1,19 @@
 """Tests for SisenseClient."""
 
-from unittest.mock import AsyncMock, MagicMock, patch
+import asyncio
 
 import httpx
 import pytest
 
-from src.client import SisenseClient
+from src.client import CircuitOpenError, LimitConfig, RetryPolicy, SisenseClient
+from src.metrics import MetricsRegistry
+
+
+def make_client(handler, **kwargs) -> SisenseClient:
+    """Create a SisenseClient backed by an in-memory mock transport."""
+    return SisenseClient(
+        "https://test.sisense.com", "test_token", transport=httpx.MockTransport(handler), **kwargs
+    )
 
 
 @pytest.mark.asyncio
@@ -19,56 +27,106 @@ async def test_client_init():
 @pytest.mark.asyncio
 async def test_client_get_success():
     """Test successful GET request."""
-    client = SisenseClient("https://test.sisense.com", "test_token")
+    requests = []
 
-    mock_response = {"data": "test"}
-    with patch("httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client_class.return_value.__aenter__.return_value = mock_client
-        mock_response_obj = MagicMock()
-        mock_response_obj.json.return_value = mock_response
-        mock_response_obj.raise_for_status = MagicMock()
-        mock_client.get.return_value = mock_response_obj
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"data": "test"})
 
-        result = await client.get("/api/test")
-        assert result == mock_response
-        mock_client.get.assert_called_once()
+    client = make_client(handler)
+    result = await client.get("/api/test", params={"title": "Sales"})
+
+    assert result == {"data": "test"}
+    assert len(requests) == 1
+    assert str(requests[0].url) == "https://test.sisense.com/api/test?title=Sales"
+    assert requests[0].headers["Authorization"] == "Bearer test_token"
+    await client.aclose()
 
 
 @pytest.mark.asyncio
 async def test_client_get_error():
     """Test GET request with HTTP error."""
-    client = SisenseClient("https://test.sisense.com", "test_token")
-
-    with patch("httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client_class.return_value.__aenter__.return_value = mock_client
-        mock_response_obj = MagicMock()
-        mock_response_obj.raise_for_status.side_effect = httpx.HTTPStatusError(
-            "Error", request=MagicMock(), response=MagicMock()
-        )
-        mock_client.get.return_value = mock_response_obj
+    client = make_client(
+        lambda request: httpx.Response(500, text="boom"), retry_policy=RetryPolicy(max_retries=0)
+    )
 
-        with pytest.raises(httpx.HTTPStatusError):
-            await client.get("/api/test")
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get("/api/test")
+    await client.aclose()
 
 
 @pytest.mark.asyncio
 async def test_client_post_success():
     """Test successful POST request."""
-    client = SisenseClient("https://test.sisense.com", "test_token")
+    bodies = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(request.content)
+        return httpx.Response(200, json={"result": "success"})
+
+    client = make_client(handler)
+    result = await client.post("/api/test", json_data={"key": "value"})
+
+    assert result == {"result": "success"}
+    assert bodies == [b'{"key":"value"}']
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_reuses_pooled_http_client():
+    """Test that consecutive requests share one underlying connection pool."""
+    client = make_client(lambda request: httpx.Response(200, json={}))
+
+    await client.get("/api/one")
+    pooled = client._client
+    await client.get("/api/two")
+    await client.post("/api/three")
+
+    assert pooled is not None
+    assert client._client is pooled
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_aclose_releases_pool():
+    """Test that aclose closes the pool and a later request opens a fresh one."""
+    client = make_client(lambda request: httpx.Response(200, json={}))
+
+    await client.get("/api/test")
+    pooled = client._client
+    await client.aclose()
+
+    assert pooled.is_closed
+    assert client._client is None
+    # Closing twice is a no-op
+    await client.aclose()
+
+    await client.get("/api/test")
+    assert client._client is not None and client._client is not pooled
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_async_context_manager():
+    """Test that the client closes its pool when used as an async context manager."""
+    async with make_client(lambda request: httpx.Response(200, json={"ok": True})) as client:
+        assert await client.get("/api/test") == {"ok": True}
+        pooled = client._client
+    assert pooled.is_closed
 
-    mock_response = {"result": "success"}
-    with patch("httpx.AsyncClient") as mock_client_class:
-        mock_client = AsyncMock()
-        mock_client_class.return_value.__aenter__.return_value = mock_client
-        mock_response_obj = MagicMock()
-        mock_response_obj.json.return_value = mock_response
-        mock_response_obj.raise_for_status = MagicMock()
-        mock_client.post.return_value = mock_response_obj
 
-        result = await client.post("/api/test", json_data={"key": "value"})
-        assert result == mock_response
+def test_client_pool_limits():
+    """Test that pool limits are configurable."""
+    client = SisenseClient(
+        "https://test.sisense.com",
+        "test_token",
+        max_connections=5,
+        max_keepalive_connections=2,
+        keepalive_expiry=10.0,
+    )
+    assert client.limits.max_connections == 5
+    assert client.limits.max_keepalive_connections == 2
+    assert client.limits.keepalive_expiry == 10.0
 
 
 def test_encode_datasource_name():
@@ -82,3 +140,278 @@ def test_encode_datasource_name():
     # Test already safe characters
     encoded = client.encode_datasource_name("SimpleName")
     assert encoded == "SimpleName"
+
+
+@pytest.mark.asyncio
+async def test_client_coalesces_identical_concurrent_gets():
+    """Test that 100 concurrent identical GETs produce a single upstream request."""
+    upstream_calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"title": request.url.params["title"]})
+
+    client = make_client(handler)
+    results = await asyncio.gather(
+        *(client.get("/api/v2/datamodels/schema", params={"title": "Sales"}) for _ in range(100))
+    )
+
+    assert upstream_calls == 1
+    assert all(result == {"title": "Sales"} for result in results)
+
+    # Different params are not coalesced, and finished calls are not cached
+    await asyncio.gather(
+        client.get("/api/v2/datamodels/schema", params={"title": "Sales"}),
+        client.get("/api/v2/datamodels/schema", params={"title": "Marketing"}),
+    )
+    assert upstream_calls == 3
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_coalescing_can_be_disabled():
+    """Test that coalescing can be turned off."""
+    upstream_calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={})
+
+    client = make_client(handler, coalesce_requests=False)
+    await asyncio.gather(*(client.get("/api/test") for _ in range(5)))
+
+    assert upstream_calls == 5
+    await client.aclose()
+
+
+def fast_retries(max_retries: int = 2) -> RetryPolicy:
+    return RetryPolicy(max_retries=max_retries, backoff=0.001, backoff_max=0.001)
+
+
+@pytest.mark.asyncio
+async def test_client_retries_gets_on_5xx_and_transport_errors():
+    """Test that GETs are retried until they succeed."""
+    attempts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise httpx.ConnectError("refused", request=request)
+        if attempts == 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    client = make_client(handler, retry_policy=fast_retries())
+
+    assert await client.get("/api/v1/elasticubes/getElasticubes") == {"ok": True}
+    assert attempts == 3
+    assert client.stats()["retries"]["elasticubes"] == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_gives_up_after_max_retries():
+    """Test that the last error response is raised once retries are exhausted."""
+    attempts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        return httpx.Response(502)
+
+    client = make_client(handler, retry_policy=fast_retries(2))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get("/api/test")
+    assert attempts == 3
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_honors_retry_after(monkeypatch):
+    """Test that Retry-After sets the delay and overlong values are not waited for."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "2"}),
+            httpx.Response(200, json={}),
+            httpx.Response(429, headers={"Retry-After": "3600"}),
+        ]
+    )
+    client = make_client(lambda request: next(responses), retry_policy=RetryPolicy())
+
+    await client.get("/api/one")
+    assert delays == [2.0]
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.get("/api/two")
+    assert delays == [2.0]
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_does_not_retry_posts_or_sql_read_timeouts():
+    """Test that POSTs and timed-out SQL queries are sent once."""
+    attempts = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal attempts
+        attempts += 1
+        if request.method == "POST":
+            return httpx.Response(503)
+        raise httpx.ReadTimeout("slow", request=request)
+
+    client = make_client(handler, retry_policy=fast_retries())
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await client.post("/api/test")
+    with pytest.raises(httpx.ReadTimeout):
+        await client.get("/api/datasources/Sales/sql", params={"query": "SELECT 1"})
+    assert attempts == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_circuit_breaker_fails_fast_per_family():
+    """Test that repeated failures open only the failing family's breaker."""
+    attempts = {"sql": 0, "dashboards": 0}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/sql"):
+            attempts["sql"] += 1
+            return httpx.Response(500)
+        attempts["dashboards"] += 1
+        return httpx.Response(200, json=[])
+
+    client = make_client(
+        handler, retry_policy=fast_retries(0), breaker_failure_threshold=3, coalesce_requests=False
+    )
+
+    for _ in range(3):
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get("/api/datasources/Sales/sql")
+    with pytest.raises(CircuitOpenError, match="'sql'"):
+        await client.get("/api/datasources/Sales/sql")
+    assert attempts["sql"] == 3
+
+    assert await client.get("/api/v1/dashboards") == []
+    stats = client.stats()["breakers"]
+    assert stats["sql"]["state"] == "open"
+    assert stats["sql"]["rejected"] == 1
+    assert stats["dashboards"]["state"] == "closed"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_get_retries_before_the_body_starts():
+    """Test that a streamed GET is retried on a 503 before any item is yielded."""
+    responses = iter([httpx.Response(503), httpx.Response(200, json={"values": [[1], [2]]})])
+    client = make_client(lambda request: next(responses), retry_policy=fast_retries())
+
+    items = [item async for item in client.stream_get("/api/datasources/S/sql", stream_keys=())]
+
+    assert items == [("values", [[1], [2]])]
+    assert client.stats()["retries"]["sql"] == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_limits_concurrency_per_family():
+    """Test that SQL and metadata calls are limited separately."""
+    in_flight = {"sql": 0, "other": 0}
+    peak = {"sql": 0, "other": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        family = "sql" if request.url.path.endswith("/sql") else "other"
+        in_flight[family] += 1
+        peak[family] = max(peak[family], in_flight[family])
+        await asyncio.sleep(0.01)
+        in_flight[family] -= 1
+        return httpx.Response(200, json={})
+
+    metadata = LimitConfig(max_concurrency=4)
+    client = make_client(
+        handler,
+        coalesce_requests=False,
+        rate_limits={
+            "sql": LimitConfig(max_concurrency=2),
+            "elasticubes": metadata,
+            "other": metadata,
+        },
+    )
+    await asyncio.gather(
+        *(client.get("/api/datasources/S/sql") for _ in range(10)),
+        *(client.get("/api/v1/elasticubes/getElasticubes") for _ in range(5)),
+        *(client.get("/api/test") for _ in range(5)),
+    )
+
+    assert peak == {"sql": 2, "other": 4}
+    limits = client.stats()["limits"]
+    assert limits["sql"]["requests"] == 10
+    # Families mapped to the same config share one limiter
+    assert limits["other"]["requests"] == 10
+    assert limits["sql"]["mean_wait_ms"] > 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_backs_off_concurrency_on_429():
+    """Test that a 429 cuts the family's concurrency limit and the retry succeeds."""
+    responses = iter([httpx.Response(429), httpx.Response(200, json={"ok": True})])
+    client = make_client(
+        lambda request: next(responses),
+        retry_policy=fast_retries(),
+        rate_limits={"sql": LimitConfig(max_concurrency=8)},
+    )
+
+    assert await client.get("/api/datasources/S/sql") == {"ok": True}
+    stats = client.stats()["limits"]["sql"]
+    assert stats["overloads"] == 1
+    assert stats["concurrency_limit"] == 4
+    assert stats["in_flight"] == 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stream_get_holds_its_slot_until_the_body_is_read():
+    """Test that a streamed response keeps its concurrency slot while it is consumed."""
+    client = make_client(
+        lambda request: httpx.Response(200, json={"values": [[1]]}),
+        rate_limits={"sql": LimitConfig(max_concurrency=1)},
+    )
+    limiter = client.limiters["sql"]
+
+    stream = client.stream_get("/api/datasources/S/sql", stream_keys=("values",))
+    assert (await anext(stream))[0] == "values"
+    assert limiter.concurrency.in_flight == 1
+    await stream.aclose()
+    assert limiter.concurrency.in_flight == 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_client_records_upstream_metrics():
+    """Test that every attempt is recorded per family with its status and retry count."""
+    responses = iter([httpx.Response(503), httpx.Response(200, json={"ok": True})])
+    metrics = MetricsRegistry()
+    client = make_client(
+        lambda request: next(responses), retry_policy=fast_retries(), metrics=metrics
+    )
+    metrics.watch_client(client)
+
+    assert await client.get("/api/v1/elasticubes/getElasticubes") == {"ok": True}
+
+    upstream = metrics.snapshot()["upstream"]["elasticubes"]
+    assert upstream["requests"] == 2
+    assert upstream["statuses"] == {"200": 1, "503": 1}
+    assert upstream["retries"] == 1
+    await client.aclose()
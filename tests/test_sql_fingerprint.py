@@ -0,0 +1,35 @@
+"""Tests for SQL normalization and fingerprints."""
+
+from src.services.sql_fingerprint import normalize_sql, sql_fingerprint
+
+
+def test_normalize_whitespace_comments_and_keyword_case():
+    """Test that layout, comments and keyword case do not matter."""
+    sql = "select  Brand,\n\tcount(*) from Sales -- all rows\n /* note */ group by Brand"
+    assert normalize_sql(sql) == "SELECT Brand , COUNT ( * ) FROM Sales GROUP BY Brand"
+
+
+def test_normalize_sorts_literal_in_lists():
+    """Test that literal IN lists are sorted and de-duplicated."""
+    assert normalize_sql("x IN ('b', 'a', 'b')") == "x IN ( 'a' , 'b' )"
+    assert normalize_sql("x not in (3,1,2)") == "x NOT IN ( 1 , 2 , 3 )"
+    # Lists containing expressions or subqueries are left alone
+    assert normalize_sql("x IN (2, y)") == "x IN ( 2 , y )"
+    assert normalize_sql("x IN (SELECT id FROM t)") == "x IN ( SELECT id FROM t )"
+
+
+def test_literals_and_identifiers_keep_their_spelling():
+    """Test that values and identifiers that could change results stay distinct."""
+    assert normalize_sql("WHERE name = 'select  Me'") == "WHERE name = 'select  Me'"
+    assert normalize_sql('SELECT "My Col" FROM [Sales Data]') == (
+        'SELECT "My Col" FROM [Sales Data]'
+    )
+    assert sql_fingerprint("SELECT a FROM t") != sql_fingerprint("SELECT A FROM t")
+    assert sql_fingerprint("WHERE x = 'a'") != sql_fingerprint("WHERE x = 'A'")
+
+
+def test_fingerprint_is_stable():
+    """Test that equivalent queries share a fingerprint."""
+    assert sql_fingerprint("select * from t where id in (2,1)") == sql_fingerprint(
+        "SELECT *\nFROM t\nWHERE id IN (1, 2)"
+    )
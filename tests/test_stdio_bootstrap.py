@@ -0,0 +1,154 @@
+"""Tests for the stdio bootstrap that answers the MCP handshake from static data."""
+
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.shared.version import SUPPORTED_PROTOCOL_VERSIONS
+
+from src import runtime
+from src.app import app
+from src.stdio_bootstrap import SUPPORTED_PROTOCOL_VERSIONS as BOOTSTRAP_VERSIONS
+from src.stdio_bootstrap import StdioBootstrap, initialize_result, list_tools_result
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def request(request_id, method: str, params: dict | None = None) -> dict:
+    message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params is not None:
+        message["params"] = params
+    return message
+
+
+INITIALIZE = request(
+    1,
+    "initialize",
+    {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1.0"},
+    },
+)
+INITIALIZED = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+
+
+@pytest.mark.asyncio
+async def test_static_answers_match_the_sdk_server():
+    """Test that the static initialize and tools/list results equal the SDK's."""
+    assert list(BOOTSTRAP_VERSIONS) == list(SUPPORTED_PROTOCOL_VERSIONS)
+
+    async with create_connected_server_and_client_session(app) as session:
+        tools = await session.list_tools()
+    options = app.create_initialization_options()
+
+    expected = initialize_result({"protocolVersion": SUPPORTED_PROTOCOL_VERSIONS[-1]})
+    assert expected["capabilities"] == options.capabilities.model_dump(
+        by_alias=True, exclude_none=True
+    )
+    assert expected["serverInfo"] == {
+        "name": options.server_name,
+        "version": options.server_version,
+    }
+    assert list_tools_result() == tools.model_dump(by_alias=True, exclude_none=True)
+
+
+def test_initialize_negotiates_protocol_version():
+    """Test that unknown protocol versions fall back to the latest supported one."""
+    assert initialize_result({"protocolVersion": "2024-11-05"})["protocolVersion"] == "2024-11-05"
+    assert initialize_result({"protocolVersion": "1999-01-01"})["protocolVersion"] == (
+        BOOTSTRAP_VERSIONS[-1]
+    )
+
+
+def test_handshake_does_not_import_the_sdk():
+    """Test that initialize, tools/list and ping are answered without mcp or httpx."""
+    script = (
+        "import asyncio, json, sys\n"
+        "from src.stdio_bootstrap import StdioBootstrap\n"
+        "asyncio.run(StdioBootstrap(warm_up=False).run())\n"
+        "heavy = [m for m in ('mcp', 'httpx', 'pydantic', 'src.config') if m in sys.modules]\n"
+        "print(json.dumps(heavy), file=sys.stderr)\n"
+    )
+    messages = [INITIALIZE, INITIALIZED, request(2, "tools/list"), request(3, "ping")]
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        input="".join(json.dumps(m) + "\n" for m in messages).encode(),
+        capture_output=True,
+        cwd=ROOT,
+        env={k: v for k, v in os.environ.items() if not k.startswith("SISENSE_")},
+        timeout=30,
+    )
+
+    assert result.returncode == 0, result.stderr.decode()
+    responses = [json.loads(line) for line in result.stdout.decode().splitlines()]
+    assert [r["id"] for r in responses] == [1, 2, 3]
+    assert responses[0]["result"]["serverInfo"]["name"] == "sisense-mcp"
+    assert len(responses[1]["result"]["tools"]) == 11
+    assert responses[2]["result"] == {}
+    assert json.loads(result.stderr.decode().strip().splitlines()[-1]) == []
+
+
+@pytest.mark.asyncio
+async def test_tool_call_hands_over_to_the_sdk(monkeypatch):
+    """Test that a tools/call is served by the SDK server after the static handshake."""
+    service = MagicMock()
+    service.list_elasticubes = AsyncMock(return_value=[{"title": "Sales"}])
+    monkeypatch.setattr(runtime, "_runtime", MagicMock(elasticube_service=service))
+
+    in_read, in_write = os.pipe()
+    out_read, out_write = os.pipe()
+    stdin, client_in = os.fdopen(in_read, "rb"), os.fdopen(in_write, "wb")
+    stdout, client_out = os.fdopen(out_write, "wb"), os.fdopen(out_read, "rb")
+    bootstrap = StdioBootstrap(stdin, stdout, warm_up=False)
+    task = asyncio.create_task(bootstrap.run())
+
+    async def exchange(message: dict | None) -> dict | None:
+        if message is not None:
+            client_in.write(json.dumps(message).encode() + b"\n")
+            client_in.flush()
+        if message is None or "id" not in message:
+            return None
+        return json.loads(await asyncio.to_thread(client_out.readline))
+
+    assert (await exchange(INITIALIZE))["id"] == 1
+    await exchange(INITIALIZED)
+    assert not bootstrap.handed_over
+
+    response = await exchange(request(2, "tools/call", {"name": "list_elasticubes"}))
+    assert bootstrap.handed_over
+    assert response["id"] == 2
+    assert json.loads(response["result"]["content"][0]["text"]) == [{"title": "Sales"}]
+
+    response = await exchange(request(3, "tools/call", {"name": "unknown", "arguments": {}}))
+    assert response["result"]["isError"] is True
+
+    client_in.close()
+    await asyncio.wait_for(task, 10)
+    for stream in (stdin, stdout, client_out):
+        stream.close()
+
+
+@pytest.mark.asyncio
+async def test_hand_over_fails_loudly_on_an_unsupported_protocol_version(monkeypatch):
+    """Test that a version the installed SDK does not support is reported, not dropped."""
+    import mcp.shared.version
+
+    monkeypatch.setattr(mcp.shared.version, "SUPPORTED_PROTOCOL_VERSIONS", ["2024-11-05"])
+    lines = [INITIALIZE, INITIALIZED, request(2, "tools/call", {"name": "list_elasticubes"})]
+    stdin = io.BytesIO(b"".join(json.dumps(line).encode() + b"\n" for line in lines))
+    stdout = io.BytesIO()
+
+    with pytest.raises(RuntimeError, match="2025-06-18"):
+        await StdioBootstrap(stdin, stdout, warm_up=False).run()
+
+    responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert responses[-1]["id"] == 2
+    assert "Upgrade the mcp package" in responses[-1]["error"]["message"]
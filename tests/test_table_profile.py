@@ -0,0 +1,60 @@
+"""Tests for the table profiling queries."""
+
+import pytest
+
+from src.services.schema_index import ColumnInfo
+from src.services.table_profile import (
+    aggregate_query,
+    column_kind,
+    parse_aggregates,
+    parse_top_values,
+    quote_identifier,
+    top_values_query,
+)
+
+
+def test_column_kind():
+    """Test that type codes and type names are classified."""
+    assert column_kind(8) == "numeric"
+    assert column_kind(18) == "text"
+    assert column_kind(31) == "date"
+    assert column_kind(2) == "boolean"
+    assert column_kind(21) == "other"
+    assert column_kind("DateTime") == "date"
+    assert column_kind("nvarchar") == "text"
+    assert column_kind("decimal") == "numeric"
+    assert column_kind(None) == "other"
+
+
+def test_aggregate_query_and_parse():
+    """Test that one row of aggregates is split per column by position."""
+    columns = [ColumnInfo("Amount", 5), ColumnInfo("Is Paid", 2)]
+    assert aggregate_query("Sales]Data", columns) == (
+        "SELECT COUNT(*), COUNT([Amount]), COUNT(DISTINCT [Amount]), MIN([Amount]), "
+        "MAX([Amount]), COUNT([Is Paid]), COUNT(DISTINCT [Is Paid]) FROM [Sales]]Data]"
+    )
+
+    row_count, stats = parse_aggregates(columns, {"values": [[10, 9, 7, 1.5, 99.0, 10, 2]]})
+
+    assert row_count == 10
+    assert stats == {
+        "Amount": {"non_null": 9, "distinct": 7, "min": 1.5, "max": 99.0},
+        "Is Paid": {"non_null": 10, "distinct": 2},
+    }
+    with pytest.raises(ValueError, match="7 expected values"):
+        parse_aggregates(columns, {"values": [[10, 9]]})
+    with pytest.raises(ValueError, match="exactly one row"):
+        parse_aggregates(columns, {"values": []})
+
+
+def test_top_values():
+    """Test the GROUP BY query and its parsing, including dict rows."""
+    assert quote_identifier("a]b") == "[a]]b]"
+    assert top_values_query("orders", "status") == (
+        "SELECT [status], COUNT(*) FROM [orders] GROUP BY [status] ORDER BY COUNT(*) DESC"
+    )
+    result = {"values": [["open", 5], {"status": "closed", "n": 3}]}
+    assert parse_top_values(result) == [
+        {"value": "open", "count": 5},
+        {"value": "closed", "count": 3},
+    ]
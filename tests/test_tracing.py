@@ -0,0 +1,187 @@
+"""Tests for trace spans and the OTLP/JSON exporter."""
+
+import asyncio
+import io
+import json
+
+import httpx
+import pytest
+
+from src import tracing
+from src.client import RetryPolicy, SisenseClient
+from src.tracing import CLIENT, NOOP_SPAN, SERVER, Tracer, span, traced
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    """Install a tracer writing to an in-memory stream."""
+    installed = Tracer(io.StringIO(), service_version="1.2.3")
+    monkeypatch.setattr(tracing, "_tracer", installed)
+    return installed
+
+
+def exported(tracer: Tracer) -> list[list[dict]]:
+    """Spans of each exported trace (one OTLP/JSON line per trace)."""
+    traces = []
+    for line in tracer.output.getvalue().splitlines():
+        [resource_spans] = json.loads(line)["resourceSpans"]
+        [scope_spans] = resource_spans["scopeSpans"]
+        traces.append(scope_spans["spans"])
+    return traces
+
+
+def attributes(encoded: dict) -> dict:
+    return {a["key"]: next(iter(a["value"].values())) for a in encoded["attributes"]}
+
+
+def test_span_is_a_no_op_without_a_tracer():
+    """Test that span() returns the shared no-op span while tracing is off."""
+    assert tracing.get_tracer() is None
+    with span("anything", {"a": 1}) as s:
+        s.set("b", 2)
+        s.set_error("ignored")
+    assert s is NOOP_SPAN
+    assert tracing.http_extensions() is None
+    assert tracing.current_trace_id() is None
+
+
+@pytest.mark.asyncio
+async def test_nested_spans_form_one_trace(tracer):
+    """Test that child spans share the root's trace id and the trace is exported once."""
+
+    @traced("Service.method")
+    async def method():
+        with span("parse", {"http.response.body.size": 42}):
+            return tracing.current_trace_id()
+
+    with span("tools/call list_elasticubes", kind=SERVER) as root:
+        correlation_id = await method()
+    assert correlation_id == root.trace_id
+
+    [spans] = exported(tracer)
+    by_name = {s["name"]: s for s in spans}
+    assert set(by_name) == {"tools/call list_elasticubes", "Service.method", "parse"}
+    assert {s["traceId"] for s in spans} == {root.trace_id}
+    assert "parentSpanId" not in by_name["tools/call list_elasticubes"]
+    assert by_name["Service.method"]["parentSpanId"] == root.span_id
+    assert by_name["parse"]["parentSpanId"] == by_name["Service.method"]["spanId"]
+    assert attributes(by_name["parse"]) == {"http.response.body.size": "42"}
+    assert by_name["tools/call list_elasticubes"]["kind"] == SERVER
+    assert int(by_name["parse"]["endTimeUnixNano"]) >= int(by_name["parse"]["startTimeUnixNano"])
+
+
+def test_exported_line_is_an_otlp_export_request(tracer):
+    """Test the resource and scope envelope of an exported trace."""
+    with span("root"):
+        pass
+
+    request = json.loads(tracer.output.getvalue())
+    [resource_spans] = request["resourceSpans"]
+    assert attributes(resource_spans["resource"]) == {
+        "service.name": "sisense-mcp",
+        "service.version": "1.2.3",
+    }
+    assert resource_spans["scopeSpans"][0]["scope"] == {"name": "sisense-mcp"}
+    [encoded] = resource_spans["scopeSpans"][0]["spans"]
+    assert len(encoded["traceId"]) == 32
+    assert len(encoded["spanId"]) == 16
+    assert tracer.exported_traces == 1
+
+
+def test_exceptions_mark_spans_as_failed(tracer):
+    """Test that an exception leaving a span sets an error status and error.type."""
+    with pytest.raises(ValueError):
+        with span("root"):
+            with span("child"):
+                raise ValueError("bad input")
+
+    [spans] = exported(tracer)
+    for encoded in spans:
+        assert encoded["status"] == {"code": tracing.STATUS_ERROR, "message": "bad input"}
+        assert attributes(encoded)["error.type"] == "ValueError"
+
+
+def test_spans_ending_after_their_root_are_exported_alone(tracer):
+    """Test that a child outliving its root is still exported."""
+    with span("root"):
+        child = tracer.start("background")
+    child.end()
+
+    [root_trace, late] = exported(tracer)
+    assert [s["name"] for s in root_trace] == ["root"]
+    assert [s["name"] for s in late] == ["background"]
+    assert late[0]["traceId"] == root_trace[0]["traceId"]
+
+
+@pytest.mark.asyncio
+async def test_httpcore_events_become_phase_spans(tracer):
+    """Test that httpcore trace events are turned into connect/tls/server spans."""
+    with span("sisense sql", kind=CLIENT):
+        for event in (
+            "connection.connect_tcp.started",
+            "connection.connect_tcp.complete",
+            "connection.start_tls.started",
+            "connection.start_tls.complete",
+            "http11.receive_response_headers.started",
+            "http11.receive_response_headers.failed",
+            "http11.response_closed.started",
+        ):
+            await tracer.httpcore_trace(event, {"exception": TimeoutError()})
+
+    [spans] = exported(tracer)
+    assert [s["name"] for s in spans] == ["connect", "tls", "server", "sisense sql"]
+    assert spans[2]["status"]["code"] == tracing.STATUS_ERROR
+
+
+@pytest.mark.asyncio
+async def test_unfinished_phase_spans_end_with_their_request(tracer):
+    """Test that phases of a request cancelled mid-flight are not kept open."""
+    with pytest.raises(asyncio.CancelledError):
+        with span("sisense sql", kind=CLIENT):
+            await tracer.httpcore_trace("http11.receive_response_body.started", {})
+            raise asyncio.CancelledError
+
+    assert tracer._phases == {}
+    [spans] = exported(tracer)
+    assert [s["name"] for s in spans] == ["download", "sisense sql"]
+    assert spans[0]["status"] == {"code": tracing.STATUS_ERROR, "message": "interrupted"}
+
+
+@pytest.mark.asyncio
+async def test_client_requests_are_traced(tracer):
+    """Test that SisenseClient emits a client span per attempt and a parse span."""
+    responses = iter([httpx.Response(503), httpx.Response(200, json={"ok": True})])
+    client = SisenseClient(
+        "https://test.sisense.com",
+        "test_token",
+        transport=httpx.MockTransport(lambda request: next(responses)),
+        retry_policy=RetryPolicy(max_retries=2, backoff=0.001, backoff_max=0.001),
+    )
+
+    with span("root"):
+        assert await client.get("/api/v1/elasticubes/getElasticubes") == {"ok": True}
+    await client.aclose()
+
+    [spans] = exported(tracer)
+    requests = [s for s in spans if s["name"] == "sisense elasticubes"]
+    assert [attributes(s)["http.response.status_code"] for s in requests] == ["503", "200"]
+    assert [attributes(s)["http.request.resend_count"] for s in requests] == ["0", "1"]
+    assert requests[0]["status"]["code"] == tracing.STATUS_ERROR
+    assert requests[0]["kind"] == CLIENT
+    assert any(s["name"] == "parse" for s in spans)
+
+
+def test_open_tracer_appends_to_a_file(tmp_path):
+    """Test that a file export appends one line per trace."""
+    path = tmp_path / "traces.jsonl"
+    for _ in range(2):
+        tracer = tracing.open_tracer(str(path))
+        tracing.set_tracer(tracer)
+        try:
+            with span("root"):
+                pass
+        finally:
+            tracing.set_tracer(None)
+            tracer.close()
+
+    assert len(path.read_text().splitlines()) == 2
@@ -0,0 +1,121 @@
+"""Tests for TTLCache."""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.cache import TTLCache
+from src.cache.ttl_cache import estimate_size
+
+
+def test_get_set_and_stats():
+    """Test basic hit/miss accounting."""
+    cache = TTLCache()
+
+    assert cache.get("schema", "Sales") is None
+    cache.set("schema", "Sales", {"title": "Sales"})
+    assert cache.get("schema", "Sales") == {"title": "Sales"}
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["namespaces"]["schema"] == {"hits": 1, "misses": 1}
+
+
+def test_per_namespace_ttl_expiry(clock):
+    """Test that entries expire after their namespace TTL."""
+    cache = TTLCache(default_ttl=100, ttls={"elasticubes": 10}, clock=clock)
+    cache.set("elasticubes", None, ["cube"])
+    cache.set("schema", "Sales", {"title": "Sales"})
+
+    clock.now = 11
+    assert cache.get("elasticubes") is None
+    assert cache.get("schema", "Sales") == {"title": "Sales"}
+
+    clock.now = 101
+    assert cache.get("schema", "Sales") is None
+    assert len(cache) == 0
+
+
+def test_zero_ttl_disables_namespace():
+    """Test that a TTL of 0 disables caching for a namespace."""
+    cache = TTLCache(ttls={"dashboards": 0})
+    assert cache.set("dashboards", None, []) is False
+    assert len(cache) == 0
+
+
+def test_lru_eviction_by_entry_count():
+    """Test that least recently used entries are evicted first."""
+    cache = TTLCache(max_entries=2)
+    cache.set("schema", "a", 1)
+    cache.set("schema", "b", 2)
+    cache.get("schema", "a")  # "b" is now least recently used
+    cache.set("schema", "c", 3)
+
+    assert cache.get("schema", "b") is None
+    assert cache.get("schema", "a") == 1
+    assert cache.get("schema", "c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_eviction_by_bytes():
+    """Test that the byte budget evicts old entries and rejects oversized ones."""
+    cache = TTLCache(max_bytes=100)
+    cache.set("schema", "a", "x" * 40)
+    cache.set("schema", "b", "y" * 40)
+    cache.set("schema", "c", "z" * 40)
+
+    assert cache.get("schema", "a") is None
+    assert cache.total_bytes <= 100
+    assert cache.set("schema", "huge", "x" * 500) is False
+
+
+def test_estimate_size_tracks_the_json_length():
+    """Test that sizes are exact for small values and close for sampled long lists."""
+    small = {"headers": ["id", "name"], "values": [[1, "a"], [2, None]], "ok": True}
+    assert estimate_size(small) == len(json.dumps(small, separators=(",", ":")))
+
+    result = {"values": [[i, f"Brand {i % 997}", i * 1.5] for i in range(100_000)]}
+    exact = len(json.dumps(result, separators=(",", ":")))
+    assert abs(estimate_size(result) - exact) < 0.05 * exact
+
+
+def test_max_entry_bytes_rejects_large_values():
+    """Test that a value above max_entry_bytes is not cached and evicts nothing."""
+    cache = TTLCache(max_bytes=1000, max_entry_bytes=100)
+    cache.set("sql", "small", "x" * 50)
+
+    assert cache.set("sql", "big", "y" * 200) is False
+    assert cache.get("sql", "small") == "x" * 50
+    assert cache.stats()["evictions"] == 0
+
+
+def test_invalidate():
+    """Test explicit invalidation by key, namespace and globally."""
+    cache = TTLCache()
+    cache.set("schema", "a", 1)
+    cache.set("schema", "b", 2)
+    cache.set("elasticubes", None, [])
+
+    assert cache.invalidate("schema", "a") == 1
+    assert cache.invalidate("schema", "missing") == 0
+    assert cache.invalidate("schema") == 1
+    assert cache.invalidate() == 1
+    assert len(cache) == 0
+    assert cache.total_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_get_or_load():
+    """Test that get_or_load only calls the loader on a miss or refresh."""
+    cache = TTLCache()
+    loader = AsyncMock(return_value={"title": "Sales"})
+
+    assert await cache.get_or_load("schema", "Sales", loader) == {"title": "Sales"}
+    assert await cache.get_or_load("schema", "Sales", loader) == {"title": "Sales"}
+    assert loader.await_count == 1
+
+    await cache.get_or_load("schema", "Sales", loader, refresh=True)
+    assert loader.await_count == 2